@@ -47,7 +47,7 @@ const InvoiceCard = memo(({ invoice, onView, onConvert, highlighted }) => {
                 )}
             </div>
             <h3 style={{ fontSize: '1rem', fontWeight: 800, color: '#e2e8f0', margin: '0 0 0.25rem' }}>{invoice.customer.name}</h3>
-            <span style={{ fontSize: '0.7rem', color: '#64748b' }}>{invoice.items?.length || 0} items</span>
+            <span style={{ fontSize: '0.7rem', color: '#64748b' }}>{invoice.item_count ?? invoice.items?.length ?? 0} items</span>
         </div>
 
         {/* Total */}
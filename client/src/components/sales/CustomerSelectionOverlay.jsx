@@ -1,20 +1,61 @@
-import { useState, useMemo, memo } from 'react';
+import { useState, useEffect, memo } from 'react';
 import api from '../../services/api';
 
-const CustomerSelectionOverlay = memo(({ customers, onSelectCustomer }) => {
+// Server rows -> the customer shape the cart uses
+const toCustomer = c => ({ id: c.customerId, name: c.name, phone: c.phoneNumber, type: c.type, balance: c.balance });
+
+const CustomerSelectionOverlay = memo(({ onSelectCustomer }) => {
     const [customerSearch, setCustomerSearch] = useState('');
     const [newCustomerName, setNewCustomerName] = useState('');
     const [newCustomerPhone, setNewCustomerPhone] = useState('');
     const [newCustomerType, setNewCustomerType] = useState('individual');
     const [isRegistering, setIsRegistering] = useState(false);
 
-    const filteredCustomers = useMemo(() => {
-        if (!customerSearch) return [];
-        const lower = customerSearch.toLowerCase();
-        return customers.filter(c =>
-            c.name.toLowerCase().includes(lower) || c.phone.includes(lower)
-        );
-    }, [customers, customerSearch]);
+    // The cashier's recent customers until they type; then one server page
+    // per (debounced) query, with "more" pages fetched on demand
+    const [recentCustomers, setRecentCustomers] = useState([]);
+    const [results, setResults] = useState([]);
+    const [nextAfter, setNextAfter] = useState(null);
+    const [isSearching, setIsSearching] = useState(false);
+
+    useEffect(() => {
+        let cancelled = false;
+        api.userService.getRecentCustomers()
+            .then(rows => { if (!cancelled) setRecentCustomers(rows.map(toCustomer)); })
+            .catch(err => console.error('Failed to load recent customers', err));
+        return () => { cancelled = true; };
+    }, []);
+
+    useEffect(() => {
+        const q = customerSearch.trim();
+        setResults([]);
+        setNextAfter(null);
+        setIsSearching(Boolean(q));
+        if (!q) return;
+        const controller = new AbortController();
+        const timer = setTimeout(() => {
+            api.userService.searchCustomers(q, { signal: controller.signal })
+                .then(page => {
+                    setResults(page.items.map(toCustomer));
+                    setNextAfter(page.next_after);
+                    setIsSearching(false);
+                })
+                .catch(() => { /* superseded by the next keystroke */ });
+        }, 200);
+        return () => {
+            clearTimeout(timer);
+            controller.abort();
+        };
+    }, [customerSearch]);
+
+    const loadMore = async () => {
+        if (!nextAfter) return;
+        const page = await api.userService.searchCustomers(customerSearch.trim(), { after: nextAfter });
+        setResults(prev => [...prev, ...page.items.map(toCustomer)]);
+        setNextAfter(page.next_after);
+    };
+
+    const filteredCustomers = customerSearch ? results : recentCustomers;
 
     const handleRegister = async () => {
         if (!newCustomerName.trim() || !newCustomerPhone.trim()) return;
@@ -92,10 +133,13 @@ const CustomerSelectionOverlay = memo(({ customers, onSelectCustomer }) => {
                             />
                         </div>
 
-                        {customerSearch && (
+                        {!customerSearch && recentCustomers.length > 0 && (
+                            <p style={{ fontSize: '0.65rem', color: '#475569', margin: '0.5rem 0 0', fontWeight: 700, letterSpacing: '0.08em', textTransform: 'uppercase' }}>Recent</p>
+                        )}
+                        {(customerSearch || recentCustomers.length > 0) && (
                             <div style={{ marginTop: '0.5rem', maxHeight: '180px', overflowY: 'auto', display: 'flex', flexDirection: 'column', gap: '4px' }} className="custom-scrollbar">
                                 {filteredCustomers.length === 0 ? (
-                                    <p style={{ fontSize: '0.78rem', color: '#475569', padding: '0.5rem', textAlign: 'center', fontStyle: 'italic' }}>No customers found</p>
+                                    <p style={{ fontSize: '0.78rem', color: '#475569', padding: '0.5rem', textAlign: 'center', fontStyle: 'italic' }}>{isSearching ? 'Searching...' : 'No customers found'}</p>
                                 ) : filteredCustomers.map(c => (
                                     <button key={c.id} onClick={() => onSelectCustomer(c)} style={{
                                         display: 'flex', alignItems: 'center', justifyContent: 'space-between',
@@ -108,11 +152,23 @@ const CustomerSelectionOverlay = memo(({ customers, onSelectCustomer }) => {
                                     >
                                         <div>
                                             <div style={{ fontSize: '0.875rem', fontWeight: 700, color: '#e2e8f0' }}>{c.name}</div>
-                                            <div style={{ fontSize: '0.72rem', color: '#64748b', fontFamily: 'var(--font-mono)' }}>{c.phone}</div>
+                                            <div style={{ fontSize: '0.72rem', color: '#64748b', fontFamily: 'var(--font-mono)' }}>
+                                                {c.phone}
+                                                {c.balance > 0 && <span style={{ color: '#f59e0b', marginLeft: '0.5rem' }}>owes {c.balance.toLocaleString()}</span>}
+                                            </div>
                                         </div>
                                         <span style={{ fontSize: '0.75rem', color: '#3b82f6', fontWeight: 600 }}>Select →</span>
                                     </button>
                                 ))}
+                                {customerSearch && nextAfter && (
+                                    <button onClick={loadMore} style={{
+                                        padding: '0.5rem', borderRadius: '0.625rem', background: 'transparent',
+                                        border: '1px dashed rgba(255,255,255,0.1)', color: '#64748b',
+                                        fontSize: '0.75rem', fontWeight: 600, cursor: 'pointer',
+                                    }}>
+                                        Show more
+                                    </button>
+                                )}
                             </div>
                         )}
                     </div>
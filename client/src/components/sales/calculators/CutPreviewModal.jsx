@@ -145,6 +145,9 @@ const STRATEGY_LABELS = {
 // fragmentation. This makes that comparison visible instead of silently
 // applying one hidden answer, and shows why a strategy won even when two tie
 // on sheet count: it's the one that left behind offcuts likely to resell.
+// The "best possible" line is the backend's proven lower bound on sheets
+// (glassPackingBounds.py) — the search stops early once a strategy reaches it
+// with zero scrap, which is why simple orders often list just one strategy.
 function OptimizationSummary({ optimization }) {
     if (!optimization || !optimization.trials || optimization.trials.length === 0) return null;
     return (
@@ -153,8 +156,17 @@ function OptimizationSummary({ optimization }) {
             borderRadius: '0.875rem', padding: '0.75rem 1rem', marginBottom: '1rem',
         }}>
             <div style={{ fontSize: '0.72rem', fontWeight: 700, color: '#22d3ee', marginBottom: '0.5rem' }}>
-                Optimizer compared {optimization.strategies_tried} packing strategies
+                Optimizer compared {optimization.strategies_tried} packing strateg{optimization.strategies_tried === 1 ? 'y' : 'ies'}
+                {optimization.early_terminated ? ' — stopped early, plan is provably optimal' : ''}
             </div>
+            {optimization.bounds && (
+                <div style={{ fontSize: '0.68rem', color: '#94a3b8', marginBottom: '0.5rem' }}>
+                    Best possible: {optimization.bounds.sheets_lower_bound} sheet{optimization.bounds.sheets_lower_bound === 1 ? '' : 's'}
+                    {optimization.sheets_above_bound > 0
+                        ? ` · chosen plan uses ${optimization.sheets_above_bound} more`
+                        : ' · chosen plan matches it'}
+                </div>
+            )}
             <div style={{ display: 'flex', flexDirection: 'column', gap: '3px' }}>
                 {optimization.trials.map((t, i) => (
                     <div key={i} style={{
@@ -1,10 +1,15 @@
 // @refresh reset
-import { createContext, useContext, useState, useEffect, useCallback, useMemo } from 'react';
+import { createContext, useContext, useState, useEffect, useCallback, useMemo, useRef } from 'react';
 import api from '../services/api';
 import { wsEvents } from '../utils/wsEvents';
 
 const ProductContext = createContext();
 
+// The server's version counters are per process and restart from 0, so a
+// structure_version alone could repeat one seen before a restart — the boot id
+// tells them apart.
+const structureKey = (payload) => `${payload.boot_id}-${payload.structure_version}`;
+
 export const useProducts = () => {
     const context = useContext(ProductContext);
     if (!context) {
@@ -101,20 +106,22 @@ export const ProductProvider = ({ children }) => {
         });
     };
 
+    // structureKey of the snapshot currently in state — a stock-levels
+    // response with the same key only needs its quantities patched in.
+    const structureKeyRef = useRef(null);
+
+    const applyCatalog = (catalog) => {
+        structureKeyRef.current = structureKey(catalog);
+        const mappedCats = mapCategories(catalog.categories);
+        setCategories(mappedCats);
+        setProducts(mapProducts(catalog.products, mappedCats));
+    };
+
     // --- Data Fetching ---
     const initializeData = useCallback(async () => {
         try {
             setLoading(true);
-            const [rawCats, rawProds] = await Promise.all([
-                api.productService.getAllCategories(),
-                api.productService.getAll()
-            ]);
-
-            const mappedCats = mapCategories(rawCats);
-            setCategories(mappedCats);
-
-            const mappedProds = mapProducts(rawProds, mappedCats);
-            setProducts(mappedProds);
+            applyCatalog(await api.productService.getCatalog());
             setError(null);
         } catch (err) {
             console.error("Failed to fetch product data", err);
@@ -126,18 +133,35 @@ export const ProductProvider = ({ children }) => {
 
     const refreshProducts = useCallback(async () => {
         try {
-            const raw = await api.productService.getAll();
-            // Pull fresh categories inside the setter to avoid stale closure
-            setCategories(currentCats => {
-                const mapped = mapProducts(raw, currentCats);
-                setProducts(mapped);
-                return currentCats;
-            });
+            // Unchanged catalog = 304 revalidation, no rebuild server-side either.
+            applyCatalog(await api.productService.getCatalog());
         } catch (err) {
             console.error("Failed to refresh products", err);
         }
     }, []);
 
+    // `products_updated` follows every sale, which only moves stock: fetch the
+    // small stock-levels payload and patch quantities in place, falling back to
+    // the full catalog when something structural (price, name, variants) changed.
+    const refreshStock = useCallback(async () => {
+        try {
+            const levels = await api.productService.getStockLevels();
+            if (structureKey(levels) !== structureKeyRef.current) {
+                await refreshProducts();
+                return;
+            }
+            const productStock = new Map(levels.products.map(p => [p.productId, p.stock_quantity]));
+            const variantStock = new Map(levels.variants.map(v => [v.variantId, v.stock_quantity]));
+            setProducts(current => current.map(p => ({
+                ...p,
+                stock: productStock.get(p.id) ?? p.stock,
+                variants: p.variants.map(v => ({ ...v, stock: variantStock.get(v.id) ?? v.stock })),
+            })));
+        } catch (err) {
+            console.error("Failed to refresh stock levels", err);
+        }
+    }, [refreshProducts]);
+
     const refreshCategories = useCallback(async () => {
         try {
             const raw = await api.productService.getAllCategories();
@@ -154,8 +178,8 @@ export const ProductProvider = ({ children }) => {
 
     // Re-fetch whenever another client (or tab) mutates products
     useEffect(() => {
-        return wsEvents.on('products_updated', refreshProducts);
-    }, [refreshProducts]);
+        return wsEvents.on('products_updated', refreshStock);
+    }, [refreshStock]);
 
     // --- Actions ---
     const addProduct = useCallback(async (productData) => {
@@ -26,7 +26,10 @@ export const WebSocketProvider = ({ children }) => {
     const connect = (gen) => {
         if (gen !== genRef.current) return;
 
-        const ws = new WebSocket(WS_URL);
+        // The token lets the server route user-targeted events (new messages)
+        // to this socket; broadcasts arrive either way.
+        const token = localStorage.getItem('token');
+        const ws = new WebSocket(token ? `${WS_URL}?token=${encodeURIComponent(token)}` : WS_URL);
 
         ws.onopen = () => {
             // Stale socket from a previous cycle — close it now that it's OPEN
@@ -37,8 +40,8 @@ export const WebSocketProvider = ({ children }) => {
 
         ws.onmessage = (e) => {
             try {
-                const { type } = JSON.parse(e.data);
-                if (type) wsEvents.emit(type);
+                const { type, data } = JSON.parse(e.data);
+                if (type) wsEvents.emit(type, data);
             } catch { /* ignore malformed frames */ }
         };
 
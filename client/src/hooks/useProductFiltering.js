@@ -1,5 +1,6 @@
 import { useState, useMemo, useEffect, useDeferredValue } from 'react';
 import { useProducts } from '../context/ProductContext';
+import { ProductService } from '../services/api';
 
 export const PROFILE_COLORS = [
     { name: 'White', hex: '#FFFFFF' },
@@ -20,6 +21,11 @@ export function useProductFiltering() {
     // Performance: Defer the search query for filtering
     const deferredQuery = useDeferredValue(searchQuery);
 
+    // Server-ranked search (GET /products/search — item codes, variant names,
+    // typos) within the active category: productId -> rank. It only adds hits
+    // and orders them; the local name match always stays in the results.
+    const [searchRanks, setSearchRanks] = useState(null);
+
     // --- MEMOIZED HELPERS ---
     const isProfileCategory = useMemo(() =>
         activeCategory === 'ke-profile' || activeCategory === 'tz-profile',
@@ -47,16 +53,39 @@ export function useProductFiltering() {
         }
     }, [activeCategory, currentSubCategories]);
 
+    const activeCategoryDbId = useMemo(() =>
+        CATEGORIES.find(c => c.id === activeCategory)?.dbId ?? null,
+        [activeCategory, CATEGORIES]);
+
+    // --- EFFECT: Server Search ---
+    useEffect(() => {
+        const q = deferredQuery.trim();
+        setSearchRanks(null);
+        if (!q) return;
+        const controller = new AbortController();
+        const timer = setTimeout(() => {
+            ProductService.search(q, { limit: 50, categoryId: activeCategoryDbId, signal: controller.signal })
+                .then(data => setSearchRanks(new Map(data.results.map((hit, i) => [hit.productId, i]))))
+                .catch(() => { /* aborted or offline — keep the local match */ });
+        }, 120);
+        return () => {
+            clearTimeout(timer);
+            controller.abort();
+        };
+    }, [deferredQuery, activeCategoryDbId]);
+
     // --- MEMOIZED FILTERING ---
     const filteredProducts = useMemo(() => {
         const lowerQuery = deferredQuery.toLowerCase();
 
-        return PRODUCTS.filter(p => {
+        const matches = PRODUCTS.filter(p => {
             const matchesCategory = p.category === activeCategory;
             if (!matchesCategory) return false;
 
             const matchesSubCategory = p.subCategory === activeSubCategory;
-            const matchesSearch = !lowerQuery || p.name.toLowerCase().includes(lowerQuery);
+            const matchesSearch = !lowerQuery
+                || p.name.toLowerCase().includes(lowerQuery)
+                || Boolean(searchRanks?.has(p.id));
 
             let matchesColor = true;
             if (isProfileCategory && profileColor) {
@@ -76,7 +105,11 @@ export function useProductFiltering() {
             }
             return matchesSearch;
         });
-    }, [activeCategory, activeSubCategory, deferredQuery, isProfileCategory, isGlassCategory, isAccessoriesCategory, PRODUCTS, profileColor]);
+        // Best match first while searching; local-only matches keep their order after the ranked ones
+        if (!searchRanks || !lowerQuery) return matches;
+        const rank = p => searchRanks.get(p.id) ?? Number.MAX_SAFE_INTEGER;
+        return matches.sort((a, b) => rank(a) - rank(b));
+    }, [activeCategory, activeSubCategory, deferredQuery, searchRanks, isProfileCategory, isGlassCategory, isAccessoriesCategory, PRODUCTS, profileColor]);
 
     return {
         // State
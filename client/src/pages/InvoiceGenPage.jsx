@@ -1,6 +1,5 @@
 import { useState, useEffect, useCallback } from 'react';
 import { useLocation, useNavigate } from 'react-router-dom';
-import api from '../services/api';
 import ProductCard from '../components/sales/ProductCard';
 import ProductModal from '../components/sales/ProductModal';
 import CartSidebar from '../components/sales/CartSidebar';
@@ -13,7 +12,6 @@ export default function InvoiceGenPage() {
     const { products: PRODUCTS } = useProducts();
     const location = useLocation();
     const navigate = useNavigate();
-    const [customers, setCustomers] = useState([]);
 
     const {
         activeCategory, setActiveCategory,
@@ -23,12 +21,6 @@ export default function InvoiceGenPage() {
         filteredProducts, currentSubCategories, CATEGORIES, isProfileCategory,
     } = useProductFiltering();
 
-    useEffect(() => {
-        api.userService.getCustomers().then(fetched => {
-            setCustomers(fetched.map(c => ({ id: c.customerId, name: c.name, phone: c.phoneNumber, type: c.type || 'registered' })));
-        }).catch(console.error);
-    }, []);
-
     const [selectedProduct, setSelectedProduct] = useState(null);
     const [modalOpen, setModalOpen] = useState(false);
     const [editingIndex, setEditingIndex] = useState(null);
@@ -185,7 +177,7 @@ export default function InvoiceGenPage() {
                 color={initialModalDetails?.color || profileColor} initialDetails={initialModalDetails} source="invoice" />
 
             {/* Customer overlay */}
-            {!selectedCustomer && <CustomerSelectionOverlay customers={customers} onSelectCustomer={handleCustomerSelect} />}
+            {!selectedCustomer && <CustomerSelectionOverlay onSelectCustomer={handleCustomerSelect} />}
         </div>
     );
 }
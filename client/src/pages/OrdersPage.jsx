@@ -6,6 +6,7 @@ import OrderCard from '../components/orders/OrderCard';
 import InvoiceCard from '../components/orders/InvoiceCard';
 import CancelOrderModal from '../components/orders/CancelOrderModal';
 import SetCancelPinModal from '../components/orders/SetCancelPinModal';
+import api from '../services/api';
 
 export default function OrdersPage() {
     const navigate = useNavigate();
@@ -65,7 +66,7 @@ export default function OrdersPage() {
     const handleEdit = useCallback(async (order) => {
         try {
             // Fetch the full order including items (list endpoint returns items=[])
-            const full = await import('../services/api').then(m => m.default.orderService.getOrder(order.id));
+            const full = await api.orderService.getOrder(order.id);
             navigate('/sales', { state: { mode: 'edit', orderData: { ...full, id: full.orderId, customer: order.customer } } });
         } catch (err) {
             console.error('Failed to fetch order for editing', err);
@@ -81,7 +82,7 @@ export default function OrdersPage() {
     const handleViewOrder = useCallback(async (order) => {
         try {
             // List endpoint returns items=[]; fetch the full order for the summary view
-            const full = await import('../services/api').then(m => m.default.orderService.getOrder(order.id));
+            const full = await api.orderService.getOrder(order.id);
             navigate('/orders/review', { state: { order: { ...full, id: full.orderId, customer: order.customer } } });
         } catch (err) {
             console.error('Failed to fetch order for summary view', err);
@@ -89,15 +90,35 @@ export default function OrdersPage() {
         }
     }, [navigate]);
 
-    const handleViewInvoice = useCallback((invoice) => navigate('/invoice/review', { state: { invoice } }), [navigate]);
-    const handleConvertInvoice = useCallback((invoice) => navigate('/checkout', {
-        state: {
-            cartItems: invoice.items,
-            customer: invoice.customer,
-            enableTax: invoice.vat_enabled ?? false,
-            sourceInvoiceId: invoice.id,
+    // The invoice list carries summaries only (no cart snapshot) — fetch the
+    // full invoice's items before opening it or converting it at checkout.
+    const withInvoiceItems = useCallback(async (invoice) => {
+        const full = await api.invoiceService.get(invoice.id);
+        return { ...invoice, items: full.items || [] };
+    }, []);
+
+    const handleViewInvoice = useCallback(async (invoice) => {
+        try {
+            navigate('/invoice/review', { state: { invoice: await withInvoiceItems(invoice) } });
+        } catch (err) {
+            console.error('Failed to fetch invoice for review', err);
+        }
+    }, [navigate, withInvoiceItems]);
+    const handleConvertInvoice = useCallback(async (invoice) => {
+        try {
+            const full = await withInvoiceItems(invoice);
+            navigate('/checkout', {
+                state: {
+                    cartItems: full.items,
+                    customer: full.customer,
+                    enableTax: full.vat_enabled ?? false,
+                    sourceInvoiceId: full.id,
+                }
+            });
+        } catch (err) {
+            console.error('Failed to fetch invoice for checkout', err);
         }
-    }), [navigate]);
+    }, [navigate, withInvoiceItems]);
 
     const tabs = [
         { id: 'orders', label: 'Sales Orders', color: '#3b82f6', count: orders.length },
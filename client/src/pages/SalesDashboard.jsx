@@ -1,6 +1,5 @@
 import React, { useState, useEffect, useCallback } from 'react';
 import { useNavigate, useLocation } from 'react-router-dom';
-import api from '../services/api';
 import ProductCard from '../components/sales/ProductCard';
 import ProductModal from '../components/sales/ProductModal';
 import CartSidebar from '../components/sales/CartSidebar';
@@ -59,7 +58,6 @@ export default function SalesDashboard() {
     const [editingIndex, setEditingIndex] = useState(null);
     const [initialModalDetails, setInitialModalDetails] = useState(null);
     const [isCartOpen, setIsCartOpen] = useState(false);
-    const [customers, setCustomers] = useState([]);
 
     const {
         cartItems: cart,
@@ -87,22 +85,6 @@ export default function SalesDashboard() {
         }
     }, [sessionType, setSessionType, clearCart, location.state]);
 
-    useEffect(() => {
-        let cancelled = false;
-        const fetchCustomers = async () => {
-            try {
-                const fetched = await api.userService.getCustomers();
-                if (!cancelled) {
-                    setCustomers(fetched.map(c => ({ id: c.customerId, name: c.name, phone: c.phoneNumber, type: c.type })));
-                }
-            } catch (err) {
-                if (!cancelled) console.error('Failed to load customers', err);
-            }
-        };
-        fetchCustomers();
-        return () => { cancelled = true; };
-    }, []);
-
     // Track whether we have already loaded this specific navigation state so
     // cart edits (add/remove) don't trigger a re-load of the original items.
     const loadedStateRef = React.useRef(null);
@@ -672,7 +654,6 @@ export default function SalesDashboard() {
             {/* ── Customer Selection Overlay ── */}
             {!selectedCustomer && (
                 <CustomerSelectionOverlay
-                    customers={customers}
                     onSelectCustomer={handleCustomerSelect}
                 />
             )}
@@ -30,6 +30,9 @@ api.interceptors.request.use((config) => {
 api.interceptors.response.use(
     (response) => response,
     (error) => {
+        // A request the caller aborted (superseded type-ahead) isn't an error
+        if (axios.isCancel(error)) return Promise.reject(error);
+
         const status = error.response?.status;
 
         if (status === 401) {
@@ -120,6 +123,26 @@ export const ProductService = {
         const response = await api.get('/products/');
         return response.data;
     },
+    /** Full catalog { boot_id, structure_version, stock_version, categories, products }.
+     * Served with an ETag + no-cache, so the browser revalidates on its own and
+     * an unchanged catalog comes back as a body-less 304. */
+    getCatalog: async () => {
+        const response = await api.get('/products/catalog');
+        return response.data;
+    },
+    /** Stock quantities only — what a sale changes (see ProductContext). */
+    getStockLevels: async () => {
+        const response = await api.get('/products/stock-levels');
+        return response.data;
+    },
+    /** Ranked type-ahead: { query, structure_version, results } — compact hits
+     * (productId, name, itemCode, price_from, matched variants, score). */
+    search: async (q, { limit = 20, categoryId = null, signal } = {}) => {
+        const params = new URLSearchParams({ q, limit });
+        if (categoryId) params.append('category_id', categoryId);
+        const response = await api.get(`/products/search?${params}`, { signal });
+        return response.data;
+    },
     create: async (productData) => {
         const response = await api.post('/products/', productData);
         return response.data;
@@ -311,6 +334,20 @@ export const UserService = {
         const response = await api.get('/users/customers');
         return response.data;
     },
+    /** One keyset page { items, next_after } of compact customers (with their
+     * outstanding credit `balance`). q: phone digits (prefix) or part of a name;
+     * pass next_after back as `after` for the next page. */
+    searchCustomers: async (q, { limit = 20, after = null, signal } = {}) => {
+        const params = new URLSearchParams({ q, limit });
+        if (after) params.append('after', after);
+        const response = await api.get(`/users/customers/search?${params}`, { signal });
+        return response.data;
+    },
+    /** The signed-in cashier's recently served customers, most recent first. */
+    getRecentCustomers: async () => {
+        const response = await api.get('/users/customers/recent');
+        return response.data;
+    },
     resetPassword: async (userId, data) => {
         // data: { currentPassword, newPassword, confirmNewPassword }
         const response = await api.post(`/users/${userId}/password-reset`, data);
@@ -329,10 +366,15 @@ export const InvoiceService = {
         const response = await api.post('/invoices/', invoiceData);
         return response.data;
     },
-    /** List all invoices. Pass status to filter: 'draft'|'sent'|'converted'|'cancelled' */
-    getAll: async (skip = 0, limit = 100, status = null) => {
-        const params = new URLSearchParams({ skip, limit });
+    /** Invoice summaries (no `items` — use get(id) for those), newest first.
+     * Pass the last invoiceId of a page as beforeId for the next one; status
+     * filters 'draft'|'sent'|'converted'|'cancelled'. */
+    getAll: async ({ beforeId = null, limit = 100, status = null, dateFrom = null, dateTo = null } = {}) => {
+        const params = new URLSearchParams({ limit });
+        if (beforeId != null) params.append('before_id', beforeId);
         if (status) params.append('status', status);
+        if (dateFrom) params.append('date_from', dateFrom);
+        if (dateTo) params.append('date_to', dateTo);
         const response = await api.get(`/invoices/?${params}`);
         return response.data;
     },
@@ -361,8 +403,16 @@ export const MessagingService = {
         const response = await api.post('/messages/', msgData);
         return response.data;
     },
-    getInbox: async () => {
-        const response = await api.get('/messages/inbox');
+    /** One keyset page { items, next_before_id, unread_count }, newest first —
+     * pass the previous page's next_before_id as beforeId for the next one. */
+    getInbox: async ({ beforeId = null, limit = 50, unreadOnly = false } = {}) => {
+        const params = new URLSearchParams({ limit, unread_only: unreadOnly });
+        if (beforeId != null) params.append('before_id', beforeId);
+        const response = await api.get(`/messages/inbox?${params}`);
+        return response.data;
+    },
+    getUnreadCount: async () => {
+        const response = await api.get('/messages/unread-count');
         return response.data;
     },
     markRead: async (id, statusData) => {
@@ -3,7 +3,9 @@
 const _emitter = new EventTarget();
 
 export const wsEvents = {
-    emit: (type) => _emitter.dispatchEvent(new CustomEvent(type)),
+    // `detail` carries the event's payload for targeted events (e.g. the new
+    // message on `message_received`); plain broadcasts have none.
+    emit: (type, detail) => _emitter.dispatchEvent(new CustomEvent(type, { detail })),
     on: (type, handler) => {
         _emitter.addEventListener(type, handler);
         return () => _emitter.removeEventListener(type, handler);
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: orderitems.details stored as json (before) vs jsonb (after).
+
+Point DATABASE_URL at a restored production dump. The script copies orderitems
+into two temporary tables — details as json with no extra indexes (how the
+column was), and details as jsonb with the indexes migrate_jsonb_columns.py
+creates — optionally multiplied by --scale to extrapolate, and times on each:
+
+  line-type lookup    items with a glass-cut line: json has to expand every
+                      row's lineItems array; jsonb answers `details @> ...`
+                      from ix_orderitems_details_gin.
+  cutting queue       pending items with a glass-cut line, the query
+                      GET /orders/cutting-queue?line_type=glass-cut runs.
+  server extract      details->'lineItems' for every row: json re-parses the
+                      text per access, jsonb reads its binary form.
+  fetch + decode      SELECT details for every row into Python dicts
+                      (what loading OrderItems costs the API).
+
+Temporary tables only — nothing in the database is modified.
+
+Run from the server/ directory:
+    python benchmark_jsonb.py
+    python benchmark_jsonb.py --scale 10 --repeat 7
+"""
+
+import argparse
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, text
+from db.database import DATABASE_URL
+
+LINE_TYPE = "glass-cut"
+
+QUERIES = {
+    "line-type lookup": (
+        "SELECT item_id FROM {table} WHERE EXISTS ("
+        " SELECT 1 FROM json_array_elements(details->'lineItems') e WHERE e->>'type' = :line_type)",
+        "SELECT item_id FROM {table} WHERE details @> CAST(:contains AS jsonb)",
+    ),
+    "cutting queue": (
+        "SELECT item_id, details FROM {table} WHERE cutting_completed = false AND EXISTS ("
+        " SELECT 1 FROM json_array_elements(details->'lineItems') e WHERE e->>'type' = :line_type)",
+        "SELECT item_id, details FROM {table} WHERE cutting_completed = false"
+        " AND details @> CAST(:contains AS jsonb)",
+    ),
+    "server extract": (
+        "SELECT count(*) FROM {table} WHERE json_array_length(details->'lineItems') > 1",
+        "SELECT count(*) FROM {table} WHERE jsonb_array_length(details->'lineItems') > 1",
+    ),
+    "fetch + decode": (
+        "SELECT details FROM {table}",
+        "SELECT details FROM {table}",
+    ),
+}
+
+
+def build_tables(conn, scale: int) -> int:
+    copies = f"CROSS JOIN generate_series(1, {scale})" if scale > 1 else ""
+    for table, col_type in (("bench_items_json", "json"), ("bench_items_jsonb", "jsonb")):
+        conn.execute(text(
+            f"CREATE TEMP TABLE {table} AS "
+            f"SELECT row_number() OVER () AS item_id, cutting_completed, "
+            f"details::text::{col_type} AS details FROM orderitems {copies}"
+        ))
+        conn.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY (item_id)"))
+    conn.execute(text("CREATE INDEX ON bench_items_jsonb USING gin (details jsonb_path_ops)"))
+    conn.execute(text("CREATE INDEX ON bench_items_jsonb (item_id) WHERE cutting_completed = false"))
+    conn.execute(text("ANALYZE bench_items_json"))
+    conn.execute(text("ANALYZE bench_items_jsonb"))
+    return conn.execute(text("SELECT count(*) FROM bench_items_json")).scalar()
+
+
+def table_size(conn, table: str) -> int:
+    return conn.execute(text(f"SELECT pg_total_relation_size('{table}')")).scalar()
+
+
+def best_of(fn, repeat: int):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="orderitems.details as json vs jsonb.")
+    parser.add_argument("--scale", type=int, default=1, help="copies of orderitems to benchmark against")
+    parser.add_argument("--repeat", type=int, default=5, help="best of N runs")
+    args = parser.parse_args()
+
+    engine = create_engine(DATABASE_URL)
+    params = {"line_type": LINE_TYPE, "contains": '{"lineItems": [{"type": "%s"}]}' % LINE_TYPE}
+
+    with engine.connect() as conn:
+        rows = build_tables(conn, max(args.scale, 1))
+        print(
+            f"{rows:,} rows   json {table_size(conn, 'bench_items_json') / 2**20:,.1f} MiB   "
+            f"jsonb {table_size(conn, 'bench_items_jsonb') / 2**20:,.1f} MiB (with indexes)"
+        )
+        for label, (json_sql, jsonb_sql) in QUERIES.items():
+            json_s, json_rows = best_of(
+                lambda: conn.execute(text(json_sql.format(table="bench_items_json")), params).all(), args.repeat
+            )
+            jsonb_s, jsonb_rows = best_of(
+                lambda: conn.execute(text(jsonb_sql.format(table="bench_items_jsonb")), params).all(), args.repeat
+            )
+            if len(json_rows) != len(jsonb_rows):
+                raise SystemExit(f"{label}: json and jsonb queries returned different row counts")
+            print(
+                f"{label:<18} json {json_s * 1000:9.1f} ms   jsonb {jsonb_s * 1000:9.1f} ms   "
+                f"x{json_s / jsonb_s:5.1f}   ({len(jsonb_rows):,} rows)"
+            )
+        conn.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: default vs fast JSON path for the large list endpoints.
+
+Builds synthetic payloads — 10,000 orders and 2,000 products with 6 variants
+each — and times, per payload:
+
+  default  what the routes did before: one Pydantic model per row
+           (_order_to_shallow_response / ProductResponse from attributes),
+           validated against the response_model, dumped in JSON mode and
+           encoded with the stdlib json module — FastAPI's default path.
+  fast     what the routes do now: the service's row → dict projection
+           (orderService._order_summary_dict / products.service._product_dict)
+           encoded by fastJson (orjson when installed).
+
+Before timing, it checks both paths decode to the same JSON, so the fast path
+can't silently drift from the response model. No database needed.
+
+Run from the server/ directory:
+    python benchmark_list_serialization.py
+    python benchmark_list_serialization.py --orders 20000 --products 5000 --repeat 7
+"""
+
+import argparse
+import json
+import random
+import sys
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pydantic import TypeAdapter
+
+import fastJson
+from core.ordering import model as order_model
+from core.ordering.orderService import _order_summary_dict, _order_to_shallow_response
+from core.inventory.products import model as product_model
+from core.inventory.products.service import _product_dict, _variant_dict
+
+
+def fake_orders(n: int, rng: random.Random) -> list:
+    users = [uuid.uuid4() for _ in range(8)]
+    start = datetime(2025, 1, 1, 8, 0, 0)
+    orders = []
+    for i in range(n):
+        subtotal = round(rng.uniform(100, 50000), 2)
+        paid = round(subtotal * rng.choice((1, 1, 0.5, 0)), 2)
+        customer = SimpleNamespace(name=f"Customer {i % 700}") if i % 3 else None
+        orders.append(SimpleNamespace(
+            orderId=i + 1, customerid=(i % 700) + 1 if customer else None,
+            customer=customer, customerName=customer.name if customer else None,
+            amountPayed=paid, balance=round(subtotal - paid, 2), servedby=rng.choice(users),
+            parent_orderid=None, VAT_status=bool(i % 2), created_at=start + timedelta(minutes=7 * i),
+            payment_status="Paid" if paid >= subtotal else ("Partial" if paid else "Unpaid"),
+            subtotal=subtotal, discount=0.0, status="completed", payment_method="cash",
+            total=subtotal, source_invoice_id=None, orderItems=[],
+        ))
+    return orders
+
+
+def fake_products(n: int, variants_each: int, rng: random.Random) -> list:
+    products = []
+    variant_id = 0
+    for i in range(n):
+        variants = []
+        for _ in range(variants_each):
+            variant_id += 1
+            variants.append(SimpleNamespace(
+                variantId=variant_id, product_id=i + 1, name=None,
+                attributes={"Color": rng.choice(("Silver", "Bronze", "White")), "Length": rng.choice(("15ft", "21ft"))},
+                stock_quantity=float(rng.randint(0, 400)), price=round(rng.uniform(200, 9000), 2),
+                price_half=None, price_unit=round(rng.uniform(20, 900), 2),
+                length=None, width=None, height=None, unit_quantity=None,
+            ))
+        products.append(SimpleNamespace(
+            productId=i + 1, name=f"Product {i}", itemCode=f"IC-{i:05d}", category_id=(i % 12) + 1,
+            sub_category="window", description="Aluminium profile", image_url=None, has_variants=True,
+            stock_quantity=rng.randint(0, 500), track_offcuts=bool(i % 4 == 0), unit="ft",
+            applicable_attributes=["Color", "Length"], has_dimensions=False, min_usable_dimension=150.0,
+            allow_rotation=True, popular_size_ranges=[], variants=variants,
+        ))
+    return products
+
+
+def default_orders(orders, names) -> bytes:
+    adapter = TypeAdapter(List[order_model.OrderResponse])
+    models = [_order_to_shallow_response(o, names[o.servedby]) for o in orders]
+    return json.dumps(adapter.dump_python(adapter.validate_python(models), mode="json")).encode("utf-8")
+
+
+def fast_orders(orders, names) -> bytes:
+    return fastJson.dumps([_order_summary_dict(o, names[o.servedby]) for o in orders])
+
+
+def default_products(products) -> bytes:
+    adapter = TypeAdapter(List[product_model.ProductResponse])
+    validated = adapter.validate_python(products, from_attributes=True)
+    return json.dumps(adapter.dump_python(validated, mode="json")).encode("utf-8")
+
+
+def fast_products(products) -> bytes:
+    return fastJson.dumps([_product_dict(p, [_variant_dict(v) for v in p.variants]) for p in products])
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def compare(label: str, default_fn, fast_fn, repeat: int) -> None:
+    default_body, fast_body = default_fn(), fast_fn()
+    if json.loads(default_body) != json.loads(fast_body):
+        raise SystemExit(f"{label}: fast path output differs from the response model's")
+    default_s = best_of(default_fn, repeat)
+    fast_s = best_of(fast_fn, repeat)
+    print(
+        f"{label:<16} default {default_s * 1000:8.1f} ms   fast {fast_s * 1000:8.1f} ms   "
+        f"x{default_s / fast_s:4.1f}   ({len(fast_body) / 1024:,.0f} KiB)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Default vs fast JSON path for list endpoints.")
+    parser.add_argument("--orders", type=int, default=10_000)
+    parser.add_argument("--products", type=int, default=2_000)
+    parser.add_argument("--variants", type=int, default=6, help="variants per product")
+    parser.add_argument("--repeat", type=int, default=5, help="best of N runs")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    orders = fake_orders(args.orders, rng)
+    names = {o.servedby: f"User {str(o.servedby)[:4]}" for o in orders}
+    products = fake_products(args.products, args.variants, rng)
+
+    print(f"encoder: {'orjson' if fastJson.orjson else 'stdlib json (orjson not installed)'}")
+    compare(f"{args.orders} orders", lambda: default_orders(orders, names), lambda: fast_orders(orders, names), args.repeat)
+    compare(f"{args.products} products", lambda: default_products(products), lambda: fast_products(products), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
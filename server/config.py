@@ -30,8 +30,70 @@ class Settings:
     API_HOST: str = os.getenv("API_HOST", "0.0.0.0")
     API_PORT: int = int(os.getenv("API_PORT", "8000"))
     
-    # Logging
+    # Logging (loggiing.py). LOG_LEVEL is a default level plus optional
+    # per-module overrides: "INFO,core.inventory=WARNING,sqlalchemy=WARNING".
+    # LOG_FORMAT: json (one object per line) | text. Warnings from the noisy
+    # per-line-item sites (extra=RATE_LIMITED) are capped at
+    # LOG_RATE_LIMIT_BURST per LOG_RATE_LIMIT_WINDOW s per call site
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")
+    LOG_RATE_LIMIT_WINDOW: float = float(os.getenv("LOG_RATE_LIMIT_WINDOW", "60"))
+    LOG_RATE_LIMIT_BURST: int = int(os.getenv("LOG_RATE_LIMIT_BURST", "5"))
+
+    # Startup schema check: "fingerprint" skips create_all when the models'
+    # DDL hash matches the one stored at the last create_all (db/database.py);
+    # "always" runs create_all on every boot
+    SCHEMA_CHECK_ON_START: str = os.getenv("SCHEMA_CHECK_ON_START", "fingerprint").lower()
+
+    # Request instrumentation — requests issuing more SQL statements than this
+    # are flagged in the log (usually an N+1 lazy-load pattern)
+    REQUEST_QUERY_BUDGET: int = int(os.getenv("REQUEST_QUERY_BUDGET", "50"))
+
+    # On-demand request profiler (monitoring/profiler.py). Admins opt a request
+    # in with an `X-Profile: 1` header; PROFILE_SAMPLE_RATES additionally
+    # samples by path prefix, e.g. "/orders/=0.02,/products/=0.01" (empty = off)
+    PROFILE_SAMPLE_RATES: str = os.getenv("PROFILE_SAMPLE_RATES", "")
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_MAX_CAPTURES: int = int(os.getenv("PROFILE_MAX_CAPTURES", "50"))
+    PROFILE_INTERVAL_MS: float = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+
+    # GET /metrics — bearer token for the Prometheus scraper (empty = only
+    # admin/CEO login tokens are accepted)
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+
+    # Streamed exports (core/exports) — per-statement timeout in seconds for
+    # their dedicated connections, and how long a stalled client may leave the
+    # export transaction idle before Postgres ends it
+    EXPORT_STATEMENT_TIMEOUT: int = int(os.getenv("EXPORT_STATEMENT_TIMEOUT", "300"))
+    EXPORT_IDLE_TIMEOUT: int = int(os.getenv("EXPORT_IDLE_TIMEOUT", "120"))
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+    # Transaction retry (db/retry.py) — checkout/order-edit attempts in total
+    # when Postgres aborts one as a deadlock or serialization failure, and the
+    # backoff between them in seconds (full jitter, doubling up to the max)
+    TX_RETRY_ATTEMPTS: int = int(os.getenv("TX_RETRY_ATTEMPTS", "4"))
+    TX_RETRY_BASE_DELAY: float = float(os.getenv("TX_RETRY_BASE_DELAY", "0.05"))
+    TX_RETRY_MAX_DELAY: float = float(os.getenv("TX_RETRY_MAX_DELAY", "1.0"))
+
+    # Cart availability cache (core/inventory/availabilityService.py) — seconds
+    # a result is reused for the same cart at the same stock/offcut version;
+    # 0 disables it
+    AVAILABILITY_CACHE_TTL: float = float(os.getenv("AVAILABILITY_CACHE_TTL", "5"))
+
+    # Customer lookup (core/userManagement/customerService.py) — how many
+    # recently served customers the checkout picker shows per cashier
+    RECENT_CUSTOMERS_PER_CASHIER: int = int(os.getenv("RECENT_CUSTOMERS_PER_CASHIER", "10"))
+
+    # Receivables summary (core/financials/receivablesService.py) — local hour
+    # the nightly reconciliation against the credits table runs (-1 disables
+    # it), and whether it rewrites the rows it finds wrong or only reports them
+    RECEIVABLES_RECONCILE_HOUR: int = int(os.getenv("RECEIVABLES_RECONCILE_HOUR", "2"))
+    RECEIVABLES_RECONCILE_FIX: bool = os.getenv("RECEIVABLES_RECONCILE_FIX", "true").lower() == "true"
+
+    # Reference data cache (core/referenceCache.py) — settings, attribute
+    # classes, categories. Writes invalidate explicitly; the TTL only bounds
+    # staleness after out-of-band edits (migrations, manual SQL)
+    REFERENCE_CACHE_TTL: float = float(os.getenv("REFERENCE_CACHE_TTL", "300"))
     
     # CORS Settings
     CORS_ORIGINS: list = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://127.0.0.1:3000").split(",")
@@ -0,0 +1,83 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from core.userManagement.authService import get_current_user
+from utils import require_role
+from . import service
+from .model import ExportFormat
+
+router = APIRouter(prefix="/exports", tags=["Exports"])
+
+MEDIA_TYPES = {
+    ExportFormat.csv: "text/csv; charset=utf-8",
+    ExportFormat.ndjson: "application/x-ndjson",
+}
+
+
+def _export(spec: service.ExportSpec, fmt: ExportFormat, date_from: date, date_to: date, current_user) -> StreamingResponse:
+    require_role(["ceo", "admin", "manager"], current_user)
+    start, end = service.date_bounds(date_from, date_to)
+    return StreamingResponse(
+        service.stream_export(spec, fmt, start, end),
+        media_type=MEDIA_TYPES[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="{service.filename(spec, fmt, date_from, date_to)}"',
+            "Cache-Control": "no-store",
+        },
+    )
+
+
+@router.get("/orders")
+def export_orders(
+    date_from: date = Query(..., description="First day included"),
+    date_to: date = Query(..., description="Last day included"),
+    format: ExportFormat = Query(ExportFormat.csv),
+    current_user = Depends(get_current_user),
+):
+    """
+    Orders created in the date range, one row per order item (orders without
+    items get a single row with empty item columns). Streamed as CSV or NDJSON.
+    """
+    return _export(service.ORDERS, format, date_from, date_to, current_user)
+
+
+@router.get("/payments")
+def export_payments(
+    date_from: date = Query(..., description="First day included"),
+    date_to: date = Query(..., description="Last day included"),
+    format: ExportFormat = Query(ExportFormat.csv),
+    current_user = Depends(get_current_user),
+):
+    """
+    Payments recorded in the date range. Streamed as CSV or NDJSON.
+    """
+    return _export(service.PAYMENTS, format, date_from, date_to, current_user)
+
+
+@router.get("/credits")
+def export_credits(
+    date_from: date = Query(..., description="First day included"),
+    date_to: date = Query(..., description="Last day included"),
+    format: ExportFormat = Query(ExportFormat.csv),
+    current_user = Depends(get_current_user),
+):
+    """
+    Credits created in the date range, with the customer name. Streamed as CSV or NDJSON.
+    """
+    return _export(service.CREDITS, format, date_from, date_to, current_user)
+
+
+@router.get("/offcuts")
+def export_offcuts(
+    date_from: date = Query(..., description="First day included"),
+    date_to: date = Query(..., description="Last day included"),
+    format: ExportFormat = Query(ExportFormat.csv),
+    current_user = Depends(get_current_user),
+):
+    """
+    Offcuts created in the date range (any status), with the product name.
+    Streamed as CSV or NDJSON.
+    """
+    return _export(service.OFFCUTS, format, date_from, date_to, current_user)
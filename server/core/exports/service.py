@@ -0,0 +1,231 @@
+"""
+Streamed CSV / NDJSON exports for the accountant and month-end reconciliation:
+orders with their items, payments, credits and offcut inventory.
+
+Building these as one list response loads the whole date range into memory
+(ORM objects, then the response models, then the encoded body) and holds a
+pooled connection, under its 30 s statement timeout, for the whole time. Here
+each export is a generator handed to StreamingResponse:
+
+  - It opens its own connection on `export_engine` (db/database.py) — unpooled,
+    with a longer statement timeout and an idle-in-transaction timeout — only
+    once the response starts streaming, and closes it when the generator
+    finishes or is closed (client gone).
+  - The query runs in one REPEATABLE READ, READ ONLY transaction, so the rows
+    come from a single snapshot even though they're read over minutes.
+  - `yield_per` makes psycopg2 use a named server-side cursor: rows arrive in
+    batches of EXPORT_BATCH_SIZE and each batch is encoded into one chunk, so
+    memory stays at one batch whatever the date range.
+  - Starlette awaits each chunk's send before pulling the next one from the
+    generator, so a slow client slows the cursor down instead of rows piling
+    up in memory (backpressure).
+
+The date range is inclusive of both days: [date_from 00:00, date_to + 1 day).
+"""
+
+import csv
+import io
+import time
+from datetime import date, datetime, time as dtime, timedelta
+from decimal import Decimal
+from typing import Callable, Iterator, List, Optional
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import Select, select
+
+import fastJson
+from config import settings
+from db.database import export_engine
+from entities.credits import Credit
+from entities.customers import Customer
+from entities.offcuts import Offcut
+from entities.orderItems import OrderItem
+from entities.orders import Order
+from entities.payments import Payment
+from entities.products import Product
+from loggiing import logger
+from .model import ExportFormat
+
+
+class ExportSpec:
+    """One export: its CSV header, the statement for a date range and the
+    row → values projection (same order as `columns`)."""
+
+    def __init__(
+        self,
+        name: str,
+        columns: List[str],
+        statement: Callable[[datetime, datetime], Select],
+        project: Callable = tuple,
+    ):
+        self.name = name
+        self.columns = columns
+        self.statement = statement
+        self.project = project
+
+
+# ── Export definitions ───────────────────────────────────────────────────────
+
+def _orders_statement(start: datetime, end: datetime) -> Select:
+    # One row per order item; orders without items still get one row
+    return (
+        select(
+            Order.orderId, Order.created_at, Order.status, Order.payment_status, Order.payment_method,
+            Order.VAT_status, Order.customerid, Customer.name, Order.servedby, Order.subtotal,
+            Order.discount, Order.total, Order.amountPayed, Order.balance,
+            OrderItem.item_id, OrderItem.product_id, Product.name, OrderItem.variant_id,
+            OrderItem.details, OrderItem.total_price, OrderItem.status, OrderItem.cutting_completed,
+        )
+        .outerjoin(Customer, Customer.customerId == Order.customerid)
+        .outerjoin(OrderItem, OrderItem.order_id == Order.orderId)
+        .outerjoin(Product, Product.productId == OrderItem.product_id)
+        .where(Order.created_at >= start, Order.created_at < end)
+        .order_by(Order.orderId, OrderItem.item_id)
+    )
+
+
+def _order_row(row) -> tuple:
+    details = row[18] or {}
+    return (
+        *row[:18],
+        details.get("quantity"), details.get("unitType"), details.get("unitPrice"),
+        *row[19:],
+    )
+
+
+ORDERS = ExportSpec(
+    "orders",
+    [
+        "order_id", "created_at", "status", "payment_status", "payment_method", "vat",
+        "customer_id", "customer_name", "served_by", "subtotal", "discount", "total",
+        "amount_paid", "balance", "item_id", "product_id", "product_name", "variant_id",
+        "quantity", "unit_type", "unit_price", "item_total", "item_status", "cutting_completed",
+    ],
+    _orders_statement,
+    _order_row,
+)
+
+PAYMENTS = ExportSpec(
+    "payments",
+    ["payment_id", "order_id", "amount", "payment_method", "transaction_ref", "number_used", "payed_at", "recorded_by"],
+    lambda start, end: (
+        select(
+            Payment.paymentId, Payment.orderId, Payment.amount, Payment.payment_method,
+            Payment.transaction_ref, Payment.number_used, Payment.payed_at, Payment.recorded_by,
+        )
+        .where(Payment.payed_at >= start, Payment.payed_at < end)
+        .order_by(Payment.paymentId)
+    ),
+)
+
+CREDITS = ExportSpec(
+    "credits",
+    ["credit_id", "order_id", "customer_id", "customer_name", "amount", "amount_due", "status", "created_at", "settled_at"],
+    lambda start, end: (
+        select(
+            Credit.creditId, Credit.orderId, Credit.customerId, Customer.name, Credit.amount,
+            Credit.amount_due, Credit.status, Credit.createdAt, Credit.settledAt,
+        )
+        .outerjoin(Customer, Customer.customerId == Credit.customerId)
+        .where(Credit.createdAt >= start, Credit.createdAt < end)
+        .order_by(Credit.creditId)
+    ),
+)
+
+OFFCUTS = ExportSpec(
+    "offcuts",
+    [
+        "offcut_id", "product_id", "product_name", "variant_id", "length", "width", "height",
+        "quantity", "status", "source_item_id", "created_at",
+    ],
+    lambda start, end: (
+        select(
+            Offcut.offcutId, Offcut.product_id, Product.name, Offcut.variant_id, Offcut.length,
+            Offcut.width, Offcut.height, Offcut.quantity, Offcut.status, Offcut.source_item_id,
+            Offcut.created_at,
+        )
+        .outerjoin(Product, Product.productId == Offcut.product_id)
+        .where(Offcut.created_at >= start, Offcut.created_at < end)
+        .order_by(Offcut.offcutId)
+    ),
+)
+
+
+# ── Encoding ─────────────────────────────────────────────────────────────────
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (UUID, date)):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _csv_chunk(rows: List[tuple]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([[_plain(v) for v in row] for row in rows])
+    return buffer.getvalue().encode("utf-8")
+
+
+def _ndjson_chunk(columns: List[str], rows: List[tuple]) -> bytes:
+    return b"".join(
+        fastJson.dumps({c: _plain(v) for c, v in zip(columns, row)}) + b"\n" for row in rows
+    )
+
+
+# ── Streaming ────────────────────────────────────────────────────────────────
+
+def date_bounds(date_from: date, date_to: date) -> tuple:
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must be on or before date_to")
+    return datetime.combine(date_from, dtime.min), datetime.combine(date_to + timedelta(days=1), dtime.min)
+
+
+def filename(spec: ExportSpec, fmt: ExportFormat, date_from: date, date_to: date) -> str:
+    return f"{spec.name}_{date_from.isoformat()}_{date_to.isoformat()}.{fmt.value}"
+
+
+def stream_export(
+    spec: ExportSpec,
+    fmt: ExportFormat,
+    start: datetime,
+    end: datetime,
+    batch_size: Optional[int] = None,
+) -> Iterator[bytes]:
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    started = time.perf_counter()
+    rows_sent = 0
+    completed = False
+
+    conn = export_engine.connect()
+    try:
+        options = {"yield_per": batch_size}
+        if conn.dialect.name == "postgresql":
+            options.update(isolation_level="REPEATABLE READ", postgresql_readonly=True)
+        conn = conn.execution_options(**options)
+
+        with conn.begin():
+            result = conn.execute(spec.statement(start, end))
+            if fmt is ExportFormat.csv:
+                yield _csv_chunk([spec.columns])
+            for partition in result.partitions():
+                rows = [spec.project(row) for row in partition]
+                rows_sent += len(rows)
+                yield _csv_chunk(rows) if fmt is ExportFormat.csv else _ndjson_chunk(spec.columns, rows)
+        completed = True
+    except Exception as e:
+        # Headers are already sent — all that can be done is end the stream
+        # early; the client sees a truncated file.
+        logger.error(f"Export {spec.name} failed after {rows_sent} rows: {e}", exc_info=True)
+        raise
+    finally:
+        conn.close()
+        logger.info(
+            f"Export {spec.name} ({fmt.value}, {start.date()}..{(end - timedelta(days=1)).date()}) "
+            f"{'finished' if completed else 'stopped'}: {rows_sent} rows "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
@@ -3,7 +3,8 @@ from typing import List
 from sqlmodel import Session
 from db.database import get_session
 from core.userManagement.authService import get_current_user
-from . import model, PaymentService, creditService
+from utils import require_role
+from . import model, PaymentService, creditService, receivablesService
 
 router = APIRouter(prefix="/financials", tags=["Financials"])
 
@@ -81,3 +82,44 @@ def get_customer_credits(
     Get all credits for a specific customer. Requires authentication.
     """
     return creditService.check_credit_for_customer_by_customerId(customer_id, db)
+
+# ---------------------------------------------------------------------------
+# Receivables Endpoints
+# ---------------------------------------------------------------------------
+
+@router.get("/receivables/aging", response_model=model.AgingReport)
+def get_aging_report(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_session),
+    current_user = Depends(get_current_user)
+):
+    """
+    Outstanding credit by age (0-30/31-60/61-90/90+ days) with the customers
+    owing most, from the receivables summary. CEO, admin and manager only.
+    """
+    require_role(["ceo", "admin", "manager"], current_user)
+    return receivablesService.aging_report(db, limit)
+
+@router.get("/receivables/customer/{customer_id}", response_model=model.ReceivableSummary)
+def get_customer_receivables(
+    customer_id: int,
+    db: Session = Depends(get_session),
+    current_user = Depends(get_current_user)
+):
+    """
+    A customer's outstanding credit and its aging. Requires authentication.
+    """
+    return receivablesService.customer_summary(db, customer_id)
+
+@router.post("/receivables/reconcile", response_model=model.ReconcileReport)
+def reconcile_receivables(
+    fix: bool = Query(False),
+    db: Session = Depends(get_session),
+    current_user = Depends(get_current_user)
+):
+    """
+    Check the receivables summary against the credits table; with fix=true,
+    rewrite the rows that differ. CEO, admin and manager only.
+    """
+    require_role(["ceo", "admin", "manager"], current_user)
+    return receivablesService.reconcile(db, fix)
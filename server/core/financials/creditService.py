@@ -7,7 +7,7 @@ from entities.credits import Credit
 from entities.customers import Customer
 from db.database import get_session
 from loggiing import logger
-from . import model
+from . import model, receivablesService
 
 
 def create_credit(credit_data: model.CreditCreateRequest, db: Session = Depends(get_session)) -> model.CreditCreateResponse:
@@ -21,6 +21,8 @@ def create_credit(credit_data: model.CreditCreateRequest, db: Session = Depends(
             status=credit_data.status
         )
         db.add(new_credit)
+        db.flush()
+        receivablesService.refresh_customer(db, new_credit.customerId)
         db.commit()
         db.refresh(new_credit)
 
@@ -62,6 +64,8 @@ def update_credit(payedAmount: float, order_id: int, credit_data: model.CreditUp
                 credit.status = "Partially Paid"
 
         db.add(credit)
+        db.flush()
+        receivablesService.refresh_customer(db, credit.customerId)
         db.commit()
         db.refresh(credit)
 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 class PaymentCreateRequest(BaseModel):
     orderId: int
@@ -41,4 +41,41 @@ class CreditUpdate(BaseModel):
 
 class CreditUpdateResponse(BaseModel):
     message: str
-    creditId: Optional[int]
\ No newline at end of file
+    creditId: Optional[int]
+
+
+class ReceivableSummary(BaseModel):
+    customerId: int
+    customerName: Optional[str] = None
+    outstanding: float
+    open_credits: int
+    oldest_unpaid_at: Optional[str] = None
+    due_0_30: float
+    due_31_60: float
+    due_61_90: float
+    due_over_90: float
+    aged_on: str
+
+
+class AgingBuckets(BaseModel):
+    due_0_30: float
+    due_31_60: float
+    due_61_90: float
+    due_over_90: float
+
+
+class AgingReport(BaseModel):
+    as_of: str
+    customers: int         # customers with open credit
+    outstanding: float
+    buckets: AgingBuckets
+    top_customers: List[ReceivableSummary]
+
+
+class ReconcileReport(BaseModel):
+    checked: int
+    missing: List[int]     # open credits but no summary row
+    mismatched: List[int]
+    extra: List[int]       # summary shows credit the customer no longer has
+    fixed: int
+    reaged: int = 0        # rows last aged before today, re-aged to today
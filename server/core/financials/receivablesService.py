@@ -0,0 +1,315 @@
+"""
+Receivables — what every customer owes on credit, kept as one summary row per
+customer (entities/customerReceivables.py) instead of being re-added from the
+credits table on every read.
+
+  - refresh_customer(db, customer_id) recomputes one customer's row from their
+    open credits (ix_credits_customer_open) inside the caller's transaction. It
+    is called by every credit write — order creation, POST/PUT /financials/
+    credits — after the write is flushed and before the commit, so the summary
+    commits or rolls back with the credit it describes. The customer row is
+    locked FOR NO KEY UPDATE first: two tills writing one customer's credits
+    serialize here, and the second recomputes after seeing the first's commit.
+    Inserting credits (their FK takes FOR KEY SHARE) doesn't conflict with it.
+  - aging_report(db) and customer_summary(db, id) only read the summary table.
+    Buckets are by the age of each credit's createdAt: 0-30, 31-60, 61-90 and
+    over 90 days, as of the row's aged_on — the report's as_of is the oldest
+    of those, so a report served before the nightly run says so.
+  - reconcile(db, fix) checks every row against the raw credits table
+    (outstanding, open count, oldest unpaid date, and the buckets as of the
+    row's own aged_on), reports what differs and optionally rewrites those rows.
+    Then it re-ages the rows last aged before today — once per customer per
+    day, with a compare-and-swap on the row's version so a credit write that
+    lands meanwhile wins. It runs nightly from start_reconciler() at
+    RECEIVABLES_RECONCILE_HOUR, on demand from POST /financials/receivables/
+    reconcile, or from the command line (reconcile_receivables.py). Differences are counted in the
+    receivables_reconcile_mismatches metric — any at all mean a credit write
+    bypassed refresh_customer (manual SQL, a migration script).
+"""
+
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import func, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session, select
+
+from config import settings
+from entities.credits import Credit
+from entities.customerReceivables import CustomerReceivable
+from entities.customers import Customer
+from loggiing import logger
+from monitoring import metrics
+
+BUCKETS = ("due_0_30", "due_31_60", "due_61_90", "due_over_90")
+TOLERANCE = 0.005  # money compares to the cent
+REAGE_BATCH = 500
+
+_stop = threading.Event()
+_reconciler: Optional[threading.Thread] = None
+
+
+# ── Computation ──────────────────────────────────────────────────────────────
+
+def _bucket(age_days: int) -> str:
+    if age_days <= 30:
+        return "due_0_30"
+    if age_days <= 60:
+        return "due_31_60"
+    if age_days <= 90:
+        return "due_61_90"
+    return "due_over_90"
+
+
+def _summarise(credits: Iterable[Tuple[float, datetime]], as_of: date) -> dict:
+    """Summary columns for one customer's open credits, given as (amount_due, createdAt)."""
+    values = {"outstanding": 0.0, "open_credits": 0, "oldest_unpaid_at": None, **{b: 0.0 for b in BUCKETS}}
+    for amount_due, created_at in credits:
+        amount_due = float(amount_due or 0)
+        values["outstanding"] += amount_due
+        values["open_credits"] += 1
+        if created_at is not None:
+            if values["oldest_unpaid_at"] is None or created_at < values["oldest_unpaid_at"]:
+                values["oldest_unpaid_at"] = created_at
+            values[_bucket(max((as_of - created_at.date()).days, 0))] += amount_due
+        else:
+            values["due_0_30"] += amount_due
+    for key in ("outstanding", *BUCKETS):
+        values[key] = round(values[key], 2)
+    return values
+
+
+def _open_credits(db: Session, customer_ids: List[int]) -> Dict[int, List[Tuple[float, datetime]]]:
+    rows = db.exec(
+        select(Credit.customerId, Credit.amount_due, Credit.createdAt)
+        .where(Credit.customerId.in_(customer_ids), Credit.status != "Paid")
+    ).all()
+    credits: Dict[int, list] = {cid: [] for cid in customer_ids}
+    for cid, amount_due, created_at in rows:
+        credits[cid].append((amount_due, created_at))
+    return credits
+
+
+# ── Maintenance (called by the credit writers) ───────────────────────────────
+
+def refresh_customer(db: Session, customer_id: int) -> CustomerReceivable:
+    """
+    Recompute `customer_id`'s summary row from their open credits, in the
+    caller's transaction — flush the credit write first, commit afterwards.
+    """
+    db.exec(
+        select(Customer.customerId).where(Customer.customerId == customer_id).with_for_update(key_share=True)
+    ).first()
+    today = date.today()
+    values = _summarise(_open_credits(db, [customer_id])[customer_id], today)
+
+    summary = db.get(CustomerReceivable, customer_id, populate_existing=True)
+    if summary is None:
+        summary = CustomerReceivable(customerId=customer_id, aged_on=today, version=0)
+    for key, value in values.items():
+        setattr(summary, key, value)
+    summary.aged_on = today
+    summary.version = (summary.version or 0) + 1
+    db.add(summary)
+    db.flush()
+    return summary
+
+
+def _reage_stale(db: Session) -> int:
+    """Re-age the rows still carrying open credit that were last aged before
+    today. Returns how many were rewritten."""
+    today = date.today()
+    rewritten = 0
+    while True:
+        stale = db.exec(
+            select(CustomerReceivable.customerId, CustomerReceivable.version)
+            .where(CustomerReceivable.aged_on < today, CustomerReceivable.open_credits > 0)
+            .limit(REAGE_BATCH)
+        ).all()
+        if not stale:
+            break
+        credits = _open_credits(db, [cid for cid, _ in stale])
+        for cid, version in stale:
+            values = _summarise(credits[cid], today)
+            result = db.exec(
+                update(CustomerReceivable)
+                .where(CustomerReceivable.customerId == cid, CustomerReceivable.version == version)
+                .values(**values, aged_on=today, version=version + 1)
+            )
+            rewritten += result.rowcount
+        db.commit()
+        # A row whose CAS lost was rewritten by a credit write — already aged today
+    return rewritten
+
+
+# ── Reads ────────────────────────────────────────────────────────────────────
+
+def _summary_dict(row: CustomerReceivable, name: Optional[str] = None) -> dict:
+    return {
+        "customerId": row.customerId,
+        "customerName": name,
+        "outstanding": row.outstanding,
+        "open_credits": row.open_credits,
+        "oldest_unpaid_at": row.oldest_unpaid_at.isoformat() if row.oldest_unpaid_at else None,
+        **{b: getattr(row, b) for b in BUCKETS},
+        "aged_on": row.aged_on.isoformat(),
+    }
+
+
+def aging_report(db: Session, limit: int = 20) -> dict:
+    """Receivables totals by aging bucket, with the `limit` customers owing
+    most — read as stored; reconcile() does the re-aging."""
+    try:
+        totals = db.exec(
+            select(
+                func.count(),
+                func.min(CustomerReceivable.aged_on),
+                func.coalesce(func.sum(CustomerReceivable.outstanding), 0),
+                *(func.coalesce(func.sum(getattr(CustomerReceivable, b)), 0) for b in BUCKETS),
+            ).where(CustomerReceivable.open_credits > 0)
+        ).one()
+        top = db.exec(
+            select(CustomerReceivable, Customer.name)
+            .join(Customer, Customer.customerId == CustomerReceivable.customerId)
+            .where(CustomerReceivable.open_credits > 0)
+            .order_by(CustomerReceivable.outstanding.desc(), CustomerReceivable.customerId)
+            .limit(max(1, min(limit, 100)))
+        ).all()
+        return {
+            "as_of": (totals[1] or date.today()).isoformat(),
+            "customers": totals[0],
+            "outstanding": round(float(totals[2]), 2),
+            "buckets": {b: round(float(v), 2) for b, v in zip(BUCKETS, totals[3:])},
+            "top_customers": [_summary_dict(row, name) for row, name in top],
+        }
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Database error building the aging report: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Database error occurred while building the aging report")
+
+
+def customer_summary(db: Session, customer_id: int) -> dict:
+    """One customer's receivables summary, aged as of its aged_on."""
+    try:
+        name = db.exec(select(Customer.name).where(Customer.customerId == customer_id)).first()
+        if name is None:
+            raise HTTPException(status_code=404, detail="Customer not found")
+        row = db.get(CustomerReceivable, customer_id)
+        if row is None:
+            return {
+                "customerId": customer_id, "customerName": name, "outstanding": 0.0, "open_credits": 0,
+                "oldest_unpaid_at": None, **{b: 0.0 for b in BUCKETS}, "aged_on": date.today().isoformat(),
+            }
+        return _summary_dict(row, name)
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Database error reading receivables for customer {customer_id}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Database error occurred while reading receivables")
+
+
+# ── Reconciliation ───────────────────────────────────────────────────────────
+
+def _differs(row: CustomerReceivable, expected: dict) -> bool:
+    if row.open_credits != expected["open_credits"] or row.oldest_unpaid_at != expected["oldest_unpaid_at"]:
+        return True
+    return any(abs(float(getattr(row, k) or 0) - expected[k]) > TOLERANCE for k in ("outstanding", *BUCKETS))
+
+
+def reconcile(db: Session, fix: bool = False) -> dict:
+    """
+    Compare every summary row with the credits table. A customer is `missing`
+    when they have open credits but no row, `mismatched` when their row
+    disagrees, and `extra` when their row still shows credit they no longer
+    have. With `fix`, each of those is recomputed by refresh_customer. Rows
+    last aged before today are re-aged afterwards either way.
+    """
+    try:
+        credits: Dict[int, list] = {}
+        for cid, amount_due, created_at in db.exec(
+            select(Credit.customerId, Credit.amount_due, Credit.createdAt).where(Credit.status != "Paid")
+        ):
+            credits.setdefault(cid, []).append((amount_due, created_at))
+        rows = {row.customerId: row for row in db.exec(select(CustomerReceivable)).all()}
+
+        found = {"missing": [], "mismatched": [], "extra": []}
+        for cid, open_credits in credits.items():
+            row = rows.get(cid)
+            if row is None:
+                found["missing"].append(cid)
+            elif _differs(row, _summarise(open_credits, row.aged_on)):
+                found["mismatched"].append(cid)
+        for cid, row in rows.items():
+            if cid not in credits and (row.open_credits or abs(row.outstanding or 0) > TOLERANCE):
+                found["extra"].append(cid)
+
+        for kind, ids in found.items():
+            if ids:
+                metrics.receivables_reconcile_mismatches.inc(len(ids), kind=kind)
+        db.rollback()  # end the read snapshot; fixes lock and re-read per customer
+
+        fixed = 0
+        if fix:
+            for cid in sorted(set().union(*found.values())):
+                refresh_customer(db, cid)
+                db.commit()
+                fixed += 1
+        reaged = _reage_stale(db)
+
+        report = {
+            "checked": len(set(credits) | set(rows)),
+            **{kind: sorted(ids) for kind, ids in found.items()},
+            "fixed": fixed,
+            "reaged": reaged,
+        }
+        if any(found.values()):
+            logger.warning(
+                f"Receivables reconciliation: {len(found['missing'])} missing, "
+                f"{len(found['mismatched'])} mismatched, {len(found['extra'])} extra; fixed {fixed}"
+            )
+        else:
+            logger.info(f"Receivables reconciliation: {report['checked']} customers, summary matches credits")
+        return report
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Database error reconciling receivables: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Database error occurred while reconciling receivables")
+
+
+# ── Nightly job ──────────────────────────────────────────────────────────────
+
+def _seconds_until(hour: int) -> float:
+    now = datetime.now()
+    run_at = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    return (run_at - now).total_seconds()
+
+
+def _run_nightly(engine) -> None:
+    while not _stop.wait(_seconds_until(settings.RECEIVABLES_RECONCILE_HOUR)):
+        try:
+            with Session(engine) as db:
+                reconcile(db, fix=settings.RECEIVABLES_RECONCILE_FIX)
+        except Exception as e:
+            logger.error(f"Nightly receivables reconciliation failed: {e}", exc_info=True)
+
+
+def start_reconciler(engine) -> None:
+    global _reconciler
+    if _reconciler is not None or settings.RECEIVABLES_RECONCILE_HOUR < 0:
+        return
+    _stop.clear()
+    _reconciler = threading.Thread(target=_run_nightly, args=(engine,), name="receivables-reconciler", daemon=True)
+    _reconciler.start()
+
+
+def stop_reconciler() -> None:
+    global _reconciler
+    _stop.set()
+    if _reconciler is not None:
+        _reconciler.join(timeout=10)
+        _reconciler = None
@@ -1,12 +1,19 @@
 from fastapi import HTTPException
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
+from core import referenceCache
 from entities.attributes import AttributeClass, AttributeValue
 from loggiing import logger
 from . import model
 
 
 def get_all_attribute_classes(db: Session) -> list:
-    return db.exec(select(AttributeClass)).all()
+    """Attribute classes with their values, served from the reference cache —
+    every write below invalidates it before committing."""
+    def load():
+        classes = db.exec(select(AttributeClass).options(selectinload(AttributeClass.values))).all()
+        return [model.AttributeClassResponse.model_validate(ac) for ac in classes]
+    return referenceCache.get(referenceCache.ATTRIBUTE_CLASSES, "all", load)
 
 
 def create_attribute_class(data: model.AttributeClassCreate, db: Session) -> AttributeClass:
@@ -19,6 +26,7 @@ def create_attribute_class(data: model.AttributeClassCreate, db: Session) -> Att
 
     ac = AttributeClass(name=data.name, type=data.type)
     db.add(ac)
+    referenceCache.invalidate(db, referenceCache.ATTRIBUTE_CLASSES)
     db.commit()
     db.refresh(ac)
     logger.info(f"Attribute class created: {ac.name} ({ac.type})")
@@ -38,6 +46,7 @@ def rename_attribute_class(class_id: int, data: model.AttributeClassRename, db:
 
     ac.name = data.name
     db.add(ac)
+    referenceCache.invalidate(db, referenceCache.ATTRIBUTE_CLASSES)
     db.commit()
     db.refresh(ac)
     return ac
@@ -48,6 +57,7 @@ def delete_attribute_class(class_id: int, db: Session) -> dict:
     if not ac:
         raise HTTPException(status_code=404, detail="Attribute class not found")
     db.delete(ac)
+    referenceCache.invalidate(db, referenceCache.ATTRIBUTE_CLASSES)
     db.commit()
     return {"message": "Attribute class deleted", "id": class_id}
 
@@ -67,6 +77,7 @@ def add_attribute_value(class_id: int, data: model.AttributeValueCreate, db: Ses
 
     av = AttributeValue(attribute_class_id=class_id, value=data.value)
     db.add(av)
+    referenceCache.invalidate(db, referenceCache.ATTRIBUTE_CLASSES)
     db.commit()
     db.refresh(av)
     return av
@@ -89,6 +100,7 @@ def rename_attribute_value(value_id: int, data: model.AttributeValueRename, db:
 
     av.value = data.value
     db.add(av)
+    referenceCache.invalidate(db, referenceCache.ATTRIBUTE_CLASSES)
     db.commit()
     db.refresh(av)
     return av
@@ -99,5 +111,6 @@ def delete_attribute_value(value_id: int, db: Session) -> dict:
     if not av:
         raise HTTPException(status_code=404, detail="Attribute value not found")
     db.delete(av)
+    referenceCache.invalidate(db, referenceCache.ATTRIBUTE_CLASSES)
     db.commit()
     return {"message": "Attribute value deleted", "id": value_id}
@@ -0,0 +1,269 @@
+"""
+Cart availability — whether every line of a cart can be fulfilled, in one
+request and a fixed number of queries.
+
+The POS used to call GET /products/{id}/availability once per cart line (two
+db.get()s each), so validating a 30-line cart was 30 round-trips and 60
+queries. check_cart() takes the whole cart — the same item shape checkout
+receives (productId, variantId, quantity, details.lineItems) — and answers
+every line from three queries: the cart's products, its variants, and the
+available offcuts of its offcut-tracked products.
+
+Lines are classified exactly like inventoryService._process_line_items
+dispatches them, and checked against a running balance per stock row, so two
+lines drawing on the same variant compete for it the way they will at
+checkout:
+
+  - counted lines — units, rolls/meters, full bars, sheet-full, and halves/cuts
+    of products that don't track offcuts: a plain quantity against the row.
+    These answers are exact.
+  - cut lines on offcut-tracked products — 1D cuts/halves and glass-cut: the
+    fresh bars/sheets they need are estimated with the same lower bounds the
+    glass engine's strategy search uses (glassPackingBounds.compute_sheet_bounds;
+    a bar is a sheet of height 1, and the bounds are just as valid in 1D),
+    against the offcuts that can take the pieces. A line whose lower bound
+    already exceeds the stock is certainly not fulfillable; one within it is
+    reported ok with `exact: false` — POST /products/{id}/cut-feasibility (or
+    checkout itself) runs the real engine. Manually selected offcuts must still
+    be in the pool.
+
+Nothing here locks or writes. Results are cached for AVAILABILITY_CACHE_TTL
+seconds (0 disables) keyed by the cart and the catalog's stock and offcut
+versions (catalogService.versions()), read before the queries run — so a
+commit that changes stock or offcuts invalidates every cached answer, and the
+TTL only bounds staleness from writes that bypass the ORM.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlmodel import Session, select
+
+from config import settings
+from entities.offcuts import Offcut
+from entities.products import Product
+from entities.variants import Variant
+from core.inventory import catalogService
+from core.inventory.glassOffcutService import get_full_dims, line_piece_dims_mm
+from core.inventory.glassPackingBounds import EPS, compute_sheet_bounds, fitting_orientations
+from monitoring import metrics
+
+CACHE_MAX_ENTRIES = 256
+
+_cache: "OrderedDict[tuple, tuple]" = OrderedDict()  # key -> (expires_at, result)
+_cache_lock = threading.Lock()
+
+
+# ── Cache ────────────────────────────────────────────────────────────────────
+
+def _cache_key(items: list, current: dict) -> tuple:
+    cart = json.dumps(items, sort_keys=True, separators=(",", ":"), default=str)
+    return current["stock"], current["offcuts"], cart
+
+
+def _cache_get(key: tuple) -> Optional[dict]:
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        _cache.move_to_end(key)
+        return entry[1]
+
+
+def _cache_put(key: tuple, result: dict) -> None:
+    with _cache_lock:
+        _cache[key] = (time.monotonic() + settings.AVAILABILITY_CACHE_TTL, result)
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+
+# ── Loading ──────────────────────────────────────────────────────────────────
+
+def _load(db: Session, items: list) -> tuple:
+    """({productId: Product}, {variantId: Variant}, {(productId, variantId): [Offcut]})."""
+    product_ids = {item["productId"] for item in items}
+    variant_ids = {item["variantId"] for item in items if item.get("variantId")}
+
+    products = {
+        p.productId: p for p in db.exec(select(Product).where(Product.productId.in_(product_ids))).all()
+    } if product_ids else {}
+    variants = {
+        v.variantId: v for v in db.exec(select(Variant).where(Variant.variantId.in_(variant_ids))).all()
+    } if variant_ids else {}
+
+    offcuts: dict = {}
+    tracked = [pid for pid, p in products.items() if p.track_offcuts]
+    if tracked:
+        rows = db.exec(select(Offcut).where(
+            Offcut.product_id.in_(tracked),
+            Offcut.status == "available",
+            Offcut.quantity > 0,
+        )).all()
+        for oc in rows:
+            offcuts.setdefault((oc.product_id, oc.variant_id), []).append(oc)
+    return products, variants, offcuts
+
+
+# ── Line classification ──────────────────────────────────────────────────────
+
+def _demand(product: Product, variant: Optional[Variant], details: dict, quantity: float, pool: list) -> dict:
+    """
+    What one cart item needs from its stock row: {"units", "exact", "reason"}.
+    `units` is the exact count for counted lines plus the lower bound on fresh
+    bars/sheets for cut lines; `reason` is set when the item can't be fulfilled
+    regardless of stock (a piece nothing can hold, a selected offcut that's gone).
+    """
+    line_items = details.get("lineItems")
+    if not (line_items and isinstance(line_items, list)):
+        return {"units": max(float(details.get("quantity", quantity) or 0), 0.0), "exact": True, "reason": None}
+
+    track = product.track_offcuts
+    full_len = float(variant.length) if variant and variant.length else 0.0
+    units = 0.0
+    bar_pieces: list = []   # [(length, 1, count)] — 1D cuts resolved against offcuts/bars
+    glass_pieces: list = []  # [(w, h, count)] in mm
+    selected_ids: set = set()
+
+    for line in line_items:
+        l_type = line.get("type", "")
+        qty = int(line.get("qty", 0))
+        if qty <= 0:
+            continue
+        if l_type == "glass-cut":
+            if track:
+                dims = line_piece_dims_mm(line)
+                if dims:
+                    glass_pieces.append(dims)
+            else:
+                units += qty
+        elif "full" in l_type:
+            units += qty
+        elif "half" in l_type:
+            if full_len > 0 and track:
+                bar_pieces.append((full_len / 2.0, 1.0, qty))
+            else:
+                units += qty
+        elif "cut" in l_type:
+            cut_len = float((line.get("meta") or {}).get("length", 0))
+            if cut_len <= 0:
+                continue
+            if not track:
+                units += qty
+                continue
+            selection = line.get("offcut_selection")
+            if selection:
+                # The cashier's offcuts cover what they cover; any shortfall is
+                # one more piece (apply_manual_cut_selection)
+                by_id = {oc.offcutId: oc for oc in pool}
+                for src in selection:
+                    oc = by_id.get(src.get("offcut_id"))
+                    if oc is None or oc.length + EPS < float(src.get("length_used", 0)):
+                        return {"units": units, "exact": True,
+                                "reason": f"Selected offcut #{src.get('offcut_id')} is no longer available"}
+                    selected_ids.add(oc.offcutId)
+                shortfall = round(cut_len * qty - sum(float(s.get("length_used", 0)) for s in selection), 4)
+                if shortfall > 0.01:
+                    bar_pieces.append((shortfall, 1.0, 1))
+            else:
+                bar_pieces.append((cut_len, 1.0, qty))
+        else:
+            units += qty
+
+    exact = True
+    if bar_pieces:
+        free = [(oc.length, 1.0, oc.quantity) for oc in pool
+                if oc.offcutId not in selected_ids and not oc.width and oc.length > 0]
+        longest = max(length for length, _, _ in bar_pieces)
+        if full_len > 0 and longest > full_len + EPS and not any(length + EPS >= longest for length, _, _ in free):
+            return {"units": units, "exact": True,
+                    "reason": f"Cut length {longest} exceeds full bar length {full_len} for product '{product.name}'"}
+        units += compute_sheet_bounds(bar_pieces, full_len, 1.0, False, free)["sheets_lower_bound"]
+        exact = False
+    if glass_pieces:
+        sheet_w, sheet_h = get_full_dims(variant)
+        free = [(oc.width, oc.height, oc.quantity) for oc in pool if oc.width and oc.height]
+        for w, h, _ in glass_pieces:
+            sources = [(sheet_w, sheet_h)] + [(ow, oh) for ow, oh, _ in free]
+            if not any(fitting_orientations(w, h, sw, sh, product.allow_rotation) for sw, sh in sources):
+                return {"units": units, "exact": True,
+                        "reason": f"A {w:g} x {h:g} mm piece fits neither a full sheet nor any offcut of '{product.name}'"}
+        bounds = compute_sheet_bounds(glass_pieces, sheet_w, sheet_h, product.allow_rotation, free)
+        units += bounds["sheets_lower_bound"]
+        exact = False
+    return {"units": units, "exact": exact, "reason": None}
+
+
+# ── Public entry point ───────────────────────────────────────────────────────
+
+def _check(db: Session, items: list) -> dict:
+    products, variants, offcuts = _load(db, items)
+    remaining: dict = {}  # ("v"|"p", id) -> stock left after the lines before
+    lines = []
+
+    for index, item in enumerate(items):
+        product_id, variant_id = item["productId"], item.get("variantId")
+        result = {
+            "index": index, "productId": product_id, "variantId": variant_id,
+            "ok": False, "exact": True, "requested": 0.0, "available": 0.0, "reason": None,
+        }
+        lines.append(result)
+
+        product = products.get(product_id)
+        if product is None:
+            result["reason"] = "Product not found"
+            continue
+        variant = variants.get(variant_id) if variant_id else None
+        if variant_id and (variant is None or variant.product_id != product_id):
+            result["reason"] = "Variant not found"
+            continue
+
+        demand = _demand(
+            product, variant, item.get("details") or {}, float(item.get("quantity") or 0),
+            offcuts.get((product_id, variant_id), []),
+        )
+        row = variant or product
+        key = ("v", variant_id) if variant else ("p", product_id)
+        available = remaining.get(key, float(row.stock_quantity or 0))
+        result.update(requested=demand["units"], available=available, exact=demand["exact"])
+
+        if demand["reason"]:
+            result["reason"] = demand["reason"]
+        elif demand["units"] > available + EPS:
+            label = (variant.name if variant else None) or product.name
+            result["reason"] = (
+                f"Insufficient stock for '{label}'. Available: {available}, requested: {demand['units']}"
+                if demand["exact"] else
+                f"Needs at least {demand['units']:g} full bars/sheets of '{label}'; {available:g} in stock"
+            )
+        else:
+            result["ok"] = True
+            remaining[key] = available - demand["units"]
+
+    return {"ok": all(line["ok"] for line in lines), "lines": lines}
+
+
+def check_cart(db: Session, items: list) -> dict:
+    """
+    Availability for every item of a cart, in order — see the module docstring.
+    `items` are dicts with productId, variantId, quantity and details (as sent
+    to POST /orders/). Returns {"ok", "stock_version", "lines": [{"index",
+    "productId", "variantId", "ok", "exact", "requested", "available",
+    "reason"}, ...]}.
+    """
+    current = catalogService.versions()
+    key = _cache_key(items, current) if settings.AVAILABILITY_CACHE_TTL > 0 else None
+    if key is not None:
+        cached = _cache_get(key)
+        if cached is not None:
+            metrics.availability_checks.inc(result="hit")
+            return cached
+
+    result = {"stock_version": current["stock"], **_check(db, items)}
+    metrics.availability_checks.inc(result="miss" if key is not None else "uncached")
+    if key is not None:
+        _cache_put(key, result)
+    return result
@@ -0,0 +1,197 @@
+"""
+Catalog snapshot — the whole products + variants + categories payload the POS
+loads into ProductContext, built once per catalog version and served as cached
+bytes with a strong ETag.
+
+Why: every sale broadcasts `products_updated` and every open client used to
+refetch GET /products/, which loaded products in one query and then lazy-loaded
+each product's variants during serialization (1 + N queries), once per client.
+Now:
+  - build_snapshot() loads everything in two queries (products JOIN variants,
+    then categories) and serializes it once; every client asking for the same
+    version gets the same bytes, and a client that already has them gets a 304.
+  - stock_levels() is the small payload that actually changes per sale — ids
+    and stock quantities only. ProductContext patches stock from it and only
+    refetches the snapshot when `structure_version` moved, or `boot_id` did.
+
+Versions are two in-process counters, bumped from SQLAlchemy session events
+AFTER a commit that touched a Product, Variant or Category row:
+  - stock_version     — a stock quantity changed (or a variant/product was
+                        added or removed).
+  - structure_version — anything else changed (name, price, attributes, ...).
+A third counter, offcuts_version, moves when an Offcut row changes; it isn't
+part of either payload, but cached answers that depend on the offcut pool
+(availabilityService) key on it. The snapshot contains stock too, so its ETag
+carries both of the first two. Both counters live in
+this process: the server runs as a single uvicorn worker (install_service.bat),
+the same assumption ws/manager.py makes. A boot id is part of every ETag so a
+browser's cached copy from a previous process can never match a fresh counter,
+and of both payloads (`boot_id`) so a client comparing versions does the same.
+Writes that bypass the ORM (raw UPDATE text in the migrate_* scripts) don't bump
+anything — those run with the server stopped. The in-app exceptions — the stock
+ledger's compare-and-swap UPDATEs (core/inventory/stockConcurrency.py) and the
+catalog importer's set-based upserts (core/inventory/importService.py) — report
+themselves through note_stock_change() / note_catalog_change(). Row `version`
+changes alone are bookkeeping and bump nothing.
+"""
+
+import json
+import threading
+import uuid
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session as OrmSession, joinedload
+from sqlmodel import Session, select
+
+from entities.offcuts import Offcut
+from entities.products import Product, Category
+from entities.variants import Variant
+from core.inventory.products import model
+from loggiing import logger
+
+_CATALOG_ENTITIES = (Product, Variant, Category)
+_STOCK_FIELDS = {"stock_quantity"}
+_IGNORED_FIELDS = {"version"}  # entities/versioning.py — moves with every write
+_PENDING_KEY = "catalog_pending_bumps"
+
+_boot_id = uuid.uuid4().hex[:8]
+_versions = {"structure": 0, "stock": 0, "offcuts": 0}
+_versions_lock = threading.Lock()
+
+_cache: dict = {}  # "snapshot" / "stock" -> (etag, bytes)
+_build_lock = threading.Lock()
+
+
+# ── Version tracking ─────────────────────────────────────────────────────────
+
+def _classify_change(obj, is_new_or_deleted: bool) -> set:
+    if is_new_or_deleted:
+        return {"structure", "stock"}
+    changed = {attr.key for attr in inspect(obj).attrs if attr.history.has_changes()} - _IGNORED_FIELDS
+    if not changed:
+        return set()
+    kinds = set()
+    if changed & _STOCK_FIELDS:
+        kinds.add("stock")
+    if changed - _STOCK_FIELDS:
+        kinds.add("structure")
+    return kinds
+
+
+@event.listens_for(OrmSession, "before_flush")
+def _collect_catalog_changes(session, flush_context, instances):
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    for obj in (*session.new, *session.deleted):
+        if isinstance(obj, _CATALOG_ENTITIES):
+            pending |= _classify_change(obj, True)
+        elif isinstance(obj, Offcut):
+            pending.add("offcuts")
+    for obj in session.dirty:
+        if isinstance(obj, _CATALOG_ENTITIES):
+            pending |= _classify_change(obj, False)
+        elif isinstance(obj, Offcut) and _classify_change(obj, False):
+            pending.add("offcuts")
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _bump_catalog_versions(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        with _versions_lock:
+            for kind in pending:
+                _versions[kind] += 1
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_catalog_changes(session):
+    # A full rollback discards everything flushed so far. (A rolled-back
+    # SAVEPOINT — the glass engine's strategy trials — keeps the flags: an extra
+    # bump only costs one snapshot rebuild, a missed one would serve stale data.)
+    session.info.pop(_PENDING_KEY, None)
+
+
+def note_stock_change(session) -> None:
+    """For stock writes that don't go through the ORM flush — bumps
+    stock_version after this session's next commit."""
+    session.info.setdefault(_PENDING_KEY, set()).add("stock")
+
+
+def note_catalog_change(session) -> None:
+    """For set-based catalog writes (importService) — bumps both versions
+    after this session's next commit."""
+    session.info.setdefault(_PENDING_KEY, set()).update({"structure", "stock"})
+
+
+def versions() -> dict:
+    with _versions_lock:
+        return dict(_versions)
+
+
+def _etag(*parts) -> str:
+    return '"' + "-".join([_boot_id, *map(str, parts)]) + '"'
+
+
+def etag_matches(if_none_match, etag: str) -> bool:
+    """Strong comparison against an If-None-Match header (which may list several tags)."""
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
+
+
+# ── Payloads ─────────────────────────────────────────────────────────────────
+
+def _cached(key: str, etag: str, build) -> tuple:
+    entry = _cache.get(key)
+    if entry is not None and entry[0] == etag:
+        return entry
+    with _build_lock:
+        # Every client refetches at once after a broadcast — let the first one
+        # build and the rest pick up its result.
+        entry = _cache.get(key)
+        if entry is None or entry[0] != etag:
+            entry = (etag, build())
+            _cache[key] = entry
+        return entry
+
+
+def build_snapshot(db: Session, current: dict) -> bytes:
+    products = db.exec(
+        select(Product).options(joinedload(Product.variants)).order_by(Product.productId)
+    ).unique().all()
+    categories = db.exec(select(Category).order_by(Category.categoryId)).all()
+    payload = {
+        "boot_id": _boot_id,
+        "structure_version": current["structure"],
+        "stock_version": current["stock"],
+        "categories": [model.CategoryResponse.model_validate(c, from_attributes=True).model_dump() for c in categories],
+        "products": [model.ProductResponse.model_validate(p, from_attributes=True).model_dump() for p in products],
+    }
+    logger.info(f"Catalog snapshot rebuilt: {len(products)} products, {len(categories)} categories")
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def get_snapshot(db: Session) -> tuple:
+    """(etag, body) for the full catalog at the current version. The versions
+    are read BEFORE loading, so the body is never older than its tag claims."""
+    current = versions()
+    etag = _etag("c", current["structure"], current["stock"])
+    return _cached("snapshot", etag, lambda: build_snapshot(db, current))
+
+
+def build_stock_levels(db: Session, current: dict) -> bytes:
+    products = db.exec(select(Product.productId, Product.stock_quantity)).all()
+    variants = db.exec(select(Variant.variantId, Variant.product_id, Variant.stock_quantity)).all()
+    payload = model.StockLevelsResponse(
+        boot_id=_boot_id,
+        structure_version=current["structure"],
+        stock_version=current["stock"],
+        products=[model.ProductStockLevel(productId=pid, stock_quantity=qty) for pid, qty in products],
+        variants=[model.VariantStockLevel(variantId=vid, product_id=pid, stock_quantity=qty) for vid, pid, qty in variants],
+    )
+    return payload.model_dump_json().encode("utf-8")
+
+
+def get_stock_levels(db: Session) -> tuple:
+    current = versions()
+    etag = _etag("s", current["structure"], current["stock"])
+    return _cached("stock", etag, lambda: build_stock_levels(db, current))
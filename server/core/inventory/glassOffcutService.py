@@ -67,6 +67,7 @@ only the cashier's cut input (in ft/inch/mm, from GlassCalculator's per-cut unit
 needs converting, into mm, before comparison.
 """
 
+import time
 import uuid
 from datetime import datetime
 from typing import Optional
@@ -78,7 +79,13 @@ from entities.products import Product
 from entities.variants import Variant
 from entities.orderItems import OrderItem
 from entities.orders import Order
-from loggiing import logger
+from core.inventory import offcutEvents as offcut_events
+from core.inventory import stockConcurrency
+from core.inventory.stockConcurrency import for_update
+from core.inventory.glassPackingBounds import compute_sheet_bounds, meets_lower_bound
+from loggiing import RATE_LIMITED, logger
+from monitoring import metrics
+from monitoring.instrumentation import span
 
 
 # ── Unit normalization ────────────────────────────────────────────────────────
@@ -145,7 +152,7 @@ def _orientations(w: float, h: float, allow_rotation: bool):
     return orientations
 
 
-def _get_full_dims(variant: Optional[Variant]) -> tuple:
+def get_full_dims(variant: Optional[Variant]) -> tuple:
     """The sheet's full size, in mm. Every has_dimensions=True product stores this
     as Variant.length x Variant.width (Variant.height is unused/dead — see module
     docstring), regardless of what Product.unit is labeled."""
@@ -160,7 +167,8 @@ def _get_full_dims(variant: Optional[Variant]) -> tuple:
 # mainly through this kind of breadth-of-search (many strategies, keep the best),
 # not one fundamentally cleverer algorithm. Each strategy only varies two decision
 # points inside _pack_rect_multi: which pending need to try first at a level, and
-# which guillotine split direction to take.
+# which guillotine split direction to take. The search stops as soon as one
+# strategy provably can't be beaten on sheets/scrap (see glassPackingBounds).
 #
 # Known gap, tried and reverted (see git history / conversation record): a
 # "grab one unit at a time, re-evaluate the whole pool between placements"
@@ -345,6 +353,7 @@ def _pack_rect_multi(w: float, h: float, needs: list, allow_rotation: bool, stra
 
 # ── Candidate generation ────────────────────────────────────────────────────────
 
+@span("glass_candidates")
 def _generate_candidates(db: Session, product: Product, variant: Optional[Variant], needs: list, full_w: float, full_h: float, strategy: dict = DEFAULT_STRATEGY) -> list:
     """
     One candidate = one source (an existing offcut or the fresh sheet), each
@@ -365,10 +374,14 @@ def _generate_candidates(db: Session, product: Product, variant: Optional[Varian
         Offcut.height.isnot(None),
     )
     stmt = stmt.where(Offcut.variant_id == variant.variantId) if variant else stmt.where(Offcut.variant_id == None)  # noqa: E711
-    offcuts = db.exec(stmt).all()
+    # Claims the pool: an offcut another transaction has locked is left out of
+    # the candidates rather than waited on, and the ones returned are ours for
+    # _apply_candidate (whose own FOR UPDATE is then a re-acquisition)
+    offcuts = db.exec(for_update(db, stmt, skip_locked=True)).all()
 
     for oc in offcuts:
-        pack = _pack_rect_multi(oc.width, oc.height, needs, allow_rotation, strategy)
+        with span("glass_pack"):
+            pack = _pack_rect_multi(oc.width, oc.height, needs, allow_rotation, strategy)
         if not pack["placed"]:
             continue
         candidates.append({
@@ -379,7 +392,8 @@ def _generate_candidates(db: Session, product: Product, variant: Optional[Varian
         })
 
     if full_w > 0 and full_h > 0:
-        pack = _pack_rect_multi(full_w, full_h, needs, allow_rotation, strategy)
+        with span("glass_pack"):
+            pack = _pack_rect_multi(full_w, full_h, needs, allow_rotation, strategy)
         if pack["placed"]:
             candidates.append({
                 "source_kind": "sheet", "source_id": None,
@@ -640,21 +654,32 @@ OFFCUT_MATCH_TOLERANCE_MM = 1.0  # sizes within 1mm are "the same offcut" (absor
 
 # ── Stock/offcut mutation primitives ────────────────────────────────────────────
 
+@span("stock_lock")
 def _lock_variant(db: Session, variant: Variant) -> Variant:
-    return db.exec(select(Variant).where(Variant.variantId == variant.variantId).with_for_update()).first()
+    return db.exec(
+        for_update(db, select(Variant).where(Variant.variantId == variant.variantId))
+        .execution_options(populate_existing=True)
+    ).first()
 
 
+@span("stock_lock")
 def _lock_product(db: Session, product: Product) -> Product:
-    return db.exec(select(Product).where(Product.productId == product.productId).with_for_update()).first()
+    return db.exec(
+        for_update(db, select(Product).where(Product.productId == product.productId))
+        .execution_options(populate_existing=True)
+    ).first()
 
 
 def _deduct_sheet_stock(db: Session, product: Product, variant: Optional[Variant], qty: int) -> None:
     if variant:
         variant = _lock_variant(db, variant)
-        if variant.stock_quantity < qty:
+        # Unit lines on the same variant are queued in the stock ledger, not
+        # yet written to the row
+        available = variant.stock_quantity + stockConcurrency.pending(db, variant)
+        if available < qty:
             raise ValueError(
                 f"Insufficient sheet stock for '{variant.name or product.name}'. "
-                f"Available: {variant.stock_quantity}, requested: {qty}"
+                f"Available: {available}, requested: {qty}"
             )
         variant.stock_quantity -= qty
         db.add(variant)
@@ -663,8 +688,9 @@ def _deduct_sheet_stock(db: Session, product: Product, variant: Optional[Variant
         db.add(product)
     else:
         product = _lock_product(db, product)
-        if product.stock_quantity < qty:
-            raise ValueError(f"Insufficient sheet stock for '{product.name}'. Available: {product.stock_quantity}, requested: {qty}")
+        available = product.stock_quantity + stockConcurrency.pending(db, product)
+        if available < qty:
+            raise ValueError(f"Insufficient sheet stock for '{product.name}'. Available: {available}, requested: {qty}")
         product.stock_quantity -= qty
         db.add(product)
 
@@ -690,14 +716,14 @@ def _upsert_glass_offcut(db: Session, product: Product, variant: Optional[Varian
     On a merge into an existing row, it's overwritten to the newest contributor —
     biased toward surfacing a pending-source notice later rather than missing one
     (this is an advisory feature, not a strict guarantee; see _apply_candidate)."""
-    stmt = select(Offcut).where(
+    stmt = for_update(db, select(Offcut).where(
         Offcut.product_id == product.productId,
         Offcut.status == status,
         Offcut.width.isnot(None),
         Offcut.height.isnot(None),
         Offcut.width >= width - OFFCUT_MATCH_TOLERANCE_MM, Offcut.width <= width + OFFCUT_MATCH_TOLERANCE_MM,
         Offcut.height >= height - OFFCUT_MATCH_TOLERANCE_MM, Offcut.height <= height + OFFCUT_MATCH_TOLERANCE_MM,
-    ).with_for_update()
+    ))
     stmt = stmt.where(Offcut.variant_id == variant.variantId) if variant else stmt.where(Offcut.variant_id == None)  # noqa: E711
     existing = db.exec(stmt).first()
     if existing:
@@ -719,12 +745,12 @@ def _upsert_glass_offcut(db: Session, product: Product, variant: Optional[Varian
 
 
 def _remove_glass_offcut(db: Session, product: Product, variant: Optional[Variant], width: float, height: float, status: str = "available") -> None:
-    stmt = select(Offcut).where(
+    stmt = for_update(db, select(Offcut).where(
         Offcut.product_id == product.productId,
         Offcut.status == status,
         Offcut.width >= width - OFFCUT_MATCH_TOLERANCE_MM, Offcut.width <= width + OFFCUT_MATCH_TOLERANCE_MM,
         Offcut.height >= height - OFFCUT_MATCH_TOLERANCE_MM, Offcut.height <= height + OFFCUT_MATCH_TOLERANCE_MM,
-    ).with_for_update()
+    ))
     stmt = stmt.where(Offcut.variant_id == variant.variantId) if variant else stmt.where(Offcut.variant_id == None)  # noqa: E711
     existing = db.exec(stmt).first()
     if existing:
@@ -749,7 +775,11 @@ def _layout_remainder_rects(src_w: float, src_h: float, grid_w: float, grid_h: f
     return rect_a, rect_b
 
 
-def _apply_candidate(db: Session, product: Product, variant: Optional[Variant], candidate: dict, item_id: Optional[int] = None) -> dict:
+@span("glass_apply")
+def _apply_candidate(
+    db: Session, product: Product, variant: Optional[Variant], candidate: dict,
+    item_id: Optional[int] = None, event_item_id: Optional[int] = None,
+) -> dict:
     """
     Consumes ONE source unit (an offcut row or one sheet) and returns
     {line_idx: event, ...} — one event per order line that got a piece from this
@@ -770,10 +800,14 @@ def _apply_candidate(db: Session, product: Product, variant: Optional[Variant],
     if THIS candidate consumes an existing offcut whose own source_item_id points
     to an item that hasn't been marked cut yet, every event produced here gets a
     `pending_source_notice` — advisory only, never blocks the resolution.
+
+    Each event is also written to offcut_events (offcutEvents.record_source) under
+    `event_item_id`, defaulting to `item_id` — the correction path passes the
+    corrected item there while leaving remainder tagging (item_id) off.
     """
     pending_source_notice = None
     if candidate["source_kind"] == "offcut":
-        locked = db.exec(select(Offcut).where(Offcut.offcutId == candidate["source_id"]).with_for_update()).first()
+        locked = db.exec(for_update(db, select(Offcut).where(Offcut.offcutId == candidate["source_id"]))).first()
         if not locked or locked.quantity < 1:
             raise ValueError(f"Offcut #{candidate['source_id']} is no longer available")
         if locked.source_item_id:
@@ -834,6 +868,10 @@ def _apply_candidate(db: Session, product: Product, variant: Optional[Variant],
         }
         if pending_source_notice is not None:
             event["pending_source_notice"] = pending_source_notice
+        offcut_events.record_source(
+            db, product.productId, variant.variantId if variant else None,
+            event_item_id if event_item_id is not None else item_id, event,
+        )
         events[line_idx] = event
     return events
 
@@ -870,7 +908,10 @@ def _pick_with_redirect(pool: list, product: Product, now: datetime, remainder_w
     return consolidated
 
 
-def _fulfill_pool(db: Session, product: Product, variant: Optional[Variant], needs: list, full_w: float, full_h: float, strategy: dict = DEFAULT_STRATEGY, item_id: Optional[int] = None) -> dict:
+def _fulfill_pool(
+    db: Session, product: Product, variant: Optional[Variant], needs: list, full_w: float, full_h: float,
+    strategy: dict = DEFAULT_STRATEGY, item_id: Optional[int] = None, event_item_id: Optional[int] = None,
+) -> dict:
     """Fulfils as much of the whole `needs` pool as possible from a single
     source, packing pieces from potentially several different order lines into
     it at once when they nest together (see _pack_rect_multi / _generate_candidates).
@@ -944,45 +985,48 @@ def _fulfill_pool(db: Session, product: Product, variant: Optional[Variant], nee
             f"({full_w:.1f}x{full_h:.1f}mm) for product '{product.name}'"
         )
 
-    now = datetime.utcnow()
-
-    offcut_candidates = [c for c in candidates if c["source_kind"] == "offcut"]
-    if offcut_candidates:
-        small_tier = [
-            c for c in offcut_candidates
-            if not _meets_popular_threshold((c["source_w"], c["source_h"]), product)
-        ] if product.popular_size_ranges else []
-
-        if small_tier:
-            # Even within the small/unpopular tier, don't let one small
-            # offcut soak up way more source than a cut needs (_creates_big_waste)
-            # when a closer-fitting small offcut is available instead.
-            best = _pick_with_redirect(small_tier, product, now, lambda c: _remainder_common_sellable(c, product))
-        else:
-            if product.popular_size_ranges:
-                # Nothing in tier 1 anymore — every remaining offcut candidate
-                # is popular-or-larger (tier 2) by definition of small_tier.
-                pool = offcut_candidates
-                remainder_worth_protecting = lambda c: _remainder_meets_popular_threshold(c, product)  # noqa: E731
+    with span("glass_score"):
+        now = datetime.utcnow()
+
+        offcut_candidates = [c for c in candidates if c["source_kind"] == "offcut"]
+        if offcut_candidates:
+            small_tier = [
+                c for c in offcut_candidates
+                if not _meets_popular_threshold((c["source_w"], c["source_h"]), product)
+            ] if product.popular_size_ranges else []
+
+            if small_tier:
+                # Even within the small/unpopular tier, don't let one small
+                # offcut soak up way more source than a cut needs (_creates_big_waste)
+                # when a closer-fitting small offcut is available instead.
+                best = _pick_with_redirect(small_tier, product, now, lambda c: _remainder_common_sellable(c, product))
             else:
-                # No CEO ranges configured yet — every offcut is one pool (no
-                # ProtectPopularStockAgent-style sales-history filtering
-                # anymore); only the scrap-avoidance consolidation logic below
-                # still applies.
-                pool = offcut_candidates
-                remainder_worth_protecting = lambda c: _remainder_common_sellable(c, product)  # noqa: E731
-
-            best = _pick_with_redirect(pool, product, now, remainder_worth_protecting)
-    else:
-        sheet_candidates = [c for c in candidates if c["source_kind"] == "sheet"]
-        best = min(sheet_candidates, key=lambda c: _candidate_sort_key(c, product, now))
+                if product.popular_size_ranges:
+                    # Nothing in tier 1 anymore — every remaining offcut candidate
+                    # is popular-or-larger (tier 2) by definition of small_tier.
+                    pool = offcut_candidates
+                    remainder_worth_protecting = lambda c: _remainder_meets_popular_threshold(c, product)  # noqa: E731
+                else:
+                    # No CEO ranges configured yet — every offcut is one pool (no
+                    # ProtectPopularStockAgent-style sales-history filtering
+                    # anymore); only the scrap-avoidance consolidation logic below
+                    # still applies.
+                    pool = offcut_candidates
+                    remainder_worth_protecting = lambda c: _remainder_common_sellable(c, product)  # noqa: E731
+
+                best = _pick_with_redirect(pool, product, now, remainder_worth_protecting)
+        else:
+            sheet_candidates = [c for c in candidates if c["source_kind"] == "sheet"]
+            best = min(sheet_candidates, key=lambda c: _candidate_sort_key(c, product, now))
 
-    return _apply_candidate(db, product, variant, best, item_id)
+    return _apply_candidate(db, product, variant, best, item_id, event_item_id)
 
 
 # ── Public entry points ─────────────────────────────────────────────────────────
 
-def _line_piece_dims_mm(line: dict) -> Optional[tuple]:
+def line_piece_dims_mm(line: dict) -> Optional[tuple]:
+    """(width, height, qty) of a glass-cut line's pieces in mm, or None when
+    the line has no usable dimensions or quantity."""
     meta = line.get("meta", {}) or {}
     l_val, w_val = meta.get("l"), meta.get("w")
     qty = int(line.get("qty", 0))
@@ -1017,13 +1061,13 @@ def _resolve_with_strategy(db: Session, product: Product, variant: Optional[Vari
     which SPECIFIC leftover shapes get produced, so the resulting offcuts are
     ones the CEO has said sell well, not just "small in total area."
     """
-    full_w, full_h = _get_full_dims(variant)
+    full_w, full_h = get_full_dims(variant)
 
     needs = []  # [{"line_idx", "piece_w", "piece_h", "remaining"}, ...]
     for idx, line in enumerate(glass_cut_lines):
-        dims = _line_piece_dims_mm(line)
+        dims = line_piece_dims_mm(line)
         if not dims:
-            logger.warning(f"glass-cut line missing l/w or qty; skipping deduction: {line}")
+            logger.warning(f"glass-cut line missing l/w or qty; skipping deduction: {line}", extra=RATE_LIMITED)
             continue
         cut_w, cut_h, qty = dims
         needs.append({"line_idx": idx, "piece_w": cut_w, "piece_h": cut_h, "remaining": qty})
@@ -1066,6 +1110,27 @@ def _resolve_with_strategy(db: Session, product: Product, variant: Optional[Vari
     }
 
 
+def _sheet_bounds_for_lines(db: Session, product: Product, variant: Optional[Variant], glass_cut_lines: list) -> dict:
+    """Lower bounds on fresh sheets for this resolution (see glassPackingBounds),
+    computed once up front from the pooled pieces, the sheet size and the same
+    available-offcut pool _generate_candidates draws from."""
+    full_w, full_h = get_full_dims(variant)
+    shapes = [dims for dims in (line_piece_dims_mm(line) for line in glass_cut_lines) if dims]
+
+    stmt = select(Offcut.width, Offcut.height, Offcut.quantity).where(
+        Offcut.product_id == product.productId,
+        Offcut.status == "available",
+        Offcut.quantity > 0,
+        Offcut.width.isnot(None),
+        Offcut.height.isnot(None),
+    )
+    stmt = stmt.where(Offcut.variant_id == variant.variantId) if variant else stmt.where(Offcut.variant_id == None)  # noqa: E711
+    offcuts = [(w, h, qty) for w, h, qty in db.exec(stmt).all()]
+
+    return compute_sheet_bounds(shapes, full_w, full_h, product.allow_rotation, offcuts)
+
+
+@span("glass_resolve")
 def resolve_glass_cut_lines(db: Session, product: Product, variant: Optional[Variant], glass_cut_lines: list, item_id: Optional[int] = None) -> dict:
     """
     Batches all glass-cut lineItems belonging to one OrderItem together and
@@ -1079,6 +1144,15 @@ def resolve_glass_cut_lines(db: Session, product: Product, variant: Optional[Var
     results: breadth of search over several heuristics, not one cleverer
     algorithm — see module docstring.
 
+    The search stops early once a trial is provably optimal on the primary
+    criteria — no more sheets than the lower bound from glassPackingBounds and
+    zero scrap. No later strategy could beat it on sheets or scrap, so that
+    trial's savepoint is released (kept) instead of rolled back and re-run;
+    strategies are deterministic, so re-running would reproduce it exactly.
+    Early termination deliberately skips the remaining strategies' sellability/
+    fragmentation tiebreaks — on simple orders the first strategy usually hits
+    the bound, which removes most of the search work.
+
     `item_id` identifies the OrderItem these lines belong to — every remainder
     created gets tagged with it (Offcut.source_item_id), and any existing offcut
     consumed along the way gets checked for a still-pending producer, surfacing a
@@ -1086,47 +1160,77 @@ def resolve_glass_cut_lines(db: Session, product: Product, variant: Optional[Var
     None for call sites operating on already-committed orders (manager corrections).
 
     Returns an "optimization" summary — {"winning_strategy", "strategies_tried",
+    "early_terminated", "bounds", "sheets_above_bound",
     "trials": [{"name", "sheets_consumed", "total_scrap_area", "total_remainder_pieces", "won"}, ...]}
     — so callers (currently the cut preview endpoint) can show that this search
-    actually happened and what it found, not just apply it silently. Existing
-    callers that ignore the return value (e.g. inventoryService.py, which only
-    needs the offcut_sources mutated onto glass_cut_lines) are unaffected.
+    actually happened, what it found, and how close the chosen plan is to the
+    best theoretically possible sheet count, not just apply it silently.
+    Existing callers that ignore the return value (e.g. inventoryService.py,
+    which only needs the offcut_sources mutated onto glass_cut_lines) are
+    unaffected.
     """
+    started = time.perf_counter()
+    bounds = _sheet_bounds_for_lines(db, product, variant, glass_cut_lines)
+
     trials = []
+    kept = None  # (metrics, strategy) of a trial that hit the bound and was kept as-is
     for strategy in STRATEGIES:
         trial_lines = [{**line} for line in glass_cut_lines]
         savepoint = db.begin_nested()
+        metrics.glass_savepoints.inc()
         try:
-            metrics = _resolve_with_strategy(db, product, variant, trial_lines, strategy, item_id)
-            trials.append((metrics, strategy))
+            trial_metrics = _resolve_with_strategy(db, product, variant, trial_lines, strategy, item_id)
         except ValueError:
-            pass  # this strategy couldn't fulfil the pool at all — skip it
-        finally:
             savepoint.rollback()
+            continue  # this strategy couldn't fulfil the pool at all — skip it
+        trials.append((trial_metrics, strategy))
+        if meets_lower_bound(trial_metrics, bounds):
+            savepoint.commit()
+            for line, trial_line in zip(glass_cut_lines, trial_lines):
+                line["offcut_sources"] = trial_line["offcut_sources"]
+            kept = (trial_metrics, strategy)
+            break
+        savepoint.rollback()
 
     if not trials:
         # No strategy could resolve the pool — re-run the baseline for real so it
         # raises its own informative ValueError instead of failing silently here.
         _resolve_with_strategy(db, product, variant, glass_cut_lines, DEFAULT_STRATEGY, item_id)
-        return {"winning_strategy": DEFAULT_STRATEGY["name"], "strategies_tried": 0, "trials": []}
-
-    # Priority: fewest sheets (the dominant raw-material cost) > least true scrap
-    # (material that literally cannot be sold) > most sellable remainders (given
-    # the sheet count and scrap are already settled, prefer whichever strategy's
-    # leftover pieces land on sizes that have actually sold before, rather than
-    # just being "small in total area" — this is the fix for "if a sheet can only
-    # provide 3 pieces, make sure the waste it produces is easy to sell") > fewest
-    # total remainder pieces (least fragmentation) as a final tiebreak.
-    best_metrics, best_strategy = min(
-        trials, key=lambda t: (
-            t[0]["sheets_consumed"], t[0]["total_scrap_area"], -t[0]["total_sellability_score"], t[0]["total_remainder_pieces"],
+        return {
+            "winning_strategy": DEFAULT_STRATEGY["name"], "strategies_tried": 0, "early_terminated": False,
+            "bounds": bounds, "sheets_above_bound": None, "trials": [],
+        }
+
+    if kept is not None:
+        best_metrics, best_strategy = kept
+    else:
+        # Priority: fewest sheets (the dominant raw-material cost) > least true scrap
+        # (material that literally cannot be sold) > most sellable remainders (given
+        # the sheet count and scrap are already settled, prefer whichever strategy's
+        # leftover pieces land on sizes that have actually sold before, rather than
+        # just being "small in total area" — this is the fix for "if a sheet can only
+        # provide 3 pieces, make sure the waste it produces is easy to sell") > fewest
+        # total remainder pieces (least fragmentation) as a final tiebreak.
+        best_metrics, best_strategy = min(
+            trials, key=lambda t: (
+                t[0]["sheets_consumed"], t[0]["total_scrap_area"], -t[0]["total_sellability_score"], t[0]["total_remainder_pieces"],
+            )
         )
-    )
-    _resolve_with_strategy(db, product, variant, glass_cut_lines, best_strategy, item_id)
+        _resolve_with_strategy(db, product, variant, glass_cut_lines, best_strategy, item_id)
+
+    metrics.glass_resolution_duration.observe(time.perf_counter() - started)
+    metrics.glass_strategies_tried.inc(len(trials))
+    metrics.glass_sheets_opened.inc(best_metrics["sheets_consumed"])
+    metrics.glass_scrap_area.inc(best_metrics["total_scrap_area"])
+    if kept is not None:
+        metrics.glass_early_terminations.inc()
 
     return {
         "winning_strategy": best_strategy["name"],
         "strategies_tried": len(trials),
+        "early_terminated": kept is not None,
+        "bounds": bounds,
+        "sheets_above_bound": best_metrics["sheets_consumed"] - bounds["sheets_lower_bound"],
         "trials": [
             {
                 "name": strategy["name"],
@@ -1178,7 +1282,36 @@ def _restore_one_source(db: Session, product: Product, variant: Optional[Variant
         _remove_glass_offcut(db, product, variant, r["width"], r["height"], r.get("status", "available"))
 
 
-def apply_manual_glass_selection(db: Session, product: Product, variant: Optional[Variant], cut_l: float, cut_w: float, unit: str, forced_offcut_id: Optional[int] = None) -> dict:
+def restore_glass_events(db: Session, product: Product, variant: Optional[Variant], events: list) -> None:
+    """Row-driven equivalent of restore_glass_cut_lines: reverses 2D offcut_events
+    rows (consume + remainder, in write order). Non-owning consume rows are
+    skipped for the same reason _restore_one_source skips shared events. The
+    caller marks the rows reversed."""
+    for event in events:
+        if event.kind == "remainder":
+            _remove_glass_offcut(db, product, variant, event.width, event.height, event.status or "available")
+        elif not event.owns_consumption:
+            continue
+        elif event.source == "offcut":
+            existing = db.get(Offcut, event.source_offcut_id) if event.source_offcut_id else None
+            if existing:
+                existing.quantity += 1
+                db.add(existing)
+            else:
+                db.add(Offcut(
+                    product_id=product.productId,
+                    variant_id=variant.variantId if variant else None,
+                    width=event.width, height=event.height,
+                    length=0.0, quantity=1, status="available",
+                ))
+        else:
+            _restore_sheet_stock(db, product, variant, 1)
+
+
+def apply_manual_glass_selection(
+    db: Session, product: Product, variant: Optional[Variant], cut_l: float, cut_w: float, unit: str,
+    forced_offcut_id: Optional[int] = None, item_id: Optional[int] = None,
+) -> dict:
     """
     Backend hook for a future cashier-override UI (the 2D analogue of
     OffcutSelectorModal.jsx). Resolves ONE cut, forced to a specific existing
@@ -1188,9 +1321,14 @@ def apply_manual_glass_selection(db: Session, product: Product, variant: Optiona
     multi-source blending here — one cut comes from exactly one source. Goes
     through the same pool-based path as resolve_glass_cut_lines, just with a
     pool of exactly one need, so it behaves identically to a single-piece line.
+
+    `item_id` is the OrderItem the cut is for, exactly as in
+    resolve_glass_cut_lines: the remainders are tagged with it and the
+    offcut_events rows are recorded under it, so cancelling or editing the
+    order finds and reverses them.
     """
     cut_w_mm, cut_h_mm = _cut_dims_to_mm(cut_l, cut_w, unit)
-    full_w, full_h = _get_full_dims(variant)
+    full_w, full_h = get_full_dims(variant)
     needs = [{"line_idx": 0, "piece_w": cut_w_mm, "piece_h": cut_h_mm, "remaining": 1}]
     candidates = _generate_candidates(db, product, variant, needs, full_w, full_h)
 
@@ -1207,10 +1345,13 @@ def apply_manual_glass_selection(db: Session, product: Product, variant: Optiona
 
     now = datetime.utcnow()
     best = min(candidates, key=lambda c: _candidate_sort_key(c, product, now))
-    return _apply_candidate(db, product, variant, best)[0]
+    return _apply_candidate(db, product, variant, best, item_id)[0]
 
 
-def resolve_replacement_pieces(db: Session, product: Product, variant: Optional[Variant], pieces: list, forced_offcut_id: Optional[int] = None) -> list:
+def resolve_replacement_pieces(
+    db: Session, product: Product, variant: Optional[Variant], pieces: list,
+    forced_offcut_id: Optional[int] = None, event_item_id: Optional[int] = None,
+) -> list:
     """
     Manager-facing correction for a "the cutter missed" scenario: one or more
     delivered pieces never actually came out of their recorded source, so a
@@ -1233,9 +1374,10 @@ def resolve_replacement_pieces(db: Session, product: Product, variant: Optional[
 
     Performs real DB mutations (offcut decrement/sheet deduction, new remainder
     upserts) via _apply_candidate — the caller controls whether this rides the
-    outer transaction (confirm) or gets rolled back (preview).
+    outer transaction (confirm) or gets rolled back (preview). `event_item_id`
+    is the order item the replacement events are recorded under in offcut_events.
     """
-    full_w, full_h = _get_full_dims(variant)
+    full_w, full_h = get_full_dims(variant)
 
     groups: dict = {}
     for width, height in pieces:
@@ -1256,10 +1398,10 @@ def resolve_replacement_pieces(db: Session, product: Product, variant: Optional[
                 raise ValueError(f"Offcut #{forced_offcut_id} doesn't fit any of the corrected pieces")
             now = datetime.utcnow()
             best = min(candidates, key=lambda c: _candidate_sort_key(c, product, now))
-            events_by_line = _apply_candidate(db, product, variant, best)
+            events_by_line = _apply_candidate(db, product, variant, best, event_item_id=event_item_id)
             forced_pending = False
         else:
-            events_by_line = _fulfill_pool(db, product, variant, needs, full_w, full_h)
+            events_by_line = _fulfill_pool(db, product, variant, needs, full_w, full_h, event_item_id=event_item_id)
 
         for event in events_by_line.values():
             events.append(event)
@@ -1274,6 +1416,7 @@ def resolve_replacement_pieces(db: Session, product: Product, variant: Optional[
 def correct_glass_offcut_event(
     db: Session, product: Product, variant: Optional[Variant], event: dict, new_remainders: list,
     failed_cut_indices: Optional[list] = None, forced_offcut_id: Optional[int] = None,
+    item_id: Optional[int] = None,
 ) -> dict:
     """
     Manager-facing correction for a single owning offcut_sources event: physical
@@ -1289,6 +1432,12 @@ def correct_glass_offcut_event(
     replacement source for it. The event's own `source`/`offcut_id` (what THIS
     source actually consumed/left behind) is otherwise untouched.
 
+    The remainders actually reversed come from the event's offcut_events rows
+    (found by its group_id), which are marked reversed and replaced by rows for
+    the corrected remainders; events recorded before that table existed fall
+    back to the JSON's remainders_created. `item_id` is the order item the event
+    belongs to, for the new rows.
+
     Returns {"before", "after", "replacement_events"} — before/after describe
     the remainder correction (as before), replacement_events is the (possibly
     empty) list of new offcut_sources-shaped entries the caller should append
@@ -1307,8 +1456,15 @@ def correct_glass_offcut_event(
         if width <= 0 or height <= 0:
             raise ValueError(f"Corrected remainder dimensions must be positive (got {width}x{height})")
 
-    for r in before:
-        _remove_glass_offcut(db, product, variant, r["width"], r["height"], r.get("status", "available"))
+    is_recorded = offcut_events.group_exists(db, event.get("group_id"))
+    if is_recorded:
+        recorded = offcut_events.group_remainders(db, event["group_id"])
+        for row in recorded:
+            _remove_glass_offcut(db, product, variant, row.width, row.height, row.status or "available")
+        offcut_events.mark_reversed(db, recorded)
+    else:
+        for r in before:
+            _remove_glass_offcut(db, product, variant, r["width"], r["height"], r.get("status", "available"))
 
     after = []
     for size in new_remainders:
@@ -1319,6 +1475,15 @@ def correct_glass_offcut_event(
         after.append({"width": width, "height": height, "status": status, "offcut_id": offcut_id})
 
     event["remainders_created"] = after
+    variant_id = variant.variantId if variant else None
+    if is_recorded:
+        offcut_events.record_remainders(
+            db, event["group_id"], product.productId, variant_id, item_id, event.get("source", "sheet"), after,
+        )
+    else:
+        # Not in offcut_events yet — record the whole (corrected) event so a later
+        # restore reverses it from the rows like everything else on the item
+        offcut_events.record_source(db, product.productId, variant_id, item_id, event)
 
     replacement_events = []
     if failed_cut_indices:
@@ -1329,6 +1494,8 @@ def correct_glass_offcut_event(
         failed_set = set(failed_cut_indices)
         failed_pieces = [(cuts[i]["width"], cuts[i]["height"]) for i in failed_cut_indices]
         event["cuts"] = [c for i, c in enumerate(cuts) if i not in failed_set]
-        replacement_events = resolve_replacement_pieces(db, product, variant, failed_pieces, forced_offcut_id)
+        replacement_events = resolve_replacement_pieces(
+            db, product, variant, failed_pieces, forced_offcut_id, event_item_id=item_id,
+        )
 
     return {"before": before, "after": after, "replacement_events": replacement_events}
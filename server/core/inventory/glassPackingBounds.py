@@ -0,0 +1,188 @@
+"""
+Lower bounds on how many FRESH sheets a glass-cut resolution can possibly need.
+
+resolve_glass_cut_lines (glassOffcutService.py) tries every packing strategy in
+STRATEGIES and keeps the best. That breadth of search is only worth paying for
+while a better outcome is still possible: once a trial has consumed no more
+sheets than a proven lower bound AND produced zero scrap, no other strategy can
+beat it on the primary criteria (fewest sheets, then least scrap), so the
+search stops there. These bounds are also surfaced in the cut preview so staff
+can see how far the chosen plan is from the theoretical optimum.
+
+Everything here is pure geometry — no DB access — computed once per resolution
+from the pooled pieces, the sheet size and whatever offcuts are available. Every
+bound must be VALID (never above the true optimum): an over-estimate would stop
+the search on a trial that another strategy could still have beaten.
+
+Bounds computed (the reported `sheets_lower_bound` is the max of all three):
+
+  1. Area bound — ceil((total piece area - usable offcut area) / sheet area).
+     Offcuts are free material, so only the area they can't absorb has to come
+     from fresh sheets. An offcut too small to hold any piece in any allowed
+     orientation doesn't count as usable.
+
+  2. Large-item bound — a piece wider than half the sheet AND taller than half
+     the sheet (in every orientation it can be placed in) can't share a sheet
+     with another such piece: two of them can be separated neither side by side
+     nor one above the other.
+
+  3. L2 bound (Martello & Vigo, "Exact solution of the two-dimensional finite
+     bin packing problem", 1998) — extends the large-item bound with the area of
+     smaller pieces. For thresholds p <= W/2, q <= H/2: I1 = large pieces with
+     w > W - p and h > H - q, I2 = the other large pieces, I3 = non-large pieces
+     with w >= p and h >= q. An I3 piece can never share a sheet with an I1
+     piece (every gap around the I1 piece is narrower than p or shorter than q),
+     so I3's area has to fit in I2's leftover space or in extra sheets:
+         L2(p, q) = |I1| + |I2| + max(0, ceil((area(I2) + area(I3) - |I2|*W*H) / (W*H)))
+     Rotation is handled conservatively: a piece only joins a set if the set's
+     condition holds in EVERY orientation it could be placed in, which keeps the
+     argument valid when the engine is free to rotate pieces (_orientations).
+
+Bounds 2 and 3 only apply to pieces that can't fit into ANY available offcut:
+those are the only ones guaranteed to land on fresh sheets. Pieces that could go
+into an offcut only contribute through the area bound.
+"""
+
+import math
+from typing import Optional
+
+EPS = 1e-6  # same float-noise tolerance as glassOffcutService's geometry helpers
+
+
+def fitting_orientations(piece_w: float, piece_h: float, src_w: float, src_h: float, allow_rotation: bool) -> list:
+    """Every (w, h) orientation of the piece that physically fits in src_w x src_h —
+    same rotation rule as glassOffcutService._orientations (a square piece has
+    only one distinct orientation)."""
+    orientations = [(piece_w, piece_h)]
+    if allow_rotation and abs(piece_w - piece_h) > EPS:
+        orientations.append((piece_h, piece_w))
+    return [(ow, oh) for ow, oh in orientations if ow <= src_w + EPS and oh <= src_h + EPS]
+
+
+def _ceil(value: float) -> int:
+    """ceil() that doesn't round 2.0000000001 (float noise from mm conversion) up to 3."""
+    return max(0, math.ceil(value - EPS))
+
+
+def area_bound(shapes: list, sheet_w: float, sheet_h: float, usable_offcut_area: float = 0.0) -> int:
+    """Bound 1 — see module docstring. `shapes` is [(piece_w, piece_h, count), ...]."""
+    sheet_area = sheet_w * sheet_h
+    if sheet_area <= EPS:
+        return 0
+    total_area = sum(w * h * count for w, h, count in shapes)
+    return _ceil((total_area - usable_offcut_area) / sheet_area)
+
+
+def large_item_bound(shapes: list, sheet_w: float, sheet_h: float, allow_rotation: bool) -> int:
+    """Bound 2 — how many pieces are too large (in every orientation) to pair up
+    with each other on one sheet. Shapes that don't fit the sheet at all are
+    skipped: the engine rejects those with its own error."""
+    count_large = 0
+    for w, h, count in shapes:
+        placements = fitting_orientations(w, h, sheet_w, sheet_h, allow_rotation)
+        if placements and all(ow > sheet_w / 2 + EPS and oh > sheet_h / 2 + EPS for ow, oh in placements):
+            count_large += count
+    return count_large
+
+
+def l2_bound(shapes: list, sheet_w: float, sheet_h: float, allow_rotation: bool) -> int:
+    """Bound 3 — Martello–Vigo L2, maximized over every meaningful (p, q) pair.
+    The sets I1/I2/I3 only change at piece dimensions, so p/q only need to range
+    over those (plus W/2, H/2 for the case where I3 ends up empty)."""
+    sheet_area = sheet_w * sheet_h
+    if sheet_area <= EPS:
+        return 0
+
+    half_w, half_h = sheet_w / 2, sheet_h / 2
+    classified = []  # [(placements, area, count, is_large), ...]
+    p_values, q_values = {half_w}, {half_h}
+    for w, h, count in shapes:
+        placements = fitting_orientations(w, h, sheet_w, sheet_h, allow_rotation)
+        if not placements:
+            continue
+        is_large = all(ow > half_w + EPS and oh > half_h + EPS for ow, oh in placements)
+        classified.append((placements, w * h, count, is_large))
+        for ow, oh in placements:
+            if ow <= half_w + EPS:
+                p_values.add(ow)
+            if oh <= half_h + EPS:
+                q_values.add(oh)
+
+    best = 0
+    for p in p_values:
+        for q in q_values:
+            n1 = n2 = 0
+            area2 = area3 = 0.0
+            for placements, area, count, is_large in classified:
+                if is_large:
+                    if all(ow > sheet_w - p + EPS and oh > sheet_h - q + EPS for ow, oh in placements):
+                        n1 += count
+                    else:
+                        n2 += count
+                        area2 += area * count
+                elif all(ow >= p - EPS and oh >= q - EPS for ow, oh in placements):
+                    area3 += area * count
+            bound = n1 + n2 + _ceil((area2 + area3 - n2 * sheet_area) / sheet_area)
+            best = max(best, bound)
+    return best
+
+
+def compute_sheet_bounds(
+    shapes: list,
+    sheet_w: float,
+    sheet_h: float,
+    allow_rotation: bool,
+    offcuts: Optional[list] = None,
+) -> dict:
+    """
+    Lower bounds on fresh sheets for one resolution. `shapes` is the pooled
+    pieces as [(piece_w, piece_h, count), ...] in mm; `offcuts` is the
+    available offcut pool as [(width, height, quantity), ...].
+
+    Returns {"area_bound", "large_item_bound", "l2_bound", "sheets_lower_bound",
+    "pieces_needing_fresh_sheet", "scrap_area_lower_bound"} — the last is always
+    0.0 (no cheap non-trivial scrap bound exists), kept explicit so callers
+    compare a trial against the bound on BOTH primary criteria the strategy
+    search ranks by.
+    """
+    offcuts = offcuts or []
+    if sheet_w <= EPS or sheet_h <= EPS:
+        # No sheet size configured — the engine can only use offcuts, so it can't
+        # open any sheet at all; zero is the (trivially tight) bound.
+        return {
+            "area_bound": 0, "large_item_bound": 0, "l2_bound": 0, "sheets_lower_bound": 0,
+            "pieces_needing_fresh_sheet": 0, "scrap_area_lower_bound": 0.0,
+        }
+
+    def fits_some_offcut(w: float, h: float, oc: tuple) -> bool:
+        return bool(fitting_orientations(w, h, oc[0], oc[1], allow_rotation))
+
+    usable_offcut_area = 0.0
+    for oc in offcuts:
+        if any(fits_some_offcut(w, h, oc) for w, h, _ in shapes):
+            usable_offcut_area += oc[0] * oc[1] * oc[2]
+
+    sheet_only = [
+        (w, h, count) for w, h, count in shapes
+        if not any(fits_some_offcut(w, h, oc) for oc in offcuts)
+    ]
+
+    bounds = {
+        "area_bound": area_bound(shapes, sheet_w, sheet_h, usable_offcut_area),
+        "large_item_bound": large_item_bound(sheet_only, sheet_w, sheet_h, allow_rotation),
+        "l2_bound": l2_bound(sheet_only, sheet_w, sheet_h, allow_rotation),
+        "pieces_needing_fresh_sheet": sum(count for _, _, count in sheet_only),
+        "scrap_area_lower_bound": 0.0,
+    }
+    bounds["sheets_lower_bound"] = max(bounds["area_bound"], bounds["large_item_bound"], bounds["l2_bound"])
+    return bounds
+
+
+def meets_lower_bound(metrics: dict, bounds: dict) -> bool:
+    """Whether a strategy trial's outcome (_resolve_with_strategy's metrics) is
+    provably optimal on the search's primary criteria — no strategy can use
+    fewer sheets or produce less scrap than this."""
+    return (
+        metrics["sheets_consumed"] <= bounds["sheets_lower_bound"]
+        and metrics["total_scrap_area"] <= bounds["scrap_area_lower_bound"] + EPS
+    )
@@ -0,0 +1,590 @@
+"""
+Catalog import — a supplier's price list (CSV or XLSX, one row per variant)
+loaded into categories/products/variants in one set-based pass.
+
+create_product / add_variants_bulk build ORM objects one at a time and the
+whole upload had to be right or nothing went in, so onboarding a catalog of
+hundreds of glass and profile variants was slow and fiddly. Here:
+
+  1. parse — rows are read as they stream from the upload (csv reader, or
+     openpyxl in read-only mode for .xlsx) and validated with the same rules
+     the product services apply: VariantCreate / PopularSizeRange for types,
+     products/service.variant_name for naming, glass_settings_error for new
+     glass products. Bad rows are collected with their row number.
+  2. stage — valid rows are COPYed (psycopg2 copy_expert, in chunks of
+     IMPORT_CHUNK_ROWS) into a TEMP table that is dropped at the end of the
+     transaction, then matched against the catalog in three UPDATE ... FROM
+     joins: category (by type slug, then name), product (by name — the key
+     create_product deduplicates on), variant (by product + name).
+  3. diff — what would change, read straight off the staged matches: new
+     categories, new/changed products, new/changed variants (field by field,
+     old -> new). This is the whole response of a dry run, which then rolls
+     back.
+  4. apply — INSERT ... SELECT for new categories, products and variants, and
+     UPDATE ... FROM for changed ones, each one statement for the whole file.
+     New variants' opening stock is added to their product's total. A simple
+     product (has_variants = false) holds its own stock, so rows adding a
+     variant to one are rejected like any other invalid row.
+
+What an import may change on rows that already exist is deliberately narrow:
+a product's itemCode, sub_category, description and unit; a variant's prices
+and dimensions — and only from non-empty cells. A product's
+applicable_attributes only grow: attribute names its new rows bring are
+appended to the ones it has. Stock of existing variants is
+never touched (that's a restock, with its own history: POST /products/restock),
+nor are offcut tracking or glass tuning of existing products.
+
+Every raw UPDATE bumps the row's `version` (entities/versioning.py), and the
+commit bumps the catalog versions (catalogService.note_catalog_change), so
+clients refetch the snapshot. Progress — rows parsed and staged, then each
+phase — is pushed to the uploading user over the WebSocket as
+`import_progress` events.
+
+Postgres only (COPY).
+"""
+
+import csv
+import io
+import json
+import time
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlmodel import Session
+
+from core import referenceCache
+from core.inventory import catalogService
+from core.inventory.products import model
+from core.inventory.products.service import category_slug, glass_settings_error, variant_name
+from loggiing import logger
+
+IMPORT_CHUNK_ROWS = 2000
+REPORT_LIMIT = 200  # changes/errors listed in the report (the counts are always complete)
+
+# Spreadsheet header -> staged column. Headers are matched case-insensitively;
+# unknown columns are ignored.
+PRODUCT_COLUMNS = [
+    "product_name", "item_code", "category", "sub_category", "unit", "track_offcuts",
+    "has_dimensions", "min_usable_dimension", "allow_rotation", "popular_size_ranges", "description",
+]
+VARIANT_COLUMNS = [
+    "attributes", "price", "price_half", "price_unit", "length", "width", "height",
+    "unit_quantity", "stock_quantity",
+]
+REQUIRED_COLUMNS = {"product_name", "category"}
+
+# Staged table — one row per valid input row
+STAGING_COLUMNS = [
+    ("row_no", "integer"),
+    ("product_name", "text"), ("item_code", "text"), ("category", "text"), ("category_type", "text"),
+    ("sub_category", "text"), ("unit", "text"), ("track_offcuts", "boolean"), ("has_dimensions", "boolean"),
+    ("min_usable_dimension", "double precision"), ("allow_rotation", "boolean"),
+    ("popular_size_ranges", "text"), ("description", "text"),
+    ("variant_name", "text"), ("attributes", "text"),
+    ("price", "double precision"), ("price_half", "double precision"), ("price_unit", "double precision"),
+    ("length", "double precision"), ("width", "double precision"), ("height", "double precision"),
+    ("unit_quantity", "double precision"), ("stock_quantity", "double precision"),
+]
+
+# Fields an import may update on existing rows (see module docstring)
+PRODUCT_UPDATE_FIELDS = [("item_code", '"itemCode"'), ("sub_category", "sub_category"),
+                         ("description", "description"), ("unit", "unit")]
+VARIANT_UPDATE_FIELDS = ["price", "price_half", "price_unit", "length", "width", "height", "unit_quantity"]
+
+_TRUE = {"1", "true", "yes", "y", "t"}
+_FALSE = {"0", "false", "no", "n", "f"}
+
+
+# ── Reading ──────────────────────────────────────────────────────────────────
+
+def _blank(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _numbered_csv(reader) -> Iterator[Tuple[int, list]]:
+    # reader.line_num counts physical lines, so a quoted cell spanning several
+    # lines still leaves the next record numbered by its own first line
+    start = 1
+    for values in reader:
+        yield start, values
+        start = reader.line_num + 1
+
+
+def read_rows(fileobj, filename: str) -> Iterator[Tuple[int, dict]]:
+    """Yields (row number, {column: raw value}) per data row, streaming from
+    `fileobj`. The number is where the row starts in the file — the CSV line,
+    or the sheet row — so blank lines skipped before it still count. .xlsx
+    needs the optional openpyxl package; anything else is read as CSV."""
+    if filename.lower().endswith((".xlsx", ".xlsm")):
+        try:
+            from openpyxl import load_workbook  # optional — only needed for .xlsx uploads
+        except ImportError:
+            raise HTTPException(status_code=400, detail="XLSX import needs the openpyxl package on the server — upload a CSV instead")
+        sheet = load_workbook(fileobj, read_only=True, data_only=True).active
+        rows = enumerate(sheet.iter_rows(values_only=True), start=1)
+    else:
+        rows = _numbered_csv(csv.reader(io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")))
+
+    header = None
+    for row_no, values in rows:
+        if header is None:
+            header = [str(h).strip().lower() if h is not None else "" for h in values]
+            missing = REQUIRED_COLUMNS - set(header)
+            if missing:
+                raise HTTPException(status_code=400, detail=f"Missing required column(s): {', '.join(sorted(missing))}")
+            continue
+        if all(_blank(v) for v in values):
+            continue
+        yield row_no, dict(zip(header, values))
+    if header is None:
+        raise HTTPException(status_code=400, detail="The file is empty")
+
+
+# ── Validation ───────────────────────────────────────────────────────────────
+
+def _text(raw: dict, key: str) -> Optional[str]:
+    value = raw.get(key)
+    return None if _blank(value) else str(value).strip()
+
+
+def _bool(raw: dict, key: str) -> Optional[bool]:
+    value = _text(raw, key)
+    if value is None:
+        return None
+    if value.lower() in _TRUE:
+        return True
+    if value.lower() in _FALSE:
+        return False
+    raise ValueError(f"{key}: expected yes/no, got '{value}'")
+
+
+def _attributes(value: Optional[str]) -> dict:
+    """A JSON object, or `Color=White; Thickness=6mm` — order is kept, since
+    it makes the variant's name."""
+    if value is None:
+        return {}
+    if value.startswith("{"):
+        parsed = json.loads(value)
+        if not isinstance(parsed, dict):
+            raise ValueError("attributes: expected an object")
+        return parsed
+    attributes = {}
+    for part in value.split(";"):
+        if not part.strip():
+            continue
+        key, sep, val = part.partition("=")
+        if not sep or not key.strip():
+            raise ValueError(f"attributes: expected Name=Value pairs, got '{part.strip()}'")
+        attributes[key.strip()] = val.strip()
+    return attributes
+
+
+def parse_row(raw: dict) -> dict:
+    """One input row -> one staged row (without row_no). ValueError with a
+    readable message if it breaks a rule."""
+    product_name = _text(raw, "product_name")
+    category = _text(raw, "category")
+    if not product_name:
+        raise ValueError("product_name is required")
+    if not category:
+        raise ValueError("category is required")
+
+    popular = _text(raw, "popular_size_ranges")
+    ranges = [model.PopularSizeRange(**r).model_dump() for r in json.loads(popular)] if popular else []
+
+    variant = model.VariantCreate(
+        attributes=_attributes(_text(raw, "attributes")),
+        **{key: _text(raw, key) for key in VARIANT_COLUMNS[1:] if _text(raw, key) is not None},
+    )
+    fields_set = variant.model_fields_set
+    return {
+        "product_name": product_name,
+        "item_code": _text(raw, "item_code"),
+        "category": category,
+        "category_type": category_slug(category),
+        "sub_category": _text(raw, "sub_category"),
+        "unit": _text(raw, "unit"),
+        "track_offcuts": _bool(raw, "track_offcuts"),
+        "has_dimensions": _bool(raw, "has_dimensions"),
+        "min_usable_dimension": float(_text(raw, "min_usable_dimension")) if _text(raw, "min_usable_dimension") else None,
+        "allow_rotation": _bool(raw, "allow_rotation"),
+        "popular_size_ranges": json.dumps(ranges) if ranges else None,
+        "description": _text(raw, "description"),
+        "variant_name": variant_name(variant.attributes),
+        "attributes": json.dumps(variant.attributes),
+        # Only cells that were filled in — an empty price cell keeps the current price
+        **{key: getattr(variant, key) if key in fields_set else None for key in VARIANT_COLUMNS[1:]},
+    }
+
+
+def _error_message(e: Exception) -> str:
+    if isinstance(e, ValidationError):
+        return "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+    if isinstance(e, json.JSONDecodeError):
+        return f"invalid JSON ({e.msg})"
+    return str(e)
+
+
+# ── Staging ──────────────────────────────────────────────────────────────────
+
+def _copy_chunk(cursor, rows: List[dict]) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    names = [name for name, _ in STAGING_COLUMNS]
+    for row in rows:
+        # COPY's csv format reads an unquoted empty field as NULL
+        writer.writerow(["" if row.get(n) is None else row[n] for n in names])
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY import_staging ({', '.join(names)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def _resolve(db: Session) -> None:
+    """Fills import_staging's category_id / product_id / variant_id from the
+    catalog — one hash join each (lowest id wins where legacy data has
+    duplicates)."""
+    db.execute(text(
+        'UPDATE import_staging s SET category_id = c.id FROM ('
+        ' SELECT DISTINCT ON (type) type, "categoryId" AS id FROM categories ORDER BY type, "categoryId") c'
+        ' WHERE s.category_id IS NULL AND c.type = s.category_type'
+    ))
+    db.execute(text(
+        'UPDATE import_staging s SET category_id = c.id FROM ('
+        ' SELECT DISTINCT ON (lower(name)) lower(name) AS name, "categoryId" AS id FROM categories'
+        ' ORDER BY lower(name), "categoryId") c'
+        ' WHERE s.category_id IS NULL AND c.name = lower(s.category)'
+    ))
+    db.execute(text(
+        'UPDATE import_staging s SET product_id = p.id FROM ('
+        ' SELECT name, min("productId") AS id FROM products GROUP BY name) p'
+        ' WHERE s.product_id IS NULL AND p.name = s.product_name'
+    ))
+    db.execute(text(
+        'UPDATE import_staging s SET variant_id = v.id FROM ('
+        ' SELECT product_id, name, min("variantId") AS id FROM variants GROUP BY product_id, name) v'
+        ' WHERE s.variant_id IS NULL AND v.product_id = s.product_id AND v.name = s.variant_name'
+    ))
+
+
+# ── Diff ─────────────────────────────────────────────────────────────────────
+
+def _changed(pairs) -> dict:
+    """{field: {"from", "to"}} for every (field, old, new) where new is set and differs."""
+    return {f: {"from": old, "to": new} for f, old, new in pairs if new is not None and new != old}
+
+
+def _product_firsts_sql() -> str:
+    # Product-level cells come from the product's first row in the file
+    return "SELECT DISTINCT ON (product_name) * FROM import_staging ORDER BY product_name, row_no"
+
+
+def _attribute_key_rows_sql() -> str:
+    # Each attribute name a product's rows use, with where it first appears in
+    # the file (row, then position in the cell) — the order it's listed in
+    return (
+        "SELECT DISTINCT ON (s.product_name, e.key) s.product_name, s.product_id, e.key, s.row_no, e.ord"
+        " FROM import_staging s"
+        " CROSS JOIN LATERAL json_each_text(CAST(s.attributes AS json)) WITH ORDINALITY AS e(key, value, ord)"
+        " ORDER BY s.product_name, e.key, s.row_no, e.ord"
+    )
+
+
+def _attribute_keys_sql() -> str:
+    # A new product's applicable_attributes
+    return f"SELECT product_name, json_agg(key ORDER BY row_no, ord) AS keys FROM ({_attribute_key_rows_sql()}) k GROUP BY product_name"
+
+
+# An existing product's applicable_attributes as a jsonb array ('[]' if unset)
+_CURRENT_ATTRIBUTES = (
+    "CASE WHEN json_typeof(p.applicable_attributes) = 'array'"
+    " THEN CAST(p.applicable_attributes AS jsonb) ELSE CAST('[]' AS jsonb) END"
+)
+
+
+def _new_attribute_keys_sql() -> str:
+    # The attribute names an existing product's rows bring that it doesn't list yet
+    return (
+        f"SELECT k.product_id, jsonb_agg(k.key ORDER BY k.row_no, k.ord) AS keys"
+        f" FROM ({_attribute_key_rows_sql()}) k"
+        f' JOIN products p ON p."productId" = k.product_id'
+        f" WHERE NOT ({_CURRENT_ATTRIBUTES} @> jsonb_build_array(k.key))"
+        f" GROUP BY k.product_id"
+    )
+
+
+def _diff(db: Session) -> dict:
+    categories = [r[0] for r in db.execute(text(
+        "SELECT DISTINCT ON (category_type) category FROM import_staging"
+        " WHERE category_id IS NULL ORDER BY category_type, row_no"
+    )).all()]
+
+    new_products = db.execute(text(
+        f"SELECT product_name, category, has_dimensions FROM ({_product_firsts_sql()}) s"
+        " WHERE product_id IS NULL ORDER BY row_no"
+    )).all()
+    product_rows = db.execute(text(
+        f'SELECT s.product_name, p."itemCode", s.item_code, p.sub_category, s.sub_category,'
+        f' p.description, s.description, p.unit, s.unit, {_CURRENT_ATTRIBUTES}, a.keys'
+        f' FROM ({_product_firsts_sql()}) s JOIN products p ON p."productId" = s.product_id'
+        f" LEFT JOIN ({_new_attribute_keys_sql()}) a ON a.product_id = s.product_id ORDER BY s.row_no"
+    )).all()
+    product_changes = []
+    for r in product_rows:
+        fields = _changed([("itemCode", r[1], r[2]), ("sub_category", r[3], r[4]),
+                           ("description", r[5], r[6]), ("unit", r[7], r[8]),
+                           ("applicable_attributes", r[9], r[9] + r[10] if r[10] else None)])
+        if fields:
+            product_changes.append({"product": r[0], "action": "update", "fields": fields})
+
+    new_variants = db.execute(text(
+        "SELECT product_name, variant_name, price, stock_quantity FROM import_staging"
+        " WHERE variant_id IS NULL ORDER BY row_no"
+    )).all()
+    cols = ", ".join(f"v.{f}, s.{f}" for f in VARIANT_UPDATE_FIELDS)
+    variant_rows = db.execute(text(
+        f"SELECT s.product_name, s.variant_name, {cols} FROM import_staging s"
+        f' JOIN variants v ON v."variantId" = s.variant_id ORDER BY s.row_no'
+    )).all()
+    variant_changes = []
+    for r in variant_rows:
+        fields = _changed((f, r[2 + 2 * i], r[3 + 2 * i]) for i, f in enumerate(VARIANT_UPDATE_FIELDS))
+        if fields:
+            variant_changes.append({"product": r[0], "variant": r[1], "action": "update", "fields": fields})
+
+    return {
+        "categories": {"create": len(categories), "names": categories[:REPORT_LIMIT]},
+        "products": {
+            "create": len(new_products),
+            "update": len(product_changes),
+            "unchanged": len(product_rows) - len(product_changes),
+            "changes": (
+                [{"product": name, "action": "create", "fields": {"category": {"from": None, "to": category}}}
+                 for name, category, _ in new_products] + product_changes
+            )[:REPORT_LIMIT],
+        },
+        "variants": {
+            "create": len(new_variants),
+            "update": len(variant_changes),
+            "unchanged": len(variant_rows) - len(variant_changes),
+            "changes": (
+                [{"product": p, "variant": v, "action": "create",
+                  "fields": {"price": {"from": None, "to": price}, "stock_quantity": {"from": None, "to": stock or 0}}}
+                 for p, v, price, stock in new_variants] + variant_changes
+            )[:REPORT_LIMIT],
+        },
+    }
+
+
+def _new_glass_product_errors(db: Session) -> List[dict]:
+    """glass_settings_error for every product the file would create — existing
+    products keep the tuning they have."""
+    rows = db.execute(text(
+        f"SELECT row_no, has_dimensions, min_usable_dimension, popular_size_ranges"
+        f" FROM ({_product_firsts_sql()}) s WHERE product_id IS NULL AND has_dimensions"
+    )).all()
+    errors = []
+    for row_no, has_dimensions, min_usable, ranges in rows:
+        message = glass_settings_error(bool(has_dimensions), min_usable, json.loads(ranges) if ranges else [])
+        if message:
+            errors.append({"row": row_no, "error": message})
+    return errors
+
+
+def _simple_product_variant_errors(db: Session) -> List[dict]:
+    """A product without variants (has_variants = false) keeps its own stock,
+    so a row that would add a variant to it is rejected — dropped from the
+    staging table and reported by row number."""
+    rows = db.execute(text(
+        "DELETE FROM import_staging s USING products p"
+        ' WHERE p."productId" = s.product_id AND NOT p.has_variants AND s.variant_id IS NULL'
+        " RETURNING s.row_no, s.product_name, s.variant_name"
+    )).all()
+    return [
+        {"row": row_no, "error": f"'{product}' is a simple product (no variants) — variant "
+                                 f"'{variant or '(no attributes)'}' can't be added by import"}
+        for row_no, product, variant in rows
+    ]
+
+
+# ── Apply ────────────────────────────────────────────────────────────────────
+
+def _apply(db: Session) -> None:
+    db.execute(text(
+        "INSERT INTO categories (name, type, sub_categories)"
+        " SELECT DISTINCT ON (category_type) category, category_type, '[]'"
+        " FROM import_staging WHERE category_id IS NULL ORDER BY category_type, row_no"
+    ))
+    db.execute(text(
+        'INSERT INTO products (name, "itemCode", category_id, sub_category, description, unit,'
+        " track_offcuts, alarm_quantity, has_variants, stock_quantity, applicable_attributes,"
+        " has_dimensions, min_usable_dimension, allow_rotation, popular_size_ranges, version)"
+        " SELECT s.product_name, s.item_code, c.\"categoryId\", s.sub_category, s.description,"
+        " COALESCE(s.unit, 'ft'), COALESCE(s.track_offcuts, false), 0, true, 0, COALESCE(a.keys, CAST('[]' AS json)),"
+        " COALESCE(s.has_dimensions, false), COALESCE(s.min_usable_dimension, 150.0),"
+        " COALESCE(s.allow_rotation, true), CAST(COALESCE(s.popular_size_ranges, '[]') AS json), 1"
+        f" FROM ({_product_firsts_sql()}) s"
+        f" LEFT JOIN ({_attribute_keys_sql()}) a ON a.product_name = s.product_name"
+        " JOIN LATERAL (SELECT \"categoryId\" FROM categories"
+        "  WHERE type = s.category_type OR lower(name) = lower(s.category)"
+        "  ORDER BY \"categoryId\" LIMIT 1) c ON true"
+        " WHERE s.product_id IS NULL"
+    ))
+    _resolve(db)  # ids of what was just created (their variants are all new: variant_id stays NULL)
+
+    # Existing products: the updatable fields, and any attribute names new to them appended
+    sets = ", ".join(f"{col} = COALESCE(s.{field}, p.{col})" for field, col in PRODUCT_UPDATE_FIELDS)
+    changed = " OR ".join(f"(s.{field} IS NOT NULL AND s.{field} IS DISTINCT FROM p.{col})"
+                          for field, col in PRODUCT_UPDATE_FIELDS)
+    db.execute(text(
+        f"UPDATE products p SET {sets},"
+        f" applicable_attributes = CASE WHEN a.keys IS NULL THEN p.applicable_attributes"
+        f"  ELSE CAST({_CURRENT_ATTRIBUTES} || a.keys AS json) END,"
+        f" version = p.version + 1"
+        f" FROM ({_product_firsts_sql()}) s LEFT JOIN ({_new_attribute_keys_sql()}) a ON a.product_id = s.product_id"
+        f' WHERE p."productId" = s.product_id AND ({changed} OR a.keys IS NOT NULL)'
+    ))
+
+    sets = ", ".join(f"{f} = COALESCE(s.{f}, v.{f})" for f in VARIANT_UPDATE_FIELDS)
+    changed = " OR ".join(f"(s.{f} IS NOT NULL AND s.{f} IS DISTINCT FROM v.{f})" for f in VARIANT_UPDATE_FIELDS)
+    db.execute(text(
+        f"UPDATE variants v SET {sets}, version = v.version + 1"
+        f' FROM import_staging s WHERE v."variantId" = s.variant_id AND ({changed})'
+    ))
+
+    # New variants, and their opening stock onto the product total (only ever
+    # a product with variants — see _simple_product_variant_errors)
+    db.execute(text(
+        "WITH ins AS ("
+        " INSERT INTO variants (product_id, name, attributes, stock_quantity, low_stock_threshold, price,"
+        "  price_half, price_unit, length, width, height, unit_quantity, version)"
+        " SELECT product_id, variant_name, CAST(attributes AS json), COALESCE(stock_quantity, 0), 10.0,"
+        "  COALESCE(price, 0), price_half, price_unit, length, width, height, unit_quantity, 1"
+        " FROM import_staging WHERE variant_id IS NULL"
+        " RETURNING product_id, stock_quantity)"
+        " UPDATE products p SET stock_quantity = p.stock_quantity + a.added, version = p.version + 1"
+        ' FROM (SELECT product_id, SUM(stock_quantity) AS added FROM ins GROUP BY product_id) a'
+        ' WHERE p."productId" = a.product_id'
+    ))
+
+
+# ── Public entry point ───────────────────────────────────────────────────────
+
+def import_catalog(
+    db: Session,
+    fileobj,
+    filename: str,
+    dry_run: bool = True,
+    skip_invalid: bool = False,
+    progress: Optional[Callable[[dict], Any]] = None,
+) -> dict:
+    """
+    Runs the import described in the module docstring on `db`'s transaction
+    and returns the report: {"dry_run", "applied", "rows": {"total", "valid",
+    "invalid"}, "errors", "categories", "products", "variants",
+    "duration_ms"}. Nothing is written when `dry_run` is set, or when any row
+    is invalid and `skip_invalid` isn't. `progress(event)` is called with
+    {"phase", "rows"} as the import moves along. 400 if the file itself
+    can't be read (format, encoding, missing columns).
+    """
+    started = time.perf_counter()
+    report = lambda phase, rows: progress and progress({"phase": phase, "rows": rows})  # noqa: E731
+
+    cursor = None
+    try:
+        db.execute(text(
+            "CREATE TEMP TABLE import_staging ("
+            + ", ".join(f"{name} {sql_type}" for name, sql_type in STAGING_COLUMNS)
+            + ", category_id integer, product_id integer, variant_id integer) ON COMMIT DROP"
+        ))
+        cursor = db.connection().connection.cursor()
+
+        errors: List[dict] = []
+        invalid_rows: set = set()
+        seen_variants: set = set()
+        chunk: List[dict] = []
+        total = staged = 0
+        for row_no, raw in read_rows(fileobj, filename):
+            total += 1
+            try:
+                row = parse_row(raw)
+            except (ValueError, ValidationError) as e:
+                errors.append({"row": row_no, "error": _error_message(e)})
+                continue
+            key = (row["product_name"], row["variant_name"])
+            if key in seen_variants:
+                errors.append({"row": row_no, "error": f"Duplicate variant '{row['variant_name'] or '(no attributes)'}' of '{row['product_name']}'"})
+                continue
+            seen_variants.add(key)
+            row["row_no"] = row_no
+            chunk.append(row)
+            if len(chunk) >= IMPORT_CHUNK_ROWS:
+                _copy_chunk(cursor, chunk)
+                staged += len(chunk)
+                chunk = []
+                report("staging", staged)
+        if chunk:
+            _copy_chunk(cursor, chunk)
+            staged += len(chunk)
+        report("staging", staged)
+
+        db.execute(text("ANALYZE import_staging"))
+        _resolve(db)
+        glass_errors = _new_glass_product_errors(db)
+        if glass_errors:
+            # A new glass product without its tuning can't be created at all:
+            # every one of its rows is dropped, and each counts as invalid
+            bad = [e["row"] for e in glass_errors]
+            dropped = db.execute(text(
+                "DELETE FROM import_staging WHERE product_name IN ("
+                " SELECT product_name FROM import_staging WHERE row_no = ANY(:rows))"
+                " RETURNING row_no"
+            ), {"rows": bad}).scalars().all()
+            invalid_rows.update(dropped)
+            errors.extend(glass_errors)
+        errors.extend(_simple_product_variant_errors(db))
+
+        report("diff", staged)
+        result = _diff(db)
+        errors.sort(key=lambda e: e["row"])
+        invalid_rows.update(e["row"] for e in errors)
+        invalid = len(invalid_rows)
+
+        apply = not dry_run and (not errors or skip_invalid)
+        if apply:
+            report("applying", staged)
+            _apply(db)
+            catalogService.note_catalog_change(db)
+            if result["categories"]["create"]:
+                referenceCache.invalidate(db, referenceCache.CATEGORIES)
+            db.commit()
+        else:
+            db.rollback()
+
+        result.update({
+            "dry_run": dry_run,
+            "applied": apply,
+            "rows": {"total": total, "valid": total - invalid, "invalid": invalid},
+            "errors": errors[:REPORT_LIMIT],
+            "duration_ms": round((time.perf_counter() - started) * 1000),
+        })
+        report("done", staged)
+        logger.info(
+            f"Catalog import {'applied' if apply else 'dry run' if dry_run else 'rejected'}: {total} rows, "
+            f"{invalid} invalid, +{result['products']['create']} products, +{result['variants']['create']} variants, "
+            f"{result['variants']['update']} variants updated in {result['duration_ms']} ms"
+        )
+        return result
+    except HTTPException:
+        db.rollback()
+        raise
+    except UnicodeDecodeError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="The CSV file must be UTF-8 encoded")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Catalog import failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Catalog import failed: {str(e)}")
+    finally:
+        if cursor is not None:
+            cursor.close()
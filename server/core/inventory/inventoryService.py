@@ -1,13 +1,17 @@
 from sqlmodel import Session, select
-from sqlalchemy.orm.attributes import flag_modified
-from typing import Optional
+from typing import Iterable, Optional, Tuple
 from entities.products import Product
 from entities.variants import Variant
 from entities.offcuts import Offcut
 from entities.orderItems import OrderItem
 from entities.orders import Order
-from core.inventory.glassOffcutService import resolve_glass_cut_lines, restore_glass_cut_lines
-from loggiing import logger
+from core.inventory import offcutEvents as offcut_events
+from core.inventory import stockConcurrency
+from core.inventory.stockConcurrency import for_update
+from core.inventory.glassOffcutService import resolve_glass_cut_lines, restore_glass_cut_lines, restore_glass_events
+from loggiing import RATE_LIMITED, logger
+from monitoring import metrics
+from monitoring.instrumentation import span
 
 
 def _pending_source_notice(db: Session, source_item_id: Optional[int]) -> Optional[dict]:
@@ -64,14 +68,9 @@ def deduct_stock_for_order_item(db: Session, item: OrderItem) -> None:
         if cuttable:
             item.cutting_completed = False
             item.cutting_completed_at = None
-        # Persist offcut_sources mutations back to the JSON column.
-        # flag_modified is required: the offcut lookups inside _process_line_items
-        # trigger a premature autoflush that INSERTs this item before offcut_sources
-        # is attached, then mutates the same lineItems list in place — so by the time
-        # this reassignment runs, old and new `details` are value-equal and SQLAlchemy
-        # skips the UPDATE unless explicitly told the attribute changed.
-        item.details = {**details, "lineItems": line_items}
-        flag_modified(item, "details")
+        # offcut_sources were attached to the lineItems in place. `details` is a
+        # mutation-tracked document (entities/jsonTypes.py), so that alone flags the
+        # column — even after the offcut lookups' autoflush already INSERTed the item.
         db.add(item)
     else:
         qty = float(details.get("quantity", 0))
@@ -140,7 +139,8 @@ def _process_line_items(
             if full_len <= 0:
                 logger.warning(
                     f"Product {product.productId} has no length set; "
-                    "deducting 1 whole unit per half sold."
+                    "deducting 1 whole unit per half sold.",
+                    extra=RATE_LIMITED,
                 )
                 _deduct_full_stock(db, product, variant, qty)
             elif track:
@@ -157,7 +157,8 @@ def _process_line_items(
 
             if cut_len <= 0:
                 logger.warning(
-                    f"Cut line item for product {product.productId} has no length; skipping deduction."
+                    f"Cut line item for product {product.productId} has no length; skipping deduction.",
+                    extra=RATE_LIMITED,
                 )
                 continue
 
@@ -180,7 +181,7 @@ def _process_line_items(
             _deduct_simple_stock(db, product, variant, qty)
 
         else:
-            logger.warning(f"Unknown line item type '{l_type}'; performing simple deduction.")
+            logger.warning(f"Unknown line item type '{l_type}'; performing simple deduction.", extra=RATE_LIMITED)
             _deduct_simple_stock(db, product, variant, qty)
 
     return cuttable
@@ -197,20 +198,20 @@ def check_line_items_feasible(
     via deduct_stock_for_order_item — against a shallow copy of line_items, to
     check whether they can be fulfilled from current stock/offcuts without
     committing anything. Mirrors how products/service.py's preview_glass_cuts
-    reuses glassOffcutService.resolve_glass_cut_lines: same real logic, always
-    rolled back in `finally`, so nothing is ever persisted by a dry run.
+    reuses glassOffcutService.resolve_glass_cut_lines: same real logic, run
+    inside stockConcurrency.dry_run — no row locks, always rolled back — so
+    nothing is ever persisted by a dry run.
 
     Returns {"ok": True, "message": None} if fulfillable, else
     {"ok": False, "message": <human-readable reason, from the ValueError>}.
     """
     trial_lines = [dict(line) for line in line_items]  # don't mutate caller's lineItems
-    try:
-        _process_line_items(db, product, variant, trial_lines)
-        return {"ok": True, "message": None}
-    except ValueError as e:
-        return {"ok": False, "message": str(e)}
-    finally:
-        db.rollback()  # dry run only — never persist
+    with stockConcurrency.dry_run(db):
+        try:
+            _process_line_items(db, product, variant, trial_lines)
+            return {"ok": True, "message": None}
+        except ValueError as e:
+            return {"ok": False, "message": str(e)}
 
 
 # ── Stock deduction primitives ────────────────────────────────────────────────
@@ -221,19 +222,78 @@ def _get_full_length(product: Product, variant: Optional[Variant] = None) -> flo
     return 0.0
 
 
-def _lock_variant(db: Session, variant: Variant) -> Variant:
-    """Re-fetch a variant with SELECT ... FOR UPDATE so concurrent deductions
-    against the same row block instead of racing (lost-update prevention)."""
-    return db.exec(
-        select(Variant).where(Variant.variantId == variant.variantId).with_for_update()
-    ).first()
-
-
-def _lock_product(db: Session, product: Product) -> Product:
-    """Re-fetch a product with SELECT ... FOR UPDATE — see _lock_variant."""
-    return db.exec(
-        select(Product).where(Product.productId == product.productId).with_for_update()
-    ).first()
+@span("stock_lock")
+def lock_stock_rows(
+    db: Session,
+    product_ids: Iterable[Optional[int]],
+    variant_ids: Iterable[Optional[int]] = (),
+) -> Tuple[dict, dict]:
+    """
+    Locks the variants and products an offcut-tracked (cutting) checkout, edit
+    or cancel is about to work on, up front and in one canonical order —
+    variants by id, then products by id — and returns ({productId: Product},
+    {variantId: Variant}).
+
+    Without it, create_order locked rows in whatever order its cart items (and
+    the per-line locks in the cutting paths) happened to reach them, so two
+    carts sharing products in a different order could each hold a row the
+    other was waiting for, and Postgres aborted one as a deadlock. With every
+    cutting transaction taking its whole set here first, the per-line locks
+    later on are re-acquisitions of rows already held. Single-row counts
+    (unit/roll lines, full bars) don't need it: they go through the
+    compare-and-swap ledger in stockConcurrency, which writes in this same
+    order at commit.
+
+    The ORDER BY sits under the row locking in the plan, so rows are locked in
+    that order; populate_existing refreshes rows this session had already loaded.
+    """
+    variants: dict = {}
+    ids = sorted({v for v in variant_ids if v})
+    if ids:
+        rows = db.exec(
+            for_update(db, select(Variant).where(Variant.variantId.in_(ids)).order_by(Variant.variantId))
+            .execution_options(populate_existing=True)
+        ).all()
+        variants = {v.variantId: v for v in rows}
+
+    products: dict = {}
+    ids = sorted({p for p in product_ids if p})
+    if ids:
+        rows = db.exec(
+            for_update(db, select(Product).where(Product.productId.in_(ids)).order_by(Product.productId))
+            .execution_options(populate_existing=True)
+        ).all()
+        products = {p.productId: p for p in rows}
+    return products, variants
+
+
+def load_stock_rows(
+    db: Session,
+    product_ids: Iterable[Optional[int]],
+    variant_ids: Iterable[Optional[int]] = (),
+) -> Tuple[dict, dict]:
+    """
+    Loads the products and variants a checkout/edit/cancel works on and
+    returns ({productId: Product}, {variantId: Variant}) — locking (through
+    lock_stock_rows) only the rows of offcut-tracked products, whose cutting
+    paths need them held. Everything else is read plainly: its stock goes
+    through the compare-and-swap ledger, so an accessory-only cart holds no
+    row locks until its commit.
+    """
+    product_ids = {p for p in product_ids if p}
+    variant_ids = {v for v in variant_ids if v}
+    products = {
+        p.productId: p for p in db.exec(select(Product).where(Product.productId.in_(product_ids))).all()
+    } if product_ids else {}
+    variants = {
+        v.variantId: v for v in db.exec(select(Variant).where(Variant.variantId.in_(variant_ids))).all()
+    } if variant_ids else {}
+
+    tracked = {pid for pid, p in products.items() if p.track_offcuts}
+    if tracked:
+        # Same identity-map objects, refreshed under the lock
+        lock_stock_rows(db, tracked, [vid for vid, v in variants.items() if v.product_id in tracked])
+    return products, variants
 
 
 def _deduct_full_stock(
@@ -242,30 +302,8 @@ def _deduct_full_stock(
     variant: Optional[Variant],
     qty: int,
 ) -> None:
-    """Deduct whole units. Locks the row first to prevent concurrent oversell,
-    validates stock, then syncs parent total when deducting a variant."""
-    if variant:
-        variant = _lock_variant(db, variant)
-        if variant.stock_quantity < qty:
-            raise ValueError(
-                f"Insufficient stock for '{variant.name or product.name}'. "
-                f"Available: {variant.stock_quantity}, requested: {qty}"
-            )
-        variant.stock_quantity -= qty
-        db.add(variant)
-        # Keep parent product total in sync
-        product = _lock_product(db, product)
-        product.stock_quantity = max(0, (product.stock_quantity or 0) - qty)
-        db.add(product)
-    else:
-        product = _lock_product(db, product)
-        if product.stock_quantity < qty:
-            raise ValueError(
-                f"Insufficient stock for '{product.name}'. "
-                f"Available: {product.stock_quantity}, requested: {qty}"
-            )
-        product.stock_quantity -= qty
-        db.add(product)
+    """Deduct whole units — same as _deduct_simple_stock."""
+    _deduct_simple_stock(db, product, variant, qty)
 
 
 def _deduct_simple_stock(
@@ -274,33 +312,23 @@ def _deduct_simple_stock(
     variant: Optional[Variant],
     qty: float,
 ) -> None:
-    """Deduct fractional or integer units. Locks the row first to prevent
-    concurrent oversell, validates stock, then syncs parent total."""
+    """Deduct fractional or integer units. Validates stock now and queues the
+    write, which lands at commit as a compare-and-swap on the row's version
+    (stockConcurrency) — no row lock is held in between. Syncs the parent
+    total when deducting a variant."""
     if variant:
-        variant = _lock_variant(db, variant)
-        if variant.stock_quantity < qty:
-            raise ValueError(
-                f"Insufficient stock for '{variant.name or product.name}'. "
-                f"Available: {variant.stock_quantity}, requested: {qty}"
-            )
-        variant.stock_quantity -= qty
-        db.add(variant)
-        product = _lock_product(db, product)
-        product.stock_quantity = max(0, (product.stock_quantity or 0) - qty)
-        db.add(product)
+        stockConcurrency.adjust(
+            db, variant, -qty, label=variant.name or product.name, require_available=True
+        )
+        # Keep parent product total in sync
+        stockConcurrency.adjust(db, product, -qty, clamp_at_zero=True)
     else:
-        product = _lock_product(db, product)
-        if product.stock_quantity < qty:
-            raise ValueError(
-                f"Insufficient stock for '{product.name}'. "
-                f"Available: {product.stock_quantity}, requested: {qty}"
-            )
-        product.stock_quantity -= qty
-        db.add(product)
+        stockConcurrency.adjust(db, product, -qty, label=product.name, require_available=True)
 
 
 # ── Offcut best-fit algorithm ─────────────────────────────────────────────────
 
+@span("offcut_best_fit")
 def _fulfill_one_cut_via_best_fit(
     db: Session,
     product: Product,
@@ -322,7 +350,8 @@ def _fulfill_one_cut_via_best_fit(
     tagged with it (Offcut.source_item_id), and if the offcut actually consumed
     was itself still awaiting cutting confirmation, the returned dict carries a
     `pending_source_notice` (advisory only — see the 2D equivalent in
-    glassOffcutService._apply_candidate).
+    glassOffcutService._apply_candidate). The source is also written to
+    offcut_events (offcutEvents.record_source) under `item_id`.
     """
     stmt = (
         select(Offcut)
@@ -333,8 +362,10 @@ def _fulfill_one_cut_via_best_fit(
             Offcut.quantity > 0,
         )
         .order_by(Offcut.length.asc())  # smallest fit first → least waste
-        .with_for_update()  # prevent two concurrent cuts from claiming the same offcut
     )
+    # Claim the offcut; one another transaction already holds (an edit or a
+    # correction mid-flight) is passed over instead of waited on
+    stmt = for_update(db, stmt, skip_locked=True)
     if variant:
         stmt = stmt.where(Offcut.variant_id == variant.variantId)
     else:
@@ -354,8 +385,11 @@ def _fulfill_one_cut_via_best_fit(
         else:
             db.add(best_offcut)
 
+        remainder_offcut_id = None
         if remainder > 0.01:
-            _upsert_offcut(db, product, variant, remainder, source_item_id=item_id)
+            remainder_offcut_id = _upsert_offcut(db, product, variant, remainder, source_item_id=item_id)
+            metrics.offcut_1d_remainder_length.inc(remainder)
+        metrics.offcut_1d_cuts.inc(source="offcut")
 
         result = {
             "source": "offcut",
@@ -366,22 +400,27 @@ def _fulfill_one_cut_via_best_fit(
         }
         if notice is not None:
             result["pending_source_notice"] = notice
+        _record_source(db, product, variant, item_id, result, remainder_offcut_id)
         return result
 
     # ── No offcut fits — fall back to consuming a whole bar ────────────────
     if full_length <= 0:
         logger.warning(
             f"Product {product.productId} has no full length; "
-            "deducting 1 whole without creating a remainder offcut."
+            "deducting 1 whole without creating a remainder offcut.",
+            extra=RATE_LIMITED,
         )
         _deduct_full_stock(db, product, variant, 1)
-        return {
+        metrics.offcut_1d_cuts.inc(source="full_bar")
+        result = {
             "source": "full_bar",
             "offcut_id": None,
             "offcut_length": 0,
             "length_used": required_length,
             "remainder_created": 0,
         }
+        _record_source(db, product, variant, item_id, result)
+        return result
 
     if required_length > full_length:
         raise ValueError(
@@ -391,16 +430,34 @@ def _fulfill_one_cut_via_best_fit(
 
     _deduct_full_stock(db, product, variant, 1)
     remainder = round(full_length - required_length, 4)
+    remainder_offcut_id = None
     if remainder > 0.01:
-        _upsert_offcut(db, product, variant, remainder, source_item_id=item_id)
+        remainder_offcut_id = _upsert_offcut(db, product, variant, remainder, source_item_id=item_id)
+        metrics.offcut_1d_remainder_length.inc(remainder)
+    metrics.offcut_1d_cuts.inc(source="full_bar")
 
-    return {
+    result = {
         "source": "full_bar",
         "offcut_id": None,
         "offcut_length": full_length,
         "length_used": required_length,
         "remainder_created": remainder if remainder > 0.01 else 0,
     }
+    _record_source(db, product, variant, item_id, result, remainder_offcut_id)
+    return result
+
+
+def _record_source(
+    db: Session,
+    product: Product,
+    variant: Optional[Variant],
+    item_id: Optional[int],
+    entry: dict,
+    remainder_offcut_id: Optional[int] = None,
+) -> None:
+    offcut_events.record_source(
+        db, product.productId, variant.variantId if variant else None, item_id, entry, remainder_offcut_id,
+    )
 
 
 def _process_cut_with_offcuts(
@@ -438,6 +495,10 @@ def restore_stock_for_order_item(db: Session, item: OrderItem) -> None:
     """
     Reverse the stock deduction for a single OrderItem so an order can be re-processed.
     Mirrors deduct_stock_for_order_item but adds stock back instead of removing it.
+
+    Offcut consumption is undone from the item's offcut_events rows (which are then
+    marked reversed); a cut line's JSON offcut_sources are only used for entries
+    that never got rows (see core/inventory/offcutEvents.py).
     """
     product = db.get(Product, item.product_id)
     if not product:
@@ -452,7 +513,7 @@ def restore_stock_for_order_item(db: Session, item: OrderItem) -> None:
     line_items = details.get("lineItems")
 
     if line_items and isinstance(line_items, list):
-        _restore_line_items(db, product, variant, line_items)
+        _restore_line_items(db, product, variant, line_items, offcut_events.item_events(db, item.item_id))
     else:
         qty = float(details.get("quantity", 0))
         if qty > 0:
@@ -461,22 +522,31 @@ def restore_stock_for_order_item(db: Session, item: OrderItem) -> None:
 
 def _restore_simple_stock(db, product, variant, qty: float) -> None:
     if variant:
-        variant.stock_quantity += qty
-        db.add(variant)
-        product.stock_quantity = (product.stock_quantity or 0) + qty
-        db.add(product)
-    else:
-        product.stock_quantity = (product.stock_quantity or 0) + qty
-        db.add(product)
+        stockConcurrency.adjust(db, variant, qty)
+    stockConcurrency.adjust(db, product, qty)
 
 
-def _restore_line_items(db, product, variant, line_items: list) -> None:
+def _restore_line_items(db, product, variant, line_items: list, events: Optional[list] = None) -> None:
     track = product.track_offcuts
     full_len = _get_full_length(product, variant)
 
+    events = events or []
+    recorded_groups = {e.group_id for e in events}
+    if track:
+        _restore_offcut_events(db, product, variant, [e for e in events if e.reversed_at is None])
+
+    def unrecorded(sources):
+        return [src for src in (sources or []) if src.get("group_id") not in recorded_groups]
+
+    def reversed_from_events(line) -> bool:
+        sources = line.get("offcut_sources")
+        return bool(track and sources and not unrecorded(sources))
+
     glass_cut_lines = [l for l in line_items if l.get("type", "") == "glass-cut" and int(l.get("qty", 0)) > 0]
     if glass_cut_lines and track:
-        restore_glass_cut_lines(db, product, variant, glass_cut_lines)
+        restore_glass_cut_lines(db, product, variant, [
+            {**line, "offcut_sources": unrecorded(line.get("offcut_sources"))} for line in glass_cut_lines
+        ])
 
     for line in line_items:
         l_type = line.get("type", "")
@@ -493,13 +563,16 @@ def _restore_line_items(db, product, variant, line_items: list) -> None:
         if "full" in l_type:
             _restore_simple_stock(db, product, variant, qty)
 
+        elif reversed_from_events(line):
+            continue  # every source of this cut line was reversed from offcut_events above
+
         elif "half" in l_type:
             if full_len <= 0 or not track:
                 _restore_simple_stock(db, product, variant, qty)
             else:
                 sources = line.get("offcut_sources")
                 if sources:
-                    restore_specific_offcut_sources(db, product, variant, sources)
+                    restore_specific_offcut_sources(db, product, variant, unrecorded(sources))
                 else:
                     for _ in range(qty):
                         _restore_simple_stock(db, product, variant, 1)
@@ -517,8 +590,9 @@ def _restore_line_items(db, product, variant, line_items: list) -> None:
             else:
                 sources = line.get("offcut_sources")
                 if sources:
-                    # Use the exact recorded sources — mirrors restore_specific_offcut_sources
-                    restore_specific_offcut_sources(db, product, variant, sources)
+                    # Use the exact recorded sources — only those without offcut_events
+                    # rows are left to replay from the JSON at this point
+                    restore_specific_offcut_sources(db, product, variant, unrecorded(sources))
                 else:
                     # No source record (legacy) — fall back to full-bar assumption
                     for _ in range(qty):
@@ -534,13 +608,48 @@ def _restore_line_items(db, product, variant, line_items: list) -> None:
             _restore_simple_stock(db, product, variant, qty)
 
 
+def _restore_offcut_events(db, product, variant, events: list) -> None:
+    """Reverses not-yet-reversed offcut_events rows in write order — the row-driven
+    equivalent of restore_specific_offcut_sources (1D) / restore_glass_cut_lines
+    (2D, delegated to glassOffcutService.restore_glass_events) — and marks them
+    reversed."""
+    if not events:
+        return
+    glass = [e for e in events if e.source == "sheet" or e.width is not None]
+    restore_glass_events(db, product, variant, glass)
+
+    for event in events:
+        if event.source == "sheet" or event.width is not None:
+            continue
+        if event.kind == "remainder":
+            _remove_offcut(db, product, variant, event.length)
+        elif event.source == "offcut":
+            existing = db.get(Offcut, event.source_offcut_id) if event.source_offcut_id else None
+            if existing:
+                existing.quantity += 1
+                db.add(existing)
+            else:
+                # Offcut was fully deleted — recreate it
+                db.add(Offcut(
+                    product_id=product.productId,
+                    variant_id=variant.variantId if variant else None,
+                    length=event.length or 0.0,
+                    quantity=1,
+                ))
+        else:
+            # Restore 1 whole bar to stock
+            _restore_simple_stock(db, product, variant, 1)
+
+    offcut_events.mark_reversed(db, events)
+
+
 def _remove_offcut(db, product, variant, length: float) -> None:
     """Decrement (or delete) an offcut that was previously created as a remainder."""
-    stmt = select(Offcut).where(
+    stmt = for_update(db, select(Offcut).where(
         Offcut.product_id == product.productId,
         Offcut.length >= length - 0.01,
         Offcut.length <= length + 0.01,
-    ).with_for_update()
+    ))
     if variant:
         stmt = stmt.where(Offcut.variant_id == variant.variantId)
     else:
@@ -616,11 +725,10 @@ def _consume_offcut_sources(
         oc_id = int(s["offcut_id"])
         length_used = float(s["length_used"])
 
-        # Lock the row to prevent concurrent use
+        # Lock the row to prevent concurrent use. Not SKIP LOCKED: the cashier
+        # picked this exact offcut, so wait for it rather than silently skip it.
         locked = db.exec(
-            select(Offcut)
-            .where(Offcut.offcutId == oc_id)
-            .with_for_update()
+            for_update(db, select(Offcut).where(Offcut.offcutId == oc_id))
         ).first()
 
         if not locked:
@@ -641,8 +749,9 @@ def _consume_offcut_sources(
         else:
             db.add(locked)
 
+        remainder_offcut_id = None
         if remainder > 0.01:
-            _upsert_offcut(db, product, variant, remainder, source_item_id=item_id)
+            remainder_offcut_id = _upsert_offcut(db, product, variant, remainder, source_item_id=item_id)
 
         entry = {
             "source": "offcut",
@@ -653,6 +762,7 @@ def _consume_offcut_sources(
         }
         if notice is not None:
             entry["pending_source_notice"] = notice
+        _record_source(db, product, variant, item_id, entry, remainder_offcut_id)
         result.append(entry)
 
     return result
@@ -701,20 +811,21 @@ def _upsert_offcut(
     variant: Optional[Variant],
     length: float,
     source_item_id: Optional[int] = None,
-) -> None:
+) -> int:
     """
     Create a new offcut record or increment the quantity if one of the
-    same length (±1mm tolerance) already exists.
+    same length (±1mm tolerance) already exists. Returns the row's id (recorded
+    as the remainder's produced_offcut_id in offcut_events).
 
     `source_item_id` tags which OrderItem's cutting job produced this remainder
     (see the 2D equivalent, glassOffcutService._upsert_glass_offcut, for the full
     merge-policy rationale — overwritten on merge only when a real id is given).
     """
-    stmt = select(Offcut).where(
+    stmt = for_update(db, select(Offcut).where(
         Offcut.product_id == product.productId,
         Offcut.length >= length - 0.001,
         Offcut.length <= length + 0.001,
-    ).with_for_update()
+    ))
     if variant:
         stmt = stmt.where(Offcut.variant_id == variant.variantId)
     else:
@@ -726,11 +837,14 @@ def _upsert_offcut(
         if source_item_id is not None:
             existing.source_item_id = source_item_id
         db.add(existing)
-    else:
-        db.add(Offcut(
-            product_id=product.productId,
-            variant_id=variant.variantId if variant else None,
-            length=length,
-            quantity=1,
-            source_item_id=source_item_id,
-        ))
+        return existing.offcutId
+    new_offcut = Offcut(
+        product_id=product.productId,
+        variant_id=variant.variantId if variant else None,
+        length=length,
+        quantity=1,
+        source_item_id=source_item_id,
+    )
+    db.add(new_offcut)
+    db.flush()
+    return new_offcut.offcutId
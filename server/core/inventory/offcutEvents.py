@@ -0,0 +1,151 @@
+"""
+Relational log of offcut consumption — the offcut_events table (see
+entities/offcutEvents.py for the row shapes).
+
+Every cut's provenance used to live only in OrderItem.details["lineItems"][i]
+["offcut_sources"] JSON, so "which orders consumed offcut 812" or "scrap produced
+this month per variant" meant loading and walking every order item in Python.
+Now the cut engines — glassOffcutService._apply_candidate for 2D, and
+inventoryService._fulfill_one_cut_via_best_fit / _consume_offcut_sources for 1D —
+call record_source() with the exact offcut_sources entry they return, in the same
+transaction as the stock/offcut mutation. A strategy trial rolled back to its
+savepoint, or a dry run rolled back entirely, takes its rows with it.
+
+The JSON entries are still written (receipts, cutting instructions and the cut
+preview render them) and carry the rows' group_id, which is how the correction
+path finds an event's rows. Restore (inventoryService.restore_stock_for_order_item)
+and correction (glassOffcutService.correct_glass_offcut_event) read the rows and
+mark what they undo as reversed; JSON entries with no rows (orders from before
+this table, if migrate_add_offcut_events.py hasn't backfilled them yet) still fall
+back to the old JSON-driven restore.
+"""
+
+import uuid
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from sqlmodel import Session, select
+
+from entities.offcutEvents import OffcutEvent
+
+REMAINDER_MIN_LENGTH = 0.01  # same threshold the 1D engine uses for creating a remainder
+
+
+def new_group_id() -> str:
+    return uuid.uuid4().hex
+
+
+def record_source(
+    db: Session,
+    product_id: int,
+    variant_id: Optional[int],
+    item_id: Optional[int],
+    entry: dict,
+    remainder_offcut_id: Optional[int] = None,
+    created_at: Optional[datetime] = None,
+    reversed_at: Optional[datetime] = None,
+) -> str:
+    """
+    Adds the rows for one offcut_sources entry — a 2D event (has "cuts") or a 1D
+    source dict — and stamps its group_id onto `entry` (reusing one already there,
+    which is how the shared 2D events of one physical source end up in one group).
+    `remainder_offcut_id` is the offcut row a 1D remainder went into; 2D events
+    already carry theirs per remainder. created_at/reversed_at are for the backfill.
+    """
+    group_id = entry.get("group_id") or new_group_id()
+    entry["group_id"] = group_id
+    source = entry.get("source") or "full_bar"
+    common = {
+        "group_id": group_id, "item_id": item_id, "product_id": product_id, "variant_id": variant_id,
+        "source": source, "created_at": created_at or datetime.utcnow(), "reversed_at": reversed_at,
+    }
+    source_offcut_id = entry.get("offcut_id") if source == "offcut" else None
+
+    if "cuts" in entry:
+        owns = entry.get("owns_consumption", True)
+        db.add(OffcutEvent(
+            kind="consume", source_offcut_id=source_offcut_id,
+            width=entry.get("offcut_width"), height=entry.get("offcut_height"),
+            pieces=len(entry.get("cuts") or []), owns_consumption=owns, **common,
+        ))
+        if owns:
+            _add_remainders(db, common, entry.get("remainders_created") or [])
+    else:
+        db.add(OffcutEvent(
+            kind="consume", source_offcut_id=source_offcut_id,
+            length=entry.get("offcut_length") or None, length_used=entry.get("length_used"), **common,
+        ))
+        remainder = float(entry.get("remainder_created") or 0)
+        if remainder > REMAINDER_MIN_LENGTH:
+            db.add(OffcutEvent(
+                kind="remainder", produced_offcut_id=remainder_offcut_id,
+                length=remainder, status="available", **common,
+            ))
+    return group_id
+
+
+def record_remainders(
+    db: Session,
+    group_id: str,
+    product_id: int,
+    variant_id: Optional[int],
+    item_id: Optional[int],
+    source: str,
+    remainders: Iterable[dict],
+) -> None:
+    """Adds 2D remainder rows ({"width", "height", "status", "offcut_id"}) to an
+    existing group — the correction path's replacement for what it reversed."""
+    common = {
+        "group_id": group_id, "item_id": item_id, "product_id": product_id, "variant_id": variant_id,
+        "source": source, "created_at": datetime.utcnow(), "reversed_at": None,
+    }
+    _add_remainders(db, common, remainders)
+
+
+def _add_remainders(db: Session, common: dict, remainders: Iterable[dict]) -> None:
+    for r in remainders:
+        db.add(OffcutEvent(
+            kind="remainder", produced_offcut_id=r.get("offcut_id"),
+            width=r.get("width"), height=r.get("height"), status=r.get("status", "available"),
+            **common,
+        ))
+
+
+# ── Reads ────────────────────────────────────────────────────────────────────
+
+def item_events(db: Session, item_id: Optional[int]) -> List[OffcutEvent]:
+    """Every row recorded for an order item — reversed ones included — in the
+    order they were written (a source before its remainders)."""
+    if item_id is None:
+        return []
+    return list(db.exec(
+        select(OffcutEvent).where(OffcutEvent.item_id == item_id).order_by(OffcutEvent.eventId)
+    ).all())
+
+
+def group_exists(db: Session, group_id: Optional[str]) -> bool:
+    if not group_id:
+        return False
+    return db.exec(select(OffcutEvent.eventId).where(OffcutEvent.group_id == group_id).limit(1)).first() is not None
+
+
+def group_remainders(db: Session, group_id: Optional[str]) -> List[OffcutEvent]:
+    """The not-yet-reversed remainder rows of one consumption."""
+    if not group_id:
+        return []
+    return list(db.exec(
+        select(OffcutEvent)
+        .where(
+            OffcutEvent.group_id == group_id,
+            OffcutEvent.kind == "remainder",
+            OffcutEvent.reversed_at == None,  # noqa: E711
+        )
+        .order_by(OffcutEvent.eventId)
+    ).all())
+
+
+def mark_reversed(db: Session, events: Iterable[OffcutEvent]) -> None:
+    now = datetime.utcnow()
+    for event in events:
+        event.reversed_at = now
+        db.add(event)
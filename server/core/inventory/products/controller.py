@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, Query, BackgroundTasks, Header, Response, UploadFile, File
 from typing import List, Optional
+import time
+import uuid
+import anyio
 from sqlmodel import Session
 from db.database import get_session
 from core.userManagement.authService import get_current_user
 from ws.manager import manager
+from core.inventory import availabilityService, catalogService, importService, searchService
+from fastJson import FastJSONResponse
 from . import model, service
 
 router = APIRouter(prefix="/products", tags=["Products"])
@@ -31,7 +36,53 @@ def get_products(
     category_id: Optional[int] = None,
     db: Session = Depends(get_session)
 ):
-    return service.getAllProducts(skip, limit, search, category_id, db)
+    return FastJSONResponse(service.getAllProducts(skip, limit, search, category_id, db))
+
+def _conditional(etag: str, body: bytes, if_none_match: Optional[str]) -> Response:
+    # no-cache = "store it, but revalidate every time": the browser sends
+    # If-None-Match on its own and hands the cached body to the app on a 304.
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if catalogService.etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/search", response_model=model.ProductSearchResponse)
+def search_products(
+    q: str = Query("", description="Name, item code or variant words; prefixes match"),
+    limit: int = Query(20, ge=1, le=searchService.MAX_LIMIT),
+    category_id: Optional[int] = None,
+    db: Session = Depends(get_session),
+):
+    """
+    Ranked POS type-ahead (core/inventory/searchService.py): an in-memory
+    prefix index first, pg_trgm similarity behind it for typos and infixes.
+    Compact hits — the full product is in the catalog snapshot.
+    """
+    return FastJSONResponse(searchService.search(db, q, limit, category_id))
+
+@router.get("/catalog", response_model=model.CatalogSnapshotResponse)
+def get_catalog_snapshot(
+    db: Session = Depends(get_session),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Full catalog (products + variants + categories) in one payload, cached per
+    catalog version and served with a strong ETag — an unchanged refetch is a
+    304 with no body. See core/inventory/catalogService.py.
+    """
+    etag, body = catalogService.get_snapshot(db)
+    return _conditional(etag, body, if_none_match)
+
+@router.get("/stock-levels", response_model=model.StockLevelsResponse)
+def get_stock_levels(
+    db: Session = Depends(get_session),
+    if_none_match: Optional[str] = Header(None),
+):
+    """Stock quantities only — what a sale changes. Clients refetch the full
+    catalog only when `boot_id` or `structure_version` differs from their
+    snapshot's."""
+    etag, body = catalogService.get_stock_levels(db)
+    return _conditional(etag, body, if_none_match)
 
 @router.get("/categories", response_model=List[model.CategoryResponse])
 def get_categories(
@@ -130,6 +181,63 @@ async def update_product_stock(
     return result
 
 
+@router.post("/restock", response_model=model.RestockBatchResponse)
+def restock_batch(
+    payload: model.RestockBatchRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_session),
+    current_user = Depends(get_current_user)
+):
+    """
+    Many variant/product stock adjustments (a supplier delivery) in one
+    transaction, one history insert and one products_updated broadcast.
+    Per-line results; `mode` chooses whether a bad line sinks the batch
+    ("atomic", default) or is just reported ("partial").
+    """
+    result = service.restock_batch(payload, db, current_user)
+    if result["applied"]:
+        background_tasks.add_task(manager.broadcast, "products_updated")
+    return result
+
+
+@router.post("/import", response_model=model.ImportReport)
+def import_catalog(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(..., description="CSV or XLSX, one row per variant"),
+    dry_run: bool = Query(True, description="Only report what would change"),
+    skip_invalid: bool = Query(False, description="Apply the valid rows even if some are invalid"),
+    db: Session = Depends(get_session),
+    current_user = Depends(get_current_user)
+):
+    """
+    Bulk catalog import (core/inventory/importService.py). Dry run by default:
+    the response is the diff — categories, products and variants to create or
+    update, field by field — plus every invalid row; rerun with dry_run=false
+    to apply it. Progress goes to the uploader over the WebSocket as
+    `import_progress` events tagged with the returned `import_id`.
+    """
+    import_id = uuid.uuid4().hex
+    user_ids = [str(current_user.userId)]
+    last_sent = [0.0]
+
+    def progress(event: dict):
+        # A sync endpoint runs in the threadpool; hop back to the event loop
+        # for the send, at most a few times a second
+        now = time.monotonic()
+        if event["phase"] == "staging" and now - last_sent[0] < 0.25:
+            return
+        last_sent[0] = now
+        try:
+            anyio.from_thread.run(manager.send_to_users, user_ids, "import_progress", {"import_id": import_id, **event})
+        except Exception:
+            pass  # progress is best effort
+
+    result = importService.import_catalog(db, file.file, file.filename or "", dry_run, skip_invalid, progress)
+    if result["applied"]:
+        background_tasks.add_task(manager.broadcast, "products_updated")
+    return {"import_id": import_id, **result}
+
+
 @router.get("/restock-history", response_model=list[model.RestockHistoryItem])
 def get_restock_history(
     skip: int = 0,
@@ -198,6 +306,22 @@ def check_cut_feasibility(
     """
     return service.check_cut_feasibility(product_id, payload.line_items, db, payload.variant_id)
 
+@router.post("/availability", response_model=model.CartAvailabilityResponse)
+def check_cart_availability(
+    payload: model.CartAvailabilityRequest,
+    db: Session = Depends(get_session),
+    current_user = Depends(get_current_user)
+):
+    """
+    Availability of a whole cart in one round-trip — every line's ok/reason,
+    with lines on the same stock row competing for it as they will at
+    checkout. Replaces calling GET /{product_id}/availability per line; see
+    core/inventory/availabilityService.py for what is exact and what is a
+    lower bound.
+    """
+    items = [item.model_dump() for item in payload.items]
+    return availabilityService.check_cart(db, items)
+
 @router.get("/{product_id}/availability", response_model=model.StockAvailabilityResponse)
 def check_availability(
     product_id: int,
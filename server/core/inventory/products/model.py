@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
 
 class RestockHistoryItem(BaseModel):
@@ -144,14 +144,172 @@ class ProductResponse(BaseModel):
 
     # Computed or Relation
     variants: List[VariantResponse] = []
-    
+
+
+class CatalogSnapshotResponse(BaseModel):
+    """GET /products/catalog — see core/inventory/catalogService.py."""
+    boot_id: str            # the versions below restart from 0 with the server
+    structure_version: int
+    stock_version: int
+    categories: List[CategoryResponse]
+    products: List[ProductResponse]
+
+class ProductStockLevel(BaseModel):
+    productId: int
+    stock_quantity: int
+
+class VariantStockLevel(BaseModel):
+    variantId: int
+    product_id: int
+    stock_quantity: float
+
+class StockLevelsResponse(BaseModel):
+    """GET /products/stock-levels — the part of the catalog that changes per sale."""
+    boot_id: str
+    structure_version: int
+    stock_version: int
+    products: List[ProductStockLevel]
+    variants: List[VariantStockLevel]
+
 
 class StockAvailabilityResponse(BaseModel):
     message: str
 
+
+class CartAvailabilityItem(BaseModel):
+    """One cart line, in the shape POST /orders/ takes (prices aren't needed)."""
+    productId: int
+    variantId: Optional[int] = None
+    quantity: float = 0
+    details: Optional[Dict[str, Any]] = None
+
+
+class CartAvailabilityRequest(BaseModel):
+    items: List[CartAvailabilityItem]
+
+
+class CartLineAvailability(BaseModel):
+    index: int
+    productId: int
+    variantId: Optional[int] = None
+    ok: bool
+    # False for cut lines on offcut-tracked products: `requested` is a lower
+    # bound on fresh bars/sheets, and /cut-feasibility has the final word
+    exact: bool
+    requested: float
+    available: float
+    reason: Optional[str] = None
+
+
+class CartAvailabilityResponse(BaseModel):
+    """POST /products/availability — see core/inventory/availabilityService.py."""
+    ok: bool
+    stock_version: int
+    lines: List[CartLineAvailability]
+
 class StockQuantityUpdateRequest(BaseModel):
     stock: int
 
+
+class RestockLine(BaseModel):
+    """One adjustment: a variant, or a simple (non-variant) product."""
+    variant_id: Optional[int] = None
+    product_id: Optional[int] = None
+    stock_change: int
+
+
+class RestockBatchRequest(BaseModel):
+    lines: List[RestockLine]
+    # "atomic": any failed line rolls the whole batch back (the others come
+    # back "skipped"); "partial": valid lines are applied, failed ones reported
+    mode: Literal["atomic", "partial"] = "atomic"
+
+
+class RestockLineResult(BaseModel):
+    index: int
+    variant_id: Optional[int] = None
+    product_id: Optional[int] = None
+    status: str  # "applied" | "failed" | "skipped"
+    stock_before: Optional[float] = None
+    stock_after: Optional[float] = None
+    error: Optional[str] = None
+
+
+class RestockBatchResponse(BaseModel):
+    mode: str
+    applied: int
+    failed: int
+    lines: List[RestockLineResult]
+
+
+class SearchVariantHit(BaseModel):
+    variantId: int
+    name: Optional[str] = None
+    price: Optional[float] = None
+    stock_quantity: float
+
+
+class ProductSearchHit(BaseModel):
+    productId: int
+    name: str
+    itemCode: Optional[str] = None
+    category_id: int
+    unit: Optional[str] = None
+    stock_quantity: float
+    price_from: Optional[float] = None  # cheapest variant
+    variant_count: int
+    variants: List[SearchVariantHit]  # the matched variants, or all when the product matched
+    score: float
+    match: str  # "prefix" | "fuzzy"
+
+
+class ProductSearchResponse(BaseModel):
+    query: str
+    structure_version: int
+    results: List[ProductSearchHit]
+
+
+class ImportRowCounts(BaseModel):
+    total: int
+    valid: int
+    invalid: int
+
+
+class ImportRowError(BaseModel):
+    row: int  # spreadsheet row number (the header is row 1)
+    error: str
+
+
+class ImportChange(BaseModel):
+    product: str
+    variant: Optional[str] = None
+    action: str  # "create" | "update"
+    fields: Dict[str, Dict[str, Any]]  # field -> {"from", "to"}
+
+
+class ImportCategoryDiff(BaseModel):
+    create: int
+    names: List[str]
+
+
+class ImportEntityDiff(BaseModel):
+    create: int
+    update: int
+    unchanged: int
+    changes: List[ImportChange]
+
+
+class ImportReport(BaseModel):
+    import_id: str  # tags this run's import_progress WebSocket events
+    dry_run: bool
+    applied: bool
+    rows: ImportRowCounts
+    errors: List[ImportRowError]
+    categories: ImportCategoryDiff
+    products: ImportEntityDiff
+    variants: ImportEntityDiff
+    duration_ms: int
+
 class OffcutResponse(BaseModel):
     offcutId: int
     product_id: int
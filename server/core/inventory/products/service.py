@@ -1,3 +1,5 @@
+import re
+
 from fastapi import Depends, HTTPException, status
 from sqlmodel import Session, select, col, or_
 from typing import List, Optional, Dict, Any
@@ -6,10 +8,38 @@ from entities.variants import Variant
 from . import model
 from db.database import get_session
 from core.userManagement.authService import get_current_user
+from core import referenceCache
+from db.retry import retry_reason, run_with_retry
 from loggiing import logger
 from utils import require_role
 
 
+# ── Shared validation (also used by core/inventory/importService.py) ─────────
+
+def variant_name(attributes: Dict[str, Any]) -> str:
+    """A variant's name is its attribute values joined in order — it is how
+    variants are told apart within a product."""
+    return " - ".join(str(v) for v in attributes.values())
+
+
+def category_slug(name: str) -> str:
+    """Category.type — the slugified name the frontend keys categories by."""
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+def glass_settings_error(has_dimensions: bool, min_usable_dimension: Optional[float], popular_size_ranges: list) -> Optional[str]:
+    """Glass (2D) products must have their offcut-tuning CEO inputs set at
+    creation time — glassOffcutService's tiering can't make sensible
+    decisions with an unset scrap threshold or no popular-size guidance."""
+    if not has_dimensions:
+        return None
+    if min_usable_dimension is None:
+        return "min_usable_dimension is required for a glass (has_dimensions) product"
+    if not popular_size_ranges:
+        return "At least one popular_size_ranges entry is required for a glass (has_dimensions) product"
+    return None
+
+
 def create_product(
     product_data: model.ProductCreate, 
     db: Session = Depends(get_session), 
@@ -39,14 +69,12 @@ def create_product(
             raise HTTPException(status_code=400, detail="Product must have at least one variant")
         initial_stock = sum(v.stock_quantity for v in product_data.variants)
 
-        # 2b. Glass (2D) products must have their offcut-tuning CEO inputs set at
-        # creation time — glassOffcutService's tiering can't make sensible
-        # decisions with an unset scrap threshold or no popular-size guidance.
-        if product_data.has_dimensions:
-            if product_data.min_usable_dimension is None:
-                raise HTTPException(status_code=400, detail="min_usable_dimension is required for a glass (has_dimensions) product")
-            if not product_data.popular_size_ranges:
-                raise HTTPException(status_code=400, detail="At least one popular_size_ranges entry is required for a glass (has_dimensions) product")
+        # 2b. Glass (2D) products need their offcut-tuning inputs up front
+        glass_error = glass_settings_error(
+            product_data.has_dimensions, product_data.min_usable_dimension, product_data.popular_size_ranges
+        )
+        if glass_error:
+            raise HTTPException(status_code=400, detail=glass_error)
 
         # 3. Create Product Entity
         new_product = Product(
@@ -78,7 +106,7 @@ def create_product(
         # 4. Create Variants
         for v_data in product_data.variants:
             # Generate Name
-            v_name = " - ".join(str(v) for v in v_data.attributes.values())
+            v_name = variant_name(v_data.attributes)
 
             new_variant = Variant(
                 product_id=new_product.productId,
@@ -107,30 +135,112 @@ def create_product(
         logger.error(f"Create Product Error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+# ── Fast list path ──────────────────────────────────────────────────────────
+# GET /products/ returns every product with its variants. Building a
+# ProductResponse (plus one VariantResponse per variant) per row and encoding
+# through the default JSON path dominated the request, so the list is built
+# from plain column rows — products, then ONE query for their variants — as
+# dicts shaped exactly like model.ProductResponse and encoded with fastJson by
+# the controller (response_model, and so the OpenAPI schema, is unchanged).
+_PRODUCT_LIST_COLUMNS = (
+    Product.productId, Product.name, Product.itemCode, Product.category_id, Product.sub_category,
+    Product.description, Product.image_url, Product.has_variants, Product.stock_quantity,
+    Product.track_offcuts, Product.unit, Product.applicable_attributes, Product.has_dimensions,
+    Product.min_usable_dimension, Product.allow_rotation, Product.popular_size_ranges,
+)
+_VARIANT_LIST_COLUMNS = (
+    Variant.variantId, Variant.product_id, Variant.name, Variant.attributes, Variant.stock_quantity,
+    Variant.price, Variant.price_half, Variant.price_unit, Variant.length, Variant.width,
+    Variant.height, Variant.unit_quantity,
+)
+
+
+def _opt_float(value) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+def _variant_dict(v) -> dict:
+    return {
+        "variantId": v.variantId,
+        "name": v.name,
+        "attributes": v.attributes or {},
+        "stock_quantity": float(v.stock_quantity),
+        "price": float(v.price),
+        "price_half": _opt_float(v.price_half),
+        "price_unit": _opt_float(v.price_unit),
+        "length": _opt_float(v.length),
+        "width": _opt_float(v.width),
+        "height": _opt_float(v.height),
+        "unit_quantity": _opt_float(v.unit_quantity),
+    }
+
+
+def _product_dict(p, variants: list) -> dict:
+    return {
+        "productId": p.productId,
+        "name": p.name,
+        "itemCode": p.itemCode,
+        "category_id": p.category_id,
+        "sub_category": p.sub_category,
+        "description": p.description,
+        "image_url": p.image_url,
+        "has_variants": p.has_variants,
+        "stock_quantity": int(p.stock_quantity),
+        "track_offcuts": p.track_offcuts,
+        "unit": p.unit,
+        "applicable_attributes": p.applicable_attributes or [],
+        "has_dimensions": p.has_dimensions,
+        "min_usable_dimension": _opt_float(p.min_usable_dimension),
+        "allow_rotation": p.allow_rotation,
+        "popular_size_ranges": [
+            {key: float(r[key]) for key in ("min_w", "max_w", "min_h", "max_h")}
+            for r in (p.popular_size_ranges or [])
+        ],
+        "variants": variants,
+    }
+
+
 def getAllProducts(
     skip: int = 0, 
     limit: int = 100, 
     search: Optional[str] = None,
     category_id: Optional[int] = None,
     db: Session = Depends(get_session)
-) -> List[Product]: # Return Entity list, let FastAPI serialization handle Pydantic conversion
+) -> List[dict]:
+    """ProductResponse-shaped dicts (see "Fast list path" above)."""
     try:
-        query = select(Product).offset(skip).limit(limit)
+        query = select(*_PRODUCT_LIST_COLUMNS).order_by(Product.productId).offset(skip).limit(limit)
         
         if search:
+            # Each ILIKE is served by a trigram index (migrate_add_product_search.py);
+            # ranked type-ahead is GET /products/search
+            pattern = f"%{search}%"
             query = query.where(
                 or_(
-                    col(Product.name).ilike(f"%{search}%")
+                    col(Product.name).ilike(pattern),
+                    col(Product.itemCode).ilike(pattern),
+                    col(Product.productId).in_(
+                        select(Variant.product_id).where(col(Variant.name).ilike(pattern))
+                    ),
                 )
             )
             
         if category_id:
             query = query.where(Product.category_id == category_id)
 
-        # Ensure eager loading if needed, though SQLModel usually handles relationships lazy unless specified
-        # For now simple select is strictly strictly fine
         products = db.exec(query).all()
-        return products
+
+        variants_by_product: Dict[int, list] = {p.productId: [] for p in products}
+        if variants_by_product:
+            variant_rows = db.exec(
+                select(*_VARIANT_LIST_COLUMNS)
+                .where(Variant.product_id.in_(variants_by_product))
+                .order_by(Variant.variantId)
+            ).all()
+            for v in variant_rows:
+                variants_by_product[v.product_id].append(_variant_dict(v))
+
+        return [_product_dict(p, variants_by_product[p.productId]) for p in products]
     except Exception as e:
         logger.error(f"Get Products Error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch products")
@@ -182,7 +292,7 @@ def remove_product(product_id: int, db: Session = Depends(get_session), current_
 def add_variant(product_id: int, variant_data: model.VariantCreate, db: Session = Depends(get_session)):
     try:
         # 1. Generate Name (Strict)
-        final_name = " - ".join(str(v) for v in variant_data.attributes.values())
+        final_name = variant_name(variant_data.attributes)
 
         # 2. Create Variant
         variant = Variant(
@@ -229,7 +339,7 @@ def add_variants_bulk(product_id: int, variants_data: List[model.VariantCreate],
         created = []
         total_stock = 0.0
         for variant_data in variants_data:
-            final_name = " - ".join(str(v) for v in variant_data.attributes.values())
+            final_name = variant_name(variant_data.attributes)
             variant = Variant(
                 product_id=product_id,
                 name=final_name,
@@ -341,9 +451,7 @@ def update_variant(variant_id: int, update_data: model.VariantUpdate, db: Sessio
 
 def create_category(category_data: model.CategoryCreate, db: Session = Depends(get_session)) -> Category:
     try:
-        # Generate slugified type
-        import re
-        slug = re.sub(r'[^a-z0-9]+', '-', category_data.name.lower()).strip('-')
+        slug = category_slug(category_data.name)
         
         # Check if type exists
         existing = db.exec(select(Category).where(Category.type == slug)).first()
@@ -352,6 +460,7 @@ def create_category(category_data: model.CategoryCreate, db: Session = Depends(g
 
         new_cat = Category(name=category_data.name, type=slug)
         db.add(new_cat)
+        referenceCache.invalidate(db, referenceCache.CATEGORIES)
         db.commit()
         db.refresh(new_cat)
         return new_cat
@@ -361,7 +470,10 @@ def create_category(category_data: model.CategoryCreate, db: Session = Depends(g
         raise HTTPException(status_code=500, detail=str(e))
 
 def getAllCategories(db: Session = Depends(get_session)):
-    return db.exec(select(Category)).all()
+    """Served from the reference cache; create_category invalidates it."""
+    def load():
+        return [model.CategoryResponse.model_validate(c, from_attributes=True) for c in db.exec(select(Category)).all()]
+    return referenceCache.get(referenceCache.CATEGORIES, "all", load)
 
 # --- STOCK ---
 
@@ -414,6 +526,132 @@ def update_simple_product_stock(product_id: int, stock_change: int, db: Session,
         logger.error(f"Update Stock Error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+def restock_batch(payload: "model.RestockBatchRequest", db: Session, current_user=None) -> dict:
+    """
+    Applies many restock/adjustment lines — a supplier delivery — in ONE
+    transaction, instead of one request, commit, history row and broadcast per
+    line (update_variant / update_simple_product_stock).
+
+    Every row involved is locked up front in inventoryService.lock_stock_rows'
+    canonical order (variants, then products, by id), the same order checkouts
+    lock in, so a batch and a sale can't deadlock. Lines are applied in order
+    against the locked rows — two lines for one variant see each other — and
+    validated the way the single-line endpoints validate. The history rows go
+    in with one multi-row INSERT, and the caller (controller) broadcasts one
+    products_updated for the whole batch.
+
+    payload.mode picks what a failed line means: "atomic" rolls everything back
+    (the valid lines are reported "skipped"), "partial" commits the valid lines
+    and reports the failed ones. Replayed on deadlock/serialization failure
+    (db/retry.py).
+    """
+    return run_with_retry(db, lambda: _restock_batch_once(payload, db, current_user), "restock_batch")
+
+
+def _restock_line(line: "model.RestockLine", products: dict, variants: dict) -> tuple:
+    """(row, product, variant) for one line; ValueError if it can't be applied."""
+    if line.stock_change == 0:
+        raise ValueError("stock_change is 0")
+    if line.variant_id:
+        variant = variants.get(line.variant_id)
+        if variant is None:
+            raise ValueError("Variant not found")
+        if line.product_id and line.product_id != variant.product_id:
+            raise ValueError(f"Variant {line.variant_id} does not belong to product {line.product_id}")
+        product = products.get(variant.product_id)
+        row = variant
+    elif line.product_id:
+        product = products.get(line.product_id)
+        if product is None:
+            raise ValueError("Product not found")
+        if product.has_variants:
+            raise ValueError("Use variant lines to update stock for variable products")
+        variant = None
+        row = product
+    else:
+        raise ValueError("Each line needs a variant_id or a product_id")
+    if (row.stock_quantity or 0) + line.stock_change < 0:
+        raise ValueError(f"Insufficient stock. Current: {row.stock_quantity}")
+    return row, product, variant
+
+
+def _restock_batch_once(payload: "model.RestockBatchRequest", db: Session, current_user) -> dict:
+    from entities.editHistory import EditHistory
+    from uuid import UUID
+    from sqlalchemy import insert
+    from core.inventory.inventoryService import lock_stock_rows
+
+    try:
+        lines = payload.lines
+        variant_ids = {l.variant_id for l in lines if l.variant_id}
+        parents = dict(db.exec(
+            select(Variant.variantId, Variant.product_id).where(Variant.variantId.in_(variant_ids))
+        ).all()) if variant_ids else {}
+        product_ids = {l.product_id for l in lines if l.product_id and not l.variant_id} | set(parents.values())
+        products, variants = lock_stock_rows(db, product_ids, variant_ids)
+
+        results = []
+        history = []
+        for index, line in enumerate(lines):
+            result = model.RestockLineResult(
+                index=index, variant_id=line.variant_id, product_id=line.product_id, status="failed",
+            )
+            results.append(result)
+            try:
+                row, product, variant = _restock_line(line, products, variants)
+            except ValueError as e:
+                result.error = str(e)
+                continue
+
+            old_qty = row.stock_quantity or 0
+            row.stock_quantity = old_qty + line.stock_change
+            if variant is not None and product is not None:
+                # Sync Parent
+                product.stock_quantity = (product.stock_quantity or 0) + line.stock_change
+            result.status = "applied"
+            result.product_id = product.productId if product else line.product_id
+            result.stock_before = float(old_qty)
+            result.stock_after = float(row.stock_quantity)
+
+            if current_user is not None:
+                names = {'product_name': product.name if product else ''}
+                if variant is not None:
+                    names.update(variant_id=variant.variantId, variant_name=variant.name or '')
+                history.append({
+                    'entity_type': 'restock',
+                    'entity_id': result.product_id,
+                    'edited_by': UUID(current_user.userId),
+                    'action': 'restock',
+                    'before_snapshot': {**names, 'stock_quantity': old_qty},
+                    'after_snapshot': {**names, 'stock_quantity': result.stock_after, 'change': line.stock_change},
+                    'notes': current_user.username,
+                })
+
+        failed = sum(1 for r in results if r.status == "failed")
+        applied = len(results) - failed
+        if applied and (failed == 0 or payload.mode == "partial"):
+            if history:
+                db.execute(insert(EditHistory), history)
+            db.commit()
+        else:
+            db.rollback()
+            for r in results:
+                if r.status == "applied":
+                    r.status, r.stock_after = "skipped", None
+            applied = 0
+
+        logger.info(f"Restock batch ({payload.mode}): {applied} applied, {failed} failed of {len(results)}")
+        return {"mode": payload.mode, "applied": applied, "failed": failed, "lines": results}
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        if retry_reason(e):
+            raise
+        logger.error(f"Restock Batch Error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 def get_restock_history(
     db: Session,
     skip: int = 0,
@@ -563,9 +801,12 @@ def preview_glass_cuts(
     _consolidate_preview_events for why this isn't just the raw per-line events.
     `optimization` is resolve_glass_cut_lines' summary of the multi-strategy
     search (which heuristics were tried, their outcomes, and which won) — surfaced
-    so the preview can show that search actually happened, not just its result.
+    so the preview can show that search actually happened, not just its result —
+    including its lower bounds on sheets (glassPackingBounds), so staff can see
+    how close the chosen plan is to the best possible sheet count.
     """
     from entities.offcuts import Offcut
+    from core.inventory import stockConcurrency
     from core.inventory.glassOffcutService import resolve_glass_cut_lines
 
     product = db.get(Product, product_id)
@@ -581,15 +822,14 @@ def preview_glass_cuts(
         {"type": "glass-cut", "qty": c.qty, "meta": {"l": c.l, "w": c.w, "u": c.u}}
         for c in cuts
     ]
-    try:
-        optimization = resolve_glass_cut_lines(db, product, variant, lines)
-        all_events = [e for line in lines for e in line.get("offcut_sources", [])]
-        groups = _consolidate_preview_events(all_events, pre_existing_ids)
-        return {"groups": groups, "optimization": optimization}
-    except ValueError as e:
-        raise HTTPException(status_code=422, detail=str(e))
-    finally:
-        db.rollback()  # dry run only — never persist
+    with stockConcurrency.dry_run(db):  # no row locks, never persisted
+        try:
+            optimization = resolve_glass_cut_lines(db, product, variant, lines)
+            all_events = [e for line in lines for e in line.get("offcut_sources", [])]
+            groups = _consolidate_preview_events(all_events, pre_existing_ids)
+            return {"groups": groups, "optimization": optimization}
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
 
 
 def preview_offcut_replacement(
@@ -609,6 +849,7 @@ def preview_offcut_replacement(
     the frontend can render it with the same CuttingInstructions component
     used for committed data.
     """
+    from core.inventory import stockConcurrency
     from core.inventory.glassOffcutService import resolve_replacement_pieces
 
     product = db.get(Product, product_id)
@@ -616,14 +857,13 @@ def preview_offcut_replacement(
         raise HTTPException(status_code=404, detail="Product not found")
     variant = db.get(Variant, variant_id) if variant_id else None
 
-    try:
-        piece_tuples = [(p.width, p.height) for p in pieces]
-        events = resolve_replacement_pieces(db, product, variant, piece_tuples, forced_offcut_id)
-        return {"events": events}
-    except ValueError as e:
-        raise HTTPException(status_code=422, detail=str(e))
-    finally:
-        db.rollback()  # dry run only — never persist
+    with stockConcurrency.dry_run(db):  # no row locks, never persisted
+        try:
+            piece_tuples = [(p.width, p.height) for p in pieces]
+            events = resolve_replacement_pieces(db, product, variant, piece_tuples, forced_offcut_id)
+            return {"events": events}
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
 
 
 def check_cut_feasibility(
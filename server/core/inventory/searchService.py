@@ -0,0 +1,304 @@
+"""
+Product search — POS type-ahead over product names, item codes and variant
+names, answered from memory, with a ranked trigram search in Postgres behind it.
+
+GET /products/?search= was a bare `name ILIKE '%term%'` (no index could serve
+it, and itemCode and variants were ignored), so the POS loaded the whole catalog
+and filtered it in the browser. Two tiers now:
+
+  1. Prefix index — every product's name and itemCode, and every variant's name
+     (its attribute values, see products/service.variant_name), cut into
+     lowercase alphanumeric tokens held in one sorted list. Each query token is
+     a bisect plus a short scan, so a keystroke costs microseconds however big
+     the catalog gets. A product matches when every query token is the prefix
+     of one of its tokens — its own, or those of a variant (the matched
+     variants come back with the hit, so "clear 6" finds Clear Glass and names
+     its 6mm variant). Ranking: exact itemCode, then whole-name prefix, then
+     which field matched and how closely, then the shorter name.
+  2. Trigram search — when the prefix tier finds fewer than `limit` hits (a
+     typo, a word from the middle of a token), pg_trgm's similarity() and
+     ILIKE '%term%', both served by the GIN trigram indexes on products.name,
+     products."itemCode" and variants.name (migrate_add_product_search.py).
+     Skipped on a database without the extension.
+
+The index is rebuilt from one query when the catalog's structure version moves
+(catalogService.versions() — any name/price/attribute change, product or
+variant added or removed); when only the stock version moves, just the
+quantities are re-read. Both happen on the next search, not on the write.
+Hits are compact (no offcuts, attributes or glass tuning) — enough to show a
+pick list; the full product comes from the catalog snapshot.
+"""
+
+import bisect
+import re
+import threading
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlmodel import Session, select
+
+from entities.products import Product
+from entities.variants import Variant
+from core.inventory import catalogService
+from loggiing import logger
+from monitoring import metrics
+
+MAX_LIMIT = 50
+TRIGRAM_MIN_LENGTH = 3  # shorter queries are all prefix — trigrams of "ab" match everything
+MAX_VARIANTS_PER_HIT = 10
+
+# Token weights by field (see _score)
+_CODE, _NAME, _VARIANT = "code", "name", "variant"
+_WEIGHTS = {_CODE: 6.0, _NAME: 4.0, _VARIANT: 2.0}
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def _tokens(value: Optional[str]) -> List[str]:
+    return _TOKEN_RE.findall(value.lower()) if value else []
+
+
+# ── Prefix index ─────────────────────────────────────────────────────────────
+
+class _Index:
+    """The catalog as compact hits plus a sorted (token, productId, variantId,
+    field) posting list."""
+
+    def __init__(self, structure_version: int, stock_version: int):
+        self.structure_version = structure_version
+        self.stock_version = stock_version
+        self.products: Dict[int, dict] = {}
+        self.variants: Dict[int, dict] = {}
+        self.postings: list = []
+        self.keys: List[str] = []
+
+    def build(self, db: Session) -> None:
+        rows = db.exec(
+            select(
+                Product.productId, Product.name, Product.itemCode, Product.category_id, Product.unit,
+                Product.stock_quantity, Variant.variantId, Variant.name.label("variant_name"),
+                Variant.price, Variant.stock_quantity.label("variant_stock"),
+            )
+            .outerjoin(Variant, Variant.product_id == Product.productId)
+            .order_by(Product.productId, Variant.variantId)
+        ).all()
+        postings = []
+        for r in rows:
+            product = self.products.get(r.productId)
+            if product is None:
+                product = self.products[r.productId] = {
+                    "productId": r.productId, "name": r.name, "itemCode": r.itemCode,
+                    "category_id": r.category_id, "unit": r.unit, "stock_quantity": r.stock_quantity,
+                    "price_from": None, "variant_count": 0, "_variants": [],
+                }
+                postings.extend((t, r.productId, None, _NAME) for t in set(_tokens(r.name)))
+                postings.extend((t, r.productId, None, _CODE) for t in set(_tokens(r.itemCode)))
+            if r.variantId is None:
+                continue
+            variant = {"variantId": r.variantId, "name": r.variant_name, "price": r.price,
+                       "stock_quantity": r.variant_stock}
+            self.variants[r.variantId] = variant
+            product["_variants"].append(variant)
+            product["variant_count"] += 1
+            if r.price is not None and (product["price_from"] is None or r.price < product["price_from"]):
+                product["price_from"] = r.price
+            postings.extend((t, r.productId, r.variantId, _VARIANT) for t in set(_tokens(r.variant_name)))
+        postings.sort(key=lambda p: p[0])
+        self.postings = postings
+        self.keys = [p[0] for p in postings]
+
+    def refresh_stock(self, db: Session, stock_version: int) -> None:
+        for pid, qty in db.exec(select(Product.productId, Product.stock_quantity)).all():
+            if pid in self.products:
+                self.products[pid]["stock_quantity"] = qty
+        for vid, qty in db.exec(select(Variant.variantId, Variant.stock_quantity)).all():
+            if vid in self.variants:
+                self.variants[vid]["stock_quantity"] = qty
+        self.stock_version = stock_version
+
+    def lookup(self, prefix: str) -> list:
+        """Postings whose token starts with `prefix`."""
+        start = bisect.bisect_left(self.keys, prefix)
+        end = bisect.bisect_left(self.keys, prefix + "\uffff", start)
+        return self.postings[start:end]
+
+
+_index: Optional[_Index] = None
+_index_lock = threading.Lock()
+
+
+def _current_index(db: Session) -> _Index:
+    global _index
+    with _index_lock:
+        current = catalogService.versions()  # read before loading: a concurrent write re-triggers
+        if _index is None or _index.structure_version != current["structure"]:
+            index = _Index(current["structure"], current["stock"])
+            index.build(db)
+            _index = index
+            metrics.product_search_index_builds.inc(kind="full")
+            logger.info(f"Search index built: {len(index.products)} products, {len(index.variants)} variants")
+        elif _index.stock_version != current["stock"]:
+            _index.refresh_stock(db, current["stock"])
+            metrics.product_search_index_builds.inc(kind="stock")
+        return _index
+
+
+# ── Matching ─────────────────────────────────────────────────────────────────
+
+def _score(query_token: str, token: str, field: str) -> float:
+    return _WEIGHTS[field] + (1.0 if token == query_token else len(query_token) / len(token))
+
+
+def _prefix_search(index: _Index, query: str, category_id: Optional[int]) -> Dict[int, dict]:
+    """{productId: {"score", "variants"}} — products matching every query token."""
+    query_tokens = _tokens(query)
+    if not query_tokens:
+        return {}
+    matched: Optional[Dict[int, dict]] = None
+    for qt in query_tokens:
+        # Per product: best product-level score for this token, and the
+        # variants matching it with their best score
+        this: Dict[int, dict] = {}
+        for token, pid, vid, field in index.lookup(qt):
+            if category_id is not None and index.products[pid]["category_id"] != category_id:
+                continue
+            entry = this.setdefault(pid, {"product": 0.0, "variants": {}})
+            score = _score(qt, token, field)
+            if vid is None:
+                entry["product"] = max(entry["product"], score)
+            else:
+                entry["variants"][vid] = max(entry["variants"].get(vid, 0.0), score)
+        if matched is None:
+            matched = {pid: {"score": 0.0, "variants": None} for pid in this}
+        for pid in list(matched):
+            entry = this.get(pid)
+            if entry is None:
+                del matched[pid]
+                continue
+            hit = matched[pid]
+            if entry["product"]:
+                hit["score"] += entry["product"]
+            else:
+                # Only variants carry this token: the hit narrows to those
+                # variants that carried every variant-only token so far
+                keep = set(entry["variants"]) if hit["variants"] is None else hit["variants"] & set(entry["variants"])
+                if not keep:
+                    del matched[pid]
+                    continue
+                hit["variants"] = keep
+                hit["score"] += max(entry["variants"][v] for v in keep)
+        if not matched:
+            return {}
+
+    lowered = query.strip().lower()
+    for pid, hit in matched.items():
+        product = index.products[pid]
+        if product["itemCode"] and product["itemCode"].lower() == lowered:
+            hit["score"] += 100.0
+        elif product["name"].lower().startswith(lowered):
+            hit["score"] += 5.0
+    return matched
+
+
+def _like_pattern(query: str) -> str:
+    return "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+_trigram_available: Optional[bool] = None
+
+
+def _trigram_search(db: Session, query: str, category_id: Optional[int], limit: int) -> Dict[int, dict]:
+    """{productId: {"score", "variants"}} ranked by pg_trgm — each arm is one
+    GIN-indexed scan; ILIKE hits get a bonus over mere similarity."""
+    global _trigram_available
+    if _trigram_available is None:
+        _trigram_available = (
+            db.get_bind().dialect.name == "postgresql"
+            and db.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first() is not None
+        )
+        if not _trigram_available:
+            logger.warning("pg_trgm is not installed — product search is prefix-only (run migrate_add_product_search.py)")
+    if not _trigram_available:
+        return {}
+
+    rows = db.execute(text(
+        "WITH hits AS ("
+        '  SELECT "productId" AS product_id, NULL::integer AS variant_id,'
+        "   similarity(name, :q) + CASE WHEN name ILIKE :like THEN 0.5 ELSE 0 END AS score"
+        "  FROM products WHERE name % :q OR name ILIKE :like"
+        " UNION ALL"
+        '  SELECT "productId", NULL,'
+        '   similarity("itemCode", :q) + CASE WHEN "itemCode" ILIKE :like THEN 0.6 ELSE 0 END'
+        '  FROM products WHERE "itemCode" % :q OR "itemCode" ILIKE :like'
+        " UNION ALL"
+        '  SELECT product_id, "variantId",'
+        "   similarity(name, :q) + CASE WHEN name ILIKE :like THEN 0.4 ELSE 0 END"
+        "  FROM variants WHERE name % :q OR name ILIKE :like"
+        ")"
+        " SELECT h.product_id, max(h.score) AS score,"
+        "  array_remove(array_agg(h.variant_id ORDER BY h.score DESC), NULL) AS variant_ids,"
+        "  bool_or(h.variant_id IS NULL) AS product_level"
+        ' FROM hits h JOIN products p ON p."productId" = h.product_id'
+        " WHERE CAST(:category_id AS integer) IS NULL OR p.category_id = :category_id"
+        " GROUP BY h.product_id ORDER BY score DESC, h.product_id LIMIT :limit"
+    ), {"q": query, "like": _like_pattern(query), "category_id": category_id, "limit": limit}).all()
+    return {
+        r.product_id: {"score": float(r.score), "variants": None if r.product_level else set(r.variant_ids)}
+        for r in rows
+    }
+
+
+def _hit(index: _Index, pid: int, match: dict, source: str) -> dict:
+    product = index.products[pid]
+    variants = product["_variants"]
+    if match["variants"] is not None:
+        variants = [v for v in variants if v["variantId"] in match["variants"]]
+    return {
+        **{k: v for k, v in product.items() if not k.startswith("_")},
+        "variants": variants[:MAX_VARIANTS_PER_HIT],
+        "score": round(match["score"], 3),
+        "match": source,
+    }
+
+
+# ── Public entry point ───────────────────────────────────────────────────────
+
+def search(db: Session, query: str, limit: int = 20, category_id: Optional[int] = None) -> dict:
+    """
+    Ranked product hits for `query` — see the module docstring. Returns
+    {"query", "structure_version", "results": [{"productId", "name",
+    "itemCode", "category_id", "unit", "stock_quantity", "price_from",
+    "variant_count", "variants": [{"variantId", "name", "price",
+    "stock_quantity"}], "score", "match": "prefix" | "fuzzy"}]}. `variants`
+    lists the variants that matched — or all of them (up to
+    MAX_VARIANTS_PER_HIT) when the product itself did.
+    """
+    query = (query or "").strip()
+    limit = max(1, min(limit, MAX_LIMIT))
+    index = _current_index(db)
+    result = {"query": query, "structure_version": index.structure_version, "results": []}
+    if not query:
+        return result
+
+    prefix = _prefix_search(index, query, category_id)
+    ranked = sorted(prefix.items(), key=lambda kv: (-kv[1]["score"], len(index.products[kv[0]]["name"]), kv[0]))
+    hits = [_hit(index, pid, match, "prefix") for pid, match in ranked[:limit]]
+
+    if len(hits) < limit and len(query) >= TRIGRAM_MIN_LENGTH:
+        try:
+            fuzzy = _trigram_search(db, query, category_id, limit)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Trigram search failed: {e}")
+            fuzzy = {}
+        for pid, match in fuzzy.items():
+            if len(hits) >= limit:
+                break
+            if pid not in prefix and pid in index.products:
+                hits.append(_hit(index, pid, match, "fuzzy"))
+
+    metrics.product_searches.inc(
+        result="empty" if not hits else "fuzzy" if hits[-1]["match"] == "fuzzy" else "prefix"
+    )
+    result["results"] = hits
+    return result
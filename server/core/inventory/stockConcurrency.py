@@ -0,0 +1,184 @@
+"""
+How stock writes take (or avoid) row locks.
+
+Two kinds of stock change go through a checkout:
+
+  - Single-row counts — unit/roll/meter lines, full bars, non-tracked products,
+    and every restore of those (inventoryService._deduct_simple_stock,
+    _deduct_full_stock, _restore_simple_stock). These no longer lock anything
+    when they run. adjust() checks availability straight away against the row
+    as this transaction read it (plus whatever this transaction already queued
+    for it) — so a short cart still fails with the same ValueError at the same
+    line — and queues the delta in the session's ledger. At commit, apply()
+    writes each row ONCE with a compare-and-swap on its version
+    (entities/versioning.py):
+
+        UPDATE variants SET stock_quantity = :new, version = :v + 1
+        WHERE "variantId" = :id AND version = :v
+
+    in canonical order (variants by id, then products by id, the same order
+    inventoryService.lock_stock_rows uses). A row someone else changed since
+    we read it matches nothing; it is re-read, re-checked and tried again (up
+    to CAS_ATTEMPTS, then StaleDataError, which db/retry.py replays as a whole
+    transaction). The row lock the UPDATE takes is held only from there to the
+    COMMIT a moment later — an accessory-only cart holds no row locks while its
+    order, items, credit and payment are being built.
+
+  - Multi-row cutting work — offcut selection, sheets, remainders — keeps its
+    SELECT ... FOR UPDATE locks (taken up front for offcut-tracked products by
+    lock_stock_rows): a cut plan is a set of rows that have to agree.
+
+Dry runs (preview_glass_cuts, preview_offcut_replacement,
+check_line_items_feasible) run inside dry_run(): they are always rolled back, so
+for_update() leaves their reads unlocked and the ledger is never written.
+
+The ledger is discarded on rollback. It is not savepoint-aware — the only
+savepoints are the glass engine's strategy trials, which don't use it.
+"""
+
+from contextlib import contextmanager
+from typing import Optional
+
+from sqlalchemy import event, inspect, update
+from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.exc import StaleDataError
+from sqlmodel import Session
+
+from entities.products import Product
+from entities.variants import Variant
+from core.inventory import catalogService
+from monitoring import metrics
+
+CAS_ATTEMPTS = 5
+_LEDGER_KEY = "stock_ledger"
+_DRY_RUN_KEY = "stock_dry_run"
+_APPLY_ORDER = {Variant: 0, Product: 1}
+
+
+# ── Dry runs ─────────────────────────────────────────────────────────────────
+
+@contextmanager
+def dry_run(db: Session):
+    """Runs the block without row locks and always rolls it back."""
+    db.info[_DRY_RUN_KEY] = True
+    try:
+        yield
+    finally:
+        db.info.pop(_DRY_RUN_KEY, None)
+        db.rollback()  # dry run only — never persist
+
+
+def is_dry_run(db: Session) -> bool:
+    return bool(db.info.get(_DRY_RUN_KEY))
+
+
+def for_update(db: Session, stmt, **kwargs):
+    """stmt.with_for_update(**kwargs) — except inside dry_run(), which never
+    writes anything it reads."""
+    return stmt if is_dry_run(db) else stmt.with_for_update(**kwargs)
+
+
+# ── Ledger ───────────────────────────────────────────────────────────────────
+
+class _Entry:
+    __slots__ = ("row", "delta", "label", "require_available", "clamp_at_zero")
+
+    def __init__(self, row, label: str):
+        self.row = row
+        self.delta = 0.0
+        self.label = label
+        self.require_available = False
+        self.clamp_at_zero = False
+
+
+def adjust(
+    db: Session,
+    row,
+    delta: float,
+    label: Optional[str] = None,
+    require_available: bool = False,
+    clamp_at_zero: bool = False,
+) -> None:
+    """
+    Queues `delta` on a Variant/Product row's stock_quantity, written at commit
+    (see the module docstring). `require_available` raises ValueError now if
+    the row — as read, less what this transaction already queued — can't cover
+    it; `clamp_at_zero` floors the written value at 0 instead (a product's
+    total, which follows its variants).
+    """
+    ledger = db.info.setdefault(_LEDGER_KEY, {})
+    key = (type(row), inspect(row).identity)
+    entry = ledger.get(key)
+    if entry is None:
+        entry = ledger[key] = _Entry(row, label or getattr(row, "name", None) or str(key[1][0]))
+    if require_available:
+        available = (row.stock_quantity or 0) + entry.delta
+        if available + delta < 0:
+            # Nothing queued — callers may treat this as "line not fulfillable"
+            # and carry on (check_line_items_feasible)
+            raise ValueError(
+                f"Insufficient stock for '{entry.label}'. Available: {available}, requested: {-delta}"
+            )
+    entry.delta += delta
+    entry.require_available |= require_available
+    entry.clamp_at_zero |= clamp_at_zero
+
+
+def pending(db: Session, row) -> float:
+    """The delta this transaction has queued for `row` (0 if none)."""
+    entry = db.info.get(_LEDGER_KEY, {}).get((type(row), inspect(row).identity))
+    return entry.delta if entry else 0.0
+
+
+def apply(db: Session) -> None:
+    """Writes the queued deltas — one CAS UPDATE per row, canonical order.
+    Called from the before_commit hook below; callers never need to."""
+    ledger = db.info.pop(_LEDGER_KEY, None)
+    if not ledger:
+        return
+    db.flush()  # ORM writes to the same rows first, so the versions read below are current
+    entries = sorted(ledger.items(), key=lambda kv: (_APPLY_ORDER.get(kv[0][0], 9), kv[0][1]))
+    for (cls, identity), entry in entries:
+        if entry.delta:
+            _compare_and_swap(db, cls, identity, entry)
+    catalogService.note_stock_change(db)
+
+
+def _compare_and_swap(db: Session, cls, identity: tuple, entry: _Entry) -> None:
+    row = entry.row
+    pk = inspect(cls).primary_key[0]
+    for _ in range(CAS_ATTEMPTS):
+        current = row.stock_quantity or 0
+        version = row.version
+        new = current + entry.delta
+        if entry.require_available and new < 0:
+            raise ValueError(
+                f"Insufficient stock for '{entry.label}'. Available: {current}, requested: {-entry.delta}"
+            )
+        if entry.clamp_at_zero:
+            new = max(0, new)
+        result = db.execute(
+            update(cls)
+            .where(pk == identity[0], cls.version == version)
+            .values(stock_quantity=new, version=version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            set_committed_value(row, "stock_quantity", new)
+            set_committed_value(row, "version", version + 1)
+            return
+        metrics.stock_cas_conflicts.inc(table=cls.__tablename__)
+        db.refresh(row, attribute_names=["stock_quantity", "version"])
+    raise StaleDataError(f"{cls.__tablename__} {identity[0]} kept changing under a stock update")
+
+
+@event.listens_for(OrmSession, "before_commit")
+def _apply_ledger(session):
+    if session.info.get(_LEDGER_KEY):
+        apply(session)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_ledger(session):
+    session.info.pop(_LEDGER_KEY, None)
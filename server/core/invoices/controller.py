@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, Query, BackgroundTasks
 from typing import List, Optional
+from datetime import datetime
 from sqlmodel import Session
 
 from db.database import get_session
@@ -24,16 +25,21 @@ async def create_invoice(
     return result
 
 
-@router.get("/", response_model=List[model.InvoiceResponse])
+@router.get("/", response_model=List[model.InvoiceSummary])
 def list_invoices(
-    skip: int = 0,
-    limit: int = 100,
+    before_id: Optional[int] = Query(None, description="Keyset cursor: the last invoiceId of the previous page"),
+    limit: int = Query(100, ge=1, le=500),
     status: Optional[str] = Query(None, description="Filter by status: draft|sent|converted|cancelled"),
+    date_from: Optional[datetime] = Query(None, description="Created at or after (ISO 8601)"),
+    date_to: Optional[datetime] = Query(None, description="Created before (ISO 8601)"),
     db: Session = Depends(get_session),
     current_user: TokenData = Depends(get_current_user),
 ):
-    """List invoices, newest first. Optionally filter by status."""
-    return service.list_invoices(skip, limit, status, db)
+    """
+    List invoice summaries, newest first. Summaries omit the `items` cart
+    snapshot (see `item_count`) — fetch GET /invoices/{id} for the full invoice.
+    """
+    return service.list_invoices(before_id, limit, status, date_from, date_to, db)
 
 
 @router.get("/{invoice_id}", response_model=model.InvoiceResponse)
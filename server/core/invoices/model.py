@@ -76,6 +76,27 @@ class InvoiceResponse(BaseModel):
         from_attributes = True
 
 
+class InvoiceSummary(BaseModel):
+    """List projection — everything an invoice card shows, without the `items`
+    cart snapshot (GET /invoices/{id} returns the full invoice)."""
+    invoiceId: int
+    invoice_number: str
+    customer_id: Optional[int]
+    customer_name: Optional[str]
+    customer_phone: Optional[str]
+    customer_type: str
+    created_at: str
+    converted_at: Optional[str]
+    subtotal: float
+    vat_amount: float
+    total: float
+    discount: float
+    vat_enabled: bool
+    item_count: int
+    status: str
+    order_id: Optional[int]
+
+
 class InvoiceCreateResponse(BaseModel):
     message: str
     invoiceId: int
@@ -16,13 +16,6 @@ from . import model
 
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
-def _generate_invoice_number(db: Session) -> str:
-    """Generate next sequential invoice number: INV-000001."""
-    result = db.exec(select(Invoice).order_by(Invoice.invoiceId.desc())).first()
-    next_id = (result.invoiceId + 1) if result else 1
-    return f"INV-{next_id:06d}"
-
-
 def _invoice_to_response(inv: Invoice) -> model.InvoiceResponse:
     return model.InvoiceResponse(
         invoiceId=inv.invoiceId,
@@ -53,12 +46,11 @@ def create_invoice(
     created_by_id: str,
     db: Session,
 ) -> model.InvoiceCreateResponse:
-    """Save a new invoice (quotation)."""
+    """Save a new invoice (quotation). The invoice number is assigned by the
+    database inside the INSERT (invoice_number_seq) and comes back with the
+    new id via RETURNING — one round-trip, no duplicate risk."""
     try:
-        invoice_number = _generate_invoice_number(db)
-
         inv = Invoice(
-            invoice_number=invoice_number,
             customer_id=data.customer.id,
             customer_name=data.customer.name,
             customer_phone=data.customer.phone,
@@ -70,18 +62,20 @@ def create_invoice(
             discount=data.discount,
             vat_enabled=data.vat_enabled,
             items=data.items,
+            item_count=len(data.items),
             notes=data.notes,
             status="draft",
         )
         db.add(inv)
+        db.flush()
+        invoice_id, invoice_number = inv.invoiceId, inv.invoice_number
         db.commit()
-        db.refresh(inv)
 
         logger.info(f"Invoice {invoice_number} created by {created_by_id}")
         return model.InvoiceCreateResponse(
             message="Invoice created",
-            invoiceId=inv.invoiceId,
-            invoice_number=inv.invoice_number,
+            invoiceId=invoice_id,
+            invoice_number=invoice_number,
         )
     except Exception as e:
         db.rollback()
@@ -96,16 +90,51 @@ def get_invoice(invoice_id: int, db: Session) -> model.InvoiceResponse:
     return _invoice_to_response(inv)
 
 
+# Columns for the list projection — deliberately not `items`, so Postgres never
+# has to read/detoast the cart JSON and the response stays small.
+_SUMMARY_COLUMNS = (
+    Invoice.invoiceId, Invoice.invoice_number,
+    Invoice.customer_id, Invoice.customer_name, Invoice.customer_phone, Invoice.customer_type,
+    Invoice.created_at, Invoice.converted_at,
+    Invoice.subtotal, Invoice.vat_amount, Invoice.total, Invoice.discount, Invoice.vat_enabled,
+    Invoice.item_count, Invoice.status, Invoice.order_id,
+)
+
+
 def list_invoices(
-    skip: int,
+    before_id: Optional[int],
     limit: int,
     status_filter: Optional[str],
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
     db: Session,
-) -> List[model.InvoiceResponse]:
-    stmt = select(Invoice).order_by(Invoice.created_at.desc()).offset(skip).limit(limit)
+) -> List[model.InvoiceSummary]:
+    """
+    Invoice summaries, newest first, one keyset page at a time: pass the last
+    invoiceId of the previous page as `before_id`. invoiceId increases with
+    created_at, so ordering by the primary key gives the same order as before
+    without OFFSET's cost of re-reading every skipped row.
+    """
+    stmt = select(*_SUMMARY_COLUMNS)
+    if before_id is not None:
+        stmt = stmt.where(Invoice.invoiceId < before_id)
     if status_filter:
         stmt = stmt.where(Invoice.status == status_filter)
-    return [_invoice_to_response(i) for i in db.exec(stmt).all()]
+    if date_from:
+        stmt = stmt.where(Invoice.created_at >= date_from)
+    if date_to:
+        stmt = stmt.where(Invoice.created_at < date_to)
+    rows = db.exec(stmt.order_by(Invoice.invoiceId.desc()).limit(limit)).all()
+    return [
+        model.InvoiceSummary(
+            **{
+                **row._mapping,
+                "created_at": row.created_at.isoformat() if row.created_at else "",
+                "converted_at": row.converted_at.isoformat() if row.converted_at else None,
+            }
+        )
+        for row in rows
+    ]
 
 
 def update_invoice(
@@ -142,6 +171,8 @@ def update_invoice(
 
     for key, value in update_dict.items():
         setattr(inv, key, value)
+    if "items" in update_dict:
+        inv.item_count = len(inv.items or [])
 
     db.add(inv)
     db.commit()
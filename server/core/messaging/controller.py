@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List, Dict
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from typing import List, Dict, Optional
 from sqlmodel import Session
 from db.database import get_session
 from entities.users import User
 from core.userManagement.authService import get_current_user
+from ws.manager import manager
 from . import model, service
 
 router = APIRouter(prefix="/messages", tags=["Messaging"])
@@ -15,32 +16,55 @@ router = APIRouter(prefix="/messages", tags=["Messaging"])
 @router.post("/", response_model=dict)
 def send_message(
     message_data: model.messageCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Send a message to one or more users/roles.
+    Send a message to one or more users/roles. Recipients with a live
+    WebSocket get a `message_received` push instead of having to poll.
     """
-    return service.send_message(message_data, current_user, db)
+    result = service.send_message(message_data, current_user, db)
+    recipient_ids = result.pop("recipient_ids")
+    push = result.pop("push")
+    background_tasks.add_task(manager.send_to_users, recipient_ids, "message_received", push)
+    return result
 
-@router.get("/inbox", response_model=List[model.messageResponse])
+@router.get("/inbox", response_model=model.inboxPage)
 def get_inbox(
+    before_id: Optional[int] = Query(None, description="messageId to page before (next_before_id of the previous page)"),
+    limit: int = Query(50, ge=1, le=service.INBOX_PAGE_MAX),
+    unread_only: bool = False,
     db: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Get messages for the current user.
+    Get messages for the current user, newest first, one keyset page at a time.
     """
-    return service.read_inbox(current_user, db)
+    return service.read_inbox(current_user, db, before_id, limit, unread_only)
+
+@router.get("/unread-count", response_model=model.unreadCountResponse)
+def get_unread_count(
+    db: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Unread badge — a single-row read of the maintained counter.
+    """
+    return {"unread_count": service.get_unread_count(current_user, db)}
 
 @router.put("/{message_id}/read", response_model=dict)
 def mark_message_read(
     message_id: int,
     status_data: model.messageReadStatusUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Update message read status.
+    Update message read status. The reader's other tabs are told to refresh
+    their unread badge.
     """
-    return service.update_message_read_status(message_id, status_data, current_user, db)
+    result = service.update_message_read_status(message_id, status_data, current_user, db)
+    background_tasks.add_task(manager.send_to_users, [str(current_user.userId)], "messages_updated")
+    return result
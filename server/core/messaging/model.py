@@ -9,17 +9,29 @@ class messageCreate(BaseModel):
     recipient_ids: Optional[list[UUID]] = None
     role: Optional[str] = None
     is_broadcast: Optional[bool] = False
-    
-    
+
+
 class messageReadStatusUpdate(BaseModel):
     has_read: bool
     read_at: datetime = None
-    
+
 class messageResponse(BaseModel):
     message_id: int
     sender_id: UUID
     content: str
-    sent_at: datetime    
+    sent_at: datetime
+    has_read: bool = False
+    read_at: Optional[datetime] = None
     class Config:
         from_attributes = True
-    
+
+class inboxPage(BaseModel):
+    """One keyset page, newest first. Pass `next_before_id` back as `before_id`
+    for the next page; it's None on the last page."""
+    items: list[messageResponse]
+    next_before_id: Optional[int] = None
+    unread_count: int
+
+class unreadCountResponse(BaseModel):
+    unread_count: int
+
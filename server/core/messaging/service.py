@@ -6,93 +6,194 @@ from db.database import get_session
 from core.userManagement.authService import get_current_user
 from entities.users import User
 from loggiing import logger
-from sqlalchemy import func
+from sqlalchemy import func, insert, literal, update
+from uuid import UUID
+
+INBOX_PAGE_MAX = 100
+
+
+def _adjust_unread(db: Session, user_ids, delta: int) -> None:
+    """
+    users.unreadMessages += delta for every user in `user_ids` (a list, or a
+    SELECT of user ids). Rows are locked in userId order first so two broadcasts
+    fanning out at the same time queue behind each other instead of deadlocking.
+    """
+    locked = (
+        select(User.userId)
+        .where(User.userId.in_(user_ids))
+        .order_by(User.userId)
+        .with_for_update()
+        .subquery()
+    )
+    db.exec(
+        update(User)
+        .where(User.userId == locked.c.userId)
+        .values(unreadMessages=func.greatest(User.unreadMessages + delta, 0))
+    )
+
 
 def send_message(message_data: model.messageCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_session)) -> dict:
+    """
+    Creates the message and its recipient rows in ONE transaction. Recipients
+    are fanned out set-based — a single INSERT ... SELECT FROM users (broadcast,
+    role, or an explicit id list, which that also de-duplicates and validates)
+    — then every recipient's unread counter is bumped. Returns the recipient ids
+    so the controller can push the message to their WebSocket connections.
+    """
     try:
-        new_message = Message(senderId=current_user.userId, content=message_data.content)
-        db.add(new_message)
-        db.commit()
-        db.flush(new_message)
-        
-        
+        sender_id = UUID(current_user.userId)
         if message_data.is_broadcast:
-            roleRecipients = db.exec(select(User.userId).where(User.userId != current_user.userId)).all()
-            for recipient in roleRecipients:
-                message_recipient = MessageRecipient(messageId=new_message.messageId, recipientUserId= recipient)
-                db.add(message_recipient)
-                
+            recipient_filter = [User.userId != sender_id]
         elif message_data.recipient_ids:
-            for recipient_id in message_data.recipient_ids:
-                message_recipient = MessageRecipient(messageId=new_message.messageId, recipientUserId= recipient_id)
-                db.add(message_recipient)
-                
+            recipient_filter = [User.userId.in_(message_data.recipient_ids)]
         elif message_data.role:
-            recipients_ids = db.exec(select(User.userId).where(User.role == message_data.role, User.userId != current_user.userId))
-            for recipient in recipients_ids:
-                message_recipient = MessageRecipient(messageId=new_message.messageId, recipientUserId= recipient)
-                db.add(message_recipient)
-        
-        db.commit()        
-        logger.info(f"Message sent by {current_user.userId} to {len(message_data.recipient_ids or roleRecipients)} recipients.")
-        return {"message": "Message sent successfully", "id": new_message.messageId}
+            recipient_filter = [User.role == message_data.role, User.userId != sender_id]
+        else:
+            raise HTTPException(status_code=400, detail="Message has no recipients")
+
+        new_message = Message(senderId=sender_id, content=message_data.content)
+        db.add(new_message)
+        db.flush()  # messageId, without committing — recipients go in the same transaction
+
+        recipient_ids = db.exec(
+            insert(MessageRecipient)
+            .from_select(
+                ["messageId", "recipientUserId"],
+                select(literal(new_message.messageId), User.userId).where(*recipient_filter),
+            )
+            .returning(MessageRecipient.recipientUserId)
+        ).scalars().all()
+
+        if not recipient_ids:
+            raise HTTPException(status_code=400, detail="No matching recipients")
+
+        _adjust_unread(
+            db,
+            select(MessageRecipient.recipientUserId).where(MessageRecipient.messageId == new_message.messageId),
+            +1,
+        )
+        db.commit()
+        db.refresh(new_message)
+
+        logger.info(f"Message {new_message.messageId} sent by {current_user.userId} to {len(recipient_ids)} recipients.")
+        return {
+            "message": "Message sent successfully",
+            "id": new_message.messageId,
+            "recipient_count": len(recipient_ids),
+            "recipient_ids": [str(r) for r in recipient_ids],
+            "push": {
+                "message_id": new_message.messageId,
+                "sender_id": str(new_message.senderId),
+                "content": new_message.content,
+                "sent_at": new_message.sent_at.isoformat() if new_message.sent_at else None,
+            },
+        }
     except HTTPException:
+        db.rollback()
         raise
     except Exception as e:
         db.rollback()
         logger.error(f"Error sending message: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
-                
-        
-        
-        
+
+
 def update_message_read_status(message_id: int, status_data: model.messageReadStatusUpdate, current_user: User = Depends(get_current_user), db: Session = Depends(get_session)) -> dict:
+    """
+    Flips has_read with a conditional UPDATE (only when the state actually
+    changes), so the unread counter moves exactly once even if the client
+    double-submits or two tabs mark the same message.
+    """
     try:
-        message_recipient = db.exec(
-            select(MessageRecipient)
-            .where(MessageRecipient.messageId == message_id, MessageRecipient.recipientUserId == current_user.userId)
+        changed = db.exec(
+            update(MessageRecipient)
+            .where(
+                MessageRecipient.messageId == message_id,
+                MessageRecipient.recipientUserId == current_user.userId,
+                MessageRecipient.has_read != status_data.has_read,
+            )
+            .values(
+                has_read=status_data.has_read,
+                read_at=(status_data.read_at or func.now()) if status_data.has_read else None,
+            )
+            .returning(MessageRecipient.messageRecipientId)
         ).first()
-        
-        if not message_recipient:
-            logger.warning(f"MessageRecipient not found for message {message_id} and user {current_user.id}.")
-            raise HTTPException(status_code=404, detail="Message or recipient not found")
-        
-        message_recipient.has_read = status_data.has_read
-        message_recipient.read_at = status_data.read_at or (func.now() if status_data.has_read else None)
-        
-        db.add(message_recipient)
+
+        if changed is None:
+            exists = db.exec(
+                select(MessageRecipient.messageRecipientId)
+                .where(MessageRecipient.messageId == message_id, MessageRecipient.recipientUserId == current_user.userId)
+            ).first()
+            if exists is None:
+                logger.warning(f"MessageRecipient not found for message {message_id} and user {current_user.userId}.")
+                raise HTTPException(status_code=404, detail="Message or recipient not found")
+            return {"message": "Read status unchanged"}
+
+        _adjust_unread(db, [UUID(current_user.userId)], -1 if status_data.has_read else +1)
         db.commit()
-        
-        logger.info(f"User {current_user.id} updated read status for message {message_id} to {status_data.has_read}.")
+
+        logger.info(f"User {current_user.userId} updated read status for message {message_id} to {status_data.has_read}.")
         return {"message": "Read status updated successfully"}
-        
+
     except HTTPException:
+        db.rollback()
         raise
     except Exception as e:
         db.rollback()
         logger.error(f"Error updating read status for message {message_id}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
-    
-        
-def read_inbox(current_user: User = Depends(get_current_user), db: Session = Depends(get_session)) -> list[model.messageResponse]:
+
+
+def get_unread_count(current_user: User, db: Session) -> int:
+    return db.exec(select(User.unreadMessages).where(User.userId == current_user.userId)).first() or 0
+
+
+def read_inbox(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_session),
+    before_id: int = None,
+    limit: int = 50,
+    unread_only: bool = False,
+) -> model.inboxPage:
+    """
+    Keyset-paginated inbox, newest first: `before_id` is the last messageId of
+    the previous page. Filters and orders on messageRecipients' own columns so
+    ix_messageRecipients_inbox (recipientUserId, has_read, messageId) serves
+    the whole query — page N costs the same as page 1, unlike OFFSET.
+    """
     try:
-        messages = db.exec(
-            select(Message)
-            .join(MessageRecipient)
+        limit = max(1, min(limit, INBOX_PAGE_MAX))
+        query = (
+            select(Message, MessageRecipient.has_read, MessageRecipient.read_at)
+            .join(MessageRecipient, MessageRecipient.messageId == Message.messageId)
             .where(MessageRecipient.recipientUserId == current_user.userId)
-            .order_by(Message.sent_at.desc())
-        ).all()
-        
-        if not messages:
-            logger.info(f"No messages found for user {current_user.id}.")
-            return []
-        
-        logger.info(f"{len(messages)} messages fetched for user {current_user.id}.")
-        return messages
+        )
+        if unread_only:
+            query = query.where(MessageRecipient.has_read == False)  # noqa: E712
+        if before_id is not None:
+            query = query.where(MessageRecipient.messageId < before_id)
+        rows = db.exec(query.order_by(MessageRecipient.messageId.desc()).limit(limit + 1)).all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        items = [
+            model.messageResponse(
+                message_id=message.messageId,
+                sender_id=message.senderId,
+                content=message.content,
+                sent_at=message.sent_at,
+                has_read=has_read,
+                read_at=read_at,
+            )
+            for message, has_read, read_at in rows
+        ]
+        logger.info(f"{len(items)} messages fetched for user {current_user.userId}.")
+        return model.inboxPage(
+            items=items,
+            next_before_id=items[-1].message_id if has_more else None,
+            unread_count=get_unread_count(current_user, db),
+        )
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error fetching inbox for user {current_user.id}: {e}", exc_info=True)
+        logger.error(f"Error fetching inbox for user {current_user.userId}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
-    
-
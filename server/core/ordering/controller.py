@@ -5,6 +5,7 @@ from db.database import get_session
 from core.userManagement.authService import get_current_user
 from ws.manager import manager
 from utils import require_role
+from fastJson import FastJSONResponse
 from . import model, orderService, orderItemService
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
@@ -14,7 +15,7 @@ router = APIRouter(prefix="/orders", tags=["Orders"])
 # ---------------------------------------------------------------------------
 
 @router.post("/", response_model=model.OrderCreateResponse)
-async def create_order(
+def create_order(
     order_data: model.OrderCreate,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_session),
@@ -34,7 +35,7 @@ def get_orders(
     current_user = Depends(get_current_user)
 ):
     require_role(["manager", "cashier", "ceo", "admin"], current_user)
-    return orderService.get_all_orders(db, skip, limit)
+    return FastJSONResponse(orderService.get_all_orders(db, skip, limit))
 
 
 @router.get("/audit/history", response_model=List[model.EditHistoryResponse])
@@ -46,7 +47,7 @@ def get_audit_history(
     current_user = Depends(get_current_user),
 ):
     """Return edit history records for CEO/admin review."""
-    return orderService.get_audit_history(entity_type, db, skip, limit)
+    return FastJSONResponse(orderService.get_audit_history(entity_type, db, skip, limit))
 
 
 @router.get("/customer/{customer_id}", response_model=List[model.OrderResponse])
@@ -56,18 +57,20 @@ def get_orders_by_customer(
     limit: int = 20,
     db: Session = Depends(get_session)
 ):
-    return orderService.get_orders_by_customerId(customer_id, db, skip, limit)
+    return FastJSONResponse(orderService.get_orders_by_customerId(customer_id, db, skip, limit))
 
 
 @router.get("/cutting-queue", response_model=List[model.PendingCuttingItem])
 def get_cutting_queue(
     skip: int = 0,
     limit: int = 100,
+    line_type: Optional[str] = None,
     db: Session = Depends(get_session),
     current_user = Depends(get_current_user),
 ):
-    """Items still awaiting a cutting report, for the cutting-queue batch-report screen."""
-    return orderService.get_pending_cutting_items(db, current_user, skip, limit)
+    """Items still awaiting a cutting report, for the cutting-queue batch-report screen.
+    `line_type=glass-cut` narrows it to items with a glass-cut line."""
+    return orderService.get_pending_cutting_items(db, current_user, skip, limit, line_type)
 
 
 @router.put("/cutting-queue/mark-done", response_model=model.MarkCuttingDoneResponse)
@@ -99,7 +102,7 @@ def get_order(
 
 
 @router.put("/{order_id}/edit", response_model=model.OrderCreateResponse)
-async def edit_order(
+def edit_order(
     order_id: int,
     order_data: model.OrderEditRequest,
     background_tasks: BackgroundTasks,
@@ -45,6 +45,7 @@ class OrderResponse(BaseModel):
     totalAmount: float
     parentOrderId: Optional[int] = None
     servedBy: Optional[UUID] = None
+    servedByName: Optional[str] = None
     VAT_status: bool
     discount: Optional[float] = 0.0
     paymentStatus: str
@@ -171,6 +172,7 @@ class EditHistoryResponse(BaseModel):
     entity_type: str
     entity_id: int
     edited_by: str
+    edited_by_name: Optional[str] = None
     edited_at: str
     action: str
     before_snapshot: Dict[str, Any]
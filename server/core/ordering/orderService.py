@@ -5,6 +5,8 @@ from datetime import datetime
 from decimal import Decimal, ROUND_HALF_UP
 
 from fastapi import Depends, HTTPException, Query
+from sqlalchemy import type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import Session, select
 
 from entities.orders import Order
@@ -13,11 +15,16 @@ from entities.products import Product
 from entities.variants import Variant
 from entities.editHistory import EditHistory
 from entities.invoices import Invoice
+from entities.customers import Customer
 from db.database import get_session
+from db.retry import retry_reason, run_with_retry
 from loggiing import logger
 from utils import require_role
 from ..userManagement.authService import get_current_user
-from ..inventory.inventoryService import deduct_stock_for_order_item
+from ..userManagement.displayNames import display_name, display_names
+from ..userManagement.customerService import note_recent_customer
+from ..financials import receivablesService
+from ..inventory.inventoryService import deduct_stock_for_order_item, load_stock_rows
 from . import model
 from typing import List
 
@@ -28,7 +35,7 @@ from typing import List
 # ---------------------------------------------------------------------------
 # Shared helpers
 # ---------------------------------------------------------------------------
-def _order_to_response(order: Order) -> model.OrderResponse:
+def _order_to_response(order: Order, served_by_name: str | None = None) -> model.OrderResponse:
     """Map ORM → response Pydantic model (centralised)."""
     customer_name = None
     try:
@@ -46,6 +53,7 @@ def _order_to_response(order: Order) -> model.OrderResponse:
         customerName=customer_name,
         amountPaid=amount_paid,
         servedBy=order.servedby,
+        servedByName=served_by_name,
         parentOrderId=order.parent_orderid,
         VAT_status=order.VAT_status,
         created_at=order.created_at.isoformat() if order.created_at else "",
@@ -76,7 +84,7 @@ def _order_to_response(order: Order) -> model.OrderResponse:
         ]
     )
 
-def _order_to_shallow_response(order: Order) -> model.OrderResponse:
+def _order_to_shallow_response(order: Order, served_by_name: str | None = None) -> model.OrderResponse:
     """Map ORM into response Pydantic model WITHOUT loading items (to prevent N+1 list queries)."""
     customer_name = None
     try:
@@ -94,6 +102,7 @@ def _order_to_shallow_response(order: Order) -> model.OrderResponse:
         customerName=customer_name,
         amountPaid=amount_paid,
         servedBy=order.servedby,
+        servedByName=served_by_name,
         parentOrderId=order.parent_orderid,
         VAT_status=order.VAT_status,
         created_at=order.created_at.isoformat() if isinstance(order.created_at, datetime) else str(order.created_at),
@@ -109,6 +118,79 @@ def _order_to_shallow_response(order: Order) -> model.OrderResponse:
         items=[]
     )
 
+def _shallow_responses(orders: List[Order], db: Session) -> list[model.OrderResponse]:
+    """Shallow-map a list of orders, resolving every servedBy name in one query."""
+    names = display_names(db, (order.servedby for order in orders))
+    return [_order_to_shallow_response(order, names.get(order.servedby)) for order in orders]
+
+# ── Fast list path ──────────────────────────────────────────────────────────
+# The high-volume list endpoints (GET /orders/, /orders/customer/{id},
+# /orders/audit/history) skip the ORM objects and the per-row Pydantic models:
+# they select plain columns (the customer name via a JOIN instead of a lazy
+# load per order) and build dicts shaped exactly like model.OrderResponse /
+# EditHistoryResponse, which the controller encodes with fastJson. The
+# response_model on the route is unchanged, so the OpenAPI schema is too.
+# benchmark_list_serialization.py checks both paths produce the same JSON.
+_ORDER_SUMMARY_COLUMNS = (
+    Order.orderId, Order.customerid, Customer.name.label("customerName"), Order.amountPayed,
+    Order.balance, Order.servedby, Order.parent_orderid, Order.VAT_status, Order.created_at,
+    Order.payment_status, Order.subtotal, Order.discount, Order.status, Order.payment_method,
+    Order.total, Order.source_invoice_id,
+)
+
+
+def _order_summary_select():
+    return select(*_ORDER_SUMMARY_COLUMNS).outerjoin(Customer, Customer.customerId == Order.customerid)
+
+
+def _order_summary_dict(row, served_by_name: str | None) -> dict:
+    """One _ORDER_SUMMARY_COLUMNS row → the JSON _order_to_shallow_response produces."""
+    amount_paid = row.amountPayed or 0
+    balance = row.balance or 0
+    created_at = row.created_at
+    return {
+        "orderId": row.orderId,
+        "customerId": row.customerid,
+        "customerName": row.customerName,
+        "amountPaid": float(amount_paid),
+        "totalAmount": float(Decimal(str(amount_paid)) + Decimal(str(balance))),
+        "parentOrderId": row.parent_orderid,
+        "servedBy": str(row.servedby) if row.servedby else None,
+        "servedByName": served_by_name,
+        "VAT_status": row.VAT_status,
+        "discount": float(row.discount or 0),
+        "paymentStatus": row.payment_status,
+        "created_at": created_at.isoformat() if isinstance(created_at, datetime) else str(created_at),
+        "status": row.status,
+        "paymentMethod": row.payment_method,
+        "balance": float(balance),
+        "subtotal": float(row.subtotal or 0),
+        "total": float(row.total or 0),
+        "source_invoice_id": row.source_invoice_id,
+        "items": [],
+    }
+
+
+def _order_summaries(statement, db: Session) -> list[dict]:
+    rows = db.exec(statement).all()
+    names = display_names(db, (row.servedby for row in rows))
+    return [_order_summary_dict(row, names.get(row.servedby)) for row in rows]
+
+
+def _edit_history_dict(r: EditHistory, edited_by_name: str | None) -> dict:
+    return {
+        "id": r.id,
+        "entity_type": r.entity_type,
+        "entity_id": r.entity_id,
+        "edited_by": str(r.edited_by),
+        "edited_by_name": edited_by_name,
+        "edited_at": r.edited_at.isoformat(),
+        "action": r.action,
+        "before_snapshot": r.before_snapshot or {},
+        "after_snapshot": r.after_snapshot or {},
+        "notes": r.notes,
+    }
+
 # ---------------------------------------------------------------------------
 # Business logic
 # ---------------------------------------------------------------------------
@@ -235,7 +317,14 @@ def create_order(order_data: model.OrderCreate, db: Session = Depends(get_sessio
     Create a new order entry + items transactionally.
     - Only users with admin or manager roles can create orders.
     - Returns a structured success message.
+
+    The transaction is replayed if Postgres aborts it as a deadlock or
+    serialization failure (see db/retry.py).
     """
+    return run_with_retry(db, lambda: _create_order_once(order_data, db, current_user), "create_order")
+
+
+def _create_order_once(order_data: model.OrderCreate, db: Session, current_user) -> model.OrderCreateResponse:
     try:
         # 🔐 Ensure user has privilege to create
         require_role(["manager", "cashier", "ceo", "admin"], current_user)
@@ -270,19 +359,14 @@ def create_order(order_data: model.OrderCreate, db: Session = Depends(get_sessio
         db.add(new_order)
         db.flush()  # Generate orderId without committing
 
-        # Pre-fetch Products and Variants for performance (N+1 fix)
-        product_ids = [item.productId for item in order_data.items]
-        variant_ids = [item.variantId for item in order_data.items if item.variantId]
-
-        products_cache = {}
-        if product_ids:
-            products = db.exec(select(Product).where(Product.productId.in_(product_ids))).all()
-            products_cache = {p.productId: p for p in products}
-
-        variants_cache = {}
-        if variant_ids:
-            variants = db.exec(select(Variant).where(Variant.variantId.in_(variant_ids))).all()
-            variants_cache = {v.variantId: v for v in variants}
+        # Pre-fetch Products and Variants for performance (N+1 fix) — rows of
+        # offcut-tracked products are locked up front in canonical order,
+        # before any deduction (see load_stock_rows)
+        products_cache, variants_cache = load_stock_rows(
+            db,
+            [item.productId for item in order_data.items],
+            [item.variantId for item in order_data.items],
+        )
 
         # 2. Process Items & Calculate Subtotal
         calculated_subtotal = Decimal("0.00")
@@ -354,6 +438,8 @@ def create_order(order_data: model.OrderCreate, db: Session = Depends(get_sessio
                 status=credit_status,
             )
             db.add(new_credit)
+            db.flush()
+            receivablesService.refresh_customer(db, new_order.customerid)
             logger.info(
                 f"Credit record created for order {new_order.orderId}: "
                 f"amount={float(final_total):.2f}, due={float(new_order.balance):.2f}, status={credit_status}"
@@ -374,6 +460,7 @@ def create_order(order_data: model.OrderCreate, db: Session = Depends(get_sessio
             db.add(new_payment_rec)
 
         db.commit()
+        note_recent_customer(new_order.servedby, new_order.customerid)
 
         logger.info(f"Order {new_order.orderId} created (Items: {len(order_data.items)}) by {current_user.userId}.")
         return model.OrderCreateResponse(
@@ -387,6 +474,8 @@ def create_order(order_data: model.OrderCreate, db: Session = Depends(get_sessio
         raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         db.rollback()
+        if retry_reason(e):
+            raise  # create_order's run_with_retry replays it
         logger.error(f"Error creating transactional order: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Something went wrong while creating the order. Please try again.")
     
@@ -401,7 +490,7 @@ def get_order_by_orderId(order_id: int, db: Session = Depends(get_session)) -> m
         if not order:
             logger.warning(f"Order {order_id} not found.")
             raise HTTPException(status_code=404, detail="Order not found")
-        return _order_to_response(order)
+        return _order_to_response(order, display_name(db, order.servedby))
     except HTTPException:
         raise
     except Exception as e:
@@ -430,7 +519,7 @@ def get_orders_for_period_vatExcluded(
             .limit(limit)
         )
         orders = db.exec(statement).all()
-        return [_order_to_shallow_response(order) for order in orders]
+        return _shallow_responses(orders, db)
 
     except HTTPException:
         raise
@@ -464,7 +553,7 @@ def get_orders_for_period_vatIncluded(
             .limit(limit)
         )
         orders = db.exec(statement).all()
-        return [_order_to_shallow_response(order) for order in orders]
+        return _shallow_responses(orders, db)
 
     except HTTPException:
         raise
@@ -481,19 +570,19 @@ def get_orders_by_customerId(
     db: Session = Depends(get_session),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(10, ge=1, le=100, description="Maximum number of records to return"),
-) -> List[model.OrderResponse]:
+) -> list[dict]:
     """
-    Retrieve all orders for a specific customer, with pagination.
+    Retrieve all orders for a specific customer, with pagination — as
+    OrderResponse-shaped dicts (see "Fast list path" above).
     """
     try:
         statement = (
-            select(Order)
+            _order_summary_select()
             .where(Order.customerid == customer_id)
             .offset(skip)
             .limit(limit)
         )
-        orders = db.exec(statement).all()
-        return [_order_to_shallow_response(order) for order in orders]
+        return _order_summaries(statement, db)
 
     except HTTPException:
         raise
@@ -522,7 +611,7 @@ def get_orders_by_servedby(
             .limit(limit)
         )
         orders = db.exec(statement).all()
-        return [_order_to_shallow_response(order) for order in orders]
+        return _shallow_responses(orders, db)
 
     except HTTPException:
         raise
@@ -544,7 +633,7 @@ def get_orders_for_certain_day(date: str, db: Session = Depends(get_session)) ->
             Order.created_at <= f"{date} 23:59:59"
         )
         orders = db.exec(statement).all()
-        return [_order_to_shallow_response(order) for order in orders]
+        return _shallow_responses(orders, db)
     except HTTPException:
         raise
     except Exception as e:
@@ -559,7 +648,7 @@ def get_child_orders(parent_order_id: int, db: Session = Depends(get_session)) -
     try:
         statement = select(Order).where(Order.parent_orderid == parent_order_id)
         orders = db.exec(statement).all()
-        return [_order_to_shallow_response(order) for order in orders]
+        return _shallow_responses(orders, db)
     except HTTPException:
         raise
     except Exception as e:
@@ -570,15 +659,14 @@ def get_all_orders(
     db: Session = Depends(get_session),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=500, description="Maximum number of records to return"),
-) -> list[model.OrderResponse]:
+) -> list[dict]:
     """
-    Retrieve all orders in the system with pagination, newest first.
+    Retrieve all orders in the system with pagination, newest first — as
+    OrderResponse-shaped dicts (see "Fast list path" above).
     """
     try:
-        statement = select(Order).order_by(Order.created_at.desc()).offset(skip).limit(limit)
-        orders = db.exec(statement).all()
-
-        return [_order_to_shallow_response(order) for order in orders]
+        statement = _order_summary_select().order_by(Order.created_at.desc()).offset(skip).limit(limit)
+        return _order_summaries(statement, db)
 
     except HTTPException:
         raise
@@ -596,7 +684,7 @@ def getAll_orders_VatIncluded(db: Session = Depends(get_session)) -> list[model.
         statement = select(Order).where(Order.VAT_status == True)
         orders = db.exec(statement).all()
 
-        return [_order_to_shallow_response(order) for order in orders]
+        return _shallow_responses(orders, db)
 
     except HTTPException:
         raise
@@ -618,14 +706,23 @@ def update_order(
       4. Create new items and deduct stock.
       5. Recalculate order totals.
       6. Write an EditHistory record.
+
+    Replayed on a deadlock/serialization failure, like create_order.
     """
+    return run_with_retry(db, lambda: _update_order_once(order_id, order_data, db, current_user), "update_order")
+
+
+def _update_order_once(
+    order_id: int,
+    order_data: model.OrderEditRequest,
+    db: Session,
+    current_user,
+) -> model.OrderCreateResponse:
     from core.inventory.inventoryService import (
         deduct_stock_for_order_item,
         restore_stock_for_order_item,
     )
     from entities.editHistory import EditHistory
-    from entities.products import Product
-    from entities.variants import Variant
 
     require_role(["manager", "ceo", "admin"], current_user)
 
@@ -657,8 +754,15 @@ def update_order(
         }
 
         # ── 2. Restore stock from old items ───────────────────────────────────
-        # Load into a plain list first so the loop isn't affected by deletions
+        # Load into a plain list first so the loop isn't affected by deletions.
+        # Every cutting row the old AND new items touch is locked here, before
+        # any restore or deduction (see load_stock_rows).
         old_items = db.exec(select(OrderItem).where(OrderItem.order_id == order_id)).all()
+        products_cache, variants_cache = load_stock_rows(
+            db,
+            [oi.product_id for oi in old_items] + [i.productId for i in order_data.items],
+            [oi.variant_id for oi in old_items] + [i.variantId for i in order_data.items],
+        )
         for old_item in old_items:
             restore_stock_for_order_item(db, old_item)
             db.delete(old_item)
@@ -667,19 +771,7 @@ def update_order(
         # otherwise SQLAlchemy hits the now-deleted instances when we add new items.
         db.expire(order)
 
-        # ── 3. Pre-fetch products/variants ────────────────────────────────────
-        product_ids = [i.productId for i in order_data.items]
-        variant_ids = [i.variantId for i in order_data.items if i.variantId]
-
-        products_cache = {}
-        if product_ids:
-            prods = db.exec(select(Product).where(Product.productId.in_(product_ids))).all()
-            products_cache = {p.productId: p for p in prods}
-
-        variants_cache = {}
-        if variant_ids:
-            vars_ = db.exec(select(Variant).where(Variant.variantId.in_(variant_ids))).all()
-            variants_cache = {v.variantId: v for v in vars_}
+        # ── 3. Products/variants were pre-fetched by load_stock_rows above ────
 
         # ── 4. Create new items and deduct stock ──────────────────────────────
         calculated_subtotal = Decimal("0.00")
@@ -800,6 +892,8 @@ def update_order(
         raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         db.rollback()
+        if retry_reason(e):
+            raise  # update_order's run_with_retry replays it
         logger.error(f"Error editing order {order_id}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Something went wrong while updating the order. Please try again.")
 
@@ -826,7 +920,6 @@ def correct_offcut_for_order_item(
     for them (see glassOffcutService.correct_glass_offcut_event for the actual
     offcut inventory mutation), then writes an EditHistory row.
     """
-    from sqlalchemy.orm.attributes import flag_modified
     from core.inventory.glassOffcutService import correct_glass_offcut_event
 
     require_role(["manager", "ceo", "admin"], current_user)
@@ -858,13 +951,12 @@ def correct_offcut_for_order_item(
     try:
         result = correct_glass_offcut_event(
             db, product, variant, event, [r.model_dump() for r in new_remainders],
-            failed_cut_indices, forced_offcut_id,
+            failed_cut_indices, forced_offcut_id, item_id=item_id,
         )
+        # `event` and `offcut_sources` belong to item.details (a mutation-tracked
+        # document), so the in-place changes above and below flag it for UPDATE
         if result["replacement_events"]:
             offcut_sources.extend(result["replacement_events"])
-
-        item.details = {**details, "lineItems": line_items}
-        flag_modified(item, "details")
         db.add(item)
 
         audit = EditHistory(
@@ -936,22 +1028,41 @@ def mark_cutting_complete_for_order(order_id: int, db: Session, current_user) ->
     return mark_cutting_complete_batch(item_ids, db, current_user)
 
 
-def get_pending_cutting_items(db: Session, current_user, skip: int = 0, limit: int = 100) -> list:
+def get_pending_cutting_items(
+    db: Session, current_user, skip: int = 0, limit: int = 100, line_type: str | None = None,
+) -> list:
     """
     Items still awaiting a cutting report — order id/customer/product name plus
     the lineItems needed to render CuttingInstructions, for the cutting-queue page.
+    `line_type` (e.g. "glass-cut") keeps only items with at least one line of
+    that type.
+
+    Uses the partial index ix_orderitems_cutting_pending; on Postgres the
+    line_type filter is a JSONB containment test served by the details GIN
+    index (ix_orderitems_details_gin), elsewhere it is applied after the fetch.
     """
     require_role(["manager", "cashier", "ceo", "admin"], current_user)
 
+    on_postgres = db.get_bind().dialect.name == "postgresql"
     stmt = (
         select(OrderItem, Order, Product)
         .join(Order, OrderItem.order_id == Order.orderId)
         .join(Product, OrderItem.product_id == Product.productId)
         .where(OrderItem.cutting_completed == False, Order.status != "cancelled")  # noqa: E712
         .order_by(Order.created_at.asc())
-        .offset(skip).limit(limit)
     )
+    if line_type and on_postgres:
+        stmt = stmt.where(
+            type_coerce(OrderItem.details, JSONB).contains({"lineItems": [{"type": line_type}]})
+        )
+    if on_postgres or not line_type:
+        stmt = stmt.offset(skip).limit(limit)
     rows = db.exec(stmt).all()
+    if line_type and not on_postgres:
+        rows = [
+            row for row in rows
+            if any(l.get("type") == line_type for l in (row[0].details or {}).get("lineItems") or [])
+        ][skip:skip + limit]
     results = []
     for item, order, product in rows:
         customer_name = None
@@ -974,28 +1085,15 @@ def get_audit_history(
     db: Session,
     skip: int = 0,
     limit: int = 100,
-) -> list[model.EditHistoryResponse]:
-    from entities.editHistory import EditHistory
-
+) -> list[dict]:
+    """EditHistoryResponse-shaped dicts, newest first (see "Fast list path")."""
     stmt = select(EditHistory).order_by(EditHistory.edited_at.desc()).offset(skip).limit(limit)
     if entity_type:
         stmt = stmt.where(EditHistory.entity_type == entity_type)
 
     rows = db.exec(stmt).all()
-    return [
-        model.EditHistoryResponse(
-            id=r.id,
-            entity_type=r.entity_type,
-            entity_id=r.entity_id,
-            edited_by=str(r.edited_by),
-            edited_at=r.edited_at.isoformat(),
-            action=r.action,
-            before_snapshot=r.before_snapshot or {},
-            after_snapshot=r.after_snapshot or {},
-            notes=r.notes,
-        )
-        for r in rows
-    ]
+    names = display_names(db, (r.edited_by for r in rows))
+    return [_edit_history_dict(r, names.get(r.edited_by)) for r in rows]
 
 
 def update_order_payment_status(
@@ -1046,6 +1144,7 @@ def _restore_and_cancel(db: Session, order: Order) -> None:
     if order.status == "cancelled":
         return
     items = db.exec(select(OrderItem).where(OrderItem.order_id == order.orderId)).all()
+    load_stock_rows(db, [i.product_id for i in items], [i.variant_id for i in items])
     for item in items:
         restore_stock_for_order_item(db, item)
     order.status = "cancelled"
@@ -0,0 +1,177 @@
+"""
+Read-through cache for small, rarely-changing reference data — system settings
+(the order-cancel PIN hash), attribute classes and product categories.
+
+These used to be re-queried on every call: the cancel-PIN check hits
+system_settings twice per cancellation, and the attribute/category lists are
+fetched on every page load. Now:
+
+  - get(namespace, key, loader) returns the cached value, or runs `loader()`
+    once and keeps the result. Values must be plain data (dicts, pydantic
+    models, strings) — never ORM instances, which belong to one session.
+  - invalidate(db, namespace, ...) is called by every write path, BEFORE its
+    commit. The namespace is dropped from this process's cache only after the
+    transaction commits (a rolled-back write invalidates nothing), and the same
+    transaction issues `pg_notify('reference_cache', namespace)`, which Postgres
+    delivers to other listeners only on commit.
+  - start_listener() runs a daemon thread LISTENing on that channel with its
+    own connection, so every other worker process drops the namespace too. The
+    deployment is a single worker today (install_service.bat); this keeps a
+    multi-worker one coherent. If the listener loses its connection it drops
+    the whole cache when it reconnects, since notifications may have been
+    missed in between.
+
+A per-namespace generation counter guards the load race: a loader that started
+before an invalidation won't store its (stale) result after it. Entries also
+expire after REFERENCE_CACHE_TTL seconds as a safety net for writes that bypass
+the services (migrate_* scripts, manual SQL).
+
+Hit/miss and invalidation counts are exported as reference_cache_* metrics.
+"""
+
+import select as _select
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy.pool import NullPool
+
+from config import settings
+from loggiing import logger
+from monitoring import metrics
+
+SETTINGS = "settings"
+ATTRIBUTE_CLASSES = "attribute_classes"
+CATEGORIES = "categories"
+
+CHANNEL = "reference_cache"
+_PENDING_KEY = "reference_cache_pending"
+_MISSING = object()
+
+_entries: dict = {}      # namespace -> {key: (expires_at, value)}
+_generations: dict = {}  # namespace -> int
+_lock = threading.Lock()
+
+
+# ── Lookups ──────────────────────────────────────────────────────────────────
+
+def get(namespace: str, key: Any, loader: Callable[[], Any]) -> Any:
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(namespace, {}).get(key, _MISSING)
+        generation = _generations.get(namespace, 0)
+    if entry is not _MISSING and entry[0] > now:
+        metrics.reference_cache_requests.inc(namespace=namespace, result="hit")
+        return entry[1]
+
+    metrics.reference_cache_requests.inc(namespace=namespace, result="miss")
+    value = loader()
+    with _lock:
+        if _generations.get(namespace, 0) == generation:
+            _entries.setdefault(namespace, {})[key] = (now + settings.REFERENCE_CACHE_TTL, value)
+    return value
+
+
+# ── Invalidation ─────────────────────────────────────────────────────────────
+
+def invalidate_local(*namespaces: str, source: str = "local") -> None:
+    with _lock:
+        for namespace in namespaces:
+            _entries.pop(namespace, None)
+            _generations[namespace] = _generations.get(namespace, 0) + 1
+    for namespace in namespaces:
+        metrics.reference_cache_invalidations.inc(namespace=namespace, source=source)
+
+
+def invalidate_all(source: str = "local") -> None:
+    with _lock:
+        namespaces = set(_entries) | set(_generations)
+    if namespaces:
+        invalidate_local(*namespaces, source=source)
+
+
+def invalidate(db: OrmSession, *namespaces: str) -> None:
+    """
+    Mark `namespaces` stale as part of `db`'s current transaction: dropped here
+    after commit, and announced to the other workers by the same commit.
+    """
+    db.info.setdefault(_PENDING_KEY, set()).update(namespaces)
+    if db.get_bind().dialect.name == "postgresql":
+        for namespace in namespaces:
+            db.execute(text("SELECT pg_notify(:channel, :namespace)"), {"channel": CHANNEL, "namespace": namespace})
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _apply_pending(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        invalidate_local(*pending)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+# ── Cross-worker listener ────────────────────────────────────────────────────
+
+_listener: Optional[threading.Thread] = None
+_stop = threading.Event()
+
+
+def _listen(database_url: str) -> None:
+    # A dedicated, unpooled connection: LISTEN holds it for the process
+    # lifetime, which would otherwise permanently take a slot from the pool.
+    listen_engine = create_engine(database_url, poolclass=NullPool)
+    backoff = 1.0
+    first = True
+    while not _stop.is_set():
+        raw = None
+        try:
+            raw = listen_engine.raw_connection()
+            conn = raw.driver_connection
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANNEL}")
+            if not first:
+                invalidate_all(source="reconnect")
+            first = False
+            backoff = 1.0
+            while not _stop.is_set():
+                if _select.select([conn], [], [], 5.0) == ([], [], []):
+                    continue
+                conn.poll()
+                namespaces = {notify.payload for notify in conn.notifies}
+                conn.notifies.clear()
+                if namespaces:
+                    invalidate_local(*namespaces, source="remote")
+        except Exception as e:
+            logger.warning(f"Reference cache listener disconnected, retrying in {backoff:.0f}s: {e}")
+            _stop.wait(backoff)
+            backoff = min(backoff * 2, 60.0)
+        finally:
+            if raw is not None:
+                try:
+                    raw.close()
+                except Exception:
+                    pass
+    listen_engine.dispose()
+
+
+def start_listener(database_url: str) -> None:
+    global _listener
+    if _listener is not None or not database_url.startswith("postgresql"):
+        return
+    _stop.clear()
+    _listener = threading.Thread(target=_listen, args=(database_url,), name="reference-cache-listener", daemon=True)
+    _listener.start()
+
+
+def stop_listener() -> None:
+    global _listener
+    _stop.set()
+    if _listener is not None:
+        _listener.join(timeout=10)
+        _listener = None
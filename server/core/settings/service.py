@@ -1,5 +1,7 @@
+from typing import Optional
 from sqlmodel import Session
 from entities.settings import SystemSetting
+from core import referenceCache
 from core.userManagement.authService import hash_password, verify_password
 from loggiing import logger
 
@@ -16,16 +18,25 @@ def set_cancel_pin(db: Session, pin: str, current_user) -> None:
         db.add(existing)
     else:
         db.add(SystemSetting(key=CANCEL_PIN_KEY, value=hashed, updated_by=current_user.userId))
+    referenceCache.invalidate(db, referenceCache.SETTINGS)
     db.commit()
     logger.info(f"Order-cancel PIN updated by {current_user.userId}.")
 
 
+def _cancel_pin_hash(db: Session) -> Optional[str]:
+    """The stored PIN hash (None when no PIN is set), via the reference cache."""
+    def load():
+        setting = db.get(SystemSetting, CANCEL_PIN_KEY)
+        return setting.value if setting else None
+    return referenceCache.get(referenceCache.SETTINGS, CANCEL_PIN_KEY, load)
+
+
 def cancel_pin_is_configured(db: Session) -> bool:
-    return db.get(SystemSetting, CANCEL_PIN_KEY) is not None
+    return _cancel_pin_hash(db) is not None
 
 
 def verify_cancel_pin(db: Session, pin: str) -> bool:
-    setting = db.get(SystemSetting, CANCEL_PIN_KEY)
-    if not setting:
+    hashed = _cancel_pin_hash(db)
+    if not hashed:
         return False
-    return verify_password(pin, setting.value)
+    return verify_password(pin, hashed)
@@ -2,10 +2,11 @@ from datetime import datetime, timezone
 from typing import List, Optional
 
 from fastapi import HTTPException
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
 
 from entities.tools import Tool, ToolLoan, ToolLoanItem
-from entities.users import User
+from core.userManagement.displayNames import display_names
 from loggiing import logger
 from . import model
 
@@ -21,27 +22,13 @@ def _tool_to_response(tool: Tool) -> model.ToolResponse:
     )
 
 
-def _user_display_name(db: Session, user_id) -> Optional[str]:
-    if not user_id:
-        return None
-    user = db.get(User, user_id)
-    if not user:
-        return None
-    return f"{user.firstName} {user.secondName}".strip() if user.secondName else user.firstName
-
-
-def _loan_to_response(loan: ToolLoan, db: Session) -> model.ToolLoanResponse:
-    tool_ids = [item.tool_id for item in loan.items]
-    tools_cache = {}
-    if tool_ids:
-        tools = db.exec(select(Tool).where(Tool.toolId.in_(tool_ids))).all()
-        tools_cache = {t.toolId: t for t in tools}
-
+def _loan_to_response(loan: ToolLoan, tools_by_id: dict, names: dict) -> model.ToolLoanResponse:
+    """Pure mapping — tools and user names are resolved up front by _loans_to_responses()."""
     items = [
         model.ToolLoanItemResponse(
             itemId=item.itemId,
             toolId=item.tool_id,
-            toolName=tools_cache[item.tool_id].name if item.tool_id in tools_cache else "Unknown Tool",
+            toolName=tools_by_id[item.tool_id].name if item.tool_id in tools_by_id else "Unknown Tool",
             returned=item.returned,
             returned_at=item.returned_at.isoformat() if item.returned_at else None,
             defect_note=item.defect_note,
@@ -52,9 +39,9 @@ def _loan_to_response(loan: ToolLoan, db: Session) -> model.ToolLoanResponse:
     return model.ToolLoanResponse(
         loanId=loan.loanId,
         workerName=loan.workerName,
-        issued_by=_user_display_name(db, loan.issued_by),
+        issued_by=names.get(loan.issued_by),
         issued_at=loan.issued_at.isoformat() if loan.issued_at else "",
-        returned_by=_user_display_name(db, loan.returned_by),
+        returned_by=names.get(loan.returned_by),
         returned_at=loan.returned_at.isoformat() if loan.returned_at else None,
         status=loan.status,
         notes=loan.notes,
@@ -62,6 +49,20 @@ def _loan_to_response(loan: ToolLoan, db: Session) -> model.ToolLoanResponse:
     )
 
 
+def _loans_to_responses(loans: List[ToolLoan], db: Session) -> List[model.ToolLoanResponse]:
+    """
+    Map a page of loans (items already eager-loaded) with one Tool query for
+    every tool on the page and one User query for every issuer/returner, instead
+    of a query per loan for each.
+    """
+    tool_ids = {item.tool_id for loan in loans for item in loan.items}
+    tools_by_id = {}
+    if tool_ids:
+        tools_by_id = {t.toolId: t for t in db.exec(select(Tool).where(Tool.toolId.in_(tool_ids))).all()}
+    names = display_names(db, [uid for loan in loans for uid in (loan.issued_by, loan.returned_by)])
+    return [_loan_to_response(loan, tools_by_id, names) for loan in loans]
+
+
 # ── Tool Catalog ─────────────────────────────────────────────────────────────
 
 def create_tool(data: model.ToolCreate, db: Session) -> model.ToolResponse:
@@ -169,13 +170,19 @@ def get_all_loans(
     skip: int = 0,
     limit: int = 100,
 ) -> List[model.ToolLoanResponse]:
-    stmt = select(ToolLoan).order_by(ToolLoan.issued_at.desc()).offset(skip).limit(limit)
+    stmt = (
+        select(ToolLoan)
+        .options(selectinload(ToolLoan.items))
+        .order_by(ToolLoan.issued_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
     if status_filter:
         stmt = stmt.where(ToolLoan.status == status_filter)
     if worker:
         stmt = stmt.where(ToolLoan.workerName.ilike(f"%{worker}%"))
     loans = db.exec(stmt).all()
-    return [_loan_to_response(loan, db) for loan in loans]
+    return _loans_to_responses(loans, db)
 
 
 def process_return(loan_id: int, data: model.ToolReturnRequest, db: Session, current_user) -> model.ToolReturnResponse:
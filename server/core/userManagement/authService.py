@@ -1,8 +1,8 @@
 from datetime import timedelta, datetime, timezone
+from functools import lru_cache
 from typing import Annotated
 from uuid import UUID, uuid4
 from fastapi import Depends, HTTPException, status
-from passlib.context import CryptContext
 import jwt
 import json
 import logging
@@ -21,14 +21,20 @@ SECRET_KEY = settings.JWT_SECRET_KEY
 ALGORITHM = settings.JWT_ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+@lru_cache(maxsize=1)
+def _pwd_context():
+    # passlib + argon2 are only needed to hash/verify a password (login, PIN
+    # checks) — imported on first use to keep them off the startup path.
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["argon2"], deprecated="auto")
+
 auth_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
 
 def hash_password(password: str) -> str:
     """Hash a password for storing."""
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
 
 def userRegistration(register_user_request: model.UserRegistrationRequest, db: Session = Depends(get_session)) -> None:
     """Register a new user"""
@@ -85,7 +91,7 @@ def userRegistration(register_user_request: model.UserRegistrationRequest, db: S
     
 def verify_password(plain_password: str, hashed_password: str) -> bool:
         """Verify a stored password against one provided by user"""
-        return pwd_context.verify(plain_password, hashed_password)
+        return _pwd_context().verify(plain_password, hashed_password)
     
 def authenticate_user(username: str, password: str, db: Session) -> dict | bool:
     """Authenticate user by email OR username and password"""
@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Annotated
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Annotated, Optional
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlmodel import Session
 from db.database import get_session
@@ -68,6 +68,31 @@ def get_customers(
     """
     return customerService.get_all_customers(db)
 
+@router.get("/customers/search", response_model=model.CustomerPage)
+def search_customers(
+    q: Optional[str] = Query(None, description="Phone digits (prefix) or part of a name"),
+    limit: int = Query(20, ge=1, le=customerService.SEARCH_PAGE_MAX),
+    after: Optional[str] = Query(None, description="Keyset cursor: next_after of the previous page"),
+    db: Session = Depends(get_session),
+    current_user = Depends(authService.get_current_user)
+):
+    """
+    Customer lookup for the checkout picker — one keyset page of compact rows
+    with each customer's outstanding credit. Replaces downloading every
+    customer with GET /customers.
+    """
+    return customerService.search_customers(db, q, limit, after)
+
+@router.get("/customers/recent", response_model=List[model.CustomerSummary])
+def get_recent_customers(
+    db: Session = Depends(get_session),
+    current_user = Depends(authService.get_current_user)
+):
+    """
+    The calling cashier's most recently served customers, most recent first.
+    """
+    return customerService.recent_customers(db, current_user)
+
 
 # ---------------------------------------------------------------------------
 # User Management Endpoints
@@ -1,9 +1,20 @@
+import base64
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
 from fastapi import HTTPException, Depends
 from .authService import get_current_user
+from entities.customerReceivables import CustomerReceivable
 from entities.customers import Customer
+from entities.orders import Order
+from config import settings
 from db.database import get_session
 from loggiing import logger
-from sqlmodel import Session
+from sqlmodel import Session, select
+from sqlalchemy import func, tuple_
 from utils import require_role
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from . import model
@@ -23,6 +34,8 @@ def create_customerAccount(customer_info: model.CustomerCreateRequest, db: Sessi
         db.add(new_customerAccount)
         db.commit()
         db.refresh(new_customerAccount)
+        if current_user is not None:
+            note_recent_customer(current_user.userId, new_customerAccount.customerId)
         
         logger.info("customer created successfully")
         return model.CustomerCreateResponse(
@@ -48,3 +61,159 @@ def get_all_customers(db: Session = Depends(get_session)):
     except Exception as e:
         logger.error(f"Error retrieving customers: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
+
+
+# ---------------------------------------------------------------------------
+# Lookup — the checkout customer picker
+# ---------------------------------------------------------------------------
+# The picker used to download every customer (GET /users/customers) and search
+# them in the browser; walk-in credit sales add customers every day. Now it asks
+# for a page at a time:
+#   - a query that looks like a phone number is a prefix match on its digits
+#     (ix_customers_phone_digits — "0712 345" finds "0712345678"), ordered by
+#     number;
+#   - anything else matches names by substring (ILIKE through the
+#     ix_customers_name_trgm trigram index), ordered by name;
+#   - no query lists everyone by name.
+# Pages are keyset pages: `next_after` is an opaque cursor holding the last
+# row's sort key and id, so page N costs what page 1 does. Rows are a compact
+# projection with the customer's outstanding credit, read from the receivables
+# summary (financials/receivablesService.py) — one keyed lookup per page.
+# The picker opens on the cashier's recent customers instead of a search.
+
+SEARCH_PAGE_MAX = 50
+_PHONE_QUERY_RE = re.compile(r"^\+?(?=.*\d)[\d\s\-\(\)]+$")
+
+_recent: Dict[str, "OrderedDict[int, None]"] = {}  # cashier userId -> customerIds, most recent last
+_recent_lock = threading.Lock()
+
+
+def phone_digits(value: str) -> str:
+    return re.sub(r"\D", "", value or "")
+
+
+def _phone_key():
+    # Must match ix_customers_phone_digits' expression for the index to apply
+    return func.regexp_replace(Customer.phoneNumber, "[^0-9]", "", "g")
+
+
+def _encode_cursor(key: str, customer_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([key, customer_id]).encode()).decode()
+
+
+def _decode_cursor(after: str) -> tuple:
+    try:
+        key, customer_id = json.loads(base64.urlsafe_b64decode(after.encode()))
+        return str(key), int(customer_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _with_balances(rows, db: Session) -> List[dict]:
+    """Compact CustomerSummary dicts for `rows` (customerId, name, phoneNumber,
+    type), with each customer's open credit."""
+    ids = [r.customerId for r in rows]
+    balances = {}
+    if ids:
+        balances = {
+            cid: (due, count)
+            for cid, due, count in db.exec(
+                select(CustomerReceivable.customerId, CustomerReceivable.outstanding, CustomerReceivable.open_credits)
+                .where(CustomerReceivable.customerId.in_(ids))
+            ).all()
+        }
+    return [
+        {
+            "customerId": r.customerId,
+            "name": r.name,
+            "phoneNumber": r.phoneNumber,
+            "type": r.type,
+            "balance": round(float(balances.get(r.customerId, (0, 0))[0] or 0), 2),
+            "open_credits": balances.get(r.customerId, (0, 0))[1],
+        }
+        for r in rows
+    ]
+
+
+_SUMMARY_COLUMNS = (Customer.customerId, Customer.name, Customer.phoneNumber, Customer.type)
+
+
+def search_customers(db: Session, q: Optional[str], limit: int = 20, after: Optional[str] = None) -> dict:
+    """One keyset page of customers matching `q` (see above). Returns
+    {"items": [CustomerSummary], "next_after": cursor or None on the last page}."""
+    try:
+        limit = max(1, min(limit, SEARCH_PAGE_MAX))
+        q = (q or "").strip()
+        if _PHONE_QUERY_RE.match(q):
+            key = _phone_key()
+            stmt = select(*_SUMMARY_COLUMNS, key.label("sort_key")).where(key.like(f"{phone_digits(q)}%"))
+        else:
+            key = Customer.name
+            stmt = select(*_SUMMARY_COLUMNS, key.label("sort_key"))
+            if q:
+                pattern = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                stmt = stmt.where(Customer.name.ilike(pattern, escape="\\"))
+        if after:
+            last_key, last_id = _decode_cursor(after)
+            stmt = stmt.where(tuple_(key, Customer.customerId) > tuple_(last_key, last_id))
+        rows = db.exec(stmt.order_by(key, Customer.customerId).limit(limit + 1)).all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "items": _with_balances(rows, db),
+            "next_after": _encode_cursor(rows[-1].sort_key, rows[-1].customerId) if has_more else None,
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error searching customers: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+def note_recent_customer(user_id, customer_id: Optional[int]) -> None:
+    """Moves `customer_id` to the front of the cashier's recent list (called
+    after an order or a registration commits)."""
+    if not customer_id:
+        return
+    with _recent_lock:
+        recent = _recent.get(str(user_id))
+        if recent is None:
+            return  # not loaded yet — the first read seeds it from orders, this one included
+        recent.pop(customer_id, None)
+        recent[customer_id] = None
+        while len(recent) > settings.RECENT_CUSTOMERS_PER_CASHIER:
+            recent.popitem(last=False)
+
+
+def _recent_ids(db: Session, user_id) -> List[int]:
+    key = str(user_id)
+    with _recent_lock:
+        recent = _recent.get(key)
+        if recent is not None:
+            return list(reversed(recent))
+    # First look since the server started: the cashier's latest orders
+    # (orders.servedby is indexed)
+    rows = db.exec(
+        select(Order.customerid, func.max(Order.orderId).label("last_order"))
+        .where(Order.servedby == user_id, Order.customerid.is_not(None))
+        .group_by(Order.customerid)
+        .order_by(func.max(Order.orderId).desc())
+        .limit(settings.RECENT_CUSTOMERS_PER_CASHIER)
+    ).all()
+    with _recent_lock:
+        recent = _recent.setdefault(key, OrderedDict((r.customerid, None) for r in reversed(rows)))
+        return list(reversed(recent))
+
+
+def recent_customers(db: Session, current_user) -> List[dict]:
+    """The cashier's most recently served customers, most recent first."""
+    try:
+        ids = _recent_ids(db, current_user.userId)
+        if not ids:
+            return []
+        rows = {r.customerId: r for r in db.exec(select(*_SUMMARY_COLUMNS).where(Customer.customerId.in_(ids))).all()}
+        return _with_balances([rows[i] for i in ids if i in rows], db)
+    except Exception as e:
+        logger.error(f"Error loading recent customers for {current_user.userId}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
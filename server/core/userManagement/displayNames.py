@@ -0,0 +1,66 @@
+"""
+Per-request user display-name cache.
+
+Several responses show *who* did something — tool loans' issued_by /
+returned_by, orders' servedBy, audit history's edited_by — and resolving each
+one with its own `db.get(User, ...)` turns a list page into one query per row.
+Services instead hand every user id they are about to render to
+`display_names()`, which resolves the ones not seen yet in ONE query and keeps
+the result on the session.
+
+The cache lives in `Session.info`, and get_session() opens one session per
+request, so it is scoped to the request: nothing leaks between requests, and a
+renamed user shows up on the next one.
+"""
+
+from typing import Dict, Iterable, Optional
+from uuid import UUID
+
+from sqlmodel import Session, select
+
+from entities.users import User
+
+_CACHE_KEY = "user_display_names"
+
+
+def _format(first_name: str, second_name: Optional[str]) -> str:
+    return f"{first_name} {second_name}".strip() if second_name else first_name
+
+
+def _as_uuid(user_id) -> Optional[UUID]:
+    if not user_id:
+        return None
+    if isinstance(user_id, UUID):
+        return user_id
+    try:
+        return UUID(str(user_id))
+    except ValueError:
+        return None
+
+
+def display_names(db: Session, user_ids: Iterable) -> Dict[UUID, Optional[str]]:
+    """
+    Map each user id in `user_ids` to "firstName secondName" (None for unknown
+    users). Ids already cached on this session cost nothing; the rest are
+    fetched together with a single SELECT.
+    """
+    cache: Dict[UUID, Optional[str]] = db.info.setdefault(_CACHE_KEY, {})
+    wanted = {uid for uid in map(_as_uuid, user_ids) if uid is not None}
+    missing = wanted - cache.keys()
+    if missing:
+        rows = db.exec(
+            select(User.userId, User.firstName, User.secondName).where(User.userId.in_(missing))
+        ).all()
+        for user_id, first_name, second_name in rows:
+            cache[user_id] = _format(first_name, second_name)
+        for user_id in missing - {row[0] for row in rows}:
+            cache[user_id] = None
+    return {uid: cache[uid] for uid in wanted}
+
+
+def display_name(db: Session, user_id) -> Optional[str]:
+    """Single-id convenience over display_names()."""
+    uid = _as_uuid(user_id)
+    if uid is None:
+        return None
+    return display_names(db, [uid]).get(uid)
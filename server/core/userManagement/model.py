@@ -80,3 +80,18 @@ class CustomerResponse(BaseModel):
     name: str
     phoneNumber: str
     type: str # 'registered', 'corporate', etc.
+
+class CustomerSummary(BaseModel):
+    """Compact customer row for the checkout picker — with what they owe."""
+    customerId: int
+    name: str
+    phoneNumber: str
+    type: str
+    balance: float  # unpaid amount_due across open credits
+    open_credits: int
+
+class CustomerPage(BaseModel):
+    """One keyset page. Pass `next_after` back as `after` for the next page;
+    it's None on the last page."""
+    items: list[CustomerSummary]
+    next_after: Optional[str] = None
@@ -10,7 +10,7 @@ import os
 # Add the server directory to the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from db import create_db_and_tables, engine
+from db.database import create_db_and_tables, engine
 from entities import *  # Import all models to register them with SQLModel
 
 def main():
@@ -19,7 +19,7 @@ def main():
     
     try:
         # Create all tables
-        create_db_and_tables()
+        create_db_and_tables(force=True)
         print("✅ All tables created successfully!")
         
         # Print table information
@@ -1,19 +1,44 @@
 from sqlmodel import SQLModel, create_engine
 from sqlalchemy import Engine, event, text
-from sqlalchemy.pool import QueuePool
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateSequence, CreateTable
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, QueuePool
 from typing import Generator
 from sqlmodel import Session
 import sys
 import os
+import time
+import hashlib
 import logging
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import settings
+from monitoring.instrumentation import install_query_counter
+from monitoring import metrics
 
 logger = logging.getLogger(__name__)
 
 DATABASE_URL = settings.get_database_url()
 
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection
+    (and how many gave up after pool_timeout) — see monitoring/metrics.py.
+    Pool events only fire once a connection is already handed out, so the wait
+    itself can only be measured around _do_get."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            metrics.db_pool_checkout_timeouts.inc()
+            raise
+        finally:
+            metrics.db_pool_checkout_wait.observe(time.perf_counter() - start)
+
+
 # ── Connection Pool Configuration ──────────────────────────────────────────
 # QueuePool with tuned settings for a POS workload:
 #   - pool_size: persistent connections kept alive
@@ -25,7 +50,7 @@ DATABASE_URL = settings.get_database_url()
 engine: Engine = create_engine(
     DATABASE_URL,
     echo=settings.DEBUG,
-    poolclass=QueuePool,
+    poolclass=InstrumentedQueuePool,
     pool_size=10,
     max_overflow=20,
     pool_timeout=30,
@@ -38,6 +63,30 @@ engine: Engine = create_engine(
     },
 )
 
+# ── Export connections ──────────────────────────────────────────────────────
+# Streamed exports (core/exports) can run for minutes while a slow client reads
+# a year of rows. They get their own unpooled connections so they never hold
+# one of the pool's slots, with a longer statement timeout (the first fetch of
+# a big sorted export does all the sorting) and an idle-in-transaction timeout
+# so a client that stops reading can't pin a snapshot open indefinitely.
+export_engine: Engine = create_engine(
+    DATABASE_URL,
+    poolclass=NullPool,
+    connect_args={
+        "connect_timeout": 10,
+        "application_name": "EmiratesCo-API-export",
+        "options": (
+            f"-c statement_timeout={settings.EXPORT_STATEMENT_TIMEOUT * 1000} "
+            f"-c idle_in_transaction_session_timeout={settings.EXPORT_IDLE_TIMEOUT * 1000}"
+        ),
+    },
+)
+
+# Per-request query count / DB time, surfaced in the Server-Timing header (see
+# monitoring/instrumentation.py and the timing middleware in main.py).
+install_query_counter(engine)
+metrics.register_pool_gauges(engine)
+
 # ── Session-level performance settings ─────────────────────────────────────
 @event.listens_for(engine, "connect")
 def set_session_defaults(dbapi_connection, connection_record):
@@ -52,10 +101,67 @@ def set_session_defaults(dbapi_connection, connection_record):
         logger.warning(f"Could not set session defaults: {e}")
 
 
-def create_db_and_tables():
-    """Create all database tables defined in SQLModel metadata."""
+# ── Schema fingerprint (fast start) ─────────────────────────────────────────
+# create_all() reflects every table on every boot. Instead, hash the DDL the
+# models would emit and keep the hash in system_settings: when it matches, the
+# database already has this exact schema and create_all() is skipped, so a
+# restart costs a single-row SELECT. Any model change (new table, column, index,
+# type) changes the hash and the next boot runs create_all() as before. A
+# missing system_settings table just reads as "no fingerprint".
+SCHEMA_FINGERPRINT_KEY = "schema_fingerprint"
+
+
+def schema_fingerprint() -> str:
+    """SHA-256 of the CREATE statements for every table, index and sequence in
+    SQLModel.metadata, compiled for Postgres so it doesn't depend on the URL."""
+    dialect = postgresql.dialect()
+    ddl = []
+    for table in sorted(SQLModel.metadata.tables.values(), key=lambda t: t.name):
+        ddl.append(str(CreateTable(table).compile(dialect=dialect)))
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            ddl.append(str(CreateIndex(index).compile(dialect=dialect)))
+    for name in sorted(SQLModel.metadata._sequences):
+        ddl.append(str(CreateSequence(SQLModel.metadata._sequences[name]).compile(dialect=dialect)))
+    return hashlib.sha256("\n".join(ddl).encode("utf-8")).hexdigest()
+
+
+def _stored_schema_fingerprint():
+    try:
+        with engine.connect() as conn:
+            return conn.execute(
+                text("SELECT value FROM system_settings WHERE key = :key"), {"key": SCHEMA_FINGERPRINT_KEY}
+            ).scalar()
+    except Exception:
+        return None
+
+
+def _store_schema_fingerprint(fingerprint: str) -> None:
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO system_settings (key, value) VALUES (:key, :value) "
+                "ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, updated_at = now()"
+            ),
+            {"key": SCHEMA_FINGERPRINT_KEY, "value": fingerprint},
+        )
+
+
+def create_db_and_tables(force: bool = False) -> bool:
+    """
+    Create all database tables defined in SQLModel metadata — unless the stored
+    schema fingerprint says they already match (see above). `force=True`
+    (create_tables.py, SCHEMA_CHECK_ON_START=always) always runs create_all.
+    Returns True when create_all actually ran.
+    """
+    fingerprint = schema_fingerprint()
+    if not force and _stored_schema_fingerprint() == fingerprint:
+        logger.info(f"Schema fingerprint {fingerprint[:12]} unchanged — skipping create_all.")
+        return False
+
     SQLModel.metadata.create_all(engine)
-    logger.info("Database tables verified/created.")
+    _store_schema_fingerprint(fingerprint)
+    logger.info(f"Database tables verified/created (schema fingerprint {fingerprint[:12]}).")
+    return True
 
 
 def get_session() -> Generator[Session, None, None]:
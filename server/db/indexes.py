@@ -0,0 +1,29 @@
+"""
+Index builds shared by the migrate_*.py scripts.
+
+CREATE INDEX CONCURRENTLY doesn't block writes while it builds, but a build
+that fails or is interrupted half-way leaves an INVALID index behind — one
+the planner never uses and that CREATE INDEX ... IF NOT EXISTS would keep
+skipping on every re-run.
+"""
+
+
+def create_index_concurrently(cur, name: str, ddl: str) -> None:
+    """
+    Runs `ddl` (a CREATE INDEX CONCURRENTLY IF NOT EXISTS for index `name`)
+    on `cur`, first dropping an invalid index of that name left by an
+    interrupted build so it is built again. `cur` must belong to an
+    autocommit connection: neither statement can run in a transaction block.
+    """
+    cur.execute(
+        "SELECT i.indisvalid FROM pg_index i "
+        "JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = %s",
+        (name,),
+    )
+    row = cur.fetchone()
+    if row and not row[0]:
+        print(f"{name}: found invalid (interrupted build), dropping...")
+        cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    print(f"{name}: creating (if missing)...")
+    cur.execute(ddl)
+    print("  Done.")
@@ -0,0 +1,93 @@
+"""
+Replays a whole transaction when Postgres aborts it as a deadlock victim or a
+serialization failure, or when a compare-and-swap stock write kept losing to
+concurrent updates (StaleDataError, see core/inventory/stockConcurrency.py).
+
+These all mean "nothing of yours was applied, run it again" — the
+transaction lost a race, it isn't wrong. Checkout and order edits used to turn
+them into a 500 for the cashier; run_with_retry rolls the session back and
+calls the function again, after a jittered exponential backoff so the two
+colliding transactions don't collide again in lock-step. Each replay and each
+give-up is counted in monitoring/metrics.py (db_transaction_retries_total,
+db_transaction_retries_exhausted_total) by operation and reason.
+
+The function must be the WHOLE transaction — everything from its first
+statement to its commit — and must not keep ORM objects across attempts
+(they are expired by the rollback); re-read what it needs each time.
+"""
+
+import random
+import time
+from typing import Callable, Optional, TypeVar
+
+from fastapi import HTTPException
+from sqlalchemy.orm.exc import StaleDataError
+from sqlmodel import Session
+
+from config import settings
+from loggiing import logger
+from monitoring import metrics
+
+T = TypeVar("T")
+
+# SQLSTATE -> metrics reason
+RETRYABLE_SQLSTATES = {
+    "40001": "serialization_failure",
+    "40P01": "deadlock",
+}
+
+
+def retry_reason(exc: BaseException) -> Optional[str]:
+    """The retry reason if `exc` (or what it wraps — SQLAlchemy's DBAPIError
+    .orig, or an explicit `raise ... from`) is a deadlock/serialization
+    failure or a stale row version, else None."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, StaleDataError):
+            return "stale_version"
+        code = getattr(exc, "pgcode", None) or getattr(getattr(exc, "orig", None), "pgcode", None)
+        if code in RETRYABLE_SQLSTATES:
+            return RETRYABLE_SQLSTATES[code]
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(max, base * 2^(attempt-1))]."""
+    cap = min(settings.TX_RETRY_MAX_DELAY, settings.TX_RETRY_BASE_DELAY * (2 ** (attempt - 1)))
+    return random.uniform(0, cap)
+
+
+def run_with_retry(db: Session, fn: Callable[[], T], operation: str, attempts: Optional[int] = None) -> T:
+    """
+    Calls fn() and returns its result; on a deadlock/serialization failure,
+    rolls `db` back, sleeps backoff_delay() and calls it again — up to
+    `attempts` calls in total (TX_RETRY_ATTEMPTS). When they are used up the
+    request fails with a 503 the till can simply resubmit. Any other exception
+    propagates unchanged.
+
+    The backoff blocks the calling thread, so the endpoints that use this are
+    plain `def` (FastAPI runs them in the threadpool) — never `async def`,
+    where it would stall the event loop and every WebSocket with it.
+    """
+    attempts = attempts or settings.TX_RETRY_ATTEMPTS
+    for attempt in range(1, attempts + 1):
+        try:
+            return fn()
+        except Exception as e:
+            reason = retry_reason(e)
+            if reason is None:
+                raise
+            db.rollback()
+            if attempt >= attempts:
+                metrics.db_transaction_retries_exhausted.inc(operation=operation, reason=reason)
+                logger.error(f"{operation}: gave up after {attempts} attempts ({reason})")
+                raise HTTPException(
+                    status_code=503,
+                    detail="The system is busy with another sale of the same items. Please try again.",
+                ) from e
+            delay = backoff_delay(attempt)
+            metrics.db_transaction_retries.inc(operation=operation, reason=reason)
+            logger.warning(f"{operation}: {reason} on attempt {attempt}/{attempts}, retrying in {delay * 1000:.0f} ms")
+            time.sleep(delay)
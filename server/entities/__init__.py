@@ -1,3 +1,6 @@
+from sqlalchemy import DDL, event
+from sqlmodel import SQLModel
+
 from .users import User
 from .customers import Customer
 from .products import Product
@@ -7,13 +10,22 @@ from .invoices import Invoice      # Must be before Order (Order has FK → invo
 from .orders import Order
 from .orderItems import OrderItem
 from .offcuts import Offcut
+from .offcutEvents import OffcutEvent
 from .payments import Payment
 from .credits import Credit
+from .customerReceivables import CustomerReceivable
 from .messages import Message, MessageRecipient
 from .editHistory import EditHistory
 from .settings import SystemSetting
 from .tools import Tool, ToolLoan, ToolLoanItem
 
+# The search indexes (products, variants, customers) use gin_trgm_ops — the
+# extension has to exist before create_all builds any of them
+event.listen(
+    SQLModel.metadata, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
 __all__ = [
     "User",
     "Customer",
@@ -25,8 +37,10 @@ __all__ = [
     "Order",
     "OrderItem",
     "Offcut",
+    "OffcutEvent",
     "Payment",
     "Credit",
+    "CustomerReceivable",
     "Message",
     "MessageRecipient",
     "EditHistory",
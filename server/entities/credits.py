@@ -1,11 +1,15 @@
 from sqlmodel import Field, SQLModel, Relationship
-from sqlalchemy import Enum, func, Column
+from sqlalchemy import Enum, func, Column, Index, text
 from typing import List, Optional
 from datetime import datetime
 
 class Credit(SQLModel, table= True):
 
     __tablename__ = "credits"
+    __table_args__ = (
+        # A customer's open credits — what receivablesService.refresh_customer sums
+        Index("ix_credits_customer_open", "customerId", postgresql_where=text("status <> 'Paid'")),
+    )
 
     creditId: Optional[int] = Field(default=None, primary_key= True)
     orderId: int = Field(foreign_key = "orders.orderId", nullable= False)
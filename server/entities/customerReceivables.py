@@ -0,0 +1,37 @@
+from sqlmodel import Field, SQLModel
+from sqlalchemy import Index, func
+from typing import Optional
+from datetime import date, datetime
+
+
+class CustomerReceivable(SQLModel, table=True):
+    """
+    A customer's open credit, summarised: what they owe, since when, and how old
+    it is. Maintained in the same transaction as every write to their credits
+    (see core/financials/receivablesService.py) — the aging report and the
+    customer lookup read this instead of walking the credits table.
+
+    Buckets split the open amount_due by the age of each credit (days since its
+    createdAt) as of `aged_on`; credits age while nothing is written, so rows
+    older than today are re-aged by the nightly reconciliation.
+    """
+    __tablename__ = "customer_receivables"
+    __table_args__ = (
+        # Aging report: largest debtors first
+        Index("ix_customer_receivables_outstanding", "outstanding"),
+    )
+
+    customerId: int = Field(foreign_key="customers.customerId", primary_key=True)
+    outstanding: float = Field(default=0.0, nullable=False)
+    open_credits: int = Field(default=0, nullable=False)
+    oldest_unpaid_at: Optional[datetime] = Field(default=None, nullable=True)
+
+    due_0_30: float = Field(default=0.0, nullable=False)
+    due_31_60: float = Field(default=0.0, nullable=False)
+    due_61_90: float = Field(default=0.0, nullable=False)
+    due_over_90: float = Field(default=0.0, nullable=False)
+    aged_on: date = Field(nullable=False)
+
+    # Bumped on every write; re-aging only lands if no credit write got there first
+    version: int = Field(default=0, nullable=False)
+    updated_at: datetime = Field(sa_column_kwargs={"server_default": func.now(), "onupdate": func.now()})
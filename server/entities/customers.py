@@ -1,11 +1,16 @@
 from sqlmodel import Field, SQLModel, Relationship
-from sqlalchemy import func, Enum
+from sqlalchemy import func, Enum, Index
 from typing import Optional, List
 from datetime import datetime
 
 class Customer(SQLModel, table=True):
 
     __tablename__ = "customers"
+    __table_args__ = (
+        # Customer lookup (userManagement/customerService.search_customers):
+        # name ILIKE '%term%' through trigrams
+        Index("ix_customers_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
 
     customerId: Optional[int] = Field(default= None, primary_key= True)
     name: str = Field(nullable= False)
@@ -15,3 +20,11 @@ class Customer(SQLModel, table=True):
     
     credits: List["Credit"] = Relationship(back_populates="customer")
     orders: List["Order"] = Relationship(back_populates="customer")
+
+
+# Phone prefix lookup on the digits only (see customerService.phone_digits)
+Index(
+    "ix_customers_phone_digits",
+    func.regexp_replace(Customer.__table__.c.phoneNumber, "[^0-9]", "", "g").label("phone_digits"),
+    postgresql_ops={"phone_digits": "text_pattern_ops"},
+).ddl_if(dialect="postgresql")
@@ -1,11 +1,12 @@
 from sqlmodel import SQLModel, Field, Column
-from sqlalchemy import JSON, func
+from sqlalchemy import func
 from typing import Optional, Dict, Any
 from datetime import datetime
 from uuid import UUID
+from .jsonTypes import MutableJSONDict, TracksJSONMutations
 
 
-class EditHistory(SQLModel, table=True):
+class EditHistory(TracksJSONMutations, SQLModel, table=True):
     __tablename__ = "edit_history"
 
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -14,6 +15,6 @@ class EditHistory(SQLModel, table=True):
     edited_by: UUID = Field(foreign_key="users.userId", index=True)
     edited_at: datetime = Field(sa_column_kwargs={"server_default": func.now()}, index=True)
     action: str = Field(default="edit")            # 'edit' | 'restock' | 'delete'
-    before_snapshot: Dict[str, Any] = Field(default={}, sa_column=Column(JSON))
-    after_snapshot: Dict[str, Any] = Field(default={}, sa_column=Column(JSON))
+    before_snapshot: Dict[str, Any] = Field(default={}, sa_column=Column(MutableJSONDict))
+    after_snapshot: Dict[str, Any] = Field(default={}, sa_column=Column(MutableJSONDict))
     notes: Optional[str] = Field(default=None)
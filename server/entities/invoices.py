@@ -1,11 +1,28 @@
 from sqlmodel import Field, SQLModel, Relationship
-from sqlalchemy import Column, JSON, Enum, func
+from sqlalchemy import Column, Enum, Sequence, String, func, literal, select
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from uuid import UUID
+from .jsonTypes import MutableJSONList, TracksJSONMutations
 
 
-class Invoice(SQLModel, table=True):
+# Invoice numbers come from their own sequence, assigned inside the INSERT itself
+# (see Invoice.invoice_number) — no "read the max, add one" race between two
+# cashiers, and no extra query. Seeded from existing numbers by
+# migrate_invoice_number_sequence.py.
+invoice_number_seq = Sequence("invoice_number_seq", metadata=SQLModel.metadata)
+
+# 'INV-' + the next value, zero-padded to at least 6 digits (INV-000042). A
+# scalar subquery so nextval() is evaluated once and can be both measured and
+# padded; rendered inline in the INSERT's VALUES, which (unlike a column
+# DEFAULT) may contain one.
+_seq_value = select(invoice_number_seq.next_value().cast(String).label("n")).subquery()
+_next_invoice_number = select(
+    literal("INV-").concat(func.lpad(_seq_value.c.n, func.greatest(6, func.length(_seq_value.c.n)), "0"))
+).scalar_subquery()
+
+
+class Invoice(TracksJSONMutations, SQLModel, table=True):
     """
     Stores customer-facing quotations / proforma invoices.
 
@@ -21,11 +38,17 @@ class Invoice(SQLModel, table=True):
     """
 
     __tablename__ = "invoices"
+    # Fetch invoice_number via RETURNING on INSERT instead of a follow-up SELECT.
+    __mapper_args__ = {"eager_defaults": True}
 
     invoiceId: Optional[int] = Field(default=None, primary_key=True)
 
-    # Auto-generated human-readable number e.g. "INV-000042"
-    invoice_number: str = Field(nullable=False, index=True)
+    # Auto-generated human-readable number e.g. "INV-000042" — assigned by the
+    # database on INSERT from invoice_number_seq; leave it unset when creating.
+    invoice_number: Optional[str] = Field(
+        default=None,
+        sa_column=Column(String, nullable=False, unique=True, index=True, default=_next_invoice_number),
+    )
 
     # Customer — registered or guest
     customer_id: Optional[int] = Field(default=None, foreign_key="customers.customerId")
@@ -52,9 +75,13 @@ class Invoice(SQLModel, table=True):
     # Full cart snapshot — list of items with all calculated details
     # Same structure as CartContext items so the frontend can reconstruct the cart
     items: List[Dict[str, Any]] = Field(
-        default_factory=list, sa_column=Column(JSON, nullable=False)
+        default_factory=list, sa_column=Column(MutableJSONList, nullable=False)
     )
 
+    # len(items), kept in step with it on every write so the list endpoint can
+    # show "N items" without loading (and decoding) the cart JSON at all.
+    item_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+
     notes: Optional[str] = Field(default=None)
 
     # Status
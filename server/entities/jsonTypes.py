@@ -0,0 +1,221 @@
+"""
+Column types for the JSON documents stored on rows (order item details, invoice
+carts, category sub-categories, edit-history snapshots).
+
+JSONDocument is JSONB on Postgres — decomposed binary storage that can back GIN
+and expression indexes, instead of the plain `json` text SQLAlchemy's generic
+JSON type maps to — and the generic JSON type everywhere else (sqlite tests).
+
+MutableJSONDict / MutableJSONList track in-place changes at ANY depth. The
+stock SQLAlchemy MutableDict only notices top-level assignments, so code that
+appends to details["lineItems"][i]["offcut_sources"] had to call flag_modified
+(or reassign a copy of the whole document) for the UPDATE to happen. Here every
+nested dict/list is wrapped on the way in and reports changes to the document
+that owns it, which flags the column on the row.
+
+Wrapping happens when a document is loaded or assigned, and when a dict/list is
+stored into one; a container taken from one document and stored into another is
+copied, so each nested object belongs to exactly one document. Tables with these
+columns also inherit TracksJSONMutations (see below) — without it, documents on
+rows built in Python rather than loaded are never wrapped.
+"""
+
+from sqlalchemy import JSON, inspect
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.mutable import Mutable
+from sqlalchemy.orm.attributes import instance_state
+
+
+
+def JSONDocument():
+    """A fresh JSON/JSONB column type. Each Mutable.as_mutable() below needs its
+    own instance — it tracks every column built on the instance it is given."""
+    return JSON().with_variant(JSONB(), "postgresql")
+
+
+class _Nested:
+    """Shared plumbing: `_root` is the top-level Mutable this container belongs
+    to (itself for the top level)."""
+
+    _root = None
+
+    def _wrap(self, value):
+        if isinstance(value, dict):
+            if isinstance(value, NestedMutableDict) and value._root is self._root:
+                return value
+            return NestedMutableDict(value, root=self._root)
+        if isinstance(value, list):
+            if isinstance(value, NestedMutableList) and value._root is self._root:
+                return value
+            return NestedMutableList(value, root=self._root)
+        return value
+
+    def changed(self) -> None:
+        root = self._root
+        if root is None or root is self:
+            Mutable.changed(self)
+        else:
+            root.changed()
+
+
+class NestedMutableDict(_Nested, Mutable, dict):
+    def __init__(self, value=(), root=None):
+        dict.__init__(self)
+        self._root = root if root is not None else self
+        for key, item in dict(value).items():
+            dict.__setitem__(self, key, self._wrap(item))
+
+    @classmethod
+    def coerce(cls, key, value):
+        if isinstance(value, cls) and value._root is value:
+            return value
+        if isinstance(value, dict):
+            return cls(value)
+        return Mutable.coerce(key, value)
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, self._wrap(value))
+        self.changed()
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self.changed()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            dict.__setitem__(self, key, self._wrap(value))
+        self.changed()
+
+    def pop(self, *args):
+        result = dict.pop(self, *args)
+        self.changed()
+        return result
+
+    def popitem(self):
+        result = dict.popitem(self)
+        self.changed()
+        return result
+
+    def clear(self):
+        dict.clear(self)
+        self.changed()
+
+    def __reduce_ex__(self, protocol):
+        # copy/deepcopy/pickle rebuild a fresh top-level document
+        return (self.__class__, (dict(self),))
+
+
+class NestedMutableList(_Nested, Mutable, list):
+    def __init__(self, value=(), root=None):
+        list.__init__(self)
+        self._root = root if root is not None else self
+        list.extend(self, (self._wrap(item) for item in value))
+
+    @classmethod
+    def coerce(cls, key, value):
+        if isinstance(value, cls) and value._root is value:
+            return value
+        if isinstance(value, list):
+            return cls(value)
+        return Mutable.coerce(key, value)
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            list.__setitem__(self, index, [self._wrap(item) for item in value])
+        else:
+            list.__setitem__(self, index, self._wrap(value))
+        self.changed()
+
+    def __delitem__(self, index):
+        list.__delitem__(self, index)
+        self.changed()
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def append(self, value):
+        list.append(self, self._wrap(value))
+        self.changed()
+
+    def extend(self, values):
+        list.extend(self, [self._wrap(item) for item in values])
+        self.changed()
+
+    def insert(self, index, value):
+        list.insert(self, index, self._wrap(value))
+        self.changed()
+
+    def pop(self, *args):
+        result = list.pop(self, *args)
+        self.changed()
+        return result
+
+    def remove(self, value):
+        list.remove(self, value)
+        self.changed()
+
+    def clear(self):
+        list.clear(self)
+        self.changed()
+
+    def sort(self, **kwargs):
+        list.sort(self, **kwargs)
+        self.changed()
+
+    def reverse(self):
+        list.reverse(self)
+        self.changed()
+
+    def __reduce_ex__(self, protocol):
+        # copy/deepcopy/pickle rebuild a fresh top-level document
+        return (self.__class__, (list(self),))
+
+
+MutableJSONDict = NestedMutableDict.as_mutable(JSONDocument())
+MutableJSONList = NestedMutableList.as_mutable(JSONDocument())
+
+_MUTABLE_TYPES = ((MutableJSONDict, NestedMutableDict), (MutableJSONList, NestedMutableList))
+_tracked_attributes: dict = {}
+
+
+def _tracked(cls) -> dict:
+    """{attribute name: wrapper class} for a table's mutable JSON columns."""
+    tracked = _tracked_attributes.get(cls)
+    if tracked is None:
+        tracked = _tracked_attributes[cls] = {
+            prop.key: wrapper
+            for prop in inspect(cls).column_attrs
+            for sqltype, wrapper in _MUTABLE_TYPES
+            if prop.columns[0].type is sqltype
+        }
+    return tracked
+
+
+class TracksJSONMutations:
+    """
+    Mixin for SQLModel tables with MutableJSONDict / MutableJSONList columns;
+    list it before SQLModel in the bases.
+
+    SQLModel.__setattr__ (which its __init__ goes through too) sets the value on
+    the SQLAlchemy side — where the Mutable type swaps it for its wrapper — and
+    then on the pydantic side, which stores the caller's plain dict/list right
+    back over the wrapper. This puts the wrapper back, so in-place changes to a
+    new OrderItem's details are tracked too — e.g. offcut_sources attached after
+    an autoflush already INSERTed it.
+    """
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if isinstance(value, (dict, list)) and not isinstance(value, Mutable):
+            wrapper = _tracked(type(self)).get(name)
+            if wrapper is not None:
+                state = instance_state(self)
+                wrapped = wrapper.coerce(name, value)
+                state.dict[name] = wrapped
+                wrapped._parents[state] = name
@@ -1,5 +1,5 @@
 from sqlmodel import Field, SQLModel, Relationship
-from sqlalchemy import Enum, func
+from sqlalchemy import Enum, Index, func
 from typing import Optional, List
 from datetime import datetime
 from uuid import UUID
@@ -21,6 +21,11 @@ class Message(SQLModel, table=True):
 class MessageRecipient(SQLModel, table=True):
 
     __tablename__ = "messageRecipients"
+    # Inbox keyset pages and unread filters: WHERE recipientUserId = ? [AND has_read = ?]
+    # AND messageId < ? ORDER BY messageId DESC — all served from this one index.
+    __table_args__ = (
+        Index("ix_messageRecipients_inbox", "recipientUserId", "has_read", "messageId"),
+    )
 
     messageRecipientId: Optional[int] = Field(default=None, primary_key=True)
     messageId: int = Field(foreign_key="messages.messageId")
@@ -0,0 +1,55 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+from typing import Optional
+from datetime import datetime
+
+
+class OffcutEvent(SQLModel, table=True):
+    """
+    One physical fact of a cut, written in the same transaction as the stock/offcut
+    mutation it describes (see core/inventory/offcutEvents.py):
+
+      kind="consume"    — one source unit used: an existing offcut (source_offcut_id),
+                          a fresh sheet (2D) or a full bar (1D).
+      kind="remainder"  — a leftover that consumption produced (produced_offcut_id),
+                          available or scrap.
+
+    Rows from one consumption share a group_id, which is also stamped on the matching
+    OrderItem.details["lineItems"][i]["offcut_sources"] entry — the JSON stays the
+    display record, this table is what restore/correction and reporting read.
+    Restoring sets reversed_at instead of deleting, so history survives order edits.
+    """
+    __tablename__ = "offcut_events"
+    __table_args__ = (
+        Index("ix_offcut_events_variant_created", "variant_id", "created_at"),
+    )
+
+    eventId: Optional[int] = Field(default=None, primary_key=True)
+    group_id: str = Field(nullable=False, index=True)
+    kind: str = Field(nullable=False)  # "consume" | "remainder"
+
+    # The OrderItem whose cutting job this was. Deliberately not a foreign key: order
+    # edits delete and re-create items, and the (reversed) history should outlive them.
+    item_id: Optional[int] = Field(default=None, index=True)
+    product_id: int = Field(foreign_key="products.productId", nullable=False)
+    variant_id: Optional[int] = Field(default=None, foreign_key="variants.variantId")
+
+    # "offcut" | "sheet" | "full_bar" — for remainder rows, the source of their consumption
+    source: str = Field(nullable=False)
+    # Not foreign keys either: offcut rows are deleted once their quantity reaches 0
+    source_offcut_id: Optional[int] = Field(default=None, index=True)
+    produced_offcut_id: Optional[int] = Field(default=None, index=True)
+
+    # consume: the source's dimensions; remainder: the leftover's. 1D rows use length
+    # only, 2D rows width + height (same convention as Offcut).
+    length: Optional[float] = Field(default=None)
+    width: Optional[float] = Field(default=None)
+    height: Optional[float] = Field(default=None)
+    length_used: Optional[float] = Field(default=None)  # 1D consume rows
+    pieces: int = Field(default=1)                       # cuts taken from this source
+    status: Optional[str] = Field(default=None)          # remainder rows: "available" | "scrap"
+    # False for a 2D line that shared a source another line owns (see _apply_candidate)
+    owns_consumption: bool = Field(default=True)
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    reversed_at: Optional[datetime] = Field(default=None)
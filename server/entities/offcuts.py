@@ -1,7 +1,9 @@
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional
 from datetime import datetime
+from .versioning import versioned
 
+@versioned
 class Offcut(SQLModel, table=True):
     __tablename__ = "offcuts"
 
@@ -17,6 +19,7 @@ class Offcut(SQLModel, table=True):
     width: Optional[float] = Field(default=None)  # Available width (2D/glass products)
     height: Optional[float] = Field(default=None) # Available height (2D/glass products)
     quantity: int = Field(default=1) # How many pieces of this size
+    version: int = Field(default=1, sa_column_kwargs={"server_default": "1"})  # see Variant.version
 
     # "available" (usable, in the pickable pool) or "scrap" (below min usable size — kept for waste reporting only)
     status: str = Field(default="available")
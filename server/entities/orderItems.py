@@ -1,10 +1,18 @@
 from sqlmodel import Field, SQLModel, Relationship
-from sqlalchemy import Enum, Column, JSON
+from sqlalchemy import Enum, Column, Index, text
 from typing import Optional, Dict, Any
 from datetime import datetime
+from .jsonTypes import MutableJSONDict, TracksJSONMutations
 
-class OrderItem(SQLModel, table=True):
+class OrderItem(TracksJSONMutations, SQLModel, table=True):
     __tablename__ = "orderitems"
+    __table_args__ = (
+        # Containment lookups on the lineItems, e.g. the cutting queue's line-type
+        # filter: details @> '{"lineItems": [{"type": "glass-cut"}]}'
+        Index("ix_orderitems_details_gin", "details", postgresql_using="gin", postgresql_ops={"details": "jsonb_path_ops"}),
+        # The cutting queue — only the (few) items still waiting to be cut
+        Index("ix_orderitems_cutting_pending", "order_id", postgresql_where=text("cutting_completed = false")),
+    )
 
     item_id: Optional[int] = Field(default=None, primary_key=True)
     order_id: int = Field(foreign_key="orders.orderId")
@@ -13,7 +21,7 @@ class OrderItem(SQLModel, table=True):
     total_price: float = Field(nullable=False)
 
     # Detailed Attributes (Dimensions, Color, Glass Type, etc.)
-    details: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    details: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(MutableJSONDict))
 
     status: Optional[str] = Field(sa_column= Column(Enum("purchased", "returned", name=" orderItemstatus_enum"), default="purchased"))
     variant_id: Optional[int] = Field(default=None, foreign_key="variants.variantId")
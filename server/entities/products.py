@@ -1,18 +1,27 @@
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional, List, Dict, Any
-from sqlalchemy import Column, Enum, JSON
+from sqlalchemy import Column, Enum, JSON, Index
+from .jsonTypes import MutableJSONList, TracksJSONMutations
+from .versioning import versioned
 
-class Category(SQLModel, table=True):
+class Category(TracksJSONMutations, SQLModel, table=True):
     __tablename__ = "categories"
     categoryId: Optional[int] = Field(default= None, primary_key=True)
     name: str = Field(nullable=False)
     type: str = Field(nullable=False)
-    sub_categories: List[Dict[str, Any]] = Field(default=[], sa_column=Column(JSON))
+    sub_categories: List[Dict[str, Any]] = Field(default=[], sa_column=Column(MutableJSONList))
     
     products: List["Product"] = Relationship(back_populates="category")
 
+@versioned
 class Product(SQLModel, table=True):
     __tablename__ = "products"
+    __table_args__ = (
+        # Trigram indexes (pg_trgm) — ILIKE '%term%' and similarity() search on
+        # name/itemCode without a table scan (core/inventory/searchService.py)
+        Index("ix_products_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_products_itemcode_trgm", "itemCode", postgresql_using="gin", postgresql_ops={"itemCode": "gin_trgm_ops"}),
+    )
 
     productId: Optional[int] = Field(default=None, primary_key=True)
     itemCode: Optional[str] = Field(default=None, nullable=True)
@@ -31,6 +40,7 @@ class Product(SQLModel, table=True):
     # Simple vs Variable Logic
     has_variants: bool = Field(default=False)
     stock_quantity: int = Field(default=0)
+    version: int = Field(default=1, sa_column_kwargs={"server_default": "1"})  # see Variant.version
 
     # Price and dimensions live on Variant only — every product has >=1 variant.
 
@@ -19,6 +19,9 @@ class User(SQLModel, table=True):
     password: str = Field(max_length= 255, nullable= False)
     firstLogin: bool = Field(default= False)
     createdAt: datetime = Field(sa_column_kwargs={"server_default": func.now()})
+    # Maintained by core/messaging/service.py in the same transaction as every
+    # recipient insert / read-status change, so the badge never needs a COUNT(*).
+    unreadMessages: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
 
     orders: List["Order"] = Relationship(back_populates = "user")
     messages: List["Message"] = Relationship(back_populates= "user")
@@ -1,11 +1,18 @@
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column, JSON
+from sqlalchemy import Column, JSON, Index
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 import uuid
+from .versioning import versioned
 
+@versioned
 class Variant(SQLModel, table=True):
     __tablename__ = "variants"
+    __table_args__ = (
+        # Trigram index for search — a variant's name is its attribute values
+        # (" - "-joined), so this covers attribute search too
+        Index("ix_variants_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
 
     variantId: Optional[int] = Field(default=None, primary_key=True)
     product_id: int = Field(foreign_key="products.productId", nullable=False)
@@ -18,6 +25,9 @@ class Variant(SQLModel, table=True):
     # Inventory
     stock_quantity: float = Field(default=0.0)
     low_stock_threshold: float = Field(default=10.0)
+    # Bumped by every write (see entities/versioning.py) — the compare-and-swap
+    # token for stock updates that don't lock the row first
+    version: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
     
     # Price modifiers (added to base product price)
     price: float = Field(default=0.0) # Full Price
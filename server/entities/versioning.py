@@ -0,0 +1,25 @@
+"""
+Row versions for the stock-bearing tables (Variant, Product, Offcut).
+
+Every ORM UPDATE of a @versioned row whose columns actually changed bumps its
+`version` in the same statement, so the number moves with every write the app
+makes — including the ones taken under SELECT ... FOR UPDATE. The
+compare-and-swap stock writes in core/inventory/stockConcurrency.py bump it
+themselves (UPDATE ... SET version = version + 1 WHERE version = :seen) and
+rely on every other writer doing the same.
+"""
+
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+
+
+def versioned(cls):
+    """Class decorator for a table with a `version: int` column."""
+
+    @event.listens_for(cls, "before_update")
+    def _bump_version(mapper, connection, target):
+        session = object_session(target)
+        if session is not None and session.is_modified(target, include_collections=False):
+            target.version = (target.version or 0) + 1
+
+    return cls
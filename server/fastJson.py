@@ -0,0 +1,53 @@
+"""
+Fast JSON encoding for large list responses.
+
+FastAPI's default path validates the returned objects against the
+response_model (one Pydantic model per row, nested models per variant/item),
+serializes them back out and encodes with the stdlib json module. For the
+high-volume list endpoints the services already build plain dicts shaped like
+the response model, and the controllers return them through FastJSONResponse:
+returning a Response skips that round trip, while the route's response_model —
+and so the OpenAPI schema — stays exactly as declared.
+
+orjson does the encoding when installed (requirements.txt); the stdlib json
+module is the fallback, so nothing breaks without it. Both produce compact
+output; Decimal, UUID and date/datetime values are encoded the way
+Pydantic's JSON mode does (number, string, ISO string).
+
+benchmark_list_serialization.py compares this path with the default one.
+"""
+
+import json
+from datetime import date
+from decimal import Decimal
+from uuid import UUID
+
+from fastapi.responses import Response
+
+try:
+    import orjson  # optional
+except ImportError:
+    orjson = None
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, date):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -1,8 +1,63 @@
+"""
+Application logging: a queue-based pipeline with JSON output.
+
+Every request logs at least one line (timing middleware) and services log per
+order/message, so log I/O sits on the hot path. Instead of writing from the
+request thread, the root logger gets a single QueueHandler:
+
+  request thread                      │  QueueListener thread
+  ────────────────────────────────────┼──────────────────────────────────────
+  level filter (per module)           │
+  noisy-warning rate limit            │
+  stamp request_id, freeze message    │
+  queue.put_nowait(record) ───────────┼─► QueueListener → JSON/text formatting
+                                      │                 → stderr write
+
+so the request thread only pays for a couple of dict lookups and a queue put.
+
+Levels come from Settings.LOG_LEVEL: a default level, optionally followed by
+per-module overrides keyed by logger name or module path (the service modules
+share this file's `logger`, so their records are matched by file too):
+    LOG_LEVEL=INFO
+    LOG_LEVEL=INFO,core.inventory=WARNING,core.ordering.orderService=DEBUG,sqlalchemy=WARNING
+
+Call sites that can repeat once per line item (the stock-deduction fallbacks
+in core/inventory) opt into rate limiting with `extra=RATE_LIMITED`: at most
+LOG_RATE_LIMIT_BURST warnings per LOG_RATE_LIMIT_WINDOW seconds from one call
+site (file + line — the message text differs per product/order); the next one
+let through carries a `suppressed` count. Every other warning, and every
+error, is always emitted.
+
+Each record is one JSON object per line (LOG_FORMAT=json, the default) with
+ts, level, logger, module, msg, request_id (from monitoring/instrumentation's
+request context), any `extra=` fields, and exc for tracebacks. LOG_FORMAT=text
+keeps a human-readable line for local development.
+"""
+
+import atexit
+import json
 import logging
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
 from enum import StrEnum
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from config import settings
+from monitoring.instrumentation import current_stats
+
+LOG_FORMAT_TEXT = "%(asctime)s  %(levelname)-8s  %(name)s  %(message)s"
 
+_SERVER_ROOT = os.path.dirname(os.path.abspath(__file__))
+# Attributes every LogRecord has — anything else on a record came from `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id", "rate_limited"}
 
-LOG_FORMAT_DEBUG = "%(levelname)s:%(message)s:%(pathname)s:%(funcName)s:%(lineno)d"
+# `extra=` for a warning that may repeat per line item — see RateLimitFilter
+RATE_LIMITED = {"rate_limited": True}
 
 
 class LogLevels(StrEnum):
@@ -12,20 +67,193 @@ class LogLevels(StrEnum):
     debug = "DEBUG"
 
 
-def configure_logging(log_level: str = LogLevels.error):
-    log_level = str(log_level).upper()
-    log_levels = [level.value for level in LogLevels]
+def _level(name: str) -> Optional[int]:
+    level = logging.getLevelName(name.strip().upper())
+    return level if isinstance(level, int) else None
+
+
+def parse_levels(spec: str) -> tuple:
+    """"INFO,core.inventory=WARNING" -> (logging.INFO, {"core.inventory": logging.WARNING}).
+    An unknown default level falls back to ERROR; unknown overrides are ignored."""
+    default = logging.ERROR
+    overrides = {}
+    for part in filter(None, (p.strip() for p in str(spec).split(","))):
+        if "=" in part:
+            name, _, level_name = part.partition("=")
+            level = _level(level_name)
+            if level is not None and name.strip():
+                overrides[name.strip()] = level
+        else:
+            default = _level(part) or logging.ERROR
+    return default, overrides
+
+
+_module_paths: dict = {}
+
+
+def module_path(pathname: str) -> str:
+    """/…/server/core/ordering/orderService.py -> "core.ordering.orderService"
+    ("" for files outside the server tree, i.e. libraries)."""
+    path = _module_paths.get(pathname)
+    if path is None:
+        relative = os.path.relpath(pathname, _SERVER_ROOT) if pathname else ".."
+        if relative.startswith(".."):
+            path = ""
+        else:
+            path = os.path.splitext(relative)[0].replace(os.sep, ".")
+        _module_paths[pathname] = path
+    return path
+
+
+# ── Filters (run on the emitting thread, before the record is queued) ──────
+
+class ModuleLevelFilter(logging.Filter):
+    """Drops records below the level configured for their logger name or module
+    path — longest matching prefix wins, else the default level."""
+
+    def __init__(self, default: int, overrides: dict):
+        super().__init__()
+        self.default = default
+        self.overrides = overrides
+        self._thresholds: dict = {}
+
+    def _match(self, dotted: str) -> tuple:
+        best = (-1, None)
+        for prefix, level in self.overrides.items():
+            if dotted == prefix or dotted.startswith(prefix + "."):
+                if len(prefix) > best[0]:
+                    best = (len(prefix), level)
+        return best
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.name, record.pathname)
+        threshold = self._thresholds.get(key)
+        if threshold is None:
+            by_name = self._match(record.name)
+            by_path = self._match(module_path(record.pathname))
+            best = max(by_name, by_path, key=lambda match: match[0])
+            threshold = self._thresholds[key] = best[1] if best[1] is not None else self.default
+        return record.levelno >= threshold
+
+
+class RateLimitFilter(logging.Filter):
+    """At most `burst` WARNING records per `window` seconds from one call site,
+    for records logged with `extra=RATE_LIMITED`; anything else passes."""
+
+    def __init__(self, window: float, burst: int):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self._sites: dict = {}  # (pathname, lineno) -> [window_start, emitted, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != logging.WARNING or self.window <= 0 or not getattr(record, "rate_limited", False):
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None or now - site[0] >= self.window:
+                if site is not None and site[2]:
+                    record.suppressed = site[2]
+                self._sites[key] = [now, 1, 0]
+                return True
+            if site[1] < self.burst:
+                site[1] += 1
+                return True
+            site[2] += 1
+            return False
+
+
+class ContextQueueHandler(QueueHandler):
+    """QueueHandler that does the minimum on the emitting thread: stamps the
+    request id (a ContextVar — only readable here) and freezes the message so
+    later mutation of its args can't change it. Formatting, including
+    tracebacks, happens on the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if getattr(record, "request_id", None) is None:
+            stats = current_stats()
+            record.request_id = stats.request_id if stats else None
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+# ── Formatters (run on the listener thread) ──────────────────────────────────
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": module_path(record.pathname) or record.module,
+            "line": record.lineno,
+            "msg": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        return f"{line}  (+{suppressed} similar suppressed)" if suppressed else line
+
+
+# ── Setup ────────────────────────────────────────────────────────────────────
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging(log_level: str = None, log_format: str = None) -> None:
+    """(Re)install the pipeline on the root logger. Defaults to Settings."""
+    global _listener
+    default, overrides = parse_levels(log_level if log_level is not None else settings.LOG_LEVEL)
+    log_format = (log_format or settings.LOG_FORMAT).lower()
+
+    if _listener is not None:
+        _listener.stop()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = ContextQueueHandler(log_queue)
+    queue_handler.addFilter(ModuleLevelFilter(default, overrides))
+    queue_handler.addFilter(RateLimitFilter(settings.LOG_RATE_LIMIT_WINDOW, settings.LOG_RATE_LIMIT_BURST))
+    root.addHandler(queue_handler)
+    # The root level is only the floor; ModuleLevelFilter applies the real thresholds
+    root.setLevel(min([default, *overrides.values()]))
+
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(
+        JsonFormatter() if log_format == "json"
+        else TextFormatter(LOG_FORMAT_TEXT, datefmt="%Y-%m-%d %H:%M:%S")
+    )
+    _listener = QueueListener(log_queue, output)
+    _listener.start()
+
 
-    if log_level not in log_levels:
-        logging.basicConfig(level=LogLevels.error)
-        return
+def shutdown_logging() -> None:
+    """Flush everything still queued — registered atexit."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
-    if log_level == LogLevels.debug:
-        logging.basicConfig(level=log_level, format=LOG_FORMAT_DEBUG)
-        return
 
-    logging.basicConfig(level=log_level)
-    
-# Initialize logger for this module
-configure_logging(LogLevels.debug)
+# Initialize the pipeline and the logger shared by the service modules
+configure_logging()
+atexit.register(shutdown_logging)
 logger = logging.getLogger(__name__)
@@ -1,17 +1,26 @@
 import os
+import secrets
 import time
 import logging
 import pathlib
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request, Response
+from typing import Optional
+from fastapi import FastAPI, Header, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse, FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, PlainTextResponse
 from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
 
-from db.database import create_db_and_tables, get_session, check_db_health
+from config import settings
+import staticAssets
+from db.database import DATABASE_URL, create_db_and_tables, engine, get_session, check_db_health
 from entities import *
+from monitoring import instrumentation, metrics, profiler
+from core import referenceCache
+from core.financials import receivablesService
+from core.userManagement.authService import verify_token
+from utils import require_role
 
 # Import Controllers
 from core.ordering.controller import router as ordering_router
@@ -23,23 +32,29 @@ from core.messaging.controller import router as messaging_router
 from core.invoices.controller import router as invoices_router
 from core.settings.controller import router as settings_router
 from core.tools.controller import router as tools_router
+from core.exports.controller import router as exports_router
 from ws.router import router as ws_router
+from monitoring.router import router as profiles_router
 
 # ── Logging Setup ────────────────────────────────────────────────────────────
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s  %(levelname)-8s  %(name)s  %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
+# The queue-based JSON pipeline is installed by loggiing.py on import (levels,
+# format and warning rate limits come from Settings — see that module).
+import loggiing  # noqa: E402,F401
 logger = logging.getLogger("emiratesco")
 
 # ── Lifespan (replaces deprecated on_event) ──────────────────────────────────
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("🚀  EmiratesCo API starting up …")
-    create_db_and_tables()
+    create_db_and_tables(force=settings.SCHEMA_CHECK_ON_START == "always")
     logger.info("✅  Database tables verified.")
+    # Drops cached settings/attributes/categories when another worker writes them
+    referenceCache.start_listener(DATABASE_URL)
+    # Nightly check of the receivables summary against the credits table
+    receivablesService.start_reconciler(engine)
     yield
+    receivablesService.stop_reconciler()
+    referenceCache.stop_listener()
     logger.info("👋  EmiratesCo API shutting down.")
 
 # ── App Instance ─────────────────────────────────────────────────────────────
@@ -56,28 +71,88 @@ app = FastAPI(
 # Starlette applies middleware in REVERSE insertion order (last added = outermost).
 # Desired order (outermost → innermost): CORS → Timing → GZip → Router
 
-# 1. GZip compression for responses > 1 kB (innermost — closest to the router)
-app.add_middleware(GZipMiddleware, minimum_size=1024)
+# 1. GZip compression for responses > 1 kB (innermost — closest to the router).
+#    Frontend files are served precompressed by staticAssets.DistIndex, so
+#    they're skipped here instead of being recompressed on every load.
+frontend_index: Optional[staticAssets.DistIndex] = None
+
+class ApiGZipMiddleware(GZipMiddleware):
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and frontend_index is not None and scope["path"] in frontend_index:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
 
-# 2. Request timing + correlation ID
+app.add_middleware(ApiGZipMiddleware, minimum_size=1024)
+
+# 2. Request timing + correlation ID + per-request SQL/span instrumentation
+#    (see monitoring/instrumentation.py): query count, DB time and engine spans
+#    go out as a Server-Timing header and as structured log fields. Opted-in
+#    requests (admin X-Profile header / PROFILE_SAMPLE_RATES) are also profiled
+#    and stored under their request ID (see monitoring/profiler.py).
 @app.middleware("http")
 async def timing_and_request_id(request: Request, call_next):
     start = time.perf_counter()
     request_id = request.headers.get("X-Request-ID", f"req-{int(time.time() * 1000)}")
+    stats, token = instrumentation.start_request(request_id)
+    capture = (
+        profiler.start_capture()
+        if profiler.should_profile(request.method, request.url.path, request.headers)
+        else None
+    )
 
-    response: Response = await call_next(request)
+    try:
+        response: Response = await call_next(request)
+    finally:
+        instrumentation.end_request(token)
+        if capture is not None:
+            capture.stop()
 
     elapsed_ms = (time.perf_counter() - start) * 1000
+    if capture is not None:
+        try:
+            response.headers["X-Profile-Id"] = await run_in_threadpool(
+                profiler.save_capture, capture, request_id,
+                request.method, request.url.path, response.status_code, elapsed_ms,
+            )
+        except OSError:
+            logger.error(f"[{request_id}] Could not store request profile", exc_info=True)
+
+    # Label by the matched route's template (set on the scope by the router),
+    # never the raw path — /orders/812 and /orders/813 are one series.
+    route = request.scope.get("route")
+    route_label = getattr(route, "path", None) or "unmatched"
+    metrics.http_request_duration.observe(elapsed_ms / 1000, method=request.method, route=route_label)
+    metrics.http_requests.inc(method=request.method, route=route_label, status=str(response.status_code))
+
     response.headers["X-Request-ID"] = request_id
     response.headers["X-Response-Time"] = f"{elapsed_ms:.1f}ms"
+    response.headers["Server-Timing"] = instrumentation.server_timing_header(stats, elapsed_ms)
+
+    over_budget = stats.query_count > settings.REQUEST_QUERY_BUDGET
+    log_fields = {
+        **stats.as_log_fields(),
+        "method": request.method, "path": request.url.path,
+        "status": response.status_code, "elapsed_ms": round(elapsed_ms, 1),
+        "over_query_budget": over_budget,
+    }
+    db_summary = f"{stats.query_count}q/{stats.db_time_ms:.0f}ms db"
 
-    if elapsed_ms > 500:
+    if over_budget:
         logger.warning(
-            f"[{request_id}] SLOW {request.method} {request.url.path} — {elapsed_ms:.0f}ms"
+            f"[{request_id}] QUERY BUDGET {request.method} {request.url.path} — "
+            f"{stats.query_count} queries (budget {settings.REQUEST_QUERY_BUDGET}), {elapsed_ms:.0f}ms",
+            extra=log_fields,
+        )
+    elif elapsed_ms > 500:
+        logger.warning(
+            f"[{request_id}] SLOW {request.method} {request.url.path} — {elapsed_ms:.0f}ms ({db_summary})",
+            extra=log_fields,
         )
     else:
         logger.info(
-            f"[{request_id}] {request.method} {request.url.path} → {response.status_code} ({elapsed_ms:.0f}ms)"
+            f"[{request_id}] {request.method} {request.url.path} → {response.status_code} ({elapsed_ms:.0f}ms, {db_summary})",
+            extra=log_fields,
         )
 
     return response
@@ -98,8 +173,8 @@ app.add_middleware(
     ],
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-    allow_headers=["Authorization", "Content-Type", "Accept", "Origin", "X-Request-ID"],
-    expose_headers=["X-Request-ID", "X-Response-Time"],
+    allow_headers=["Authorization", "Content-Type", "Accept", "Origin", "X-Request-ID", "X-Profile"],
+    expose_headers=["X-Request-ID", "X-Response-Time", "Server-Timing", "X-Profile-Id"],
     max_age=3600,
 )
 
@@ -113,7 +188,9 @@ app.include_router(users_router)
 app.include_router(messaging_router)
 app.include_router(settings_router)
 app.include_router(tools_router)
+app.include_router(exports_router)
 app.include_router(ws_router)
+app.include_router(profiles_router)
 
 # ── Utility Endpoints ─────────────────────────────────────────────────────────
 @app.get("/api/status", tags=["System"])
@@ -142,19 +219,42 @@ async def health_check():
         },
     )
 
+@app.get("/metrics", tags=["System"], response_class=PlainTextResponse)
+async def metrics_endpoint(authorization: Optional[str] = Header(None)):
+    """
+    Prometheus text exposition — request latency per route, DB pool wait
+    time/timeouts, WebSocket connections and glass/1D engine counters.
+    See monitoring/metrics.py for the full list.
+
+    The counters describe the system's internals (CAS conflicts, retry
+    reasons, pool timeouts), so the caller needs `Authorization: Bearer
+    <METRICS_TOKEN>` — the scraper's credential — or an admin/CEO login token.
+    """
+    token = authorization[7:].strip() if authorization and authorization[:7].lower() == "bearer " else ""
+    scraper = settings.METRICS_TOKEN and secrets.compare_digest(token.encode(), settings.METRICS_TOKEN.encode())
+    if not scraper:
+        if not token:
+            raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+        require_role(list(profiler.PROFILER_ROLES), verify_token(token))
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 # ── Frontend (served same-origin in production) ──────────────────────────────
 # Registered LAST: Starlette matches routes in registration order, so every
 # API route/router above still wins before this catch-all is ever reached.
 CLIENT_DIST = pathlib.Path(__file__).resolve().parent.parent / "client" / "dist"
 
 if CLIENT_DIST.is_dir():
-    app.mount("/assets", StaticFiles(directory=CLIENT_DIST / "assets"), name="assets")
+    # Indexed (and precompressed) once here; requests never touch the
+    # filesystem except to stream the chosen file. See staticAssets.py.
+    frontend_index = staticAssets.DistIndex(CLIENT_DIST)
+    logger.info(f"Frontend: {len(frontend_index.assets)} files indexed from {CLIENT_DIST}")
 
     @app.get("/{full_path:path}", include_in_schema=False)
-    async def serve_frontend(full_path: str):
-        candidate = CLIENT_DIST / full_path
-        if candidate.is_file():
-            return FileResponse(candidate)
-        return FileResponse(CLIENT_DIST / "index.html")
+    async def serve_frontend(full_path: str, request: Request):
+        return frontend_index.response(
+            full_path,
+            request.headers.get("accept-encoding", ""),
+            request.headers.get("if-none-match"),
+        )
 else:
     logger.info("No client/dist found — frontend not mounted (API-only mode).")
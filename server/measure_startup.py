@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Startup-time report: how long `import main` takes and which modules it goes to.
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter (so nothing
+is already cached in sys.modules) and prints:
+  - the total import time of main,
+  - the slowest modules by cumulative time (their own time + everything they
+    imported first),
+  - the same rolled up per top-level package (fastapi, sqlalchemy, core, ...),
+    using each module's self time so nothing is counted twice.
+
+With --with-db it also times the startup schema check — schema_fingerprint()
+and create_db_and_tables() — against the configured DATABASE_URL.
+
+Run from the server/ directory:
+    python measure_startup.py
+    python measure_startup.py --top 40 --with-db
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def import_times():
+    """[(module, self_us, cumulative_us, depth)] for `import main`, in import order."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=SERVER_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        print(result.stderr, file=sys.stderr)
+        raise SystemExit("import main failed")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def report_imports(top: int) -> None:
+    rows = import_times()
+    main_row = next((r for r in rows if r[0] == "main"), None)
+    total_us = main_row[2] if main_row else sum(r[1] for r in rows)
+    print(f"import main: {total_us / 1000:.1f} ms ({len(rows)} modules)\n")
+
+    print(f"Slowest {top} modules by cumulative time:")
+    print(f"  {'cumulative':>10}  {'self':>8}  module")
+    for name, self_us, cumulative_us, _ in sorted(rows, key=lambda r: r[2], reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:>8.1f}ms  {self_us / 1000:>6.1f}ms  {name}")
+
+    per_package = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        per_package[name.split(".")[0]] += self_us
+    print(f"\nSelf time per top-level package (top {top}):")
+    for package, self_us in sorted(per_package.items(), key=lambda kv: kv[1], reverse=True)[:top]:
+        print(f"  {self_us / 1000:>8.1f}ms  {package}")
+
+
+def report_schema_check() -> None:
+    import time
+    sys.path.insert(0, SERVER_DIR)
+    import main  # noqa: F401 — registers every entity with SQLModel.metadata
+    from db.database import create_db_and_tables, schema_fingerprint
+
+    start = time.perf_counter()
+    fingerprint = schema_fingerprint()
+    fingerprint_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    ran = create_db_and_tables()
+    check_ms = (time.perf_counter() - start) * 1000
+
+    print(f"\nschema_fingerprint(): {fingerprint_ms:.1f} ms ({fingerprint[:12]})")
+    print(f"create_db_and_tables(): {check_ms:.1f} ms ({'create_all ran' if ran else 'skipped — fingerprint matched'})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report API startup time per module.")
+    parser.add_argument("--top", type=int, default=25, help="rows per table (default 25)")
+    parser.add_argument("--with-db", action="store_true", help="also time the startup schema check")
+    args = parser.parse_args()
+
+    report_imports(args.top)
+    if args.with_db:
+        report_schema_check()
+
+
+if __name__ == "__main__":
+    main()
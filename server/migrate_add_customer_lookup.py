@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Migration: Add the indexes behind the customer lookup
+(GET /users/customers/search, core/userManagement/customerService.py).
+
+  - CREATE EXTENSION pg_trgm   (already there if migrate_add_product_search.py ran)
+  - ix_customers_name_trgm     GIN (name gin_trgm_ops) — name ILIKE '%term%'
+  - ix_customers_phone_digits  (regexp_replace("phoneNumber", '[^0-9]', '', 'g')
+                               text_pattern_ops) — phone prefix on the digits
+  - ix_credits_customer_open   ("customerId") WHERE status <> 'Paid' — the
+                               outstanding balance shown with each customer
+
+pg_trgm is a trusted extension (Postgres 13+), so the database owner can
+create it; on older servers run the CREATE EXTENSION as a superuser first.
+The indexes are built CONCURRENTLY so the tills aren't blocked while they
+build; existing indexes are skipped and an interrupted (invalid) build is
+dropped and redone, so the script is safe to re-run.
+
+Run from the server/ directory:
+    python migrate_add_customer_lookup.py
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from db.database import DATABASE_URL
+from db.indexes import create_index_concurrently
+
+INDEXES = [
+    (
+        "ix_customers_name_trgm",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customers_name_trgm "
+        "ON customers USING gin (name gin_trgm_ops)",
+    ),
+    (
+        "ix_customers_phone_digits",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customers_phone_digits "
+        """ON customers (regexp_replace("phoneNumber", '[^0-9]', '', 'g') text_pattern_ops)""",
+    ),
+    (
+        "ix_credits_customer_open",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_credits_customer_open "
+        """ON credits ("customerId") WHERE status <> 'Paid'""",
+    ),
+]
+
+
+def migrate():
+    engine = create_engine(DATABASE_URL)
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    raw_conn = engine.raw_connection()
+    raw_conn.set_isolation_level(0)  # AUTOCOMMIT
+    cur = raw_conn.cursor()
+
+    try:
+        print("pg_trgm: creating extension (if missing)...")
+        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        print("  Done.")
+
+        for name, ddl in INDEXES:
+            create_index_concurrently(cur, name, ddl)
+
+        cur.execute("ANALYZE customers")
+        cur.execute("ANALYZE credits")
+        print("\nMigration complete.")
+
+    finally:
+        cur.close()
+        raw_conn.close()
+
+
+if __name__ == "__main__":
+    migrate()
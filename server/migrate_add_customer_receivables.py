@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Migration: Add the customer_receivables summary table and fill it from credits.
+
+  - customer_receivables  — one row per customer with open credit: outstanding
+                            total, open credit count, oldest unpaid date and
+                            aging buckets (see entities/customerReceivables.py),
+                            indexed by outstanding for the aging report
+
+Backfill runs the reconciliation with fix=True: every customer with open
+credits gets their row computed from the credits table, under the same
+per-customer lock the credit writers take, so the tills can stay up while it
+runs. Rows that already match are left alone, so the script is safe to re-run.
+
+Run from the server/ directory:
+    python migrate_add_customer_receivables.py
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlmodel import Session, SQLModel
+
+from db.database import engine
+from entities import *  # noqa: F401,F403 — registers every table the FKs point at
+from entities.customerReceivables import CustomerReceivable
+from core.financials import receivablesService
+
+
+def migrate():
+    print("Creating customer_receivables (if missing)...")
+    SQLModel.metadata.create_all(engine, tables=[CustomerReceivable.__table__])
+    print("  Done.")
+
+    print("Backfilling from credits...")
+    with Session(engine) as session:
+        report = receivablesService.reconcile(session, fix=True)
+    print(f"  {report['checked']} customers checked, {report['fixed']} rows written")
+
+    print("Migration complete.")
+
+
+if __name__ == "__main__":
+    migrate()
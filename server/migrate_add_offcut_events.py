@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Migration: Add the offcut_events table and backfill it from existing orders.
+
+  - offcut_events  — one row per consumed source and per remainder produced
+                     (see entities/offcutEvents.py), indexed by source offcut,
+                     produced offcut, order item, group and (variant, created_at)
+
+Backfill: every order item whose details JSON has offcut_sources gets rows for
+each source entry, using the order's created_at; entries on cancelled orders are
+written already reversed (their stock was restored at cancellation). Each entry
+gets the group_id its rows were written under stamped back into the JSON — that
+is how restore and the offcut-correction path match the two. Entries that
+already carry a recorded group_id are skipped, so the script is safe to re-run.
+Remainders of 1D cuts recorded before this table have no produced_offcut_id.
+
+Run from the server/ directory:
+    python migrate_add_offcut_events.py
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime
+
+from sqlalchemy import String, cast
+from sqlmodel import Session, SQLModel, select
+
+from db.database import engine
+from entities import *  # noqa: F401,F403 — registers every table the FKs point at
+from entities.offcutEvents import OffcutEvent
+from entities.orderItems import OrderItem
+from entities.orders import Order
+from core.inventory import offcutEvents as offcut_events
+
+BATCH_SIZE = 500
+
+
+def backfill_batch(session: Session, rows: list) -> int:
+    item_ids = [item.item_id for item, _, _ in rows]
+    recorded = set(session.exec(
+        select(OffcutEvent.group_id).where(OffcutEvent.item_id.in_(item_ids)).distinct()
+    ).all())
+
+    written = 0
+    now = datetime.utcnow()
+    for item, created_at, status in rows:
+        details = item.details or {}
+        line_items = details.get("lineItems") or []
+        for line in line_items:
+            for src in line.get("offcut_sources") or []:
+                if src.get("group_id") in recorded:
+                    continue
+                group_id = offcut_events.record_source(
+                    session, item.product_id, item.variant_id, item.item_id, src,
+                    created_at=created_at, reversed_at=now if status == "cancelled" else None,
+                )
+                recorded.add(group_id)
+                written += 1
+    # record_source stamped group_ids into item.details in place — a
+    # mutation-tracked document, so the commit writes them back
+    return written
+
+
+def migrate():
+    print("Creating offcut_events (if missing)...")
+    SQLModel.metadata.create_all(engine, tables=[OffcutEvent.__table__])
+    print("  Done.")
+
+    print("Backfilling from orderitems.details offcut_sources...")
+    last_id = 0
+    items_seen = 0
+    sources_written = 0
+    with Session(engine) as session:
+        while True:
+            rows = session.exec(
+                select(OrderItem, Order.created_at, Order.status)
+                .join(Order, Order.orderId == OrderItem.order_id)
+                .where(
+                    OrderItem.item_id > last_id,
+                    cast(OrderItem.details, String).like("%offcut_sources%"),
+                )
+                .order_by(OrderItem.item_id)
+                .limit(BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            try:
+                sources_written += backfill_batch(session, rows)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                print(f"  Failed on items {rows[0][0].item_id}..{rows[-1][0].item_id}: {e}")
+                raise
+            items_seen += len(rows)
+            last_id = rows[-1][0].item_id
+            session.expunge_all()
+            print(f"  {items_seen} items scanned, {sources_written} sources recorded")
+
+    print("Migration complete.")
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Migration: Enable pg_trgm and add the trigram indexes product search uses.
+
+  - CREATE EXTENSION pg_trgm
+  - ix_products_name_trgm       GIN (name gin_trgm_ops)
+  - ix_products_itemcode_trgm   GIN ("itemCode" gin_trgm_ops)
+  - ix_variants_name_trgm       GIN (name gin_trgm_ops)
+
+They serve both similarity() ranking in core/inventory/searchService.py and
+the ILIKE '%term%' filter of GET /products/?search=, which otherwise scan the
+whole table. pg_trgm is a trusted extension (Postgres 13+), so the database
+owner can create it; on older servers run the CREATE EXTENSION as a superuser
+first. The indexes are built CONCURRENTLY so the tills aren't blocked while
+they build; existing indexes are skipped and an interrupted (invalid) build is
+dropped and redone, so the script is safe to re-run.
+
+Run from the server/ directory:
+    python migrate_add_product_search.py
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from db.database import DATABASE_URL
+from db.indexes import create_index_concurrently
+
+INDEXES = [
+    (
+        "ix_products_name_trgm",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_name_trgm "
+        "ON products USING gin (name gin_trgm_ops)",
+    ),
+    (
+        "ix_products_itemcode_trgm",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_itemcode_trgm "
+        'ON products USING gin ("itemCode" gin_trgm_ops)',
+    ),
+    (
+        "ix_variants_name_trgm",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_variants_name_trgm "
+        "ON variants USING gin (name gin_trgm_ops)",
+    ),
+]
+
+
+def migrate():
+    engine = create_engine(DATABASE_URL)
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    raw_conn = engine.raw_connection()
+    raw_conn.set_isolation_level(0)  # AUTOCOMMIT
+    cur = raw_conn.cursor()
+
+    try:
+        print("pg_trgm: creating extension (if missing)...")
+        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        print("  Done.")
+
+        for name, ddl in INDEXES:
+            create_index_concurrently(cur, name, ddl)
+
+        cur.execute("ANALYZE products")
+        cur.execute("ANALYZE variants")
+        print("\nMigration complete.")
+
+    finally:
+        cur.close()
+        raw_conn.close()
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Migration: Add the row `version` column to the stock-bearing tables.
+
+  - variants.version   INTEGER NOT NULL DEFAULT 1
+  - products.version   INTEGER NOT NULL DEFAULT 1
+  - offcuts.version    INTEGER NOT NULL DEFAULT 1
+
+The compare-and-swap stock writes (core/inventory/stockConcurrency.py) match on
+it, and every ORM update of these rows bumps it (entities/versioning.py).
+Adding a column with a constant default is a catalog-only change in Postgres
+11+, so existing rows don't need rewriting. Tables that already have the
+column are skipped, so the script is safe to re-run.
+
+Run from the server/ directory:
+    python migrate_add_stock_versions.py
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, text
+from db.database import DATABASE_URL
+
+TABLES = ["variants", "products", "offcuts"]
+
+
+def migrate():
+    engine = create_engine(DATABASE_URL)
+    with engine.connect() as conn:
+        for table in TABLES:
+            exists = conn.execute(text(
+                "SELECT 1 FROM information_schema.columns "
+                "WHERE table_name = :table AND column_name = 'version'"
+            ), {"table": table}).fetchone()
+            if exists:
+                print(f"{table}.version: already exists.")
+                continue
+            print(f"{table}.version: adding...")
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+            conn.commit()
+            print("  Done.")
+        print("\nMigration complete.")
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,44 @@
+"""
+Migration: Add invoices.item_count for the lightweight invoice list.
+
+  - invoices.item_count — INTEGER NOT NULL DEFAULT 0
+      len(items), written alongside items by core/invoices/service.py so
+      GET /invoices/ can return summaries without reading the cart JSON.
+
+Backfills every existing invoice from its stored items.
+
+Additive/non-destructive and safe to re-run. Run from the server directory:
+    python migrate_invoice_item_count.py
+"""
+
+from sqlmodel import Session, text
+from db.database import engine
+
+
+def migrate():
+    with Session(engine) as session:
+        print("Adding invoices.item_count...")
+        try:
+            session.exec(text("ALTER TABLE invoices ADD COLUMN item_count INTEGER NOT NULL DEFAULT 0"))
+            session.commit()
+            print("  OK: invoices.item_count added")
+        except Exception as e:
+            print(f"  Skipped: ({e})")
+            session.rollback()
+
+        print("Backfilling item_count from items...")
+        # ::jsonb works whether the column was created as JSON (create_all) or
+        # JSONB (migrate_add_invoices.py).
+        result = session.exec(text(
+            "UPDATE invoices SET item_count = jsonb_array_length(items::jsonb) "
+            "WHERE jsonb_typeof(items::jsonb) = 'array' "
+            "AND item_count IS DISTINCT FROM jsonb_array_length(items::jsonb)"
+        ))
+        session.commit()
+        print(f"  Updated {result.rowcount} invoice(s).")
+
+        print("Migration complete.")
+
+
+if __name__ == "__main__":
+    migrate()
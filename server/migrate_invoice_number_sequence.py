@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Migration: Sequence-backed invoice numbers.
+
+  - invoice_number_seq — the sequence Invoice.invoice_number draws from inside
+    the INSERT (see entities/invoices.py). Seeded past the highest number
+    already issued (INV-000123 -> next is INV-000124), and past the highest
+    invoiceId too, which the old "max id + 1" scheme derived numbers from.
+  - ix_invoices_invoice_number — made UNIQUE, so a duplicate can never be
+    issued again. Skipped (with the offending numbers listed) if the old
+    read-then-insert race already produced duplicates: those are
+    customer-facing and need a human decision, not a silent renumber.
+
+Safe to re-run: the sequence is only ever moved forward. Run from the server/
+directory (ideally with the API stopped):
+    python migrate_invoice_number_sequence.py
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, text
+from db.database import DATABASE_URL
+
+
+def migrate():
+    engine = create_engine(DATABASE_URL)
+    with engine.connect() as conn:
+
+        # ── 1. Sequence ─────────────────────────────────────────────────────
+        print("Creating invoice_number_seq...")
+        conn.execute(text("CREATE SEQUENCE IF NOT EXISTS invoice_number_seq"))
+
+        highest = conn.execute(text(r"""
+            SELECT GREATEST(
+                COALESCE(MAX(CAST(substring(invoice_number FROM '^INV-(\d+)$') AS BIGINT)), 0),
+                COALESCE(MAX("invoiceId"), 0)
+            ) FROM invoices
+        """)).scalar()
+        current = conn.execute(text(
+            "SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END FROM invoice_number_seq"
+        )).scalar()
+
+        if highest > current:
+            conn.execute(text("SELECT setval('invoice_number_seq', :v, true)"), {"v": highest})
+            print(f"  Seeded: next number is INV-{highest + 1:06d}")
+        else:
+            print(f"  Already ahead of existing invoices (last issued {current}).")
+
+        # ── 2. Unique invoice numbers ───────────────────────────────────────
+        print("Checking for duplicate invoice numbers...")
+        duplicates = conn.execute(text(
+            "SELECT invoice_number, COUNT(*) FROM invoices "
+            "GROUP BY invoice_number HAVING COUNT(*) > 1 ORDER BY invoice_number"
+        )).fetchall()
+        if duplicates:
+            print("  ⚠️  Duplicates found — unique index NOT created. Resolve these first:")
+            for number, count in duplicates:
+                print(f"     {number} × {count}")
+        else:
+            conn.execute(text("DROP INDEX IF EXISTS ix_invoices_invoice_number"))
+            conn.execute(text(
+                "CREATE UNIQUE INDEX ix_invoices_invoice_number ON invoices (invoice_number)"
+            ))
+            print("  Done: ix_invoices_invoice_number is unique.")
+
+        conn.commit()
+        print("\n✅ Migration complete.")
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Migration: Convert the JSON document columns from json to jsonb and add the
+orderitems indexes that jsonb makes possible.
+
+  - orderitems.details                       json -> jsonb
+  - invoices.items                           json -> jsonb
+  - categories.sub_categories                json -> jsonb
+  - edit_history.before_snapshot / after_snapshot   json -> jsonb
+
+  - ix_orderitems_details_gin       GIN (details jsonb_path_ops) — containment
+                                    lookups such as the cutting queue's
+                                    details @> '{"lineItems": [{"type": "glass-cut"}]}'
+  - ix_orderitems_cutting_pending   (order_id) WHERE cutting_completed = false
+
+Converting rewrites each table under an ACCESS EXCLUSIVE lock, so run it in a
+quiet window. jsonb drops key order, insignificant whitespace and duplicate
+keys (the last one wins) — nothing in the app relies on any of them. The
+indexes are built CONCURRENTLY afterwards so order writes aren't blocked while
+they build; create_all never adds indexes to tables that already exist, which
+is why they are created here. Already-converted columns and existing indexes
+are skipped, so the script is safe to re-run.
+
+Run from the server/ directory:
+    python migrate_jsonb_columns.py
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine
+from db.database import DATABASE_URL
+from db.indexes import create_index_concurrently
+
+COLUMNS = [
+    ("orderitems", "details"),
+    ("invoices", "items"),
+    ("categories", "sub_categories"),
+    ("edit_history", "before_snapshot"),
+    ("edit_history", "after_snapshot"),
+]
+
+INDEXES = [
+    (
+        "ix_orderitems_details_gin",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_orderitems_details_gin "
+        "ON orderitems USING gin (details jsonb_path_ops)",
+    ),
+    (
+        "ix_orderitems_cutting_pending",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_orderitems_cutting_pending "
+        "ON orderitems (order_id) WHERE cutting_completed = false",
+    ),
+]
+
+
+def migrate():
+    engine = create_engine(DATABASE_URL)
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block, so the
+    # whole script uses an autocommit raw connection (each ALTER commits alone).
+    raw_conn = engine.raw_connection()
+    raw_conn.set_isolation_level(0)  # AUTOCOMMIT
+    cur = raw_conn.cursor()
+
+    try:
+        # ── 1. json -> jsonb ───────────────────────────────────────────────
+        for table, column in COLUMNS:
+            cur.execute(
+                "SELECT data_type FROM information_schema.columns "
+                "WHERE table_name = %s AND column_name = %s",
+                (table, column),
+            )
+            row = cur.fetchone()
+            if not row:
+                print(f"{table}.{column}: column not found, skipping.")
+                continue
+            if row[0] == "jsonb":
+                print(f"{table}.{column}: already jsonb.")
+                continue
+            print(f"{table}.{column}: converting {row[0]} -> jsonb...")
+            cur.execute(
+                f'ALTER TABLE {table} ALTER COLUMN "{column}" TYPE jsonb USING "{column}"::jsonb'
+            )
+            print("  Done.")
+
+        # ── 2. Indexes ─────────────────────────────────────────────────────
+        for name, ddl in INDEXES:
+            create_index_concurrently(cur, name, ddl)
+
+        cur.execute("ANALYZE orderitems")
+        print("\nMigration complete.")
+
+    finally:
+        cur.close()
+        raw_conn.close()
+
+
+if __name__ == "__main__":
+    migrate()
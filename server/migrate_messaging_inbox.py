@@ -0,0 +1,54 @@
+"""
+Migration: Unread counters + inbox index for messaging.
+
+  - users."unreadMessages" — INTEGER NOT NULL DEFAULT 0
+      Per-user unread count, maintained by core/messaging/service.py in the same
+      transaction as recipient inserts and read-status changes.
+  - ix_messageRecipients_inbox ON "messageRecipients"
+      ("recipientUserId", has_read, "messageId") — serves the keyset-paginated
+      inbox and its unread-only filter.
+
+Backfills every user's counter from their current unread recipient rows.
+
+Additive/non-destructive and safe to re-run. Run from the server directory:
+    python migrate_messaging_inbox.py
+"""
+
+from sqlmodel import Session, text
+from db.database import engine
+
+
+def migrate():
+    with Session(engine) as session:
+        print('Adding users."unreadMessages"...')
+        try:
+            session.exec(text('ALTER TABLE users ADD COLUMN "unreadMessages" INTEGER NOT NULL DEFAULT 0'))
+            session.commit()
+            print('  OK: users."unreadMessages" added')
+        except Exception as e:
+            print(f"  Skipped: ({e})")
+            session.rollback()
+
+        print("Creating ix_messageRecipients_inbox...")
+        session.exec(text(
+            'CREATE INDEX IF NOT EXISTS "ix_messageRecipients_inbox" '
+            'ON "messageRecipients" ("recipientUserId", has_read, "messageId")'
+        ))
+        session.commit()
+        print("  OK")
+
+        print("Backfilling unread counters...")
+        result = session.exec(text(
+            'UPDATE users u SET "unreadMessages" = COALESCE(('
+            '  SELECT COUNT(*) FROM "messageRecipients" mr '
+            '  WHERE mr."recipientUserId" = u."userId" AND mr.has_read = FALSE'
+            '), 0)'
+        ))
+        session.commit()
+        print(f"  Updated {result.rowcount} user(s).")
+
+        print("Migration complete.")
+
+
+if __name__ == "__main__":
+    migrate()
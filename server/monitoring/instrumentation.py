@@ -0,0 +1,132 @@
+"""
+Per-request instrumentation: SQL query count, DB time and named timing spans.
+
+The timing middleware in main.py opens a RequestStats for every HTTP request and
+parks it in a ContextVar. Everything below reads that ContextVar, so nothing has
+to thread a stats object through service signatures:
+
+  - install_query_counter(engine) hooks SQLAlchemy's before/after_cursor_execute
+    events and adds every statement (and its wall time) to the current request.
+    That separates "slow because of 200 lazy loads" from "slow because of one
+    lock wait" from "slow in Python" at a glance.
+  - span("glass_pack") wraps a hot code section (glass engine phases, stock row
+    locks, ...) and accumulates its time/count under that name. Spans may nest
+    (glass_candidates contains glass_pack), so durations aren't additive.
+
+Both are no-ops outside a request (startup, scripts, the standalone test files),
+and cheap inside one: two perf_counter() calls and a dict update.
+
+Starlette runs sync endpoints in a worker thread with a COPY of the request's
+context, so the ContextVar lookup still finds the same (mutable) RequestStats
+object from inside the thread — that's what lets service code running there
+report back to the middleware.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Optional
+
+from sqlalchemy import Engine, event
+
+
+class RequestStats:
+    """Mutable accumulator for one request — see module docstring."""
+
+    __slots__ = ("request_id", "query_count", "db_time_ms", "spans")
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.query_count = 0
+        self.db_time_ms = 0.0
+        self.spans: dict = {}  # name -> [total_ms, count]
+
+    def add_span(self, name: str, elapsed_ms: float) -> None:
+        entry = self.spans.get(name)
+        if entry is None:
+            self.spans[name] = [elapsed_ms, 1]
+        else:
+            entry[0] += elapsed_ms
+            entry[1] += 1
+
+    def as_log_fields(self) -> dict:
+        """Flat dict for structured log records (logger.info(..., extra=...))."""
+        return {
+            "request_id": self.request_id,
+            "db_queries": self.query_count,
+            "db_time_ms": round(self.db_time_ms, 1),
+            "spans": {name: {"ms": round(ms, 1), "count": count} for name, (ms, count) in self.spans.items()},
+        }
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def start_request(request_id: str) -> tuple:
+    """Opens a RequestStats for the current context. Returns (stats, token) —
+    pass the token back to end_request once the response is built."""
+    stats = RequestStats(request_id)
+    return stats, _current.set(stats)
+
+
+def end_request(token: Token) -> None:
+    _current.reset(token)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str):
+    """Times the wrapped block into the current request's `name` span."""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.add_span(name, (time.perf_counter() - start) * 1000)
+
+
+def install_query_counter(engine: Engine) -> None:
+    """Counts queries and DB time per request via cursor-execute events. The
+    start time is kept on the connection (conn.info), not in the ContextVar,
+    so it's always paired with its own statement even under executemany."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start_time")
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+        stats = _current.get()
+        if stats is not None:
+            stats.query_count += 1
+            stats.db_time_ms += elapsed_ms
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        # A failed statement never reaches after_cursor_execute — drop its start
+        # time so the next statement on this connection isn't mismatched.
+        conn = exception_context.connection
+        starts = conn.info.get("query_start_time") if conn is not None else None
+        if starts:
+            starts.pop()
+
+
+def server_timing_header(stats: RequestStats, total_ms: float) -> str:
+    """Server-Timing header value (shown per request in browser devtools'
+    Timing tab): db time with the query count as its description, one metric
+    per span, and the total."""
+    parts = [f'db;dur={stats.db_time_ms:.1f};desc="{stats.query_count} queries"']
+    for name, (ms, count) in stats.spans.items():
+        parts.append(f'{name};dur={ms:.1f};desc="x{count}"')
+    parts.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(parts)
@@ -0,0 +1,316 @@
+"""
+In-process metrics with a Prometheus text exposition (GET /metrics).
+
+Dependency-free on purpose: a small Counter/Gauge/Histogram registry is all this
+single-process, on-prem install needs, and it's cheap enough to leave on in
+production — recording a sample is a dict lookup, a bisect and a lock. If the
+optional `prometheus_client` package happens to be installed, its default
+process/GC collectors are appended to the exposition as well; nothing here
+requires it.
+
+Metric families (recorded by):
+  - http_request_duration_seconds / http_requests_total — timing middleware
+    in main.py, labeled by route TEMPLATE (/orders/{order_id}, not /orders/812)
+    so label cardinality stays bounded.
+  - db_pool_* — InstrumentedQueuePool in db/database.py (checkout wait time,
+    checkout timeouts) plus gauges read from the pool at scrape time.
+  - db_transaction_retries* — db/retry.py (replays after a deadlock or
+    serialization failure, and transactions that ran out of attempts).
+  - stock_cas_conflicts — core/inventory/stockConcurrency.py (compare-and-swap
+    stock writes that found the row changed and had to re-read it).
+  - ws_* — ws/manager.py (live connections, sends still pending in the
+    current broadcast, failed sends).
+  - glass_* — glassOffcutService.resolve_glass_cut_lines, one observation per
+    resolution (dry-run previews included — they do the same engine work).
+  - offcut_1d_* — inventoryService's 1D best-fit engine, per cut.
+  - availability_checks — core/inventory/availabilityService.py (cart
+    availability checks by cache result: hit, miss, or uncached when the
+    cache is off).
+  - product_search* — core/inventory/searchService.py (searches by which tier
+    answered — prefix, fuzzy when trigram hits were added, empty — and
+    prefix-index rebuilds: full on a structure change, stock-only otherwise).
+  - reference_cache_* — core/referenceCache.py (hits/misses and invalidations
+    per namespace: settings, attribute_classes, categories).
+  - receivables_reconcile_mismatches — core/financials/receivablesService.py
+    (summary rows the reconciliation found missing, mismatched or extra
+    against the credits table; nonzero means a write bypassed the summary).
+
+Names/labels follow Prometheus conventions (base units: seconds, mm²).
+"""
+
+import bisect
+import threading
+from typing import Callable, Optional
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(label_names: tuple, label_values: tuple, extra: Optional[tuple] = None) -> str:
+    pairs = list(zip(label_names, label_values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, label_names: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.label_names)
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: dict = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}" for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """A settable gauge, or — with `callback` — one read at scrape time (used
+    for pool size / live connections, which already live somewhere else)."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple = (), callback: Optional[Callable[[], float]] = None):
+        super().__init__(name, documentation, label_names)
+        self._values: dict = {}
+        self._callback = callback
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def render(self) -> list:
+        if self._callback is not None:
+            try:
+                items = [((), self._callback())]
+            except Exception:
+                return []  # e.g. pool not initialised yet — skip the sample, don't fail the scrape
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}" for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple = (), buckets: tuple = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict = {}  # key -> [bucket_counts (non-cumulative), sum, count]
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list:
+        with self._lock:
+            items = [(key, (list(counts), total, count)) for key, (counts, total, count) in self._series.items()]
+        lines = self.header()
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.label_names, key, ("le", _format_value(float(bound))))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, label_names: tuple = ()) -> Counter:
+        return self.register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: tuple = (), callback: Optional[Callable[[], float]] = None) -> Gauge:
+        return self.register(Gauge(name, documentation, label_names, callback))
+
+    def histogram(self, name: str, documentation: str, label_names: tuple = (), buckets: tuple = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        text = "\n".join(lines) + "\n"
+        try:
+            from prometheus_client import REGISTRY, generate_latest  # optional
+            text += generate_latest(REGISTRY).decode("utf-8")
+        except ImportError:
+            pass
+        return text
+
+
+registry = Registry()
+
+# ── HTTP ─────────────────────────────────────────────────────────────────────
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Request latency by route template.", ("method", "route"),
+)
+http_requests = registry.counter(
+    "http_requests_total", "Requests by route template and status code.", ("method", "route", "status"),
+)
+
+# ── DB pool ──────────────────────────────────────────────────────────────────
+db_pool_checkout_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+db_pool_checkout_timeouts = registry.counter(
+    "db_pool_checkout_timeouts_total", "Connection checkouts that gave up after pool_timeout.",
+)
+db_transaction_retries = registry.counter(
+    "db_transaction_retries_total", "Transactions replayed after a deadlock/serialization failure.",
+    ("operation", "reason"),
+)
+db_transaction_retries_exhausted = registry.counter(
+    "db_transaction_retries_exhausted_total", "Transactions that failed on their last retry attempt.",
+    ("operation", "reason"),
+)
+stock_cas_conflicts = registry.counter(
+    "stock_cas_conflicts_total", "Compare-and-swap stock writes that lost to a concurrent update and re-read the row.",
+    ("table",),
+)
+
+# ── WebSocket ────────────────────────────────────────────────────────────────
+ws_send_queue_depth = registry.gauge(
+    "ws_send_queue_depth", "Sends still pending in broadcasts currently in progress.",
+)
+ws_send_failures = registry.counter(
+    "ws_send_failures_total", "WebSocket sends that failed (socket pruned).",
+)
+
+# ── Glass (2D) engine ────────────────────────────────────────────────────────
+glass_resolution_duration = registry.histogram(
+    "glass_resolution_seconds", "Wall time of one resolve_glass_cut_lines call.",
+)
+glass_strategies_tried = registry.counter(
+    "glass_strategies_tried_total", "Packing strategy trials run (successful ones).",
+)
+glass_savepoints = registry.counter(
+    "glass_savepoints_total", "SAVEPOINTs opened for strategy trials.",
+)
+glass_early_terminations = registry.counter(
+    "glass_early_terminations_total", "Resolutions that stopped at the sheet lower bound.",
+)
+glass_sheets_opened = registry.counter(
+    "glass_sheets_opened_total", "Fresh sheets consumed by the chosen plan.",
+)
+glass_scrap_area = registry.counter(
+    "glass_scrap_area_mm2_total", "Scrap area produced by the chosen plan, mm².",
+)
+
+# ── Profile/bar (1D) engine ──────────────────────────────────────────────────
+offcut_1d_cuts = registry.counter(
+    "offcut_1d_cuts_total", "1D best-fit cuts by source (offcut or full_bar).", ("source",),
+)
+offcut_1d_remainder_length = registry.counter(
+    "offcut_1d_remainder_length_total", "Remainder length created by 1D cuts (product units).",
+)
+
+# ── Cart availability ────────────────────────────────────────────────────────
+availability_checks = registry.counter(
+    "availability_checks_total", "Cart availability checks by cache result (hit/miss/uncached).", ("result",),
+)
+
+# ── Product search ───────────────────────────────────────────────────────────
+product_searches = registry.counter(
+    "product_searches_total", "Product searches by the tier that answered (prefix/fuzzy/empty).", ("result",),
+)
+product_search_index_builds = registry.counter(
+    "product_search_index_builds_total", "Search prefix index rebuilds (full) and stock refreshes (stock).", ("kind",),
+)
+
+# ── Reference data cache ─────────────────────────────────────────────────────
+reference_cache_requests = registry.counter(
+    "reference_cache_requests_total", "Reference cache lookups by namespace and result (hit/miss).", ("namespace", "result"),
+)
+reference_cache_invalidations = registry.counter(
+    "reference_cache_invalidations_total",
+    "Reference cache invalidations by namespace and source (local commit, remote worker, listener reconnect).",
+    ("namespace", "source"),
+)
+
+# ── Receivables ──────────────────────────────────────────────────────────────
+receivables_reconcile_mismatches = registry.counter(
+    "receivables_reconcile_mismatches_total",
+    "Receivables summary rows that disagreed with the credits table, by kind (missing/mismatched/extra).",
+    ("kind",),
+)
+
+
+def register_pool_gauges(engine) -> None:
+    """Scrape-time gauges over the live pool — same numbers /health reports.
+    Reads engine.pool on every scrape since engine.dispose() swaps the pool."""
+    registry.gauge("db_pool_size", "Configured persistent pool size.", callback=lambda: engine.pool.size())
+    registry.gauge("db_pool_checked_out", "Connections currently checked out.", callback=lambda: engine.pool.checkedout())
+    registry.gauge("db_pool_overflow", "Overflow connections currently open.", callback=lambda: engine.pool.overflow())
+
+
+def register_ws_gauges(connection_count: Callable[[], float]) -> None:
+    registry.gauge("ws_connections", "Live WebSocket connections.", callback=connection_count)
+
+
+def render() -> str:
+    return registry.render()
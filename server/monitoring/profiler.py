@@ -0,0 +1,179 @@
+"""
+On-demand sampling profiler for individual production requests.
+
+Opt-in only, two triggers (checked by the timing middleware in main.py):
+  1. An `X-Profile: 1` request header from a CEO/admin — the header is ignored
+     unless the request's bearer token verifies with one of those roles.
+  2. PROFILE_SAMPLE_RATES — per-path sampling, e.g. "/orders/=0.02" profiles
+     ~2% of requests whose path starts with /orders/. Empty (the default)
+     disables sampling entirely.
+
+While a profiled request runs, a daemon thread snapshots every thread's stack
+(sys._current_frames) every PROFILE_INTERVAL_MS. Sync endpoints run in a
+worker thread, not the thread the middleware runs in, so an in-thread
+profiler like cProfile would miss exactly the code we care about — sampling
+all threads catches it wherever it runs. On this single-shop install
+concurrent requests are rare, but any that overlap do show up in the capture
+(each stack is rooted at its thread name so they're easy to tell apart).
+
+Captures are written as "folded" stacks (`thread;outer;...;inner count` per
+line) — the input format of flamegraph.pl and speedscope.app — to
+PROFILE_DIR/<request id>.folded, with a small .json sidecar (method, path,
+duration, sample count). Only the newest PROFILE_MAX_CAPTURES are kept.
+"""
+
+import json
+import os
+import random
+import re
+import sys
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from config import settings
+
+PROFILE_HEADER = "X-Profile"
+PROFILER_ROLES = ("ceo", "admin")
+_SAFE_ID = re.compile(r"[^A-Za-z0-9._-]")
+
+
+def _parse_sample_rates(raw: str) -> list:
+    """"/orders/=0.02,/products/=0.01" -> [("/orders/", 0.02), ("/products/", 0.01)],
+    longest prefix first so the most specific entry wins."""
+    rates = []
+    for entry in raw.split(","):
+        prefix, sep, rate = entry.strip().rpartition("=")
+        if not sep or not prefix:
+            continue
+        try:
+            rates.append((prefix, max(0.0, min(1.0, float(rate)))))
+        except ValueError:
+            continue
+    return sorted(rates, key=lambda r: -len(r[0]))
+
+
+SAMPLE_RATES = _parse_sample_rates(settings.PROFILE_SAMPLE_RATES)
+
+
+def profile_dir() -> Path:
+    return Path(settings.PROFILE_DIR)
+
+
+def safe_capture_id(request_id: str) -> str:
+    """Request ids come from a client header — never let one pick a path."""
+    return _SAFE_ID.sub("_", request_id)[:80] or "capture"
+
+
+def _requested_by_admin(headers) -> bool:
+    if headers.get(PROFILE_HEADER, "").strip() not in ("1", "true", "yes"):
+        return False
+    auth = headers.get("Authorization", "")
+    if not auth.lower().startswith("bearer "):
+        return False
+    from core.userManagement.authService import verify_token  # lazy: avoids an import cycle via db.database
+    try:
+        return verify_token(auth[7:].strip()).role in PROFILER_ROLES
+    except Exception:
+        return False
+
+
+def should_profile(method: str, path: str, headers) -> bool:
+    if _requested_by_admin(headers):
+        return True
+    for prefix, rate in SAMPLE_RATES:
+        if path.startswith(prefix):
+            return rate > 0 and random.random() < rate
+    return False
+
+
+class SamplingProfiler:
+    """Samples every thread's stack on a daemon thread until stop() — see
+    module docstring. Aggregates identical stacks as it goes, so memory is
+    bounded by the number of distinct stacks, not the request's duration."""
+
+    def __init__(self, interval_ms: float):
+        self.interval = interval_ms / 1000.0
+        self.stacks: dict = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> "SamplingProfiler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                key = ";".join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+
+def start_capture() -> SamplingProfiler:
+    return SamplingProfiler(settings.PROFILE_INTERVAL_MS).start()
+
+
+def save_capture(profiler: SamplingProfiler, request_id: str, method: str, path: str, status: int, elapsed_ms: float) -> str:
+    """Writes the capture + sidecar, prunes old captures, returns the capture id."""
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    capture_id = safe_capture_id(request_id)
+    (directory / f"{capture_id}.folded").write_text(profiler.folded(), encoding="utf-8")
+    (directory / f"{capture_id}.json").write_text(json.dumps({
+        "request_id": capture_id,
+        "method": method,
+        "path": path,
+        "status": status,
+        "elapsed_ms": round(elapsed_ms, 1),
+        "samples": profiler.samples,
+        "interval_ms": settings.PROFILE_INTERVAL_MS,
+        "captured_at": datetime.now(timezone.utc).isoformat(),
+    }), encoding="utf-8")
+    _prune(directory)
+    return capture_id
+
+
+def _prune(directory: Path) -> None:
+    sidecars = sorted(directory.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for stale in sidecars[settings.PROFILE_MAX_CAPTURES:]:
+        stale.unlink(missing_ok=True)
+        stale.with_suffix(".folded").unlink(missing_ok=True)
+
+
+def list_captures(limit: int = 50) -> list:
+    directory = profile_dir()
+    if not directory.is_dir():
+        return []
+    sidecars = sorted(directory.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)[:limit]
+    captures = []
+    for sidecar in sidecars:
+        try:
+            captures.append(json.loads(sidecar.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            continue
+    return captures
+
+
+def capture_path(request_id: str) -> Optional[Path]:
+    path = profile_dir() / f"{safe_capture_id(request_id)}.folded"
+    return path if path.is_file() else None
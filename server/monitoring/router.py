@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from core.userManagement.authService import get_current_user
+from utils import require_role
+from . import profiler
+
+router = APIRouter(prefix="/profiles", tags=["System"])
+
+
+@router.get("/")
+def list_profiles(
+    limit: int = Query(50, ge=1, le=500),
+    current_user=Depends(get_current_user),
+):
+    """Recent request profiles, newest first (see monitoring/profiler.py)."""
+    require_role(list(profiler.PROFILER_ROLES), current_user)
+    return profiler.list_captures(limit)
+
+
+@router.get("/{request_id}")
+def download_profile(
+    request_id: str,
+    current_user=Depends(get_current_user),
+):
+    """Folded-stack capture for one request — open it in speedscope.app or
+    feed it to flamegraph.pl."""
+    require_role(list(profiler.PROFILER_ROLES), current_user)
+    path = profiler.capture_path(request_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain; charset=utf-8", filename=path.name)
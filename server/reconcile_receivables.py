@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Check the customer_receivables summary against the credits table.
+
+The API already does this nightly (RECEIVABLES_RECONCILE_HOUR); this is the
+same check for running by hand or from Task Scheduler — after manual SQL on
+credits, say. Prints the customers whose rows are missing, mismatched or extra
+and exits 1 if there were any, so a scheduled run can alert on it.
+
+Run from the server/ directory:
+    python reconcile_receivables.py          # report only
+    python reconcile_receivables.py --fix    # also rewrite the rows that differ
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+
+from sqlmodel import Session
+
+from db.database import engine
+from entities import *  # noqa: F401,F403 — registers every table the FKs point at
+from core.financials import receivablesService
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fix", action="store_true", help="rewrite summary rows that differ from credits")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        report = receivablesService.reconcile(session, fix=args.fix)
+
+    print(f"{report['checked']} customers checked")
+    for kind in ("missing", "mismatched", "extra"):
+        ids = report[kind]
+        print(f"  {kind}: {len(ids)}" + (f" — customers {', '.join(map(str, ids))}" if ids else ""))
+    if args.fix:
+        print(f"  fixed: {report['fixed']}")
+    print(f"  re-aged: {report['reaged']}")
+    return 1 if any(report[kind] for kind in ("missing", "mismatched", "extra")) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Static frontend serving: client/dist, precompressed and indexed in memory.
+
+The PWA is reloaded constantly by the shop tablets. Before, every load
+stat()ed the requested path, returned FileResponse without cache headers, and
+GZipMiddleware recompressed index.html and every large JS/CSS bundle on each
+request. Now:
+
+  - DistIndex walks client/dist ONCE (at import of main.py) and keeps, per
+    file, its content type, cache policy and the stat/ETag of every encoded
+    variant. Requests are a dict lookup — no filesystem checks.
+  - Compressible files (html/js/css/json/svg/...) over 1 kB get `.gz` and
+    `.br` sidecars next to them, written once and reused across restarts
+    (rewritten only when the source is newer). Run `python staticAssets.py`
+    after `npm run build` to do it at deploy time instead of on first start.
+    Brotli needs the optional `brotli` package; without it `.br` files a
+    build step already produced are still served, just not created here.
+  - The variant is picked from Accept-Encoding (br > gzip > identity) and
+    sent with Content-Encoding + Vary, so GZipMiddleware leaves it alone
+    (main.py also skips it entirely for indexed frontend paths).
+  - Cache-Control: hashed /assets/* are immutable for a year; index.html, the
+    service worker and the manifest are `no-cache` (revalidated by ETag → 304)
+    so a new deploy is picked up on the next load; other top-level files
+    (icons) get an hour.
+
+The index is built from the dist tree as it was at startup — a new build is
+picked up by restarting the service (which the deploy does anyway).
+"""
+
+import gzip
+import mimetypes
+import os
+import pathlib
+import sys
+from typing import Optional
+
+from starlette.responses import FileResponse, Response
+
+try:
+    import brotli  # optional
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_SUFFIXES = {
+    ".html", ".js", ".mjs", ".css", ".json", ".map", ".svg", ".txt", ".xml", ".webmanifest", ".wasm", ".ico",
+}
+MIN_COMPRESS_SIZE = 1024
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))  # preference order
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+SHORT = "public, max-age=3600"
+REVALIDATED_FILES = {"index.html", "sw.js", "registerSW.js", "manifest.webmanifest"}
+
+mimetypes.add_type("application/manifest+json", ".webmanifest")
+mimetypes.add_type("text/javascript", ".mjs")
+
+
+# ── Precompression ───────────────────────────────────────────────────────────
+
+def _compress(data: bytes, encoding: str) -> Optional[bytes]:
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(data, quality=11)
+    return None
+
+
+def _ensure_sidecar(source: pathlib.Path, source_stat: os.stat_result, encoding: str, suffix: str) -> Optional[pathlib.Path]:
+    """Path of an up-to-date `<file><suffix>`, creating it if needed; None when
+    it can't be produced (no brotli module, no gain, read-only dist)."""
+    sidecar = source.with_name(source.name + suffix)
+    try:
+        if sidecar.stat().st_mtime >= source_stat.st_mtime:
+            return sidecar
+    except FileNotFoundError:
+        pass
+
+    data = source.read_bytes()
+    compressed = _compress(data, encoding)
+    if compressed is None or len(compressed) >= len(data) * 0.9:
+        return None
+    tmp = sidecar.with_name(sidecar.name + ".tmp")
+    try:
+        tmp.write_bytes(compressed)
+        os.replace(tmp, sidecar)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        return None
+    return sidecar
+
+
+# ── Index ────────────────────────────────────────────────────────────────────
+
+def _etag(stat: os.stat_result) -> str:
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def _cache_control(relative: str) -> str:
+    if relative.startswith("assets/"):
+        return IMMUTABLE
+    if relative in REVALIDATED_FILES:
+        return REVALIDATE
+    return SHORT
+
+
+class _Asset:
+    __slots__ = ("content_type", "cache_control", "variants")
+
+    def __init__(self, content_type: str, cache_control: str):
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.variants: dict = {}  # encoding ("" = identity) -> (path, stat, etag)
+
+
+class DistIndex:
+    def __init__(self, root: pathlib.Path, precompress: bool = True):
+        self.root = root
+        self.assets: dict = {}  # "assets/index-3f2a.js" -> _Asset
+        self._build(precompress)
+
+    def _build(self, precompress: bool) -> None:
+        sidecar_suffixes = tuple(suffix for _, suffix in ENCODINGS) + (".tmp",)
+        for path in sorted(self.root.rglob("*")):
+            if not path.is_file() or path.name.endswith(sidecar_suffixes):
+                continue
+            relative = path.relative_to(self.root).as_posix()
+            stat = path.stat()
+            content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+            if content_type.startswith("text/") or content_type in ("application/javascript", "application/json"):
+                content_type += "; charset=utf-8"
+            asset = _Asset(content_type, _cache_control(relative))
+            asset.variants[""] = (path, stat, _etag(stat))
+
+            if path.suffix in COMPRESSIBLE_SUFFIXES and stat.st_size >= MIN_COMPRESS_SIZE:
+                for encoding, suffix in ENCODINGS:
+                    sidecar = (
+                        _ensure_sidecar(path, stat, encoding, suffix) if precompress
+                        else path.with_name(path.name + suffix)
+                    )
+                    if sidecar is not None and sidecar.is_file():
+                        sidecar_stat = sidecar.stat()
+                        asset.variants[encoding] = (sidecar, sidecar_stat, _etag(sidecar_stat))
+            self.assets[relative] = asset
+
+    def __contains__(self, request_path: str) -> bool:
+        return request_path.lstrip("/") in self.assets
+
+    def lookup(self, full_path: str) -> Optional[_Asset]:
+        """The file for `full_path`, falling back to index.html for client-side
+        routes. Missing hashed assets are a real 404 — returning HTML for a
+        stale /assets/*.js breaks module loading with a confusing MIME error."""
+        asset = self.assets.get(full_path)
+        if asset is None and not full_path.startswith("assets/"):
+            asset = self.assets.get("index.html")
+        return asset
+
+    def response(self, full_path: str, accept_encoding: str, if_none_match: Optional[str]) -> Response:
+        asset = self.lookup(full_path)
+        if asset is None:
+            return Response(status_code=404)
+
+        encoding = negotiate(accept_encoding, asset.variants)
+        path, stat, etag = asset.variants[encoding]
+        headers = {"Cache-Control": asset.cache_control, "ETag": etag}
+        if len(asset.variants) > 1:
+            headers["Vary"] = "Accept-Encoding"
+        if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+            return Response(status_code=304, headers=headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return FileResponse(path, stat_result=stat, media_type=asset.content_type, headers=headers)
+
+
+def negotiate(accept_encoding: str, available) -> str:
+    """Best of `available` ("br"/"gzip"/"" identity) the client accepts."""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+    for encoding, _ in ENCODINGS:
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return ""
+
+
+if __name__ == "__main__":
+    # Precompress at deploy time:  python staticAssets.py [path/to/client/dist]
+    dist = pathlib.Path(sys.argv[1]) if len(sys.argv) > 1 else (
+        pathlib.Path(__file__).resolve().parent.parent / "client" / "dist"
+    )
+    index = DistIndex(dist)
+    compressed = sum(1 for asset in index.assets.values() if len(asset.variants) > 1)
+    print(f"{len(index.assets)} files indexed, {compressed} with precompressed variants"
+          + ("" if brotli else " (brotli not installed — gzip only)"))
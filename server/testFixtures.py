@@ -0,0 +1,74 @@
+"""
+Shared fixtures for the standalone test scripts (test_*.py). They all run
+against the real DATABASE_URL, so each fixture is found by name and reset in
+place rather than created fresh — re-running a script never piles up rows.
+"""
+
+from typing import Optional, Tuple
+
+from sqlmodel import Session, select
+
+from entities.customers import Customer
+from entities.offcuts import Offcut
+from entities.products import Product
+from entities.users import User
+from entities.variants import Variant
+
+
+def reset_product(db: Session, name: str, stock: float = 10, variant: Optional[dict] = None, **fields) -> Tuple[Product, Variant]:
+    """
+    The test product called `name` and its first variant, created on first
+    use. Both are reset to `stock`; `fields` are set on the product and
+    `variant` on the variant every time, so a run interrupted half-way can't
+    leave the next one with different settings.
+    """
+    variant = variant or {}
+    p = db.exec(select(Product).where(Product.name == name)).first()
+    if not p:
+        p = Product(**{"name": name, "category_id": 1, "has_variants": True, "stock_quantity": stock, **fields})
+        db.add(p)
+        db.commit()
+        db.refresh(p)
+
+    v = db.exec(select(Variant).where(Variant.product_id == p.productId)).first()
+    if not v:
+        v = Variant(**{"product_id": p.productId, "name": '', "attributes": {}, "price": 100.0, "stock_quantity": stock, **variant})
+
+    for key, value in {"stock_quantity": stock, **fields}.items():
+        setattr(p, key, value)
+    for key, value in {"stock_quantity": stock, **variant}.items():
+        setattr(v, key, value)
+    db.add(p)
+    db.add(v)
+    db.commit()
+    db.refresh(p)
+    db.refresh(v)
+    return p, v
+
+
+def clear_offcuts(db: Session, p: Product) -> None:
+    for o in db.exec(select(Offcut).where(Offcut.product_id == p.productId)).all():
+        db.delete(o)
+    db.commit()
+
+
+def reset_customer(db: Session, name: str, phone: str, type: str = "individual") -> Customer:
+    """The test customer with phone number `phone`, created on first use."""
+    c = db.exec(select(Customer).where(Customer.phoneNumber == phone)).first()
+    if not c:
+        c = Customer(name=name, phoneNumber=phone, type=type)
+        db.add(c)
+        db.commit()
+        db.refresh(c)
+    return c
+
+
+def first_user_id(db: Session):
+    """Any user's id, to serve test orders. Selects just the userId column (not
+    full User rows) — some existing user rows carry a stale `role` value
+    predating migrate_rename_roles.py that doesn't match the current enum,
+    which would blow up a full-row fetch."""
+    servedby = db.exec(select(User.userId)).first()
+    if not servedby:
+        raise RuntimeError("No users found in DB — need at least one user to seed a test order")
+    return servedby
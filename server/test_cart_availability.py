@@ -0,0 +1,133 @@
+"""
+Standalone smoke tests for cart availability
+(core/inventory/availabilityService.py — POST /products/availability),
+following the same direct-DB-session pattern as test_stock_concurrency.py.
+
+Run from the server directory:
+    python test_cart_availability.py
+"""
+
+from sqlmodel import Session, create_engine
+
+from config import settings
+from db.database import DATABASE_URL
+from entities.products import Product
+from entities.variants import Variant
+from core.inventory import availabilityService, stockConcurrency
+from monitoring import metrics
+from testFixtures import reset_product
+
+
+def _reset_fixtures(db: Session):
+    """Two plain accessories: A with 5 in stock, B with 2."""
+    a, va = reset_product(db, "Test Availability A", stock=5, track_offcuts=False, unit="pcs")
+    b, vb = reset_product(db, "Test Availability B", stock=2, track_offcuts=False, unit="pcs")
+    return (a.productId, va.variantId), (b.productId, vb.variantId)
+
+
+def _item(ids, quantity, line_items=None):
+    product_id, variant_id = ids
+    details = {"lineItems": line_items} if line_items else {"quantity": quantity}
+    return {"productId": product_id, "variantId": variant_id, "quantity": quantity, "details": details}
+
+
+def _checks(result: str) -> float:
+    return metrics.availability_checks._values.get((result,), 0.0)
+
+
+def test_1_cart_short_on_one_line(engine, a, b):
+    print("\n--- Test 1: A cart short on one line fails on that line only ---")
+    with Session(engine) as db:
+        result = availabilityService.check_cart(db, [_item(a, 3), _item(b, 4)])
+    print(result)
+    first, second = result["lines"]
+    assert not result["ok"]
+    assert first["ok"] and first["exact"] and first["requested"] == 3
+    assert not second["ok"] and second["available"] == 2 and second["requested"] == 4
+    assert "Insufficient stock" in second["reason"]
+    print("PASS")
+
+
+def test_2_repeated_demand_on_one_variant(engine, a, b):
+    print("\n--- Test 2: Lines and items drawing on one variant add up ---")
+    # Within one item: every counted line adds to the same stock row
+    with Session(engine) as db:
+        product, variant = db.get(Product, a[0]), db.get(Variant, a[1])
+        demand = availabilityService._demand(product, variant, {"lineItems": [
+            {"type": "accessory-unit", "qty": 2},
+            {"type": "profile-full", "qty": 1},
+            {"type": "accessory-half", "qty": 1},  # not offcut-tracked: a plain unit
+            {"type": "accessory-unit", "qty": 0},
+        ]}, 0, [])
+    print(f"_demand: {demand}")
+    assert demand == {"units": 4, "exact": True, "reason": None}
+
+    # Across items: a running balance, like checkout
+    with Session(engine) as db:
+        result = availabilityService.check_cart(db, [
+            _item(a, 3), _item(a, 0, [{"type": "accessory-unit", "qty": 2}]), _item(a, 1),
+        ])
+    print([(line["ok"], line["requested"], line["available"]) for line in result["lines"]])
+    assert [line["available"] for line in result["lines"]] == [5, 2, 0]
+    assert [line["ok"] for line in result["lines"]] == [True, True, False]
+    print("PASS")
+
+
+def test_3_cache_hits_until_stock_changes(engine, a, b):
+    print("\n--- Test 3: A repeated cart is a cache hit until a stock write bumps the version ---")
+    ttl = settings.AVAILABILITY_CACHE_TTL
+    settings.AVAILABILITY_CACHE_TTL = 60
+    availabilityService._cache.clear()
+    cart = [_item(a, 1)]
+    try:
+        with Session(engine) as db:
+            first = availabilityService.check_cart(db, cart)
+            hits, misses = _checks("hit"), _checks("miss")
+            again = availabilityService.check_cart(db, cart)
+            assert again is first and _checks("hit") == hits + 1, "The same cart at the same versions should hit"
+
+        with Session(engine) as db:
+            v = db.get(Variant, a[1])
+            stockConcurrency.adjust(db, v, -1)
+            db.commit()  # stockConcurrency.apply -> catalogService.note_stock_change
+
+        with Session(engine) as db:
+            after = availabilityService.check_cart(db, cart)
+        print(f"stock_version {first['stock_version']} -> {after['stock_version']}, "
+              f"available {first['lines'][0]['available']} -> {after['lines'][0]['available']}")
+        assert _checks("miss") == misses + 1, "A stock change should miss the cache"
+        assert after["stock_version"] > first["stock_version"]
+        assert after["lines"][0]["available"] == first["lines"][0]["available"] - 1
+    finally:
+        settings.AVAILABILITY_CACHE_TTL = ttl
+        availabilityService._cache.clear()
+    print("PASS")
+
+
+def run():
+    engine = create_engine(DATABASE_URL)
+    failures = []
+    for name, fn in [
+        ("test_1_cart_short_on_one_line", test_1_cart_short_on_one_line),
+        ("test_2_repeated_demand_on_one_variant", test_2_repeated_demand_on_one_variant),
+        ("test_3_cache_hits_until_stock_changes", test_3_cache_hits_until_stock_changes),
+    ]:
+        with Session(engine) as db:
+            a, b = _reset_fixtures(db)
+        try:
+            fn(engine, a, b)
+        except Exception as e:
+            failures.append((name, e))
+            print(f"{name} FAILED: {e}")
+
+    print("\n" + "=" * 60)
+    if failures:
+        print(f"{len(failures)} test(s) FAILED:")
+        for name, e in failures:
+            print(f"  - {name}: {e}")
+    else:
+        print("All tests PASSED.")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,190 @@
+"""
+Standalone smoke tests for the catalog importer
+(core/inventory/importService.py — POST /products/import), following the same
+direct-DB-session pattern as test_offcut_logic.py. Postgres only, like the
+importer itself (COPY into a temp table).
+
+One file exercises the whole pipeline — resolve, diff, apply:
+  line 2  a new product
+  line 3  (blank)
+  line 4  a new variant on an existing product, bringing a new attribute
+  line 5  a new price for an existing variant
+  line 6  a bad price
+  line 7  a variant for a simple product (has_variants = false)
+
+Run from the server directory:
+    python test_catalog_import.py
+"""
+
+import csv
+import io
+
+from sqlmodel import Session, create_engine, delete, select
+
+from db.database import DATABASE_URL
+from entities.products import Category, Product
+from entities.variants import Variant
+from core.inventory import importService
+from testFixtures import reset_product
+
+NEW_PRODUCT = "Test Import New Product"
+PROFILE = "Test Import Profile"
+SIMPLE = "Test Import Simple"
+
+
+def _reset_fixtures(db: Session) -> str:
+    """A product with one variant (Color=White, price 100, stock 10), a simple
+    product, and no trace of the product the file creates. Returns the
+    category name the file uses."""
+    new = db.exec(select(Product).where(Product.name == NEW_PRODUCT)).all()
+    for p in new:
+        db.exec(delete(Variant).where(Variant.product_id == p.productId))
+        db.delete(p)
+    profile = db.exec(select(Product).where(Product.name == PROFILE)).first()
+    if profile:
+        db.exec(delete(Variant).where(Variant.product_id == profile.productId, Variant.name != "White"))
+    db.commit()
+
+    reset_product(db, PROFILE, has_variants=True, track_offcuts=False, applicable_attributes=["Color"],
+                  variant={"name": "White", "attributes": {"Color": "White"}, "price": 100.0})
+    reset_product(db, SIMPLE, has_variants=False, track_offcuts=False, unit="pcs")
+    return db.get(Category, 1).name
+
+
+def _csv(category: str) -> io.BytesIO:
+    rows = [
+        ["product_name", "category", "attributes", "price", "stock_quantity"],
+        [NEW_PRODUCT, category, "Color=Black; Size=Large", "250", "5"],
+        [],
+        [PROFILE, category, "Color=White; Finish=Matt", "120", "3"],
+        [PROFILE, category, "Color=White", "135", ""],
+        [PROFILE, category, "Color=Red", "not-a-number", ""],
+        [SIMPLE, category, "Color=Blue", "10", "1"],
+    ]
+    text = io.StringIO()
+    csv.writer(text, lineterminator="\n").writerows(rows)
+    return io.BytesIO(text.getvalue().encode("utf-8"))
+
+
+def _state(engine) -> dict:
+    with Session(engine) as db:
+        profile = db.exec(select(Product).where(Product.name == PROFILE)).one()
+        simple = db.exec(select(Product).where(Product.name == SIMPLE)).one()
+        new = db.exec(select(Product).where(Product.name == NEW_PRODUCT)).first()
+        variants = {v.name: v for v in db.exec(select(Variant).where(Variant.product_id == profile.productId)).all()}
+        return {
+            "profile": (profile.stock_quantity, list(profile.applicable_attributes or [])),
+            "profile_variants": {name: (v.price, v.stock_quantity) for name, v in variants.items()},
+            "simple": (simple.has_variants, simple.stock_quantity,
+                       len(db.exec(select(Variant).where(Variant.product_id == simple.productId)).all())),
+            "new": None if new is None else (
+                new.stock_quantity, list(new.applicable_attributes or []),
+                [(v.name, v.price, v.stock_quantity) for v in db.exec(select(Variant).where(Variant.product_id == new.productId)).all()],
+            ),
+        }
+
+
+def test_1_dry_run_reports_the_diff_and_writes_nothing(engine, category):
+    print("\n--- Test 1: A dry run reports the diff, with true line numbers, and writes nothing ---")
+    before = _state(engine)
+    phases = []
+    with Session(engine) as db:
+        report = importService.import_catalog(db, _csv(category), "catalog.csv", dry_run=True,
+                                              progress=lambda e: phases.append(e["phase"]))
+    print(f"rows={report['rows']} errors={report['errors']}")
+    print(f"products={report['products']} variants create/update={report['variants']['create']}/{report['variants']['update']}")
+
+    assert not report["applied"]
+    assert report["rows"] == {"total": 5, "valid": 3, "invalid": 2}, report["rows"]
+    assert [e["row"] for e in report["errors"]] == [6, 7], "Errors should carry the file's line numbers (blank line 3 counts)"
+    assert "simple product" in report["errors"][1]["error"]
+    assert report["products"]["create"] == 1
+    assert report["variants"]["create"] == 2, "The new product's variant and White - Matt"
+    assert report["variants"]["update"] == 1
+
+    profile_change = next(c for c in report["products"]["changes"] if c["product"] == PROFILE)
+    assert profile_change["fields"]["applicable_attributes"]["to"] == ["Color", "Finish"]
+    price_change = next(c for c in report["variants"]["changes"] if c["action"] == "update")
+    assert price_change["fields"]["price"] == {"from": 100.0, "to": 135.0}
+
+    assert phases[-1] == "done" and "diff" in phases
+    assert _state(engine) == before, "A dry run must not write"
+    print("PASS")
+
+
+def test_2_invalid_rows_block_the_apply(engine, category):
+    print("\n--- Test 2: Without skip_invalid, one bad row keeps the whole file out ---")
+    before = _state(engine)
+    with Session(engine) as db:
+        report = importService.import_catalog(db, _csv(category), "catalog.csv", dry_run=False)
+    assert not report["applied"]
+    assert _state(engine) == before
+    print("PASS")
+
+
+def test_3_apply_with_skip_invalid(engine, category):
+    print("\n--- Test 3: skip_invalid applies the valid rows ---")
+    before = _state(engine)
+    with Session(engine) as db:
+        report = importService.import_catalog(db, _csv(category), "catalog.csv", dry_run=False, skip_invalid=True)
+    after = _state(engine)
+    print(f"Before: {before}\nAfter:  {after}")
+    assert report["applied"]
+
+    # New product, its attributes and opening stock
+    assert after["new"] == (5, ["Color", "Size"], [("Black - Large", 250.0, 5)])
+
+    # Existing product: new variant + its stock, attribute list extended, price updated
+    stock, attributes = after["profile"]
+    assert attributes == ["Color", "Finish"], attributes
+    assert stock == before["profile"][0] + 3
+    assert after["profile_variants"]["White - Matt"] == (120.0, 3)
+    assert after["profile_variants"]["White"] == (135.0, before["profile_variants"]["White"][1]), \
+        "An import updates prices but never the stock of an existing variant"
+    assert "Red" not in after["profile_variants"]
+
+    # The simple product is untouched
+    assert after["simple"] == before["simple"]
+    print("PASS")
+
+
+def test_4_reimport_is_a_no_op(engine, category):
+    print("\n--- Test 4: Importing the same file again changes nothing ---")
+    with Session(engine) as db:
+        report = importService.import_catalog(db, _csv(category), "catalog.csv", dry_run=True)
+    print(f"products={report['products']['create']}/{report['products']['update']} "
+          f"variants={report['variants']['create']}/{report['variants']['update']}")
+    assert (report["products"]["create"], report["products"]["update"]) == (0, 0)
+    assert (report["variants"]["create"], report["variants"]["update"]) == (0, 0)
+    print("PASS")
+
+
+def run():
+    engine = create_engine(DATABASE_URL)
+    with Session(engine) as db:
+        category = _reset_fixtures(db)
+
+    failures = []
+    for name, fn in [
+        ("test_1_dry_run_reports_the_diff_and_writes_nothing", test_1_dry_run_reports_the_diff_and_writes_nothing),
+        ("test_2_invalid_rows_block_the_apply", test_2_invalid_rows_block_the_apply),
+        ("test_3_apply_with_skip_invalid", test_3_apply_with_skip_invalid),
+        ("test_4_reimport_is_a_no_op", test_4_reimport_is_a_no_op),
+    ]:
+        try:
+            fn(engine, category)
+        except Exception as e:
+            failures.append((name, e))
+            print(f"{name} FAILED: {e}")
+
+    print("\n" + "=" * 60)
+    if failures:
+        print(f"{len(failures)} test(s) FAILED:")
+        for name, e in failures:
+            print(f"  - {name}: {e}")
+    else:
+        print("All tests PASSED.")
+
+
+if __name__ == "__main__":
+    run()
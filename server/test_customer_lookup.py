@@ -0,0 +1,132 @@
+"""
+Standalone smoke tests for the checkout customer lookup
+(core/userManagement/customerService.py — GET /users/customers/search and
+/users/customers/recent), following the same direct-DB-session pattern as
+test_stock_concurrency.py.
+
+Run from the server directory:
+    python test_customer_lookup.py
+"""
+
+import uuid
+from types import SimpleNamespace
+
+from sqlmodel import Session, create_engine
+
+from config import settings
+from db.database import DATABASE_URL
+from core.userManagement import customerService
+from testFixtures import reset_customer
+
+# (name, phone) — the phone numbers share a prefix, one is stored formatted
+CUSTOMERS = [
+    ("Zqc Lookup Charlie", "0799123401"),
+    ("Zqc Lookup Alpha", "0799-123-402"),
+    ("Zqc Lookup Bravo", "0799123403"),
+    ("Zqc Lookup 100% Delta", "0799123404"),
+]
+
+
+def _reset_fixtures(db: Session) -> dict:
+    """{name: customerId} for CUSTOMERS."""
+    return {name: reset_customer(db, name, phone).customerId for name, phone in CUSTOMERS}
+
+
+def _names(page: dict) -> list:
+    return [c["name"] for c in page["items"]]
+
+
+def test_1_phone_and_name_matching(engine, ids):
+    print("\n--- Test 1: A phone-like query matches digit prefixes; anything else matches names ---")
+    with Session(engine) as db:
+        by_phone = customerService.search_customers(db, "0799 1234")
+        formatted = customerService.search_customers(db, "(0799) 123-402")
+        by_name = customerService.search_customers(db, "OOKUP B")
+        literal = customerService.search_customers(db, "100%")
+        digits_in_name = customerService.search_customers(db, "Zqc 0799")
+    print(f"'0799 1234': {[c['phoneNumber'] for c in by_phone['items']]}")
+    print(f"'OOKUP B': {_names(by_name)}; '100%': {_names(literal)}")
+
+    assert [c["phoneNumber"] for c in by_phone["items"]] == [phone for _, phone in CUSTOMERS], \
+        "Phone hits are ordered by their digits, whatever the stored formatting"
+    assert _names(formatted) == ["Zqc Lookup Alpha"], "Formatting in the query is ignored too"
+    assert _names(by_name) == ["Zqc Lookup Bravo"], "Name matches are case-insensitive substrings"
+    assert _names(literal) == ["Zqc Lookup 100% Delta"], "% in the query is a literal, not a wildcard"
+    assert digits_in_name["items"] == [], "A query with letters is a name search"
+    assert all(c["balance"] == 0 and c["open_credits"] == 0 for c in by_name["items"])
+    print("PASS")
+
+
+def test_2_ordering_and_pages(engine, ids):
+    print("\n--- Test 2: Names come back in order, one keyset page at a time ---")
+    expected = sorted(name for name, _ in CUSTOMERS)
+    with Session(engine) as db:
+        pages, after = [], None
+        while True:
+            page = customerService.search_customers(db, "zqc lookup", limit=3, after=after)
+            pages.append(_names(page))
+            after = page["next_after"]
+            if after is None:
+                break
+    print(f"Pages: {pages}")
+    assert [name for page in pages for name in page] == expected
+    assert [len(page) for page in pages] == [3, 1]
+    print("PASS")
+
+
+def test_3_recent_list_dedupes_and_caps(engine, ids):
+    print("\n--- Test 3: The recent list puts the latest first, once each, up to the cap ---")
+    charlie, alpha, bravo, delta = (ids[name] for name, _ in CUSTOMERS)
+    cashier = SimpleNamespace(userId=uuid.uuid4())  # has served no orders
+    cap = settings.RECENT_CUSTOMERS_PER_CASHIER
+    settings.RECENT_CUSTOMERS_PER_CASHIER = 3
+    try:
+        customerService.note_recent_customer(cashier.userId, alpha)
+        with Session(engine) as db:
+            assert customerService.recent_customers(db, cashier) == [], \
+                "A note before the first read is dropped; the read seeds the list from orders"
+
+            for customer_id in (alpha, bravo, charlie, alpha, None):
+                customerService.note_recent_customer(cashier.userId, customer_id)
+            recent = [c["customerId"] for c in customerService.recent_customers(db, cashier)]
+            print(f"After alpha, bravo, charlie, alpha: {recent}")
+            assert recent == [alpha, charlie, bravo], "A repeat moves to the front instead of appearing twice"
+
+            customerService.note_recent_customer(cashier.userId, delta)
+            recent = [c["customerId"] for c in customerService.recent_customers(db, cashier)]
+            print(f"After delta: {recent}")
+            assert recent == [delta, alpha, charlie], "The oldest falls off past the cap"
+    finally:
+        settings.RECENT_CUSTOMERS_PER_CASHIER = cap
+        customerService._recent.pop(str(cashier.userId), None)
+    print("PASS")
+
+
+def run():
+    engine = create_engine(DATABASE_URL)
+    with Session(engine) as db:
+        ids = _reset_fixtures(db)
+
+    failures = []
+    for name, fn in [
+        ("test_1_phone_and_name_matching", test_1_phone_and_name_matching),
+        ("test_2_ordering_and_pages", test_2_ordering_and_pages),
+        ("test_3_recent_list_dedupes_and_caps", test_3_recent_list_dedupes_and_caps),
+    ]:
+        try:
+            fn(engine, ids)
+        except Exception as e:
+            failures.append((name, e))
+            print(f"{name} FAILED: {e}")
+
+    print("\n" + "=" * 60)
+    if failures:
+        print(f"{len(failures)} test(s) FAILED:")
+        for name, e in failures:
+            print(f"  - {name}: {e}")
+    else:
+        print("All tests PASSED.")
+
+
+if __name__ == "__main__":
+    run()
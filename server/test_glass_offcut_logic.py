@@ -20,66 +20,36 @@ from entities.offcuts import Offcut
 from entities.orders import Order
 from entities.orderItems import OrderItem
 from entities.users import User
+from entities.offcutEvents import OffcutEvent
 import core.inventory.glassOffcutService as gos
 from core.inventory.products import service as products_service
 from core.inventory.products.model import GlassCutPreviewCut
+from core.inventory.inventoryService import restore_stock_for_order_item
+from testFixtures import clear_offcuts, reset_product
 
 
 def _reset_product(db: Session):
-    p = db.exec(select(Product).where(Product.name == "Test Glass Sheet")).first()
-    if not p:
-        p = Product(
-            name="Test Glass Sheet", category_id=1, stock_quantity=10,
-            track_offcuts=True, has_variants=True, has_dimensions=True, unit="mm",
-            min_usable_dimension=150.0, allow_rotation=True, popular_size_ranges=[],
-        )
-        db.add(p)
-        db.commit()
-        db.refresh(p)
-    else:
-        p.stock_quantity = 10
-        p.track_offcuts = True
-        p.has_dimensions = True
-        p.min_usable_dimension = 150.0
-        p.allow_rotation = True
-        p.popular_size_ranges = []  # reset in case a prior interrupted run left this set
-        db.add(p)
-        db.commit()
-
-    v = db.exec(select(Variant).where(Variant.product_id == p.productId)).first()
-    if not v:
-        # A realistic 2440x1830mm sheet (~8x6ft), matching real has_dimensions products
-        v = Variant(product_id=p.productId, name='', attributes={}, stock_quantity=10, price=100.0, length=2440.0, width=1830.0)
-        db.add(v)
-        db.commit()
-        db.refresh(v)
-    else:
-        v.stock_quantity = 10
-        v.length = 2440.0
-        v.width = 1830.0
-        db.add(v)
-        db.commit()
-
-    _clear_offcuts(db, p)
+    # A realistic 2440x1830mm sheet (~8x6ft), matching real has_dimensions products.
+    # popular_size_ranges is reset in case a prior interrupted run left it set.
+    p, v = reset_product(
+        db, "Test Glass Sheet",
+        track_offcuts=True, has_dimensions=True, unit="mm",
+        min_usable_dimension=150.0, allow_rotation=True, popular_size_ranges=[],
+        variant={"length": 2440.0, "width": 1830.0},
+    )
+    clear_offcuts(db, p)
     db.refresh(p)
     db.refresh(v)
     return p, v
 
 
-def _clear_offcuts(db: Session, p: Product):
-    offs = db.exec(select(Offcut).where(Offcut.product_id == p.productId)).all()
-    for o in offs:
-        db.delete(o)
-    db.commit()
-
-
 def _mk_line(l, w, qty=1, unit="mm"):
     return {"type": "glass-cut", "qty": qty, "meta": {"l": l, "w": w, "u": unit}}
 
 
 def test_1_uses_existing_offcut(db, p, v):
     print("\n--- Test 1: Cut fits inside an existing offcut ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     db.add(Offcut(product_id=p.productId, variant_id=v.variantId, width=500.0, height=300.0, length=0.0, quantity=1, status="available"))
     db.commit()
     db.refresh(v)
@@ -106,7 +76,7 @@ def test_1_uses_existing_offcut(db, p, v):
 
 def test_2_falls_back_to_fresh_sheet(db, p, v):
     print("\n--- Test 2: No offcut fits -> fresh sheet consumed, remainder(s) created ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     db.refresh(v)
     stock_before = v.stock_quantity
 
@@ -128,7 +98,7 @@ def test_2_falls_back_to_fresh_sheet(db, p, v):
 
 def test_3_scrap_classification(db, p, v):
     print("\n--- Test 3: Sliver below min_usable_dimension is recorded as scrap ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     db.refresh(v)
 
     # Cutting the full 2440mm length x 1800mm leaves a 2440x30mm strip on the only
@@ -149,7 +119,7 @@ def test_3_scrap_classification(db, p, v):
 
 def test_4_sales_history_no_longer_protects_offcuts(db, p, v, servedby):
     print("\n--- Test 4: sales history alone no longer protects an offcut (ProtectPopularStockAgent removed) ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
 
     # Same setup that used to prove ProtectPopularStockAgent worked: seed
     # purchase history so 400x300mm cuts have "sold" 5 times. With that agent
@@ -192,7 +162,7 @@ def test_4_sales_history_no_longer_protects_offcuts(db, p, v, servedby):
 
 def test_5_batches_largest_first(db, p, v):
     print("\n--- Test 5: Batch resolves largest cut first regardless of input order ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     db.refresh(v)
     stock_before = v.stock_quantity
 
@@ -221,7 +191,7 @@ def test_5_batches_largest_first(db, p, v):
 
 def test_6_restore(db, p, v):
     print("\n--- Test 6: Restore path reverses stock + offcut state ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     db.refresh(v)
     stock_before = v.stock_quantity
 
@@ -248,7 +218,7 @@ def test_6_restore(db, p, v):
 
 def test_7_unit_conversion(db, p, v):
     print("\n--- Test 7: A cut entered in ft/inch converts to mm before matching an mm-native offcut ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     db.refresh(v)
     stock_before = v.stock_quantity
 
@@ -273,7 +243,7 @@ def test_7_unit_conversion(db, p, v):
 
 def test_8_grid_packs_identical_pieces(db, p, v):
     print("\n--- Test 8: N identical pieces are grid-packed into one source, not split off one at a time ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
 
     # Reproduces the reported case exactly: a 2140x1650mm sheet, 2x 550x1200mm pieces
     # requested via one line's qty. Efficient nesting keeps them as ONE consumption
@@ -324,7 +294,7 @@ def test_9_order_independent_of_lw_swap(db, p, v):
     db.refresh(v)
 
     def resolve(l, w):
-        _clear_offcuts(db, p)
+        clear_offcuts(db, p)
         line = _mk_line(l, w, qty=2)
         lines = [line]
         gos.resolve_glass_cut_lines(db, p, v, lines)
@@ -351,13 +321,13 @@ def test_9_order_independent_of_lw_swap(db, p, v):
     v.width = 1830.0
     db.add(v)
     db.commit()
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     print("PASS")
 
 
 def test_10_recursive_packing_fits_all_on_one_sheet(db, p, v):
     print("\n--- Test 10: Recursive packing mixes orientations to fit all pieces on ONE sheet ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
 
     # Reported case: a 2140x1650mm sheet, 4x 1200x550mm pieces via one line's qty.
     # A single uniform-orientation grid only fits 3 (leaving 1 that doesn't fit either
@@ -405,7 +375,7 @@ def test_10_recursive_packing_fits_all_on_one_sheet(db, p, v):
 
 def test_11_preview_consolidates_synthetic_offcut_chains(db, p, v):
     print("\n--- Test 11: Preview merges a same-preview offcut chain into one sheet, not two containers ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     v.length = 2140.0
     v.width = 1650.0
     v.stock_quantity = 10
@@ -451,13 +421,13 @@ def test_11_preview_consolidates_synthetic_offcut_chains(db, p, v):
     v.width = 1830.0
     db.add(v)
     db.commit()
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     print("PASS")
 
 
 def test_12_joint_packing_shares_one_sheet_across_lines(db, p, v):
     print("\n--- Test 12: Two different-shape lines jointly share one sheet instead of opening two ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     v.length = 2140.0
     v.width = 1650.0
     v.stock_quantity = 10
@@ -508,13 +478,13 @@ def test_12_joint_packing_shares_one_sheet_across_lines(db, p, v):
     v.width = 1830.0
     db.add(v)
     db.commit()
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     print("PASS")
 
 
 def test_13_restore_after_joint_packing(db, p, v):
     print("\n--- Test 13: Restoring a joint-packed order item returns to the exact pre-order state ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     v.length = 2140.0
     v.width = 1650.0
     v.stock_quantity = 10
@@ -551,7 +521,7 @@ def test_13_restore_after_joint_packing(db, p, v):
 
 def test_14_multi_strategy_never_worse_than_baseline(db, p, v):
     print("\n--- Test 14: Multi-strategy search never uses more sheets than the baseline strategy alone ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     v.length = 2140.0
     v.width = 1650.0
     v.stock_quantity = 10
@@ -590,13 +560,13 @@ def test_14_multi_strategy_never_worse_than_baseline(db, p, v):
     v.width = 1830.0
     db.add(v)
     db.commit()
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     print("PASS")
 
 
 def test_15_savepoint_trials_leave_no_trace(db, p, v):
     print("\n--- Test 15: Rolled-back strategy trials leave no stray rows behind ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     v.length = 2140.0
     v.width = 1650.0
     v.stock_quantity = 10
@@ -633,13 +603,13 @@ def test_15_savepoint_trials_leave_no_trace(db, p, v):
     v.width = 1830.0
     db.add(v)
     db.commit()
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     print("PASS")
 
 
 def test_16_multi_strategy_timing_sanity(db, p, v):
     print("\n--- Test 16: Multi-strategy resolution timing sanity check ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     v.length = 2140.0
     v.width = 1650.0
     v.stock_quantity = 20
@@ -661,7 +631,7 @@ def test_16_multi_strategy_timing_sanity(db, p, v):
     v.width = 1830.0
     db.add(v)
     db.commit()
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     print("PASS")
 
 
@@ -681,7 +651,7 @@ def test_17_multi_strategy_order_independent_of_lw_swap(db, p, v):
     # L/W on just ONE line changes its ranking relative to the other line,
     # changing which strategy wins overall.
     def resolve(l1, w1, l2, w2):
-        _clear_offcuts(db, p)
+        clear_offcuts(db, p)
         line1 = _mk_line(l1, w1, qty=2)
         line2 = _mk_line(l2, w2, qty=2)
         lines = [line1, line2]
@@ -709,13 +679,13 @@ def test_17_multi_strategy_order_independent_of_lw_swap(db, p, v):
     v.width = 1830.0
     db.add(v)
     db.commit()
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     print("PASS")
 
 
 def test_18_sellability_score_reflects_ceo_popular_ranges(db, p, v):
     print("\n--- Test 18: total_sellability_score/is_popular reflect CEO popular_size_ranges, not sales history ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     v.length = 2440.0
     v.width = 1830.0
     v.stock_quantity = 10
@@ -768,13 +738,13 @@ def test_18_sellability_score_reflects_ceo_popular_ranges(db, p, v):
     p.popular_size_ranges = []
     db.add(p)
     db.commit()
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     print("PASS")
 
 
 def test_19_small_offcut_before_large_offcut(db, p, v):
     print("\n--- Test 19: A small matching offcut is used before a large one, which is left mostly whole ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     db.refresh(v)
 
     # Reported case: a 1650x1020mm offcut and a 450x1120mm offcut both exist, and
@@ -820,7 +790,7 @@ def test_19_small_offcut_before_large_offcut(db, p, v):
 
 def test_20_correct_offcut_event(db, p, v):
     print("\n--- Test 20: Manager correction reverses the old remainder, applies the corrected one ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     db.refresh(v)
 
     line = _mk_line(600, 300)  # forces a fresh sheet, leaves one big remainder
@@ -861,7 +831,7 @@ def test_20_correct_offcut_event(db, p, v):
 
 def test_21_correct_offcut_rejects_invalid_input(db, p, v):
     print("\n--- Test 21: Correction rejects non-2D events, non-owner events, and bad dimensions ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
 
     try:
         gos.correct_glass_offcut_event(db, p, v, {"remainders_created": []}, [{"width": 100, "height": 100}])
@@ -888,7 +858,7 @@ def test_21_correct_offcut_rejects_invalid_input(db, p, v):
 
 def test_22_no_forced_split_when_neither_scrap_nor_big_waste_is_at_stake(db, p, v):
     print("\n--- Test 22: A small offcut is NOT used when the big offcut's remainder is neither scrap nor a big-waste chunk ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     db.refresh(v)
 
     # One 400x300 cut. The 450x850 offcut leaves a scrap sliver (50x300) plus a
@@ -925,7 +895,7 @@ def test_22_no_forced_split_when_neither_scrap_nor_big_waste_is_at_stake(db, p,
 
 def test_23_big_waste_redirects_even_when_remainder_resembles_the_cut(db, p, v):
     print("\n--- Test 23: big-waste still redirects to the closer offcut even when the big one's remainder resembles the cut ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     db.refresh(v)
 
     # One 400x1070 cut. The 850x1070 offcut leaves a single non-scrap remainder
@@ -963,7 +933,7 @@ def test_23_big_waste_redirects_even_when_remainder_resembles_the_cut(db, p, v):
 
 def test_24_resolve_replacement_pieces_auto(db, p, v):
     print("\n--- Test 24: resolve_replacement_pieces auto-resolves via _fulfill_pool, combining multiple pieces onto one source ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     db.refresh(v)
     stock_before = v.stock_quantity
 
@@ -981,7 +951,7 @@ def test_24_resolve_replacement_pieces_auto(db, p, v):
 
 def test_25_resolve_replacement_pieces_forced_offcut(db, p, v):
     print("\n--- Test 25: forced_offcut_id restricts resolution to a specific offcut, raises if it doesn't fit ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     db.refresh(v)
 
     oc = Offcut(product_id=p.productId, variant_id=v.variantId, width=700.0, height=500.0, length=0.0, quantity=1, status="available")
@@ -996,7 +966,7 @@ def test_25_resolve_replacement_pieces_forced_offcut(db, p, v):
         f"Expected the forced offcut #{oc.offcutId} to be used, got {events[0]}"
     print(f"Forced replacement used offcut #{oc.offcutId} as expected")
 
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     small = Offcut(product_id=p.productId, variant_id=v.variantId, width=100.0, height=100.0, length=0.0, quantity=1, status="available")
     db.add(small)
     db.commit()
@@ -1011,7 +981,7 @@ def test_25_resolve_replacement_pieces_forced_offcut(db, p, v):
 
 def test_26_correct_glass_offcut_event_with_failed_cuts(db, p, v):
     print("\n--- Test 26: correct_glass_offcut_event trims a missed cut and resolves a replacement source for it ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     db.refresh(v)
 
     line = _mk_line(400, 300, qty=2)  # two identical pieces, grid-packed onto one fresh sheet
@@ -1051,7 +1021,7 @@ def test_27_correct_glass_offcut_event_rejects_bad_cut_index(db, p, v):
 
 def test_28_pending_source_notice_on_cross_order_consumption(db, p, v, servedby):
     print("\n--- Test 28: consuming another order's not-yet-cut offcut attaches a pending_source_notice ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
 
     # item_a: cutting NOT reported done yet — its predicted remainder is still "pending"
     order_a = Order(servedby=servedby, subtotal=0, total=0)
@@ -1104,7 +1074,7 @@ def test_28_pending_source_notice_on_cross_order_consumption(db, p, v, servedby)
 
 def test_29_no_notice_once_source_marked_done(db, p, v, servedby):
     print("\n--- Test 29: no pending_source_notice once the producing item is marked cut ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
 
     order_a = Order(servedby=servedby, subtotal=0, total=0)
     db.add(order_a)
@@ -1147,7 +1117,7 @@ def test_29_no_notice_once_source_marked_done(db, p, v, servedby):
 
 def test_30_ceo_popular_range_drives_tiering_without_sales_history(db, p, v):
     print("\n--- Test 30: CEO popular_size_ranges alone (no sales history) still splits small/large ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     db.refresh(v)
 
     # Same physical scenario as test_19, but this time NO sales history is
@@ -1188,7 +1158,7 @@ def test_30_ceo_popular_range_drives_tiering_without_sales_history(db, p, v):
 
 def test_31_small_tier_consolidates_before_splitting(db, p, v):
     print("\n--- Test 31: within the small/unpopular tier, one offcut serving both cuts wins over splitting ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     db.refresh(v)
 
     # A high, unreachable popular threshold puts BOTH offcuts below it — i.e.
@@ -1230,7 +1200,7 @@ def test_31_small_tier_consolidates_before_splitting(db, p, v):
 
 def test_32_snubs_big_waste_even_when_consolidating_makes_less_total_scrap(db, p, v):
     print("\n--- Test 32: a source left with too much unused width/height for the cut is snubbed for a closer offcut ---")
-    _clear_offcuts(db, p)
+    clear_offcuts(db, p)
     db.refresh(v)
 
     # Same two cuts and offcuts as the ORIGINAL test 22 scenario. Consolidating
@@ -1264,6 +1234,139 @@ def test_32_snubs_big_waste_even_when_consolidating_makes_less_total_scrap(db, p
     print("PASS")
 
 
+def test_33_lower_bound_stops_strategy_search_early(db, p, v):
+    print("\n--- Test 33: Strategy search stops once a trial matches the sheet lower bound with zero scrap ---")
+    from core.inventory.glassPackingBounds import compute_sheet_bounds
+    clear_offcuts(db, p)
+    v.length = 2440.0
+    v.width = 1830.0
+    v.stock_quantity = 10
+    db.add(v)
+    db.commit()
+    db.refresh(v)
+
+    # Pure bounds first: three pieces wider AND taller than half the sheet can
+    # never share one, even though their total area fits on two sheets.
+    bounds = compute_sheet_bounds([(1250.0, 1250.0, 3)], 2440.0, 1830.0, True)
+    print(f"Bounds for 3x 1250x1250: {bounds}")
+    assert bounds["area_bound"] == 2, f"Expected area bound 2, got {bounds['area_bound']}"
+    assert bounds["large_item_bound"] == 3, f"Expected large-item bound 3, got {bounds['large_item_bound']}"
+    assert bounds["sheets_lower_bound"] == 3
+
+    # An offcut big enough to hold every piece removes the large-item bound entirely.
+    with_offcut = compute_sheet_bounds([(1250.0, 1250.0, 3)], 2440.0, 1830.0, True, [(1300.0, 1300.0, 1)])
+    assert with_offcut["pieces_needing_fresh_sheet"] == 0 and with_offcut["large_item_bound"] == 0
+
+    # Four quarter-sheets tile one sheet exactly: the first strategy already
+    # matches the bound (1 sheet, no scrap), so no other strategy should run.
+    lines = [_mk_line(1220, 915, qty=4)]
+    optimization = gos.resolve_glass_cut_lines(db, p, v, lines)
+    db.commit()
+    db.refresh(v)
+    print(f"Optimization summary: {optimization}")
+    assert optimization["early_terminated"], "Expected the search to stop at the first strategy that hit the bound"
+    assert optimization["strategies_tried"] == 1, f"Expected 1 strategy tried, got {optimization['strategies_tried']}"
+    assert optimization["bounds"]["sheets_lower_bound"] == 1
+    assert optimization["sheets_above_bound"] == 0
+    assert v.stock_quantity == 9, f"Kept trial should have consumed exactly 1 sheet, stock is {v.stock_quantity}"
+    assert sum(len(e["cuts"]) for e in lines[0]["offcut_sources"]) == 4, "Kept trial's offcut_sources weren't copied back onto the line"
+
+    gos.restore_glass_cut_lines(db, p, v, lines)
+    db.commit()
+    clear_offcuts(db, p)
+    print("PASS")
+
+
+
+def test_34_correct_recorded_event_rewrites_its_offcut_events(db, p, v):
+    print("\n--- Test 34: Correcting a recorded event reverses its remainder rows and records the corrected ones ---")
+    clear_offcuts(db, p)
+    db.refresh(v)
+
+    line = _mk_line(600, 300)  # forces a fresh sheet, leaves one big remainder
+    lines = [line]
+    gos.resolve_glass_cut_lines(db, p, v, lines)
+    db.commit()
+
+    event = next(e for e in line["offcut_sources"] if e.get("owns_consumption", True))
+    group_id = event.get("group_id")
+    assert group_id, "The engine should have stamped the event's offcut_events group_id"
+
+    def rows(kind):
+        return db.exec(select(OffcutEvent).where(OffcutEvent.group_id == group_id, OffcutEvent.kind == kind)).all()
+
+    old_rows = rows("remainder")
+    assert old_rows and all(r.reversed_at is None for r in old_rows), "Expected live remainder rows for the event"
+    consume_rows = rows("consume")
+
+    gos.correct_glass_offcut_event(db, p, v, event, [{"width": 400.0, "height": 250.0, "status": "available"}])
+    db.commit()
+
+    remainder_rows = rows("remainder")
+    live = [r for r in remainder_rows if r.reversed_at is None]
+    print(f"Remainder rows: {[(r.width, r.height, r.status, r.reversed_at is not None) for r in remainder_rows]}")
+    assert all(r.reversed_at is not None for r in old_rows), "The predicted remainder rows should be marked reversed"
+    assert [(r.width, r.height) for r in live] == [(400.0, 250.0)], f"Expected one live 400x250 row, got {live}"
+    assert event.get("group_id") == group_id, "The correction should stay in the event's group"
+    assert len(rows("consume")) == len(consume_rows), "Correcting remainders must not record another consumption"
+
+    gos.restore_glass_cut_lines(db, p, v, lines)
+    db.commit()
+    clear_offcuts(db, p)
+    print("PASS")
+
+
+def test_35_manual_selection_is_reversed_with_its_order_item(db, p, v, servedby):
+    print("\n--- Test 35: A manually picked offcut is recorded under its order item and reversed with it ---")
+    clear_offcuts(db, p)
+    db.refresh(v)
+    stock_before = v.stock_quantity
+
+    forced = Offcut(product_id=p.productId, variant_id=v.variantId, width=800.0, height=600.0, length=0.0, quantity=1, status="available")
+    db.add(forced)
+    db.commit()
+    db.refresh(forced)
+    forced_id = forced.offcutId
+
+    order = Order(servedby=servedby, subtotal=0, total=0)
+    db.add(order)
+    db.commit()
+    db.refresh(order)
+    line = _mk_line(300, 200)
+    item = OrderItem(
+        order_id=order.orderId, product_id=p.productId, variant_id=v.variantId,
+        total_price=0, status="purchased", details={"lineItems": [line]},
+    )
+    db.add(item)
+    db.commit()
+    db.refresh(item)
+
+    event = gos.apply_manual_glass_selection(db, p, v, 300, 200, "mm", forced_offcut_id=forced_id, item_id=item.item_id)
+    item.details = {"lineItems": [{**line, "offcut_sources": [event]}]}
+    db.add(item)
+    db.commit()
+    assert event["offcut_id"] == forced_id
+
+    rows = db.exec(select(OffcutEvent).where(OffcutEvent.item_id == item.item_id)).all()
+    print(f"offcut_events for item {item.item_id}: {[(r.kind, r.width, r.height) for r in rows]}")
+    assert any(r.kind == "consume" for r in rows), "The manual pick should be recorded under its order item"
+    assert any(r.kind == "remainder" for r in rows), "Its remainders too"
+
+    restore_stock_for_order_item(db, item)
+    db.commit()
+    db.refresh(v)
+
+    rows = db.exec(select(OffcutEvent).where(OffcutEvent.item_id == item.item_id)).all()
+    remaining = db.exec(select(Offcut).where(Offcut.product_id == p.productId)).all()
+    print(f"Offcuts after restore: {[(o.width, o.height, o.quantity) for o in remaining]}")
+    assert all(r.reversed_at is not None for r in rows), "Every row should be marked reversed"
+    assert [(o.width, o.height, o.quantity) for o in remaining] == [(800.0, 600.0, 1)], \
+        "The picked offcut should be back once, its remainders gone"
+    assert v.stock_quantity == stock_before, "No sheet was used, so no sheet stock should move"
+    clear_offcuts(db, p)
+    print("PASS")
+
+
 def run():
     engine = create_engine(DATABASE_URL)
     with Session(engine) as db:
@@ -1309,6 +1412,9 @@ def run():
             ("test_30_ceo_popular_range_drives_tiering_without_sales_history", lambda: test_30_ceo_popular_range_drives_tiering_without_sales_history(db, p, v)),
             ("test_31_small_tier_consolidates_before_splitting", lambda: test_31_small_tier_consolidates_before_splitting(db, p, v)),
             ("test_32_snubs_big_waste_even_when_consolidating_makes_less_total_scrap", lambda: test_32_snubs_big_waste_even_when_consolidating_makes_less_total_scrap(db, p, v)),
+            ("test_33_lower_bound_stops_strategy_search_early", lambda: test_33_lower_bound_stops_strategy_search_early(db, p, v)),
+            ("test_34_correct_recorded_event_rewrites_its_offcut_events", lambda: test_34_correct_recorded_event_rewrites_its_offcut_events(db, p, v)),
+            ("test_35_manual_selection_is_reversed_with_its_order_item", lambda: test_35_manual_selection_is_reversed_with_its_order_item(db, p, v, servedby)),
         ]:
             try:
                 fn()
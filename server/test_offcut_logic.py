@@ -5,50 +5,48 @@ from entities.variants import Variant
 from entities.offcuts import Offcut
 from entities.orders import Order
 from entities.orderItems import OrderItem
-from entities.users import User
-from core.inventory.inventoryService import deduct_stock_for_order_item, apply_manual_cut_selection
+from entities.offcutEvents import OffcutEvent
+from testFixtures import clear_offcuts, first_user_id, reset_product
+from core.inventory.inventoryService import (
+    deduct_stock_for_order_item, apply_manual_cut_selection, restore_stock_for_order_item,
+)
+
+
+def _new_order(db: Session) -> Order:
+    order = Order(servedby=first_user_id(db), subtotal=0, total=0)
+    db.add(order)
+    db.commit()
+    db.refresh(order)
+    return order
+
+
+def _reset_bar(db: Session):
+    """The 10ft test bar (length/price now live on the variant) at stock 10, no offcuts."""
+    p, v = reset_product(db, "Test Offcut Bar", track_offcuts=True, variant={"length": 10.0})
+    clear_offcuts(db, p)
+    print(f"Reset Test Product: {p.productId} / Variant {v.variantId} (Stock: {v.stock_quantity})")
+    return p, v
+
+
+def _cut_item(db: Session, order: Order, p: Product, v: Variant, length: float) -> OrderItem:
+    item = OrderItem(
+        order_id=order.orderId, product_id=p.productId, variant_id=v.variantId,
+        total_price=0, status="purchased",
+        details={"lineItems": [{"type": "accessory-cut", "qty": 1, "meta": {"length": length}}]},
+    )
+    db.add(item)
+    deduct_stock_for_order_item(db, item)
+    db.commit()
+    db.refresh(v)
+    return item
+
 
 def test_logic():
     engine = create_engine(DATABASE_URL)
     with Session(engine) as db:
-        # Select just the userId column (not full User rows) — some existing user
-        # rows carry a stale `role` value predating migrate_rename_roles.py that
-        # doesn't match the current enum, which would blow up a full-row fetch.
-        servedby = db.exec(select(User.userId)).first()
-        if not servedby:
-            raise RuntimeError("No users found in DB — need at least one user to seed a test order (Tests 1-3)")
-
-        order = Order(servedby=servedby, subtotal=0, total=0)
-        db.add(order)
-        db.commit()
-        db.refresh(order)
-        # 1. Setup Test Product + Variant (length/price now live on the variant)
-        p = db.exec(select(Product).where(Product.name == "Test Offcut Bar")).first()
-        if not p:
-            p = Product(name="Test Offcut Bar", category_id=1, stock_quantity=10, track_offcuts=True, has_variants=True)
-            db.add(p)
-            db.commit()
-            db.refresh(p)
-            print(f"Created Test Product: {p.productId} (Stock: {p.stock_quantity})")
-
-        v = db.exec(select(Variant).where(Variant.product_id == p.productId)).first()
-        if not v:
-            v = Variant(product_id=p.productId, name='', attributes={}, stock_quantity=10, price=100.0, length=10.0)
-            db.add(v)
-            db.commit()
-            db.refresh(v)
-        else:
-            v.stock_quantity = 10
-            v.length = 10.0
-            db.add(v)
-
-        # Reset stock + clear offcuts
-        p.stock_quantity = 10
-        db.add(p)
-        offs = db.exec(select(Offcut).where(Offcut.product_id == p.productId)).all()
-        for o in offs: db.delete(o)
-        db.commit()
-        print(f"Reset Test Product: {p.productId} / Variant {v.variantId} (Stock: {v.stock_quantity})")
+        order = _new_order(db)
+        # 1. Setup Test Product + Variant
+        p, v = _reset_bar(db)
 
         # 2. Simulate Order for 3ft Cut
         # Should take from Full (10ft) -> Remaining 7ft Offcut
@@ -202,9 +200,69 @@ def test_logic():
         offcuts = db.exec(select(Offcut).where(Offcut.product_id == p.productId)).all()
         print(f"Offcuts remaining: {[(o.length, o.quantity) for o in offcuts]} (Expected [] — both consumed exactly)")
 
+def test_restore_from_offcut_events():
+    # Restore reverses the item's offcut_events rows, marks them reversed, and
+    # doesn't replay the same consumption again from the JSON offcut_sources
+    engine = create_engine(DATABASE_URL)
+    with Session(engine) as db:
+        print("\n--- Test 8: Restore a recorded cut from its offcut_events rows ---")
+        order = _new_order(db)
+        p, v = _reset_bar(db)
+
+        item = _cut_item(db, order, p, v, 3.0)
+        events = db.exec(select(OffcutEvent).where(OffcutEvent.item_id == item.item_id)).all()
+        print(f"Events: {[(e.kind, e.source, e.length) for e in events]} (Expected a full_bar consume + a 7.0 remainder)")
+        assert v.stock_quantity == 9 and len(events) == 2
+
+        restore_stock_for_order_item(db, item)
+        db.commit()
+        db.refresh(v)
+        offcuts = db.exec(select(Offcut).where(Offcut.product_id == p.productId)).all()
+        events = db.exec(select(OffcutEvent).where(OffcutEvent.item_id == item.item_id)).all()
+        print(f"Stock after restore: {v.stock_quantity} (Expected 10 — restored once)")
+        print(f"Offcuts: {[o.length for o in offcuts]} (Expected [])")
+        assert v.stock_quantity == 10, "Stock should be restored exactly once"
+        assert not offcuts, "The 7.0 remainder should have been removed"
+        assert all(e.reversed_at is not None for e in events), "Every row should be marked reversed"
+
+        # A second restore finds only reversed rows and recorded JSON — nothing to undo
+        restore_stock_for_order_item(db, item)
+        db.commit()
+        db.refresh(v)
+        assert v.stock_quantity == 10, f"Second restore changed stock to {v.stock_quantity}"
+        print("PASS")
+
+
+def test_restore_legacy_item_without_events():
+    # An item cut before offcut_events existed (and not backfilled) has only the
+    # JSON offcut_sources — restore replays those instead
+    engine = create_engine(DATABASE_URL)
+    with Session(engine) as db:
+        print("\n--- Test 9: Restore a legacy cut (no offcut_events rows) from its JSON ---")
+        order = _new_order(db)
+        p, v = _reset_bar(db)
+
+        item = _cut_item(db, order, p, v, 3.0)
+        for e in db.exec(select(OffcutEvent).where(OffcutEvent.item_id == item.item_id)).all():
+            db.delete(e)
+        db.commit()
+        assert item.details["lineItems"][0].get("offcut_sources"), "Cut should have recorded its JSON sources"
+
+        restore_stock_for_order_item(db, item)
+        db.commit()
+        db.refresh(v)
+        offcuts = db.exec(select(Offcut).where(Offcut.product_id == p.productId)).all()
+        print(f"Stock after restore: {v.stock_quantity} (Expected 10)")
+        print(f"Offcuts: {[o.length for o in offcuts]} (Expected [])")
+        assert v.stock_quantity == 10, "JSON replay should restore the bar"
+        assert not offcuts, "JSON replay should remove the 7.0 remainder"
+        print("PASS")
+
+
 if __name__ == "__main__":
-    try:
-        test_logic()
-        print("\nTest Complete.")
-    except Exception as e:
-        print(f"\nTEST FAILED: {e}")
+    for test in (test_logic, test_restore_from_offcut_events, test_restore_legacy_item_without_events):
+        try:
+            test()
+        except Exception as e:
+            print(f"\nTEST FAILED: {e}")
+    print("\nTest Complete.")
@@ -0,0 +1,162 @@
+"""
+Standalone smoke tests for product search
+(core/inventory/searchService.py — GET /products/search), following the same
+direct-DB-session pattern as test_stock_concurrency.py. Test 4 runs the real
+trigram tier and needs Postgres with pg_trgm (migrate_add_product_search.py);
+it is skipped on any other database.
+
+Run from the server directory:
+    python test_product_search.py
+"""
+
+from sqlmodel import Session, create_engine, select
+
+from db.database import DATABASE_URL
+from entities.products import Category
+from entities.variants import Variant
+from core.inventory import searchService
+from testFixtures import reset_product
+
+CLEAR = "Zqx Search Mirror Clear"
+BRONZE = "Zqx Search Mirror Bronze"
+
+
+def _reset_fixtures(db: Session):
+    """Two mirrors in different categories; the clear one has 6mm and 8mm variants."""
+    category = db.exec(select(Category).where(Category.name == "Test Search Category")).first()
+    if not category:
+        category = Category(name="Test Search Category", type="test-search-category")
+        db.add(category)
+        db.commit()
+        db.refresh(category)
+
+    clear, _ = reset_product(db, CLEAR, itemCode="ZQX-CLR", track_offcuts=False, unit="pcs",
+                             variant={"name": "6mm", "attributes": {"Thickness": "6mm"}})
+    if not db.exec(select(Variant).where(Variant.product_id == clear.productId, Variant.name == "8mm")).first():
+        db.add(Variant(product_id=clear.productId, name="8mm", attributes={"Thickness": "8mm"},
+                       price=120.0, stock_quantity=10))
+        db.commit()
+    bronze, _ = reset_product(db, BRONZE, itemCode="ZQX-BRZ", category_id=category.categoryId,
+                              track_offcuts=False, unit="pcs")
+    return clear.productId, bronze.productId, category.categoryId
+
+
+def _hits(db: Session, query: str, ids, **kwargs) -> list:
+    """(productId, match) of the results that are fixtures, in result order."""
+    return [(h["productId"], h["match"]) for h in searchService.search(db, query, **kwargs)["results"]
+            if h["productId"] in ids]
+
+
+def test_1_prefix_tier(engine, clear, bronze, category_id):
+    print("\n--- Test 1: The prefix tier matches every token, ranks an exact itemCode first and narrows variants ---")
+    ids = {clear, bronze}
+    with Session(engine) as db:
+        both = _hits(db, "zqx sea", ids)
+        by_code = searchService.search(db, "ZQX-BRZ")["results"]
+        narrowed = next(h for h in searchService.search(db, "zqx clear 8")["results"] if h["productId"] == clear)
+        whole = next(h for h in searchService.search(db, "zqx clear")["results"] if h["productId"] == clear)
+    print(f"'zqx sea': {both}; 'ZQX-BRZ' first: {by_code[0]['name']}; "
+          f"'zqx clear 8' variants: {[v['name'] for v in narrowed['variants']]}")
+    assert sorted(both) == sorted([(clear, "prefix"), (bronze, "prefix")])
+    assert by_code[0]["productId"] == bronze
+    assert [v["name"] for v in narrowed["variants"]] == ["8mm"], "A variant-only token narrows the hit to that variant"
+    assert {v["name"] for v in whole["variants"]} == {"6mm", "8mm"}, "A product-level match lists every variant"
+    print("PASS")
+
+
+def test_2_prefix_category_scoping(engine, clear, bronze, category_id):
+    print("\n--- Test 2: category_id keeps the prefix tier to one category ---")
+    ids = {clear, bronze}
+    with Session(engine) as db:
+        scoped = _hits(db, "zqx mirror", ids, category_id=category_id)
+        other = _hits(db, "zqx mirror", ids, category_id=1)
+    print(f"Category {category_id}: {scoped}; category 1: {other}")
+    assert scoped == [(bronze, "prefix")]
+    assert other == [(clear, "prefix")]
+    print("PASS")
+
+
+def test_3_trigram_only_when_prefix_falls_short(engine, clear, bronze, category_id):
+    print("\n--- Test 3: The trigram tier runs only when the prefix tier is short of the limit ---")
+    calls = []
+
+    def fake_trigram(db, query, category, limit):
+        calls.append((query, category, limit))
+        found = {bronze: {"score": 0.5, "variants": None}}
+        if category is None:
+            found[clear] = {"score": 0.4, "variants": None}
+        return found
+
+    real = searchService._trigram_search
+    searchService._trigram_search = fake_trigram
+    try:
+        with Session(engine) as db:
+            full = searchService.search(db, "zqx search", limit=1)
+            assert calls == [], "A full page of prefix hits should not reach the trigram tier"
+            assert full["results"][0]["match"] == "prefix"
+
+            searchService.search(db, "zq", limit=20)
+            assert calls == [], f"Queries under {searchService.TRIGRAM_MIN_LENGTH} characters stay prefix-only"
+
+            fuzzy = _hits(db, "earch bronze", {clear, bronze}, category_id=category_id)
+            print(f"Trigram calls: {calls}; 'earch bronze': {fuzzy}")
+            assert calls == [("earch bronze", category_id, 20)], "The category goes down to the trigram tier"
+            assert fuzzy == [(bronze, "fuzzy")]
+
+            mixed = _hits(db, "zqx bronze", {clear, bronze})
+            print(f"'zqx bronze': {mixed}")
+            assert mixed == [(bronze, "prefix"), (clear, "fuzzy")], \
+                "A product the prefix tier found must not come back again as fuzzy"
+    finally:
+        searchService._trigram_search = real
+    print("PASS")
+
+
+def test_4_trigram_tier(engine, clear, bronze, category_id):
+    print("\n--- Test 4: Infixes and typos fall back to pg_trgm, scoped by category ---")
+    ids = {clear, bronze}
+    with Session(engine) as db:
+        infix = _hits(db, "earch mirror bronz", ids)
+        typo = _hits(db, "Zqx Serach Mirror Clear", ids)
+        scoped = _hits(db, "earch mirror", ids, category_id=category_id)
+    print(f"Infix: {infix}; typo: {typo}; scoped: {scoped}")
+    assert infix and infix[0] == (bronze, "fuzzy"), "Only the bronze name contains the infix"
+    assert typo and typo[0] == (clear, "fuzzy")
+    assert scoped == [(bronze, "fuzzy")]
+    print("PASS")
+
+
+def run():
+    engine = create_engine(DATABASE_URL)
+    with Session(engine) as db:
+        clear, bronze, category_id = _reset_fixtures(db)
+
+    tests = [
+        ("test_1_prefix_tier", test_1_prefix_tier),
+        ("test_2_prefix_category_scoping", test_2_prefix_category_scoping),
+        ("test_3_trigram_only_when_prefix_falls_short", test_3_trigram_only_when_prefix_falls_short),
+    ]
+    if engine.dialect.name == "postgresql":
+        tests.append(("test_4_trigram_tier", test_4_trigram_tier))
+    else:
+        print(f"\nSkipping test_4_trigram_tier: needs Postgres, not {engine.dialect.name}")
+
+    failures = []
+    for name, fn in tests:
+        try:
+            fn(engine, clear, bronze, category_id)
+        except Exception as e:
+            failures.append((name, e))
+            print(f"{name} FAILED: {e}")
+
+    print("\n" + "=" * 60)
+    if failures:
+        print(f"{len(failures)} test(s) FAILED:")
+        for name, e in failures:
+            print(f"  - {name}: {e}")
+    else:
+        print("All tests PASSED.")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,227 @@
+"""
+Standalone smoke tests for the receivables summary
+(core/financials/receivablesService.py), following the same direct-DB-session
+pattern as test_stock_concurrency.py. Tests 1-2 are pure and touch no database.
+
+Run from the server directory:
+    python test_receivables.py
+"""
+
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import update
+from sqlmodel import Session, create_engine, select
+
+from db.database import DATABASE_URL
+from entities.credits import Credit
+from entities.customerReceivables import CustomerReceivable
+from core.financials import creditService, model as financials_model, receivablesService
+from core.ordering import model as order_model, orderService
+from testFixtures import first_user_id, reset_customer, reset_product
+
+
+def _reset_fixtures(db: Session):
+    """A plain accessory to sell and a credit customer to sell it to."""
+    p, v = reset_product(db, "Test Receivables Accessory", stock=100, track_offcuts=False, unit="pcs")
+    c = reset_customer(db, "Test Receivables Customer", "0700000050")
+    return p.productId, v.variantId, c.customerId
+
+
+def _outstanding(engine, customer_id: int) -> float:
+    with Session(engine) as db:
+        row = db.get(CustomerReceivable, customer_id)
+        return row.outstanding if row else 0.0
+
+
+def _open_due(engine, customer_id: int) -> float:
+    with Session(engine) as db:
+        dues = db.exec(
+            select(Credit.amount_due).where(Credit.customerId == customer_id, Credit.status != "Paid")
+        ).all()
+        return round(sum(float(d or 0) for d in dues), 2)
+
+
+def test_1_bucket_boundaries():
+    print("\n--- Test 1: _bucket() puts each boundary day in the lower bucket ---")
+    cases = {
+        0: "due_0_30", 30: "due_0_30",
+        31: "due_31_60", 60: "due_31_60",
+        61: "due_61_90", 90: "due_61_90",
+        91: "due_over_90", 400: "due_over_90",
+    }
+    for age, expected in cases.items():
+        got = receivablesService._bucket(age)
+        print(f"{age} days -> {got}")
+        assert got == expected, f"{age} days: expected {expected}, got {got}"
+    print("PASS")
+
+
+def test_2_summarise_ages_and_rounds():
+    print("\n--- Test 2: _summarise() totals, ages and rounds a customer's open credits ---")
+    as_of = date(2026, 6, 30)
+    oldest = datetime(2026, 3, 1, 9, 30)  # 121 days
+    credits = [
+        (10.005, datetime(2026, 6, 30, 8, 0)),   # today
+        (20, datetime(2026, 5, 31)),             # 30 days
+        (30, datetime(2026, 5, 1)),              # 60 days
+        (40, datetime(2026, 4, 1)),              # 90 days
+        (50, oldest),
+        (None, datetime(2026, 6, 1)),            # nothing left due still counts as open
+        (5, None),                               # undated credit is treated as new
+        (7, datetime(2026, 7, 2)),               # dated after as_of -> age 0
+    ]
+    values = receivablesService._summarise(credits, as_of)
+    print(values)
+    assert values["open_credits"] == 8
+    assert values["outstanding"] == round(10.005 + 20 + 30 + 40 + 50 + 5 + 7, 2)
+    assert values["oldest_unpaid_at"] == oldest
+    assert values["due_0_30"] == round(10.005 + 20 + 5 + 7, 2)
+    assert values["due_31_60"] == 30
+    assert values["due_61_90"] == 40
+    assert values["due_over_90"] == 50
+
+    empty = receivablesService._summarise([], as_of)
+    assert empty["open_credits"] == 0 and empty["outstanding"] == 0 and empty["oldest_unpaid_at"] is None
+    print("PASS")
+
+
+def test_3_create_order_on_credit_refreshes_the_summary(engine, product_id, variant_id, customer_id, servedby):
+    print("\n--- Test 3: An order paid in part writes the customer's summary in the same commit ---")
+    before = _outstanding(engine, customer_id)
+    order = order_model.OrderCreate(servedBy=servedby, customerId=customer_id, paymentStatus="Partial", amountPaid=50, items=[
+        {"productId": product_id, "variantId": variant_id, "quantity": 2,
+         "unitType": "unit", "unitPrice": 100, "details": {"quantity": 2}},
+    ])
+    with Session(engine) as db:
+        response = orderService.create_order(order, db, SimpleNamespace(role="admin", userId=servedby))
+        credit = db.exec(select(Credit).where(Credit.orderId == response.orderId)).one()
+        amount_due = credit.amount_due
+
+    after = _outstanding(engine, customer_id)
+    print(f"Credit due {amount_due}; outstanding {before} -> {after}")
+    assert amount_due > 0, "A part-paid order should leave credit due"
+    assert abs(after - (before + amount_due)) < receivablesService.TOLERANCE
+    assert abs(after - _open_due(engine, customer_id)) < receivablesService.TOLERANCE, \
+        "The summary should match the credits table"
+    print("PASS")
+    return response.orderId
+
+
+def test_4_update_credit_refreshes_the_summary(engine, customer_id, order_id):
+    print("\n--- Test 4: A payment against the credit (PUT /financials/credits) updates the summary ---")
+    before = _outstanding(engine, customer_id)
+    with Session(engine) as db:
+        creditService.update_credit(
+            30, order_id, financials_model.CreditUpdate(amount_due=0, status="Partially Paid"), db
+        )
+
+    after = _outstanding(engine, customer_id)
+    print(f"Outstanding {before} -> {after} (Expected {before - 30})")
+    assert abs(after - (before - 30)) < receivablesService.TOLERANCE
+    assert abs(after - _open_due(engine, customer_id)) < receivablesService.TOLERANCE
+    print("PASS")
+
+
+def test_5_reconcile_flags_and_fixes_a_hand_edited_row(engine, customer_id):
+    print("\n--- Test 5: reconcile() flags a row edited behind its back, and fix=True rewrites it ---")
+    truth = _outstanding(engine, customer_id)
+    with Session(engine) as db:
+        db.exec(
+            update(CustomerReceivable)
+            .where(CustomerReceivable.customerId == customer_id)
+            .values(outstanding=CustomerReceivable.outstanding + 999)
+        )
+        db.commit()
+
+    with Session(engine) as db:
+        report = receivablesService.reconcile(db)
+    print(f"Check only: {report}")
+    assert customer_id in report["mismatched"], "The hand-edited row should be reported as mismatched"
+    assert report["fixed"] == 0
+    assert abs(_outstanding(engine, customer_id) - (truth + 999)) < receivablesService.TOLERANCE, \
+        "Without fix the row must be left alone"
+
+    with Session(engine) as db:
+        report = receivablesService.reconcile(db, fix=True)
+    print(f"With fix: {report}")
+    assert customer_id in report["mismatched"] and report["fixed"] >= 1
+    assert abs(_outstanding(engine, customer_id) - truth) < receivablesService.TOLERANCE
+
+    with Session(engine) as db:
+        report = receivablesService.reconcile(db)
+    assert customer_id not in report["mismatched"], "The fixed row should now match the credits table"
+    print("PASS")
+
+
+def test_6_aging_report_reads_and_reconcile_reages(engine, customer_id):
+    print("\n--- Test 6: The aging report serves a stale row as stored; reconcile() re-ages it ---")
+    yesterday = date.today() - timedelta(days=1)
+    with Session(engine) as db:
+        db.exec(
+            update(CustomerReceivable)
+            .where(CustomerReceivable.customerId == customer_id)
+            .values(aged_on=yesterday, version=CustomerReceivable.version + 1)
+        )
+        db.commit()
+
+    with Session(engine) as db:
+        report = receivablesService.aging_report(db, 100)
+        row = db.get(CustomerReceivable, customer_id)
+        print(f"Report as_of={report['as_of']}, row aged_on={row.aged_on}")
+        assert row.aged_on == yesterday, "A GET must not rewrite the summary"
+        assert report["as_of"] <= yesterday.isoformat(), "as_of should admit the row is a day old"
+
+    with Session(engine) as db:
+        report = receivablesService.reconcile(db)
+        row = db.get(CustomerReceivable, customer_id)
+    print(f"Reconcile: {report}")
+    assert report["reaged"] >= 1 and row.aged_on == date.today()
+    print("PASS")
+
+
+def run():
+    failures = []
+    for name, fn in [
+        ("test_1_bucket_boundaries", test_1_bucket_boundaries),
+        ("test_2_summarise_ages_and_rounds", test_2_summarise_ages_and_rounds),
+    ]:
+        try:
+            fn()
+        except Exception as e:
+            failures.append((name, e))
+            print(f"{name} FAILED: {e}")
+
+    engine = create_engine(DATABASE_URL)
+    with Session(engine) as db:
+        product_id, variant_id, customer_id = _reset_fixtures(db)
+        servedby = first_user_id(db)
+
+    state = {}
+    for name, fn in [
+        ("test_3_create_order_on_credit_refreshes_the_summary",
+         lambda: state.update(order_id=test_3_create_order_on_credit_refreshes_the_summary(engine, product_id, variant_id, customer_id, servedby))),
+        ("test_4_update_credit_refreshes_the_summary",
+         lambda: test_4_update_credit_refreshes_the_summary(engine, customer_id, state["order_id"])),
+        ("test_5_reconcile_flags_and_fixes_a_hand_edited_row",
+         lambda: test_5_reconcile_flags_and_fixes_a_hand_edited_row(engine, customer_id)),
+        ("test_6_aging_report_reads_and_reconcile_reages",
+         lambda: test_6_aging_report_reads_and_reconcile_reages(engine, customer_id)),
+    ]:
+        try:
+            fn()
+        except Exception as e:
+            failures.append((name, e))
+            print(f"{name} FAILED: {e}")
+
+    print("\n" + "=" * 60)
+    if failures:
+        print(f"{len(failures)} test(s) FAILED:")
+        for name, e in failures:
+            print(f"  - {name}: {e}")
+    else:
+        print("All tests PASSED.")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,144 @@
+"""
+Standalone smoke tests for batch restocks
+(core/inventory/products/service.py restock_batch — POST /products/restock),
+following the same direct-DB-session pattern as test_stock_concurrency.py.
+
+Run from the server directory:
+    python test_restock_batch.py
+"""
+
+from types import SimpleNamespace
+
+from sqlmodel import Session, create_engine, func, select
+
+from db.database import DATABASE_URL
+from entities.editHistory import EditHistory
+from entities.products import Product
+from entities.variants import Variant
+from core.inventory.products import model, service
+from testFixtures import first_user_id, reset_product
+
+
+def _reset_fixtures(db: Session):
+    """A variable product (one variant, 10 in stock) and a simple one (4 in stock)."""
+    p, v = reset_product(db, "Test Restock Variable", stock=10, track_offcuts=False, unit="pcs")
+    s, _ = reset_product(db, "Test Restock Simple", stock=4, has_variants=False, track_offcuts=False, unit="pcs")
+    return p.productId, v.variantId, s.productId
+
+
+def _state(engine, product_id: int, variant_id: int, simple_id: int) -> dict:
+    with Session(engine) as db:
+        p, v, s = db.get(Product, product_id), db.get(Variant, variant_id), db.get(Product, simple_id)
+        history = db.exec(
+            select(func.count()).select_from(EditHistory)
+            .where(EditHistory.entity_type == "restock", EditHistory.entity_id.in_([product_id, simple_id]))
+        ).one()
+        return {
+            "variant": (v.stock_quantity, v.version),
+            "product": p.stock_quantity,
+            "simple": (s.stock_quantity, s.version),
+            "history": history,
+        }
+
+
+def test_1_same_variant_twice_in_one_batch(engine, user, product_id, variant_id, simple_id):
+    print("\n--- Test 1: Two lines for one variant see each other and write the row once ---")
+    before = _state(engine, product_id, variant_id, simple_id)
+    payload = model.RestockBatchRequest(lines=[
+        model.RestockLine(variant_id=variant_id, stock_change=5),
+        model.RestockLine(product_id=simple_id, stock_change=6),
+        model.RestockLine(variant_id=variant_id, product_id=product_id, stock_change=-12),
+    ])
+    with Session(engine) as db:
+        result = service.restock_batch(payload, db, user)
+    after = _state(engine, product_id, variant_id, simple_id)
+    print(f"Result: {result}\nBefore: {before}\nAfter:  {after}")
+
+    assert (result["applied"], result["failed"]) == (3, 0)
+    first, simple, second = result["lines"]
+    assert (first.stock_before, first.stock_after) == (10, 15)
+    assert (second.stock_before, second.stock_after) == (15, 3), \
+        "The second line should start from the first line's result, not the stored stock"
+    assert second.product_id == product_id and simple.stock_after == 10
+
+    assert after["variant"] == (3, before["variant"][1] + 1), "One write (one version bump) for the variant"
+    assert after["product"] == before["product"] - 7, "The parent product's stock follows its variant"
+    assert after["simple"] == (10, before["simple"][1] + 1)
+    assert after["history"] == before["history"] + 3, "One restock history row per line"
+    print("PASS")
+
+
+def test_2_invalid_line_rolls_the_batch_back(engine, user, product_id, variant_id, simple_id):
+    print("\n--- Test 2: In atomic mode one invalid line leaves every row untouched ---")
+    before = _state(engine, product_id, variant_id, simple_id)
+    payload = model.RestockBatchRequest(lines=[
+        model.RestockLine(variant_id=variant_id, stock_change=5),
+        model.RestockLine(product_id=simple_id, stock_change=2),
+        model.RestockLine(variant_id=variant_id, stock_change=-16),  # 10 + 5 - 16 < 0
+        model.RestockLine(product_id=product_id, stock_change=1),    # variable product without a variant
+    ])
+    with Session(engine) as db:
+        result = service.restock_batch(payload, db, user)
+    after = _state(engine, product_id, variant_id, simple_id)
+    print(f"Result: {result}\nBefore: {before}\nAfter:  {after}")
+
+    assert (result["applied"], result["failed"]) == (0, 2)
+    assert [r.status for r in result["lines"]] == ["skipped", "skipped", "failed", "failed"]
+    assert "Insufficient stock" in result["lines"][2].error
+    assert "variant lines" in result["lines"][3].error
+    assert all(r.stock_after is None for r in result["lines"])
+    assert after == before, "Stock, versions and history must all be as they were"
+    print("PASS")
+
+
+def test_3_partial_mode_keeps_the_valid_lines(engine, user, product_id, variant_id, simple_id):
+    print("\n--- Test 3: In partial mode the valid lines commit and the bad one is reported ---")
+    before = _state(engine, product_id, variant_id, simple_id)
+    payload = model.RestockBatchRequest(mode="partial", lines=[
+        model.RestockLine(variant_id=variant_id, stock_change=2),
+        model.RestockLine(variant_id=-1, stock_change=3),
+        model.RestockLine(product_id=simple_id, stock_change=0),
+    ])
+    with Session(engine) as db:
+        result = service.restock_batch(payload, db, user)
+    after = _state(engine, product_id, variant_id, simple_id)
+    print(f"Result: {result}\nBefore: {before}\nAfter:  {after}")
+
+    assert (result["applied"], result["failed"]) == (1, 2)
+    assert [r.error for r in result["lines"][1:]] == ["Variant not found", "stock_change is 0"]
+    assert after["variant"] == (12, before["variant"][1] + 1)
+    assert after["simple"] == before["simple"]
+    assert after["history"] == before["history"] + 1
+    print("PASS")
+
+
+def run():
+    engine = create_engine(DATABASE_URL)
+    with Session(engine) as db:
+        user = SimpleNamespace(userId=str(first_user_id(db)), username="test_restock_batch")
+
+    failures = []
+    for name, fn in [
+        ("test_1_same_variant_twice_in_one_batch", test_1_same_variant_twice_in_one_batch),
+        ("test_2_invalid_line_rolls_the_batch_back", test_2_invalid_line_rolls_the_batch_back),
+        ("test_3_partial_mode_keeps_the_valid_lines", test_3_partial_mode_keeps_the_valid_lines),
+    ]:
+        with Session(engine) as db:
+            product_id, variant_id, simple_id = _reset_fixtures(db)
+        try:
+            fn(engine, user, product_id, variant_id, simple_id)
+        except Exception as e:
+            failures.append((name, e))
+            print(f"{name} FAILED: {e}")
+
+    print("\n" + "=" * 60)
+    if failures:
+        print(f"{len(failures)} test(s) FAILED:")
+        for name, e in failures:
+            print(f"  - {name}: {e}")
+    else:
+        print("All tests PASSED.")
+
+
+if __name__ == "__main__":
+    run()
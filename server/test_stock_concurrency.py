@@ -0,0 +1,227 @@
+"""
+Standalone smoke tests for the compare-and-swap stock ledger
+(core/inventory/stockConcurrency.py), following the same direct-DB-session
+pattern as test_offcut_logic.py. Each test opens a second session on the same
+database to play the other till.
+
+Run from the server directory:
+    python test_stock_concurrency.py
+"""
+
+from types import SimpleNamespace
+
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlalchemy.orm.exc import StaleDataError
+from sqlmodel import Session, create_engine, select
+
+from config import settings
+from db.database import DATABASE_URL
+from db.retry import run_with_retry
+from entities.variants import Variant
+from core.inventory import stockConcurrency
+from core.ordering import model as order_model, orderService
+from monitoring import metrics
+from testFixtures import first_user_id, reset_product
+
+
+def _reset_product(db: Session):
+    """A plain (not offcut-tracked) accessory whose stock only moves through the ledger."""
+    p, v = reset_product(db, "Test CAS Accessory", track_offcuts=False, unit="pcs")
+    return p.productId, v.variantId
+
+
+def _bump(engine, variant_id: int, stock: float) -> None:
+    """Another till writes the variant: new stock, next version."""
+    with Session(engine) as other:
+        other.exec(
+            update(Variant)
+            .where(Variant.variantId == variant_id)
+            .values(stock_quantity=stock, version=Variant.version + 1)
+        )
+        other.commit()
+
+
+def _read(engine, variant_id: int) -> Variant:
+    with Session(engine) as other:
+        v = other.get(Variant, variant_id)
+        other.expunge(v)
+        return v
+
+
+def _conflicts() -> float:
+    return metrics.stock_cas_conflicts._values.get(("variants",), 0.0)
+
+
+def test_1_delta_lands_only_at_commit(engine, product_id, variant_id):
+    print("\n--- Test 1: A queued delta is invisible until commit, then written once ---")
+    before = _read(engine, variant_id)
+    with Session(engine) as db:
+        v = db.get(Variant, variant_id)
+        stockConcurrency.adjust(db, v, -2, require_available=True)
+        stockConcurrency.adjust(db, v, -1, require_available=True)
+        assert stockConcurrency.pending(db, v) == -3
+        db.flush()
+
+        during = _read(engine, variant_id)
+        print(f"Other session before commit: stock={during.stock_quantity} version={during.version}")
+        assert during.stock_quantity == before.stock_quantity and during.version == before.version, \
+            "Nothing should be written before commit"
+
+        db.commit()
+
+    after = _read(engine, variant_id)
+    print(f"After commit: stock={after.stock_quantity} version={after.version}")
+    assert after.stock_quantity == before.stock_quantity - 3
+    assert after.version == before.version + 1, "Two adjustments of one row should be ONE versioned write"
+    print("PASS")
+
+
+def test_2_cas_conflict_rereads_and_retries(engine, product_id, variant_id):
+    print("\n--- Test 2: A row bumped by another session is re-read and the CAS retried ---")
+    conflicts_before = _conflicts()
+    with Session(engine) as db:
+        v = db.get(Variant, variant_id)
+        start = v.stock_quantity
+        stockConcurrency.adjust(db, v, -1, require_available=True)
+        _bump(engine, variant_id, start + 5)  # a delivery lands meanwhile
+        db.commit()
+
+    after = _read(engine, variant_id)
+    print(f"After commit: stock={after.stock_quantity} (Expected {start + 5 - 1})")
+    assert after.stock_quantity == start + 5 - 1, "The delta should apply on top of the other session's write"
+    assert _conflicts() == conflicts_before + 1, "Expected exactly one CAS conflict"
+    print("PASS")
+
+
+def test_3_stale_data_error_replays_the_transaction(engine, product_id, variant_id):
+    print("\n--- Test 3: Out of CAS attempts -> StaleDataError -> run_with_retry replays ---")
+    attempts_setting, base_delay = stockConcurrency.CAS_ATTEMPTS, settings.TX_RETRY_BASE_DELAY
+    stockConcurrency.CAS_ATTEMPTS = 1
+    settings.TX_RETRY_BASE_DELAY = 0.001
+    calls = {"n": 0}
+    try:
+        with Session(engine) as db:
+            start = _read(engine, variant_id).stock_quantity
+
+            # Without the replay, the single CAS attempt's conflict is the caller's problem
+            v = db.get(Variant, variant_id)
+            stockConcurrency.adjust(db, v, -1)
+            _bump(engine, variant_id, start)
+            try:
+                db.commit()
+                raise AssertionError("Expected StaleDataError from commit")
+            except StaleDataError as e:
+                db.rollback()
+                print(f"Commit raised: {e}")
+
+            def transaction():
+                calls["n"] += 1
+                v = db.get(Variant, variant_id, populate_existing=True)
+                stockConcurrency.adjust(db, v, -1, require_available=True)
+                if calls["n"] == 1:
+                    _bump(engine, variant_id, v.stock_quantity)  # lose the first race only
+                db.commit()
+
+            run_with_retry(db, transaction, "test_stock_concurrency")
+    finally:
+        stockConcurrency.CAS_ATTEMPTS, settings.TX_RETRY_BASE_DELAY = attempts_setting, base_delay
+
+    after = _read(engine, variant_id)
+    print(f"Attempts: {calls['n']} (Expected 2), stock={after.stock_quantity} (Expected {start - 1})")
+    assert calls["n"] == 2
+    assert after.stock_quantity == start - 1, "The replayed transaction should deduct exactly once"
+    print("PASS")
+
+
+def test_4_insufficient_stock_at_commit_is_a_422(engine, product_id, variant_id, servedby):
+    print("\n--- Test 4: Stock sold out under a checkout surfaces from commit() as a 422 ---")
+    with Session(engine) as db:
+        v = db.get(Variant, variant_id)
+        v.stock_quantity = 3
+        db.add(v)
+        db.commit()
+
+    real = orderService.deduct_stock_for_order_item
+
+    def sold_out_meanwhile(db, item):
+        real(db, item)  # passes: 3 on hand as this transaction read it
+        _bump(engine, variant_id, 1)  # another till takes 2 before our commit
+
+    orderService.deduct_stock_for_order_item = sold_out_meanwhile
+    try:
+        order = order_model.OrderCreate(servedBy=servedby, paymentStatus="Paid", amountPaid=0, items=[
+            {"productId": product_id, "variantId": variant_id, "quantity": 3,
+             "unitType": "unit", "unitPrice": 1, "details": {"quantity": 3}},
+        ])
+        with Session(engine) as db:
+            try:
+                orderService.create_order(order, db, SimpleNamespace(role="admin", userId=servedby))
+                raise AssertionError("Expected the checkout to fail")
+            except HTTPException as e:
+                print(f"HTTP {e.status_code}: {e.detail}")
+                assert e.status_code == 422, f"Expected 422, got {e.status_code}"
+                assert "Insufficient stock" in e.detail
+    finally:
+        orderService.deduct_stock_for_order_item = real
+
+    after = _read(engine, variant_id)
+    assert after.stock_quantity == 1, f"The failed checkout must not write stock, found {after.stock_quantity}"
+    print("PASS")
+
+
+def test_5_dry_run_takes_no_locks_and_writes_nothing(engine, product_id, variant_id):
+    print("\n--- Test 5: dry_run() reads without FOR UPDATE and discards its ledger ---")
+    before = _read(engine, variant_id)
+    with Session(engine) as db:
+        with stockConcurrency.dry_run(db):
+            stmt = stockConcurrency.for_update(db, select(Variant).where(Variant.variantId == variant_id))
+            assert stmt._for_update_arg is None, "for_update() must not lock inside a dry run"
+            v = db.exec(stmt).one()
+            stockConcurrency.adjust(db, v, -1, require_available=True)
+
+            if engine.dialect.name == "postgresql":
+                # Another till can still lock the row right now
+                with Session(engine) as other:
+                    other.exec(select(Variant).where(Variant.variantId == variant_id).with_for_update(nowait=True)).one()
+                    other.rollback()
+        assert stockConcurrency.pending(db, v) == 0, "The ledger should be gone after the dry run's rollback"
+        db.commit()
+
+    after = _read(engine, variant_id)
+    print(f"Stock {before.stock_quantity} -> {after.stock_quantity}, version {before.version} -> {after.version}")
+    assert (after.stock_quantity, after.version) == (before.stock_quantity, before.version)
+    print("PASS")
+
+
+def run():
+    engine = create_engine(DATABASE_URL)
+    with Session(engine) as db:
+        product_id, variant_id = _reset_product(db)
+        servedby = first_user_id(db)
+
+    failures = []
+    for name, fn in [
+        ("test_1_delta_lands_only_at_commit", lambda: test_1_delta_lands_only_at_commit(engine, product_id, variant_id)),
+        ("test_2_cas_conflict_rereads_and_retries", lambda: test_2_cas_conflict_rereads_and_retries(engine, product_id, variant_id)),
+        ("test_3_stale_data_error_replays_the_transaction", lambda: test_3_stale_data_error_replays_the_transaction(engine, product_id, variant_id)),
+        ("test_4_insufficient_stock_at_commit_is_a_422", lambda: test_4_insufficient_stock_at_commit_is_a_422(engine, product_id, variant_id, servedby)),
+        ("test_5_dry_run_takes_no_locks_and_writes_nothing", lambda: test_5_dry_run_takes_no_locks_and_writes_nothing(engine, product_id, variant_id)),
+    ]:
+        try:
+            fn()
+        except Exception as e:
+            failures.append((name, e))
+            print(f"{name} FAILED: {e}")
+
+    print("\n" + "=" * 60)
+    if failures:
+        print(f"{len(failures)} test(s) FAILED:")
+        for name, e in failures:
+            print(f"  - {name}: {e}")
+    else:
+        print("All tests PASSED.")
+
+
+if __name__ == "__main__":
+    run()
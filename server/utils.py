@@ -9,6 +9,6 @@ def require_role(allowed_roles: list[str], current_user= Depends(get_current_use
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Operation not permitted"
         )
-    logger.info(f"User {current_user.userId} authorized for operation.")
+    logger.debug(f"User {current_user.userId} authorized for operation.")
     return True
         
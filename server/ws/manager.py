@@ -1,33 +1,58 @@
 import json
+from typing import Iterable, Optional
 from fastapi import WebSocket
+from monitoring import metrics
 
 
 class ConnectionManager:
     def __init__(self):
         self._connections: list[WebSocket] = []
+        # socket -> userId (str) for connections that authenticated with ?token=;
+        # anonymous sockets only receive broadcasts.
+        self._users: dict[WebSocket, str] = {}
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, user_id: Optional[str] = None):
         await websocket.accept()
         self._connections.append(websocket)
+        if user_id:
+            self._users[websocket] = user_id
 
     def disconnect(self, websocket: WebSocket):
-        self._connections.remove(websocket)
+        # Idempotent: a socket pruned after a failed send still gets its
+        # WebSocketDisconnect in ws/router.py later.
+        if websocket in self._connections:
+            self._connections.remove(websocket)
+        self._users.pop(websocket, None)
 
-    async def broadcast(self, event: str):
-        """Send { "type": event } to all live connections. Dead sockets are pruned."""
-        payload = json.dumps({"type": event})
+    def connection_count(self) -> int:
+        return len(self._connections)
+
+    async def _send(self, targets: list[WebSocket], payload: str):
         dead: list[WebSocket] = []
-        for ws in list(self._connections):
+        metrics.ws_send_queue_depth.inc(len(targets))
+        for ws in targets:
             try:
                 await ws.send_text(payload)
             except Exception:
+                metrics.ws_send_failures.inc()
                 dead.append(ws)
+            finally:
+                metrics.ws_send_queue_depth.dec()
         for ws in dead:
-            self._connections.discard(ws) if hasattr(self._connections, "discard") else None
-            try:
-                self._connections.remove(ws)
-            except ValueError:
-                pass
+            self.disconnect(ws)
+
+    async def broadcast(self, event: str):
+        """Send { "type": event } to all live connections. Dead sockets are pruned."""
+        await self._send(list(self._connections), json.dumps({"type": event}))
+
+    async def send_to_users(self, user_ids: Iterable[str], event: str, data: Optional[dict] = None):
+        """Send { "type": event, "data": data } to every connection of the given
+        users (a user may have several tabs/tills open)."""
+        wanted = set(user_ids)
+        targets = [ws for ws, uid in self._users.items() if uid in wanted]
+        if targets:
+            await self._send(targets, json.dumps({"type": event, "data": data}))
 
 
 manager = ConnectionManager()
+metrics.register_ws_gauges(manager.connection_count)
@@ -1,12 +1,23 @@
+from typing import Optional
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from core.userManagement.authService import verify_token
 from .manager import manager
 
 router = APIRouter(tags=["WebSocket"])
 
 
 @router.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+async def websocket_endpoint(websocket: WebSocket, token: Optional[str] = None):
+    # Browsers can't set headers on a WebSocket handshake, so the JWT comes as
+    # ?token=. It's optional: without it (or with an expired one) the socket
+    # still gets broadcasts, just not user-targeted events like new messages.
+    user_id = None
+    if token:
+        try:
+            user_id = str(verify_token(token).userId)
+        except Exception:
+            user_id = None
+    await manager.connect(websocket, user_id)
     try:
         while True:
             # Keep the connection alive; client can send "ping" — we ignore content